@@ -0,0 +1,97 @@
+"""Question pool tables.
+
+Revision ID: k5l6m7n8o9p0
+Revises: j4k5l6m7n8o9
+Create Date: 2026-03-02
+
+Creates:
+- question_pool_items: Pre-generated, safety-validated practice questions
+  bucketed by subject / topic / difficulty tier / Bloom's level
+- student_question_exposures: Per-student served questions (no-repeat)
+
+All tables are tenant-scoped with RLS on college_id.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+# revision identifiers, used by Alembic.
+revision = "k5l6m7n8o9p0"
+down_revision = "j4k5l6m7n8o9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # --- question_pool_items ---
+    op.create_table(
+        "question_pool_items",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("college_id", UUID(as_uuid=True), sa.ForeignKey("colleges.id"), nullable=False, index=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("NOW()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("NOW()"), nullable=False),
+        # Bucket
+        sa.Column("subject", sa.String(100), nullable=False),
+        sa.Column("topic", sa.String(200), nullable=False),
+        sa.Column("difficulty_tier", sa.String(10), nullable=False),
+        sa.Column("blooms_level", sa.String(20), nullable=False),
+        sa.Column("question_type", sa.String(10), nullable=False, server_default="mcq"),
+        # Content
+        sa.Column("question_data", JSONB, nullable=False),
+        sa.Column("content_hash", sa.String(64), nullable=False),
+        # Usage
+        sa.Column("served_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("last_served_at", sa.DateTime(timezone=True)),
+        sa.Column("status", sa.String(20), nullable=False, server_default="available"),
+        sa.UniqueConstraint("college_id", "content_hash", name="uq_question_pool_content_hash"),
+    )
+    op.create_index(
+        "ix_question_pool_bucket",
+        "question_pool_items",
+        ["college_id", "subject", "difficulty_tier", "blooms_level", "topic", "status"],
+    )
+
+    # --- student_question_exposures ---
+    op.create_table(
+        "student_question_exposures",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("college_id", UUID(as_uuid=True), sa.ForeignKey("colleges.id"), nullable=False, index=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("NOW()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("NOW()"), nullable=False),
+        sa.Column("student_id", UUID(as_uuid=True), nullable=False),
+        sa.Column(
+            "pool_item_id", UUID(as_uuid=True),
+            sa.ForeignKey("question_pool_items.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("served_context", sa.String(30), nullable=False),
+        sa.Column("served_at", sa.DateTime(timezone=True), nullable=False),
+        sa.UniqueConstraint(
+            "college_id", "student_id", "pool_item_id",
+            name="uq_question_exposure_student_item",
+        ),
+    )
+
+    # --- RLS ---
+    for table in ("question_pool_items", "student_question_exposures"):
+        op.execute(f"ALTER TABLE {table} ENABLE ROW LEVEL SECURITY")
+        op.execute(f"ALTER TABLE {table} FORCE ROW LEVEL SECURITY")
+        op.execute(
+            f"CREATE POLICY tenant_isolation_policy ON {table} "
+            f"USING (college_id = NULLIF(current_setting('app.current_college_id', true), '')::uuid)"
+        )
+        op.execute(
+            f"CREATE POLICY superadmin_bypass_policy ON {table} "
+            f"USING (current_setting('app.is_superadmin', true) = 'true')"
+        )
+
+
+def downgrade() -> None:
+    for table in ("student_question_exposures", "question_pool_items"):
+        op.execute(f"DROP POLICY IF EXISTS superadmin_bypass_policy ON {table}")
+        op.execute(f"DROP POLICY IF EXISTS tenant_isolation_policy ON {table}")
+
+    op.drop_table("student_question_exposures")
+    op.drop_index("ix_question_pool_bucket", table_name="question_pool_items")
+    op.drop_table("question_pool_items")
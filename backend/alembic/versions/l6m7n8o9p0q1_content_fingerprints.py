@@ -0,0 +1,83 @@
+"""Content fingerprints for near-duplicate detection.
+
+Revision ID: l6m7n8o9p0q1
+Revises: k5l6m7n8o9p0
+Create Date: 2026-03-04
+
+Creates:
+- content_fingerprints: MinHash signature, LSH band hashes and optional
+  embedding per generated question / flashcard
+
+Indexes:
+- GIN on lsh_bands (array overlap candidate lookup)
+- HNSW on embedding (cosine; rows are inserted one batch at a time, so
+  HNSW's incremental build fits better than IVFFlat here)
+
+Tenant-scoped with RLS on college_id.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import pgvector.sqlalchemy
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+
+# revision identifiers, used by Alembic.
+revision = "l6m7n8o9p0q1"
+down_revision = "k5l6m7n8o9p0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "content_fingerprints",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("college_id", UUID(as_uuid=True), sa.ForeignKey("colleges.id"), nullable=False, index=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("NOW()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("NOW()"), nullable=False),
+        sa.Column("kind", sa.String(20), nullable=False),
+        sa.Column("scope", sa.String(64), nullable=False, server_default=""),
+        sa.Column("item_id", UUID(as_uuid=True)),
+        sa.Column("content_hash", sa.String(64), nullable=False),
+        sa.Column("minhash", ARRAY(sa.BigInteger), nullable=False),
+        sa.Column("lsh_bands", ARRAY(sa.BigInteger), nullable=False),
+        sa.Column("embedding", pgvector.sqlalchemy.Vector(dim=1536)),
+        sa.UniqueConstraint(
+            "college_id", "kind", "scope", "content_hash",
+            name="uq_content_fingerprint_hash",
+        ),
+    )
+    op.create_index(
+        "ix_content_fingerprint_item",
+        "content_fingerprints",
+        ["kind", "item_id"],
+    )
+    op.execute(
+        "CREATE INDEX ix_content_fingerprint_bands "
+        "ON content_fingerprints USING gin (lsh_bands)"
+    )
+    op.execute(
+        "CREATE INDEX ix_content_fingerprint_embedding "
+        "ON content_fingerprints USING hnsw (embedding vector_cosine_ops)"
+    )
+
+    # --- RLS ---
+    op.execute("ALTER TABLE content_fingerprints ENABLE ROW LEVEL SECURITY")
+    op.execute("ALTER TABLE content_fingerprints FORCE ROW LEVEL SECURITY")
+    op.execute(
+        "CREATE POLICY tenant_isolation_policy ON content_fingerprints "
+        "USING (college_id = NULLIF(current_setting('app.current_college_id', true), '')::uuid)"
+    )
+    op.execute(
+        "CREATE POLICY superadmin_bypass_policy ON content_fingerprints "
+        "USING (current_setting('app.is_superadmin', true) = 'true')"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP POLICY IF EXISTS superadmin_bypass_policy ON content_fingerprints")
+    op.execute("DROP POLICY IF EXISTS tenant_isolation_policy ON content_fingerprints")
+    op.execute("DROP INDEX IF EXISTS ix_content_fingerprint_embedding")
+    op.execute("DROP INDEX IF EXISTS ix_content_fingerprint_bands")
+    op.drop_index("ix_content_fingerprint_item", table_name="content_fingerprints")
+    op.drop_table("content_fingerprints")
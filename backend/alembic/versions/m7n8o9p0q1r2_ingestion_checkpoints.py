@@ -0,0 +1,57 @@
+"""Ingestion checkpoints for resumable streaming PDF ingestion.
+
+Revision ID: m7n8o9p0q1r2
+Revises: l6m7n8o9p0q1
+Create Date: 2026-03-05
+
+Creates:
+- ingestion_checkpoints: per-document progress (pages done, chunker
+  state, counts) committed with each page range of MedicalContent rows
+
+Not tenant-scoped by RLS — college_id is nullable (platform-wide
+content), matching medical_content.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+
+# revision identifiers, used by Alembic.
+revision = "m7n8o9p0q1r2"
+down_revision = "l6m7n8o9p0q1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ingestion_checkpoints",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("college_id", UUID(as_uuid=True), sa.ForeignKey("colleges.id"), nullable=True),
+        sa.Column("file_hash", sa.String(64), nullable=False),
+        sa.Column("document_id", UUID(as_uuid=True), nullable=False),
+        sa.Column("filename", sa.String(500), nullable=False),
+        sa.Column("source_type", sa.String(30), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="in_progress"),
+        sa.Column("total_pages", sa.Integer, nullable=False),
+        sa.Column("pages_done", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("pages_extracted", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("next_chunk_index", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("char_offset", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("carry_text", sa.Text, nullable=False, server_default=""),
+        sa.Column("chunks_stored", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("chunks_skipped", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("classification_batch_ids", ARRAY(sa.String), nullable=False, server_default="{}"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("NOW()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("NOW()"), nullable=False),
+    )
+    op.create_index(
+        "ix_ingestion_checkpoint_file",
+        "ingestion_checkpoints",
+        ["file_hash", "status"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ingestion_checkpoint_file", table_name="ingestion_checkpoints")
+    op.drop_table("ingestion_checkpoints")
@@ -0,0 +1,49 @@
+"""Document versions for incremental re-ingestion.
+
+Revision ID: n8o9p0q1r2s3
+Revises: m7n8o9p0q1r2
+Create Date: 2026-03-09
+
+Adds to ingestion_checkpoints:
+- previous_document_id: the document a new edition replaces
+- version: position in that chain, starting at 1
+- chunks_reused: unchanged chunks carried over from the previous version
+- ix_ingestion_checkpoint_document: version lookup by document_id
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers, used by Alembic.
+revision = "n8o9p0q1r2s3"
+down_revision = "m7n8o9p0q1r2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "ingestion_checkpoints",
+        sa.Column("previous_document_id", UUID(as_uuid=True), nullable=True),
+    )
+    op.add_column(
+        "ingestion_checkpoints",
+        sa.Column("version", sa.Integer, nullable=False, server_default="1"),
+    )
+    op.add_column(
+        "ingestion_checkpoints",
+        sa.Column("chunks_reused", sa.Integer, nullable=False, server_default="0"),
+    )
+    op.create_index(
+        "ix_ingestion_checkpoint_document",
+        "ingestion_checkpoints",
+        ["document_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ingestion_checkpoint_document", table_name="ingestion_checkpoints")
+    op.drop_column("ingestion_checkpoints", "chunks_reused")
+    op.drop_column("ingestion_checkpoints", "version")
+    op.drop_column("ingestion_checkpoints", "previous_document_id")
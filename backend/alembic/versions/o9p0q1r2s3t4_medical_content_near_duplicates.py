@@ -0,0 +1,55 @@
+"""Near-duplicate fingerprints on medical_content.
+
+Revision ID: o9p0q1r2s3t4
+Revises: n8o9p0q1r2s3
+Create Date: 2026-03-11
+
+Adds to medical_content:
+- minhash, lsh_bands: MinHash signature and LSH band hashes (backfilled
+  for existing rows by ai.cluster_near_duplicate_chunks)
+- canonical_id: set on a near-duplicate to the row it duplicates
+
+Indexes:
+- GIN on lsh_bands (array overlap candidate lookup)
+- ix_medical_content_canonical (releasing duplicates of retired rows)
+
+Adds chunks_near_duplicate to ingestion_checkpoints.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+
+# revision identifiers, used by Alembic.
+revision = "o9p0q1r2s3t4"
+down_revision = "n8o9p0q1r2s3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("medical_content", sa.Column("minhash", ARRAY(sa.BigInteger), nullable=True))
+    op.add_column("medical_content", sa.Column("lsh_bands", ARRAY(sa.BigInteger), nullable=True))
+    op.add_column("medical_content", sa.Column("canonical_id", UUID(as_uuid=True), nullable=True))
+    op.execute(
+        "CREATE INDEX ix_medical_content_lsh_bands "
+        "ON medical_content USING gin (lsh_bands)"
+    )
+    op.create_index(
+        "ix_medical_content_canonical",
+        "medical_content",
+        ["canonical_id"],
+    )
+    op.add_column(
+        "ingestion_checkpoints",
+        sa.Column("chunks_near_duplicate", sa.Integer, nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("ingestion_checkpoints", "chunks_near_duplicate")
+    op.drop_index("ix_medical_content_canonical", table_name="medical_content")
+    op.execute("DROP INDEX IF EXISTS ix_medical_content_lsh_bands")
+    op.drop_column("medical_content", "canonical_id")
+    op.drop_column("medical_content", "lsh_bands")
+    op.drop_column("medical_content", "minhash")
@@ -0,0 +1,79 @@
+"""Denormalized SM-2 state and due-queue index on flashcards.
+
+Revision ID: p0q1r2s3t4u5
+Revises: o9p0q1r2s3t4
+Create Date: 2026-03-12
+
+Adds to flashcards the SM-2 state of the latest review (ease_factor,
+interval_days, repetition_count, next_review_date, last_reviewed_at),
+backfilled from flashcard_reviews, and the partial index
+ix_flashcards_student_due on (student_id, next_review_date) WHERE
+is_active, so a review session is an index range scan with LIMIT
+instead of a join of every card with its latest review.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "p0q1r2s3t4u5"
+down_revision = "o9p0q1r2s3t4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "flashcards",
+        sa.Column("ease_factor", sa.Float, nullable=False, server_default="2.5"),
+    )
+    op.add_column(
+        "flashcards",
+        sa.Column("interval_days", sa.Float, nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "flashcards",
+        sa.Column("repetition_count", sa.Integer, nullable=False, server_default="0"),
+    )
+    op.add_column("flashcards", sa.Column("next_review_date", sa.Date, nullable=True))
+    op.add_column(
+        "flashcards",
+        sa.Column("last_reviewed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+    # Backfill from each card's latest review. flashcards has FORCE RLS,
+    # so the update runs under the superadmin bypass policy.
+    op.execute("SET LOCAL app.is_superadmin = 'true'")
+    op.execute("""
+        UPDATE flashcards AS f
+        SET ease_factor = COALESCE(r.ease_factor, 2.5),
+            interval_days = COALESCE(r.interval_days, 0),
+            repetition_count = COALESCE(r.repetition_count, 0),
+            next_review_date = r.next_review_date,
+            last_reviewed_at = r.reviewed_at
+        FROM (
+            SELECT DISTINCT ON (flashcard_id)
+                flashcard_id, ease_factor, interval_days, repetition_count,
+                next_review_date, reviewed_at
+            FROM flashcard_reviews
+            ORDER BY flashcard_id, reviewed_at DESC NULLS LAST
+        ) AS r
+        WHERE f.id = r.flashcard_id
+    """)
+    op.execute("RESET app.is_superadmin")
+
+    op.create_index(
+        "ix_flashcards_student_due",
+        "flashcards",
+        ["student_id", "next_review_date"],
+        postgresql_where=sa.text("is_active"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_flashcards_student_due", table_name="flashcards")
+    op.drop_column("flashcards", "last_reviewed_at")
+    op.drop_column("flashcards", "next_review_date")
+    op.drop_column("flashcards", "repetition_count")
+    op.drop_column("flashcards", "interval_days")
+    op.drop_column("flashcards", "ease_factor")
@@ -0,0 +1,145 @@
+"""Flashcard review stats and FSRS memory state.
+
+Revision ID: q1r2s3t4u5v6
+Revises: p0q1r2s3t4u5
+Create Date: 2026-03-13
+
+Adds flashcard_review_stats: the rolling per-student aggregate kept by
+the flashcard scheduler (reviews, reviewed/mastered cards, ease sum,
+streak) and the student's fitted FSRS weights. Backfilled from
+flashcards and flashcard_reviews.
+
+Adds memory_stability / memory_difficulty (FSRS state) to flashcards,
+seeded for reviewed cards from their SM-2 interval: at the default 90%
+retention the FSRS interval equals the stability.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+# revision identifiers, used by Alembic.
+revision = "q1r2s3t4u5v6"
+down_revision = "p0q1r2s3t4u5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("flashcards", sa.Column("memory_stability", sa.Float, nullable=True))
+    op.add_column("flashcards", sa.Column("memory_difficulty", sa.Float, nullable=True))
+
+    op.create_table(
+        "flashcard_review_stats",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("college_id", UUID(as_uuid=True), sa.ForeignKey("colleges.id"), nullable=False, index=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("NOW()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("NOW()"), nullable=False),
+        sa.Column("student_id", UUID(as_uuid=True), sa.ForeignKey("students.id"), nullable=False),
+        sa.Column("total_reviews", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("reviewed_cards", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("mastered_cards", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("ease_factor_sum", sa.Float, nullable=False, server_default="0"),
+        sa.Column("mastered_by_subject", JSONB, nullable=False, server_default="{}"),
+        sa.Column("streak_days", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("last_review_date", sa.Date),
+        sa.Column("fsrs_weights", JSONB),
+        sa.Column("fsrs_fitted_at", sa.DateTime(timezone=True)),
+        sa.UniqueConstraint("college_id", "student_id", name="uq_flashcard_review_stats_student"),
+    )
+
+    # --- RLS ---
+    op.execute("ALTER TABLE flashcard_review_stats ENABLE ROW LEVEL SECURITY")
+    op.execute("ALTER TABLE flashcard_review_stats FORCE ROW LEVEL SECURITY")
+    op.execute(
+        "CREATE POLICY tenant_isolation_policy ON flashcard_review_stats "
+        "USING (college_id = NULLIF(current_setting('app.current_college_id', true), '')::uuid)"
+    )
+    op.execute(
+        "CREATE POLICY superadmin_bypass_policy ON flashcard_review_stats "
+        "USING (current_setting('app.is_superadmin', true) = 'true')"
+    )
+
+    # --- Backfill (tables have FORCE RLS: run under the superadmin policy) ---
+    op.execute("SET LOCAL app.is_superadmin = 'true'")
+    op.execute("""
+        UPDATE flashcards
+        SET memory_stability = GREATEST(interval_days, 0.1),
+            memory_difficulty = 5.0
+        WHERE last_reviewed_at IS NOT NULL
+    """)
+    op.execute("""
+        INSERT INTO flashcard_review_stats (
+            id, college_id, student_id, total_reviews, reviewed_cards,
+            mastered_cards, ease_factor_sum, mastered_by_subject,
+            streak_days, last_review_date
+        )
+        WITH reviewed AS (
+            SELECT college_id, student_id, subject, ease_factor,
+                   (ease_factor >= 2.5 AND interval_days >= 21) AS mastered
+            FROM flashcards
+            WHERE last_reviewed_at IS NOT NULL
+        ),
+        cards AS (
+            SELECT college_id, student_id,
+                   count(*) AS reviewed_cards,
+                   count(*) FILTER (WHERE mastered) AS mastered_cards,
+                   sum(ease_factor) AS ease_factor_sum
+            FROM reviewed
+            GROUP BY college_id, student_id
+        ),
+        subjects AS (
+            SELECT college_id, student_id,
+                   jsonb_object_agg(subject, n) AS mastered_by_subject
+            FROM (
+                SELECT college_id, student_id, subject, count(*) AS n
+                FROM reviewed
+                WHERE mastered
+                GROUP BY college_id, student_id, subject
+            ) AS s
+            GROUP BY college_id, student_id
+        ),
+        days AS (
+            SELECT DISTINCT college_id, student_id, reviewed_at::date AS day
+            FROM flashcard_reviews
+            WHERE reviewed_at IS NOT NULL
+        ),
+        runs AS (
+            SELECT college_id, student_id, day,
+                   day - (row_number() OVER (
+                       PARTITION BY college_id, student_id ORDER BY day
+                   ))::int AS run
+            FROM days
+        ),
+        streaks AS (
+            SELECT DISTINCT ON (college_id, student_id)
+                   college_id, student_id,
+                   count(*) AS streak_days, max(day) AS last_review_date
+            FROM runs
+            GROUP BY college_id, student_id, run
+            ORDER BY college_id, student_id, max(day) DESC
+        ),
+        reviews AS (
+            SELECT college_id, student_id, count(*) AS total_reviews
+            FROM flashcard_reviews
+            GROUP BY college_id, student_id
+        )
+        SELECT gen_random_uuid(), r.college_id, r.student_id, r.total_reviews,
+               COALESCE(c.reviewed_cards, 0), COALESCE(c.mastered_cards, 0),
+               COALESCE(c.ease_factor_sum, 0),
+               COALESCE(s.mastered_by_subject, '{}'::jsonb),
+               COALESCE(k.streak_days, 0), k.last_review_date
+        FROM reviews AS r
+        LEFT JOIN cards AS c USING (college_id, student_id)
+        LEFT JOIN subjects AS s USING (college_id, student_id)
+        LEFT JOIN streaks AS k USING (college_id, student_id)
+    """)
+    op.execute("RESET app.is_superadmin")
+
+
+def downgrade() -> None:
+    op.execute("DROP POLICY IF EXISTS superadmin_bypass_policy ON flashcard_review_stats")
+    op.execute("DROP POLICY IF EXISTS tenant_isolation_policy ON flashcard_review_stats")
+    op.drop_table("flashcard_review_stats")
+    op.drop_column("flashcards", "memory_difficulty")
+    op.drop_column("flashcards", "memory_stability")
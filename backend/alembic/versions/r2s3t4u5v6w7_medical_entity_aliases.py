@@ -0,0 +1,79 @@
+"""Medical entity aliases with a trigram index for entity resolution.
+
+Revision ID: r2s3t4u5v6w7
+Revises: q1r2s3t4u5v6
+Create Date: 2026-03-14
+
+Enables pg_trgm and creates medical_entity_aliases: one row per name an
+entity can be looked up by (its name, each MedicalEntity.aliases entry,
+curated synonyms), with normalized_alias GIN-indexed (gin_trgm_ops) for
+the entity resolver's exact / prefix / substring / similarity lookups.
+Backfilled from medical_entities.
+
+Not tenant-scoped — the knowledge graph is platform-wide, matching
+medical_entities.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers, used by Alembic.
+revision = "r2s3t4u5v6w7"
+down_revision = "q1r2s3t4u5v6"
+branch_labels = None
+depends_on = None
+
+# Same normalization as knowledge_graph.normalize_name
+_NORMALIZED = "btrim(regexp_replace(lower(n.alias), '[^a-z0-9+]+', ' ', 'g'))"
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.create_table(
+        "medical_entity_aliases",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("entity_id", UUID(as_uuid=True), sa.ForeignKey("medical_entities.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("alias", sa.String(500), nullable=False),
+        sa.Column("normalized_alias", sa.String(500), nullable=False),
+        sa.Column("source", sa.String(20), nullable=False, server_default="synonym"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("NOW()"), nullable=False),
+        sa.UniqueConstraint("entity_id", "normalized_alias", name="uq_entity_alias"),
+    )
+    op.create_index(
+        "ix_entity_alias_normalized",
+        "medical_entity_aliases",
+        ["normalized_alias"],
+    )
+    op.execute(
+        "CREATE INDEX ix_entity_alias_trgm ON medical_entity_aliases "
+        "USING gin (normalized_alias gin_trgm_ops)"
+    )
+
+    # --- Backfill: every entity's name and JSONB aliases ---
+    op.execute(f"""
+        INSERT INTO medical_entity_aliases (
+            id, entity_id, alias, normalized_alias, source
+        )
+        SELECT gen_random_uuid(), n.entity_id, n.alias, {_NORMALIZED}, n.source
+        FROM (
+            SELECT e.id AS entity_id, e.name AS alias, 'name' AS source
+            FROM medical_entities AS e
+            UNION ALL
+            SELECT e.id, a.alias, 'alias'
+            FROM medical_entities AS e,
+                 jsonb_array_elements_text(
+                     CASE WHEN jsonb_typeof(e.aliases) = 'array'
+                          THEN e.aliases ELSE '[]'::jsonb END
+                 ) AS a(alias)
+        ) AS n
+        WHERE {_NORMALIZED} <> ''
+        ON CONFLICT (entity_id, normalized_alias) DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_entity_alias_trgm")
+    op.drop_index("ix_entity_alias_normalized", table_name="medical_entity_aliases")
+    op.drop_table("medical_entity_aliases")
@@ -60,6 +60,9 @@ class Settings(BaseSettings):
     LANGFUSE_PUBLIC_KEY: str = ""
     LANGFUSE_HOST: str = "http://localhost:3000"
 
+    # Flashcards
+    FLASHCARD_SCHEDULER: str = "sm2"  # "sm2" | "fsrs" (students with fitted weights)
+
     # --- AQP: Device Trust ---
     DEVICE_TRUST_SECRET: str = ""  # HS256 key for device trust JWTs (min 32 chars)
     QR_TOKEN_SECRET: str = ""  # HS256 key for QR identity tokens (min 32 chars)
@@ -80,6 +80,23 @@ CELERY_BEAT_SCHEDULE = {
         "options": {"queue": "ai_queue"},
         "kwargs": {"college_id": "__all__"},
     },
+    "ai-question-pool-fill": {
+        "task": "ai.nightly_question_pool_fill",
+        "schedule": crontab(hour=1, minute=30),  # 1:30 AM IST daily
+        "options": {"queue": "ai_queue"},
+        "kwargs": {"college_id": "__all__"},
+    },
+    "ai-near-duplicate-chunks": {
+        "task": "ai.cluster_near_duplicate_chunks",
+        "schedule": crontab(hour=4, minute=0, day_of_week=0),  # Sunday 4 AM
+        "options": {"queue": "ai_queue"},
+    },
+    "ai-fsrs-weights": {
+        "task": "ai.fit_fsrs_weights",
+        "schedule": crontab(hour=4, minute=30, day_of_week=0),  # Sunday 4:30 AM
+        "options": {"queue": "ai_queue"},
+        "kwargs": {"college_id": "__all__"},
+    },
     "stale-session-cleanup": {
         "task": "student.cleanup_stale_sessions",
         "schedule": crontab(hour=3, minute=0),  # 3:00 AM IST daily
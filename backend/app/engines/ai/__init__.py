@@ -21,6 +21,11 @@ from app.engines.ai.gateway import (  # noqa: F401
     MODEL_PRICING,
 )
 from app.engines.ai.gateway_deps import get_ai_gateway  # noqa: F401
+from app.engines.ai.model_routing import (  # noqa: F401
+    CapabilityTier,
+    ModelRoutingPolicy,
+    RoutingSLO,
+)
 from app.engines.ai.prompt_registry import (  # noqa: F401
     PromptNotFoundError,
     PromptRegistry,
@@ -24,6 +24,7 @@ Usage from routes or other engines (via AI engine public interface):
         analyze_neetpg_result,
         get_neetpg_high_yield_topics,
         get_neetpg_history,
+        stream_neetpg_mock_test,
         NEETPGPrepAgent,
     )
     from app.engines.ai.agents.flashcard_generator import (
@@ -32,6 +33,7 @@ Usage from routes or other engines (via AI engine public interface):
         generate_flashcards_from_topic,
         get_review_session,
         process_flashcard_review,
+        process_flashcard_review_batch,
         get_flashcard_stats,
     )
     from app.engines.ai.agents.recommendation_engine import (
@@ -74,6 +76,7 @@ from app.engines.ai.agents.neet_pg_prep import (  # noqa: F401
     generate_neetpg_mock_test,
     get_neetpg_high_yield_topics,
     get_neetpg_history,
+    stream_neetpg_mock_test,
 )
 from app.engines.ai.agents.flashcard_generator import (  # noqa: F401
     FlashcardGenerator,
@@ -82,6 +85,7 @@ from app.engines.ai.agents.flashcard_generator import (  # noqa: F401
     get_flashcard_stats,
     get_review_session,
     process_flashcard_review,
+    process_flashcard_review_batch,
 )
 from app.engines.ai.agents.recommendation_engine import (  # noqa: F401
     build_recommendation_graph,
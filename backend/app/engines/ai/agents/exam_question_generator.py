@@ -24,7 +24,7 @@ import json
 import logging
 from datetime import datetime, timezone
 from typing import Any
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import END, START, StateGraph
@@ -39,9 +39,17 @@ from app.engines.ai.agents.practice_question_generator import (
     _format_passages,
     _format_question_for_validation,
 )
+from app.engines.ai.dedup_index import (
+    DedupIndex,
+    DedupKind,
+    question_dedup_text,
+)
 from app.engines.ai.gateway import AIGateway
 from app.engines.ai.models import AgentExecution, AgentFeedback
-from app.engines.ai.pipelines.medical_safety import MedicalSafetyPipeline
+from app.engines.ai.pipelines.medical_safety import (
+    MedicalSafetyPipeline,
+    SafetyItem,
+)
 from app.engines.ai.prompt_registry import PromptRegistry
 from app.engines.ai.question_intelligence import get_question_intelligence_layer
 from app.engines.ai.rag import get_rag_engine
@@ -446,6 +454,23 @@ async def validate_questions(
     newly_validated: list[dict] = []
     newly_rejected: list[dict] = []
 
+    # Drop near-duplicates of earlier exam questions before safety checks
+    index = DedupIndex(db, college_id=college_id, kind=DedupKind.EXAM_QUESTION)
+    texts = [_dedup_text(q) for q in generated]
+    matches = await index.check(texts)
+    for q, match in zip(generated, matches):
+        if match is not None:
+            newly_rejected.append({
+                **q,
+                "rejection_reasons": [
+                    "Near-duplicate of an existing exam question — write a "
+                    "different scenario",
+                ],
+            })
+    texts = [t for t, match in zip(texts, matches) if match is None]
+    generated = [q for q, match in zip(generated, matches) if match is None]
+
+    items: list[SafetyItem] = []
     for q in generated:
         q_type = q.get("_question_type", "mcq")
 
@@ -454,22 +479,30 @@ async def validate_questions(
         else:
             question_text = _format_saq_laq_for_validation(q)
 
-        result = await pipeline.validate(
-            db,
+        items.append(SafetyItem(
             content=question_text,
             content_type=q_type,
-            college_id=college_id,
             source_context=source_context,
             declared_blooms_level=q.get("blooms_level"),
             # ALWAYS summative for exam questions — requires human review
             is_summative=True,
-        )
+        ))
 
+    # One packed call per check type for the whole batch
+    results = await pipeline.validate_batch(
+        db, items=items, college_id=college_id,
+    )
+
+    passed_texts: list[tuple[str, UUID]] = []
+    for q, text_, result in zip(generated, texts, results):
         if result.passed:
             # Mark that it STILL needs human review (summative = always review)
             q["_safety_passed"] = True
             q["_safety_confidence"] = result.overall_confidence
+            # Stable id in the draft, recorded as the dedup index item id
+            q["id"] = str(uuid4())
             newly_validated.append(q)
+            passed_texts.append((text_, UUID(q["id"])))
         else:
             q_with_reasons = {**q, "rejection_reasons": result.rejection_reasons}
             newly_rejected.append(q_with_reasons)
@@ -479,6 +512,9 @@ async def validate_questions(
                 result.rejection_reasons[:2],
             )
 
+    # Drafts are the only copy of exam questions — index them now
+    await index.add(passed_texts)
+
     return {
         "validated_questions": already_validated + newly_validated,
         "rejected_questions": newly_rejected,
@@ -1063,6 +1099,13 @@ def _build_faculty_addendum(
     return "\n".join(parts) if parts else ""
 
 
+def _dedup_text(q: dict) -> str:
+    """Dedup text: stem + lead-in for MCQs, the question text otherwise."""
+    if q.get("_question_type", "mcq") == "mcq":
+        return question_dedup_text(q)
+    return q.get("question_text", "")
+
+
 def _format_saq_laq_for_validation(q: dict) -> str:
     """Format an SAQ or LAQ for the safety pipeline validation."""
     q_type = q.get("_question_type", "saq")
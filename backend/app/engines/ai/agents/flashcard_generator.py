@@ -18,13 +18,15 @@ Public interface:
         generate_flashcards_from_topic,
         get_review_session,
         process_flashcard_review,
+        process_flashcard_review_batch,
         get_flashcard_stats,
     )
+
+Scheduling itself (SM-2 / FSRS, review stats) is in flashcard_scheduler.
 """
 
 import logging
-import math
-from datetime import date, datetime, timedelta, timezone
+from datetime import date, datetime, timezone
 from typing import Any
 from uuid import UUID
 
@@ -40,6 +42,14 @@ from app.engines.ai.agents.flashcard_schemas import (
     ReviewSession,
     SpacedRepetitionUpdate,
 )
+from app.engines.ai.agents.flashcard_scheduler import (
+    DEFAULT_EASE_FACTOR,
+    FlashcardScheduler,
+    ReviewBatchResult,
+    ReviewInput,
+    current_streak,
+)
+from app.engines.ai.dedup_index import DedupIndex, DedupKind
 from app.engines.ai.gateway import AIGateway
 from app.engines.ai.models import (
     AgentExecution,
@@ -50,15 +60,14 @@ from app.engines.ai.models import (
 )
 from app.engines.ai.prompt_registry import PromptRegistry
 from app.engines.ai.rag import get_rag_engine
-from app.engines.student.models import Flashcard, FlashcardReview
+from app.engines.student.models import Flashcard, FlashcardReviewStats
 
 logger = logging.getLogger(__name__)
 
 AGENT_ID = "flashcard_generator"
 
-# SM-2 defaults
-DEFAULT_EASE_FACTOR = 2.5
-MIN_EASE_FACTOR = 1.3
+# Cap on text extracted directly from a not-yet-ingested PDF
+PDF_SOURCE_MAX_CHARS = 60_000
 
 
 class FlashcardGenerator:
@@ -69,6 +78,7 @@ class FlashcardGenerator:
         generate_from_topic — Create flashcards from a medical topic
         get_review_session  — Get cards due for review today
         process_review      — Process a card review and update SM-2 state
+        process_review_batch — Process offline-synced or imported reviews
         get_stats           — Get the student's flashcard statistics
     """
 
@@ -98,7 +108,12 @@ class FlashcardGenerator:
         count: int = 20,
         card_types: list[str] | None = None,
     ) -> FlashcardBatch:
-        """Generate flashcards from a PDF via RAG retrieval + Sonnet."""
+        """Generate flashcards from a PDF via RAG retrieval + Sonnet.
+
+        If nothing of the PDF has been ingested yet and pdf_id is an R2
+        key of this college, the page range is extracted from the file
+        directly (process-pool extraction, as in content ingestion).
+        """
         card_types = card_types or ["basic", "cloze"]
         rag = get_rag_engine()
 
@@ -117,6 +132,12 @@ class FlashcardGenerator:
             self._db, query, college_id=college_id,
             filters=filters, top_k=10,
         )
+        source_context = rag_result.formatted_context
+        if not rag_result.passages:
+            source_context = (
+                await self._extract_pdf_source(pdf_id, college_id, page_range)
+                or source_context
+            )
 
         # Create audit execution
         execution = AgentExecution(
@@ -161,7 +182,7 @@ class FlashcardGenerator:
             f"Card types to use: {card_type_str}\n"
             f"Subject: {subject or 'infer from content'}\n"
             f"Topic: {topic or 'infer from content'}\n\n"
-            f"Source content:\n{rag_result.formatted_context}"
+            f"Source content:\n{source_context}"
         )
 
         # Constrained decoding → guaranteed valid JSON
@@ -195,6 +216,7 @@ class FlashcardGenerator:
                 "pdf_id": pdf_id,
                 "page_range": page_range,
                 "execution_id": str(execution.id),
+                "duplicates_skipped": len(batch.flashcards) - len(cards),
             },
         )
 
@@ -315,6 +337,7 @@ class FlashcardGenerator:
                 "topic": topic,
                 "focus": focus,
                 "execution_id": str(execution.id),
+                "duplicates_skipped": len(batch.flashcards) - len(cards),
             },
         )
 
@@ -333,78 +356,60 @@ class FlashcardGenerator:
         """Get cards due for review using SM-2 scheduling.
 
         Priority order:
-        1. Overdue cards (past next_review_date)
+        1. Overdue cards (past next_review_date), most overdue first
         2. Cards due today
-        3. New cards (never reviewed)
+        3. New cards (never reviewed), oldest first
+
+        Reads the SM-2 state denormalized onto Flashcard, so each part is
+        a range scan of ix_flashcards_student_due with LIMIT and the cost
+        follows the session size, not the student's deck size.
         """
         today = date.today()
 
-        # Subquery: latest review per flashcard
-        latest_review = (
-            select(
-                FlashcardReview.flashcard_id,
-                func.max(FlashcardReview.reviewed_at).label("latest_at"),
-            )
-            .where(
-                FlashcardReview.student_id == student_id,
-                FlashcardReview.college_id == college_id,
+        scope = [
+            Flashcard.student_id == student_id,
+            Flashcard.college_id == college_id,
+            Flashcard.is_active == True,  # noqa: E712
+        ]
+        if subject:
+            scope.append(Flashcard.subject == subject)
+
+        due_result = await self._db.execute(
+            select(Flashcard)
+            .where(*scope, Flashcard.next_review_date <= today)
+            .order_by(Flashcard.next_review_date, Flashcard.id)
+            .limit(max_cards)
+        )
+        cards = list(due_result.scalars().all())
+
+        if len(cards) < max_cards:
+            new_result = await self._db.execute(
+                select(Flashcard)
+                .where(*scope, Flashcard.next_review_date.is_(None))
+                .order_by(Flashcard.created_at, Flashcard.id)
+                .limit(max_cards - len(cards))
             )
-            .group_by(FlashcardReview.flashcard_id)
-            .subquery()
-        )
+            cards.extend(new_result.scalars().all())
 
-        # Join cards with their latest review
-        due_query = (
-            select(Flashcard, FlashcardReview)
-            .outerjoin(
-                latest_review,
-                Flashcard.id == latest_review.c.flashcard_id,
-            )
-            .outerjoin(
-                FlashcardReview,
-                (FlashcardReview.flashcard_id == Flashcard.id)
-                & (FlashcardReview.reviewed_at == latest_review.c.latest_at),
-            )
-            .where(
-                Flashcard.student_id == student_id,
-                Flashcard.college_id == college_id,
-                Flashcard.is_active == True,  # noqa: E712
+        # Queue sizes, counted over the same two index ranges
+        counts = await self._db.execute(
+            select(
+                func.count().filter(Flashcard.next_review_date <= today),
+                func.count().filter(Flashcard.next_review_date < today),
+                func.count().filter(Flashcard.next_review_date.is_(None)),
+            ).where(
+                *scope,
+                (Flashcard.next_review_date <= today)
+                | Flashcard.next_review_date.is_(None),
             )
         )
-
-        if subject:
-            due_query = due_query.where(Flashcard.subject == subject)
-
-        result = await self._db.execute(due_query)
-        rows = result.all()
-
-        overdue_cards: list[ReviewCard] = []
-        due_today_cards: list[ReviewCard] = []
-        new_cards: list[ReviewCard] = []
-
-        for card, review in rows:
-            if review is None or review.next_review_date is None:
-                new_cards.append(self._to_review_card(card, review, today))
-            elif review.next_review_date <= today:
-                days_overdue = (today - review.next_review_date).days
-                rc = self._to_review_card(card, review, today)
-                if days_overdue > 0:
-                    overdue_cards.append(rc)
-                else:
-                    due_today_cards.append(rc)
-
-        # Sort: overdue by most overdue first
-        overdue_cards.sort(key=lambda c: c.days_overdue, reverse=True)
-
-        all_due = overdue_cards + due_today_cards + new_cards
-        total_due = len(all_due)
-        session_cards = all_due[:max_cards]
+        due, overdue, new = counts.one()
 
         return ReviewSession(
-            cards=session_cards,
-            total_due=total_due,
-            new_cards=len(new_cards),
-            overdue_cards=len(overdue_cards),
+            cards=[self._to_review_card(card, today) for card in cards],
+            total_due=due + new,
+            new_cards=new,
+            overdue_cards=overdue,
             subject_filter=subject,
         )
 
@@ -421,7 +426,8 @@ class FlashcardGenerator:
         quality: int,
         response_time_ms: int,
     ) -> SpacedRepetitionUpdate:
-        """Process a flashcard review using the SM-2 algorithm.
+        """Process a flashcard review with the student's scheduler (SM-2,
+        or FSRS once fitted — see flashcard_scheduler).
 
         Quality scale (SM-2):
         0 = complete blackout
@@ -431,60 +437,52 @@ class FlashcardGenerator:
         4 = correct with some hesitation
         5 = perfect recall
         """
-        # Get the latest review for this card
-        result = await self._db.execute(
-            select(FlashcardReview)
-            .where(
-                FlashcardReview.flashcard_id == card_id,
-                FlashcardReview.student_id == student_id,
-                FlashcardReview.college_id == college_id,
-            )
-            .order_by(FlashcardReview.reviewed_at.desc())
-            .limit(1)
-        )
-        prev = result.scalars().first()
-
-        # Previous state
-        prev_ef = prev.ease_factor if prev else DEFAULT_EASE_FACTOR
-        prev_interval = prev.interval_days if prev else 0.0
-        prev_reps = prev.repetition_count if prev else 0
-
-        # SM-2 calculation
-        new_ef, new_interval, new_reps = self._sm2_calculate(
-            quality, prev_ef, prev_interval, prev_reps,
-        )
-
-        next_review = date.today() + timedelta(days=int(math.ceil(new_interval)))
-
-        # Store new review record
-        review = FlashcardReview(
-            college_id=college_id,
-            flashcard_id=card_id,
+        result = await FlashcardScheduler(self._db).apply_reviews(
             student_id=student_id,
-            quality=quality,
-            response_time_ms=response_time_ms,
-            interval_days=new_interval,
-            ease_factor=new_ef,
-            repetition_count=new_reps,
-            next_review_date=next_review,
-            reviewed_at=datetime.now(timezone.utc),
+            college_id=college_id,
+            reviews=[ReviewInput(
+                card_id=card_id,
+                quality=quality,
+                response_time_ms=response_time_ms,
+                reviewed_at=datetime.now(timezone.utc),
+            )],
         )
-        self._db.add(review)
-        await self._db.flush()
 
         # Fire metacognitive event for analytics
         await self._fire_metacognitive_event(
             student_id, college_id, card_id, quality, response_time_ms,
         )
 
-        return SpacedRepetitionUpdate(
-            card_id=str(card_id),
-            ease_factor=round(new_ef, 2),
-            interval_days=round(new_interval, 1),
-            repetition_count=new_reps,
-            next_review_date=next_review,
-            quality=quality,
+        return result.updates[0]
+
+    # ------------------------------------------------------------------
+    # process_review_batch
+    # ------------------------------------------------------------------
+
+    async def process_review_batch(
+        self,
+        *,
+        student_id: UUID,
+        college_id: UUID,
+        reviews: list[ReviewInput],
+    ) -> ReviewBatchResult:
+        """Process reviews made offline (mobile sync) or imported in bulk.
+
+        Reviews are applied in reviewed_at order; ones the server already
+        has (re-sent by a retried sync) are skipped. Metacognitive events
+        are fired for applied reviews only.
+        """
+        result = await FlashcardScheduler(self._db).apply_reviews(
+            student_id=student_id,
+            college_id=college_id,
+            reviews=reviews,
         )
+        for review in result.applied:
+            await self._fire_metacognitive_event(
+                student_id, college_id, review.card_id,
+                review.quality, review.response_time_ms,
+            )
+        return result
 
     # ------------------------------------------------------------------
     # get_stats
@@ -496,155 +494,84 @@ class FlashcardGenerator:
         student_id: UUID,
         college_id: UUID,
     ) -> FlashcardStats:
-        """Get the student's flashcard statistics."""
-        today = date.today()
+        """Get the student's flashcard statistics.
 
-        # Total and active cards
-        total_result = await self._db.execute(
-            select(func.count()).select_from(Flashcard).where(
-                Flashcard.student_id == student_id,
-                Flashcard.college_id == college_id,
-            )
-        )
-        total_cards = total_result.scalar() or 0
+        Review aggregates come from the rolling FlashcardReviewStats row;
+        card and due counts from one grouped count over the student's
+        cards.
+        """
+        today = date.today()
 
-        active_result = await self._db.execute(
-            select(func.count()).select_from(Flashcard).where(
-                Flashcard.student_id == student_id,
-                Flashcard.college_id == college_id,
-                Flashcard.is_active == True,  # noqa: E712
+        stats_result = await self._db.execute(
+            select(FlashcardReviewStats).where(
+                FlashcardReviewStats.student_id == student_id,
+                FlashcardReviewStats.college_id == college_id,
             )
         )
-        active_cards = active_result.scalar() or 0
+        stats = stats_result.scalars().first()
 
-        # Latest review per card
-        latest_review_sq = (
+        active = Flashcard.is_active == True  # noqa: E712
+        count_result = await self._db.execute(
             select(
-                FlashcardReview.flashcard_id,
-                func.max(FlashcardReview.reviewed_at).label("latest_at"),
+                Flashcard.subject,
+                func.count(),
+                func.count().filter(active),
+                func.count().filter(
+                    active, Flashcard.next_review_date.is_(None),
+                ),
+                func.count().filter(
+                    active, Flashcard.next_review_date <= today,
+                ),
+                func.count().filter(
+                    active, Flashcard.next_review_date < today,
+                ),
             )
             .where(
-                FlashcardReview.student_id == student_id,
-                FlashcardReview.college_id == college_id,
-            )
-            .group_by(FlashcardReview.flashcard_id)
-            .subquery()
-        )
-
-        review_data = await self._db.execute(
-            select(FlashcardReview)
-            .join(
-                latest_review_sq,
-                (FlashcardReview.flashcard_id == latest_review_sq.c.flashcard_id)
-                & (FlashcardReview.reviewed_at == latest_review_sq.c.latest_at),
-            )
-            .where(
-                FlashcardReview.student_id == student_id,
-                FlashcardReview.college_id == college_id,
-            )
-        )
-        latest_reviews = review_data.scalars().all()
-
-        reviewed_card_ids = {r.flashcard_id for r in latest_reviews}
-        due_today = 0
-        overdue = 0
-        mastered = 0
-        learning = 0
-        ease_factors: list[float] = []
-
-        for r in latest_reviews:
-            ef = r.ease_factor or DEFAULT_EASE_FACTOR
-            interval = r.interval_days or 0
-            ease_factors.append(ef)
-
-            if r.next_review_date and r.next_review_date <= today:
-                if r.next_review_date == today:
-                    due_today += 1
-                else:
-                    overdue += 1
-
-            if ef >= 2.5 and interval >= 21:
-                mastered += 1
-            else:
-                learning += 1
-
-        new_cards = active_cards - len(reviewed_card_ids)
-        if new_cards < 0:
-            new_cards = 0
-
-        # Total reviews
-        total_reviews_result = await self._db.execute(
-            select(func.count()).select_from(FlashcardReview).where(
-                FlashcardReview.student_id == student_id,
-                FlashcardReview.college_id == college_id,
+                Flashcard.student_id == student_id,
+                Flashcard.college_id == college_id,
             )
+            .group_by(Flashcard.subject)
         )
-        total_reviews = total_reviews_result.scalar() or 0
+        counts = count_result.all()
 
-        # Streak: consecutive days with at least one review
-        streak = await self._calculate_streak(student_id, college_id)
-
-        # By subject
-        by_subject = await self._get_stats_by_subject(
-            student_id, college_id, today, latest_reviews,
-        )
+        mastered_by_subject = stats.mastered_by_subject if stats else {}
+        by_subject: list[dict[str, Any]] = [
+            {
+                "subject": subject,
+                "total": active_count,
+                "due_today": due,
+                "mastered": mastered_by_subject.get(subject, 0),
+            }
+            for subject, _, active_count, _, due, _ in sorted(counts)
+            if active_count
+        ]
 
+        reviewed = stats.reviewed_cards if stats else 0
+        mastered = stats.mastered_cards if stats else 0
         avg_ef = (
-            sum(ease_factors) / len(ease_factors)
-            if ease_factors
+            stats.ease_factor_sum / reviewed
+            if reviewed
             else DEFAULT_EASE_FACTOR
         )
 
         return FlashcardStats(
-            total_cards=total_cards,
-            active_cards=active_cards,
-            due_today=due_today + overdue,
-            overdue=overdue,
+            total_cards=sum(c[1] for c in counts),
+            active_cards=sum(c[2] for c in counts),
+            due_today=sum(c[4] for c in counts),
+            overdue=sum(c[5] for c in counts),
             mastered=mastered,
-            learning=learning,
-            new_cards=new_cards,
+            learning=reviewed - mastered,
+            new_cards=sum(c[3] for c in counts),
             by_subject=by_subject,
             avg_ease_factor=round(avg_ef, 2),
-            total_reviews=total_reviews,
-            streak_days=streak,
+            total_reviews=stats.total_reviews if stats else 0,
+            streak_days=current_streak(stats, today),
         )
 
     # ==================================================================
     # Private helpers
     # ==================================================================
 
-    @staticmethod
-    def _sm2_calculate(
-        quality: int,
-        ease_factor: float,
-        interval: float,
-        repetitions: int,
-    ) -> tuple[float, float, int]:
-        """SM-2 algorithm core computation.
-
-        Returns (new_ease_factor, new_interval, new_repetitions).
-        """
-        # Adjust ease factor
-        new_ef = ease_factor + (
-            0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
-        )
-        new_ef = max(new_ef, MIN_EASE_FACTOR)
-
-        if quality < 3:
-            # Failed — reset to learning phase
-            return new_ef, 1.0, 0
-
-        # Passed — advance
-        new_reps = repetitions + 1
-        if new_reps == 1:
-            new_interval = 1.0
-        elif new_reps == 2:
-            new_interval = 6.0
-        else:
-            new_interval = interval * new_ef
-
-        return new_ef, new_interval, new_reps
-
     async def _store_flashcards(
         self,
         batch: GeneratedFlashcardBatch,
@@ -652,10 +579,25 @@ class FlashcardGenerator:
         college_id: UUID,
         source_pdf_id: str | None,
     ) -> list[FlashcardResponse]:
-        """Persist generated flashcards and return response models."""
+        """Persist generated flashcards and return response models.
+
+        Cards that near-duplicate one of the student's existing cards (or
+        an earlier card in the batch) are dropped before storing.
+        """
         cards: list[FlashcardResponse] = []
 
-        for gen in batch.flashcards:
+        index = DedupIndex(
+            self._db,
+            college_id=college_id,
+            kind=DedupKind.FLASHCARD,
+            scope=str(student_id),
+        )
+        matches = await index.check([gen.front for gen in batch.flashcards])
+        stored: list[tuple[str, UUID]] = []
+
+        for gen, match in zip(batch.flashcards, matches):
+            if match is not None:
+                continue
             card = Flashcard(
                 college_id=college_id,
                 student_id=student_id,
@@ -697,18 +639,15 @@ class FlashcardGenerator:
                 is_active=True,
                 created_at=card.created_at,
             ))
+            stored.append((card.front, card.id))
 
+        await index.add(stored)
         return cards
 
-    def _to_review_card(
-        self,
-        card: Flashcard,
-        review: FlashcardReview | None,
-        today: date,
-    ) -> ReviewCard:
-        """Convert a Flashcard + optional review to a ReviewCard."""
-        if review and review.next_review_date:
-            days_overdue = (today - review.next_review_date).days
+    def _to_review_card(self, card: Flashcard, today: date) -> ReviewCard:
+        """Convert a Flashcard and its SM-2 state to a ReviewCard."""
+        if card.next_review_date:
+            days_overdue = (today - card.next_review_date).days
         else:
             days_overdue = -1  # new card
 
@@ -721,12 +660,46 @@ class FlashcardGenerator:
             topic=card.topic or "",
             difficulty=card.difficulty or 3,
             clinical_pearl=card.clinical_pearl,
-            ease_factor=review.ease_factor if review else DEFAULT_EASE_FACTOR,
-            interval_days=review.interval_days if review else 0.0,
-            repetition_count=review.repetition_count if review else 0,
+            ease_factor=card.ease_factor or DEFAULT_EASE_FACTOR,
+            interval_days=card.interval_days or 0.0,
+            repetition_count=card.repetition_count or 0,
             days_overdue=days_overdue,
         )
 
+    @staticmethod
+    async def _extract_pdf_source(
+        pdf_id: str, college_id: UUID, page_range: list[int] | None,
+    ) -> str:
+        """Text of a PDF stored in R2, for PDFs not yet ingested for RAG.
+
+        page_range is 1-based and inclusive. Returns "" when pdf_id is not
+        a PDF object key of this college or the object does not exist.
+        """
+        if not (
+            pdf_id.lower().endswith(".pdf")
+            and pdf_id.startswith(f"{college_id}/")
+        ):
+            return ""
+
+        from app.core.storage import get_storage
+        from app.engines.ai.ingestion.pdf_extraction import (
+            get_pdf_extraction_service,
+        )
+
+        try:
+            file_bytes = await get_storage().download_file(pdf_id)
+        except FileNotFoundError:
+            logger.warning("Flashcard source PDF not found in R2: %s", pdf_id)
+            return ""
+
+        start, end = 0, None
+        if page_range and len(page_range) == 2:
+            start, end = max(page_range[0] - 1, 0), page_range[1]
+        pages = await get_pdf_extraction_service().extract_pages(
+            file_bytes, start, end,
+        )
+        return "\n\n".join(p for p in pages if p)[:PDF_SOURCE_MAX_CHARS]
+
     async def _get_student_profile(
         self, student_id: UUID, college_id: UUID,
     ) -> StudentMetacognitiveProfile | None:
@@ -767,111 +740,6 @@ class FlashcardGenerator:
         except Exception:
             logger.warning("Failed to fire metacognitive event", exc_info=True)
 
-    async def _calculate_streak(
-        self, student_id: UUID, college_id: UUID,
-    ) -> int:
-        """Calculate consecutive review days (streak)."""
-        result = await self._db.execute(
-            select(func.date(FlashcardReview.reviewed_at))
-            .where(
-                FlashcardReview.student_id == student_id,
-                FlashcardReview.college_id == college_id,
-            )
-            .distinct()
-            .order_by(func.date(FlashcardReview.reviewed_at).desc())
-        )
-        review_dates = [row[0] for row in result.all()]
-
-        if not review_dates:
-            return 0
-
-        today = date.today()
-        streak = 0
-
-        # Start from today or yesterday
-        if review_dates[0] == today:
-            streak = 1
-            check_date = today - timedelta(days=1)
-        elif review_dates[0] == today - timedelta(days=1):
-            streak = 1
-            check_date = today - timedelta(days=2)
-        else:
-            return 0
-
-        date_set = set(review_dates)
-        while check_date in date_set:
-            streak += 1
-            check_date -= timedelta(days=1)
-
-        return streak
-
-    async def _get_stats_by_subject(
-        self,
-        student_id: UUID,
-        college_id: UUID,
-        today: date,
-        latest_reviews: list[FlashcardReview],
-    ) -> list[dict[str, Any]]:
-        """Get per-subject statistics."""
-        # Count cards per subject
-        subject_result = await self._db.execute(
-            select(Flashcard.subject, func.count())
-            .where(
-                Flashcard.student_id == student_id,
-                Flashcard.college_id == college_id,
-                Flashcard.is_active == True,  # noqa: E712
-            )
-            .group_by(Flashcard.subject)
-        )
-        subject_counts: dict[str, int] = {}
-        for subj, cnt in subject_result.all():
-            subject_counts[subj] = cnt
-
-        # Build review lookup by flashcard_id
-        review_by_card: dict[UUID, FlashcardReview] = {
-            r.flashcard_id: r for r in latest_reviews
-        }
-
-        # Get flashcard subjects for reviewed cards
-        if review_by_card:
-            card_ids = list(review_by_card.keys())
-            card_result = await self._db.execute(
-                select(Flashcard.id, Flashcard.subject)
-                .where(Flashcard.id.in_(card_ids))
-            )
-            card_subjects: dict[UUID, str] = {
-                cid: subj for cid, subj in card_result.all()
-            }
-        else:
-            card_subjects = {}
-
-        # Aggregate per subject
-        subject_stats: dict[str, dict[str, int]] = {}
-        for cid, review in review_by_card.items():
-            subj = card_subjects.get(cid, "Unknown")
-            if subj not in subject_stats:
-                subject_stats[subj] = {"due_today": 0, "mastered": 0}
-
-            if review.next_review_date and review.next_review_date <= today:
-                subject_stats[subj]["due_today"] += 1
-
-            ef = review.ease_factor or DEFAULT_EASE_FACTOR
-            interval = review.interval_days or 0
-            if ef >= 2.5 and interval >= 21:
-                subject_stats[subj]["mastered"] += 1
-
-        by_subject: list[dict[str, Any]] = []
-        for subj in sorted(subject_counts.keys()):
-            stats = subject_stats.get(subj, {"due_today": 0, "mastered": 0})
-            by_subject.append({
-                "subject": subj,
-                "total": subject_counts[subj],
-                "due_today": stats["due_today"],
-                "mastered": stats["mastered"],
-            })
-
-        return by_subject
-
 
 # ======================================================================
 # Module-level convenience functions
@@ -972,6 +840,24 @@ async def process_flashcard_review(
     )
 
 
+async def process_flashcard_review_batch(
+    db: AsyncSession,
+    gateway: AIGateway,
+    prompt_registry: PromptRegistry,
+    *,
+    student_id: UUID,
+    college_id: UUID,
+    reviews: list[ReviewInput],
+) -> ReviewBatchResult:
+    """Process a batch of flashcard reviews."""
+    gen = FlashcardGenerator(db, gateway, prompt_registry)
+    return await gen.process_review_batch(
+        student_id=student_id,
+        college_id=college_id,
+        reviews=reviews,
+    )
+
+
 async def get_flashcard_stats(
     db: AsyncSession,
     gateway: AIGateway,
@@ -0,0 +1,691 @@
+"""Flashcard scheduling — Section S5 of architecture document.
+
+Applies batches of flashcard reviews: single reviews from the review
+screen, reviews synced from the mobile app after studying offline, and
+bulk imports.
+
+- SM-2 and FSRS updates are NumPy-vectorized across cards. A batch is
+  applied in rounds, where round k holds the k-th review (by
+  reviewed_at) of every card in it. A card reviewed three times offline
+  is replayed in order, while different cards share array operations.
+- Review rows are bulk-inserted. The cards' scheduling state (see
+  Flashcard) is written back with one executemany UPDATE.
+- FlashcardReviewStats is a rolling per-student aggregate updated with
+  every batch: reviews, reviewed/mastered cards, ease sum and streak.
+  get_stats reads it instead of scanning review history.
+
+FSRS (Free Spaced Repetition Scheduler, v4.5 formulas) tracks memory
+stability and difficulty for every card alongside SM-2. It sets the
+intervals of a student's cards when FLASHCARD_SCHEDULER is "fsrs" and
+ai.fit_fsrs_weights has fitted weights to that student's history.
+Otherwise SM-2 does.
+"""
+
+import logging
+import math
+from collections.abc import Sequence
+from dataclasses import dataclass, replace
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import func, insert, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.engines.ai.agents.flashcard_schemas import SpacedRepetitionUpdate
+from app.engines.student.models import (
+    Flashcard,
+    FlashcardReview,
+    FlashcardReviewStats,
+)
+from app.shared.exceptions import NotFoundException
+
+logger = logging.getLogger(__name__)
+
+# SM-2 defaults
+DEFAULT_EASE_FACTOR = 2.5
+MIN_EASE_FACTOR = 1.3
+
+# A card is mastered at this ease and interval (learning otherwise)
+MASTERED_EASE_FACTOR = 2.5
+MASTERED_INTERVAL_DAYS = 21.0
+
+# FSRS v4.5 default weights (fitted by the FSRS project on ~20k users)
+FSRS_DEFAULT_WEIGHTS: tuple[float, ...] = (
+    0.4872, 1.4003, 3.7145, 13.8206, 5.1618, 1.2298, 0.8975, 0.031,
+    1.6474, 0.1367, 1.0461, 2.1072, 0.0793, 0.3246, 1.587, 0.2272, 2.8755,
+)
+FSRS_DESIRED_RETENTION = 0.9
+FSRS_MAX_INTERVAL_DAYS = 36500
+# Scored reviews (reviews with an earlier review of the same card)
+# needed before a student's weights are fitted
+FSRS_MIN_REVIEWS = 400
+
+_FSRS_DECAY = -0.5
+_FSRS_FACTOR = 19 / 81  # R(t = S) = 0.9
+_MIN_STABILITY = 0.01
+# Per-rating samples needed to fit an initial stability
+_MIN_FIRST_REVIEWS = 20
+_STABILITY_GRID = np.geomspace(0.1, 365.0, 240)
+# Weights tuned after the initial stabilities, by coordinate search
+_TUNED_WEIGHTS = (8, 9, 10, 11, 14)
+_TUNING_FACTORS = (0.5, 0.7, 0.85, 1.2, 1.4, 2.0)
+
+
+# ---------------------------------------------------------------------------
+# Data classes
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True, slots=True)
+class ReviewInput:
+    """One review of a card, as answered by the student."""
+
+    card_id: UUID
+    quality: int  # SM-2 quality, 0-5
+    response_time_ms: int
+    reviewed_at: datetime
+
+
+@dataclass(frozen=True, slots=True)
+class ReviewBatchResult:
+    """Outcome of FlashcardScheduler.apply_reviews."""
+
+    # Applied reviews in the order applied, and the update each made
+    applied: list[ReviewInput]
+    updates: list[SpacedRepetitionUpdate]
+    # Reviews not newer than the card's last review (already synced)
+    skipped: int
+
+
+@dataclass(frozen=True, slots=True)
+class FSRSFit:
+    """Weights fitted to one student's review history."""
+
+    weights: tuple[float, ...]
+    log_loss: float
+    default_log_loss: float
+    reviews: int
+
+
+# ---------------------------------------------------------------------------
+# Vectorized scheduling math
+# ---------------------------------------------------------------------------
+
+def review_rounds(card_ids: Sequence[Any]) -> list[list[int]]:
+    """Group positions of chronologically ordered reviews into rounds.
+
+    Round k holds the position of each card's k-th review, so each round
+    has at most one review per card and rounds apply in order.
+    """
+    rounds: list[list[int]] = []
+    seen: dict[Any, int] = {}
+    for pos, card_id in enumerate(card_ids):
+        k = seen.get(card_id, 0)
+        seen[card_id] = k + 1
+        if k == len(rounds):
+            rounds.append([])
+        rounds[k].append(pos)
+    return rounds
+
+
+def sm2_step(
+    quality: np.ndarray,
+    ease: np.ndarray,
+    interval: np.ndarray,
+    reps: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """SM-2 update of many cards at once.
+
+    Returns (ease, interval_days, repetition_count).
+    """
+    lapse = 5 - quality
+    new_ease = np.maximum(
+        ease + (0.1 - lapse * (0.08 + lapse * 0.02)), MIN_EASE_FACTOR,
+    )
+    passed = quality >= 3
+    new_reps = np.where(passed, reps + 1, 0)
+    new_interval = np.select(
+        [~passed, new_reps == 1, new_reps == 2],
+        [1.0, 1.0, 6.0],
+        default=interval * new_ease,
+    )
+    return new_ease, new_interval, new_reps
+
+
+def quality_to_rating(quality: np.ndarray) -> np.ndarray:
+    """SM-2 quality (0-5) to FSRS rating (1 again, 2 hard, 3 good, 4 easy)."""
+    return np.clip(quality - 1, 1, 4)
+
+
+def fsrs_retrievability(
+    elapsed_days: np.ndarray, stability: np.ndarray,
+) -> np.ndarray:
+    """Probability of recall after elapsed_days."""
+    return (1 + _FSRS_FACTOR * elapsed_days / stability) ** _FSRS_DECAY
+
+
+def fsrs_interval(
+    stability: np.ndarray, retention: float = FSRS_DESIRED_RETENTION,
+) -> np.ndarray:
+    """Days until recall probability drops to retention."""
+    interval = stability / _FSRS_FACTOR * (retention ** (1 / _FSRS_DECAY) - 1)
+    return np.clip(np.round(interval), 1, FSRS_MAX_INTERVAL_DAYS)
+
+
+def _fsrs_initial_difficulty(w: np.ndarray, rating: np.ndarray) -> np.ndarray:
+    return np.clip(w[4] - (rating - 3) * w[5], 1, 10)
+
+
+def fsrs_step(
+    weights: Sequence[float],
+    rating: np.ndarray,
+    stability: np.ndarray,
+    difficulty: np.ndarray,
+    elapsed_days: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """FSRS memory-state update of many cards at once.
+
+    Cards without a memory state (NaN stability) get the initial state
+    of their rating. Returns (stability, difficulty).
+    """
+    w = np.asarray(weights, dtype=float)
+    new = np.isnan(stability)
+    s = np.where(new, 1.0, stability)
+    d = np.where(new, 5.0, difficulty)
+    r = fsrs_retrievability(np.maximum(elapsed_days, 0), s)
+
+    next_d = np.clip(
+        w[7] * _fsrs_initial_difficulty(w, np.full_like(d, 4))
+        + (1 - w[7]) * (d - w[6] * (rating - 3)),
+        1, 10,
+    )
+    hard_penalty = np.where(rating == 2, w[15], 1.0)
+    easy_bonus = np.where(rating == 4, w[16], 1.0)
+    recall_s = s * (
+        1
+        + np.exp(w[8]) * (11 - d) * s ** -w[9] * np.expm1(w[10] * (1 - r))
+        * hard_penalty * easy_bonus
+    )
+    forget_s = np.minimum(
+        w[11] * d ** -w[12] * ((s + 1) ** w[13] - 1) * np.exp(w[14] * (1 - r)),
+        s,
+    )
+    next_s = np.maximum(
+        np.where(rating == 1, forget_s, recall_s), _MIN_STABILITY,
+    )
+    return (
+        np.where(new, w[np.clip(rating, 1, 4) - 1], next_s),
+        np.where(new, _fsrs_initial_difficulty(w, rating), next_d),
+    )
+
+
+def is_mastered(ease: np.ndarray, interval: np.ndarray) -> np.ndarray:
+    return (ease >= MASTERED_EASE_FACTOR) & (interval >= MASTERED_INTERVAL_DAYS)
+
+
+# ---------------------------------------------------------------------------
+# FSRS fitting
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True, slots=True)
+class _History:
+    """A student's reviews as rounds of (card index, rating, day) arrays."""
+
+    rounds: list[tuple[np.ndarray, np.ndarray, np.ndarray]]
+    cards: int
+
+
+def _history(
+    card_ids: Sequence[Any], ratings: Sequence[int], days: Sequence[int],
+) -> _History:
+    index: dict[Any, int] = {}
+    card_index = np.array([index.setdefault(c, len(index)) for c in card_ids])
+    ratings_arr = np.asarray(ratings)
+    days_arr = np.asarray(days)
+    rounds = []
+    for positions in review_rounds(card_ids):
+        pos = np.asarray(positions)
+        rounds.append((card_index[pos], ratings_arr[pos], days_arr[pos]))
+    return _History(rounds, len(index))
+
+
+def fsrs_log_loss(weights: Sequence[float], history: _History) -> float:
+    """Mean log loss of FSRS recall predictions over a review history.
+
+    Every review after a card's first is scored: predicted recall at
+    that review against whether it was recalled (rating > 1).
+    """
+    stability = np.full(history.cards, np.nan)
+    difficulty = np.full(history.cards, np.nan)
+    last_day = np.zeros(history.cards)
+    loss = 0.0
+    scored = 0
+    for k, (idx, rating, day) in enumerate(history.rounds):
+        elapsed = day - last_day[idx]
+        if k > 0:
+            p = np.clip(
+                fsrs_retrievability(np.maximum(elapsed, 0), stability[idx]),
+                1e-6, 1 - 1e-6,
+            )
+            recalled = rating > 1
+            loss -= float(np.sum(np.where(recalled, np.log(p), np.log1p(-p))))
+            scored += len(idx)
+        stability[idx], difficulty[idx] = fsrs_step(
+            weights, rating, stability[idx], difficulty[idx], elapsed,
+        )
+        last_day[idx] = day
+    return loss / scored if scored else 0.0
+
+
+def _fit_initial_stability(
+    weights: list[float], history: _History,
+) -> None:
+    """Fit w[0..3], the stability after a first rating of 1..4.
+
+    Grid search on the recall of each card's second review; ratings
+    with too few samples keep their weight. Kept non-decreasing.
+    """
+    if len(history.rounds) < 2:
+        return
+    first_idx, first_rating, first_day = history.rounds[0]
+    second_idx, second_rating, second_day = history.rounds[1]
+    first_pos = {int(c): i for i, c in enumerate(first_idx)}
+    pos = np.array([first_pos[int(c)] for c in second_idx])
+    elapsed = np.maximum(second_day - first_day[pos], 0)
+    recalled = second_rating > 1
+    for rating in range(1, 5):
+        mask = first_rating[pos] == rating
+        if mask.sum() < _MIN_FIRST_REVIEWS:
+            continue
+        p = np.clip(
+            fsrs_retrievability(elapsed[mask][None, :], _STABILITY_GRID[:, None]),
+            1e-6, 1 - 1e-6,
+        )
+        loss = -np.where(recalled[mask], np.log(p), np.log1p(-p)).sum(axis=1)
+        weights[rating - 1] = float(_STABILITY_GRID[np.argmin(loss)])
+    weights[:4] = np.maximum.accumulate(weights[:4]).tolist()
+
+
+def fit_fsrs_weights(
+    card_ids: Sequence[Any],
+    ratings: Sequence[int],
+    days: Sequence[int],
+    *,
+    passes: int = 2,
+) -> FSRSFit | None:
+    """Fit FSRS weights to a chronological review history.
+
+    Initial stabilities are fitted per first rating, then the weights
+    that scale stability growth after recall and after a lapse are
+    tuned by coordinate search on log loss. Returns None if there are
+    fewer than FSRS_MIN_REVIEWS scored reviews.
+    """
+    history = _history(card_ids, ratings, days)
+    scored = sum(len(idx) for idx, _, _ in history.rounds[1:])
+    if scored < FSRS_MIN_REVIEWS:
+        return None
+
+    default_loss = fsrs_log_loss(FSRS_DEFAULT_WEIGHTS, history)
+    weights = list(FSRS_DEFAULT_WEIGHTS)
+    _fit_initial_stability(weights, history)
+    best = fsrs_log_loss(weights, history)
+
+    for _ in range(passes):
+        for i in _TUNED_WEIGHTS:
+            base = weights[i]
+            for factor in _TUNING_FACTORS:
+                weights[i] = base * factor
+                loss = fsrs_log_loss(weights, history)
+                if loss < best:
+                    best, base = loss, weights[i]
+            weights[i] = base
+
+    return FSRSFit(
+        weights=tuple(round(w, 4) for w in weights),
+        log_loss=best,
+        default_log_loss=default_loss,
+        reviews=scored,
+    )
+
+
+# ---------------------------------------------------------------------------
+# FlashcardScheduler
+# ---------------------------------------------------------------------------
+
+class FlashcardScheduler:
+    """Applies review batches to cards, review history and stats."""
+
+    def __init__(self, db: AsyncSession) -> None:
+        self._db = db
+
+    async def apply_reviews(
+        self,
+        *,
+        student_id: UUID,
+        college_id: UUID,
+        reviews: Sequence[ReviewInput],
+    ) -> ReviewBatchResult:
+        """Apply a batch of reviews of the student's cards.
+
+        Reviews apply in reviewed_at order. A review not newer than its
+        card's last review is skipped: it was already synced, or newer
+        reviews have rescheduled the card since. Raises NotFoundException
+        if a card does not exist or is not the student's.
+        """
+        if not reviews:
+            return ReviewBatchResult(applied=[], updates=[], skipped=0)
+
+        card_ids = sorted({r.card_id for r in reviews})
+        result = await self._db.execute(
+            select(
+                Flashcard.id,
+                Flashcard.subject,
+                Flashcard.ease_factor,
+                Flashcard.interval_days,
+                Flashcard.repetition_count,
+                Flashcard.last_reviewed_at,
+                Flashcard.memory_stability,
+                Flashcard.memory_difficulty,
+            )
+            .where(
+                Flashcard.id.in_(card_ids),
+                Flashcard.student_id == student_id,
+                Flashcard.college_id == college_id,
+            )
+            .order_by(Flashcard.id)
+            .with_for_update()
+        )
+        cards = result.all()
+        found = {card.id for card in cards}
+        if len(found) < len(card_ids):
+            missing = next(c for c in card_ids if c not in found)
+            raise NotFoundException("Flashcard", str(missing))
+
+        stats = await self._lock_stats(student_id, college_id)
+        position = {card.id: i for i, card in enumerate(cards)}
+
+        # A device clock running ahead must not push reviews into the future
+        now = datetime.now(timezone.utc)
+        chronological = sorted(
+            (
+                replace(r, reviewed_at=now) if r.reviewed_at > now else r
+                for r in reviews
+            ),
+            key=lambda r: r.reviewed_at,
+        )
+        applied = [
+            r for r in chronological
+            if cards[position[r.card_id]].last_reviewed_at is None
+            or r.reviewed_at > cards[position[r.card_id]].last_reviewed_at
+        ]
+        if not applied:
+            return ReviewBatchResult(
+                applied=[], updates=[], skipped=len(reviews),
+            )
+
+        ease = np.array([c.ease_factor for c in cards], dtype=float)
+        interval = np.array([c.interval_days for c in cards], dtype=float)
+        reps = np.array([c.repetition_count for c in cards])
+        stability = np.array(
+            [np.nan if c.memory_stability is None else c.memory_stability
+             for c in cards],
+        )
+        difficulty = np.array(
+            [np.nan if c.memory_difficulty is None else c.memory_difficulty
+             for c in cards],
+        )
+        last_day = np.array([
+            c.last_reviewed_at.date().toordinal() if c.last_reviewed_at else 0
+            for c in cards
+        ])
+        reviewed_before = np.array([c.last_reviewed_at is not None for c in cards])
+        mastered_before = is_mastered(ease, interval) & reviewed_before
+        ease_start = ease.copy()
+
+        weights = stats.fsrs_weights or FSRS_DEFAULT_WEIGHTS
+        use_fsrs = (
+            get_settings().FLASHCARD_SCHEDULER == "fsrs"
+            and stats.fsrs_weights is not None
+        )
+
+        review_rows: list[dict[str, Any]] = []
+        order: list[ReviewInput] = []
+        updates: list[SpacedRepetitionUpdate] = []
+        last_review: dict[int, ReviewInput] = {}
+        next_dates: dict[int, date] = {}
+
+        for positions in review_rounds([r.card_id for r in applied]):
+            batch = [applied[p] for p in positions]
+            idx = np.array([position[r.card_id] for r in batch])
+            quality = np.array([r.quality for r in batch])
+            day = np.array([r.reviewed_at.date().toordinal() for r in batch])
+
+            ease[idx], sm2_interval, reps[idx] = sm2_step(
+                quality, ease[idx], interval[idx], reps[idx],
+            )
+            stability[idx], difficulty[idx] = fsrs_step(
+                weights,
+                quality_to_rating(quality),
+                stability[idx],
+                difficulty[idx],
+                day - last_day[idx],
+            )
+            interval[idx] = (
+                fsrs_interval(stability[idx]) if use_fsrs else sm2_interval
+            )
+            last_day[idx] = day
+
+            for i, r in zip(idx.tolist(), batch):
+                next_review = r.reviewed_at.date() + timedelta(
+                    days=int(math.ceil(interval[i])),
+                )
+                review_rows.append({
+                    "college_id": college_id,
+                    "flashcard_id": r.card_id,
+                    "student_id": student_id,
+                    "quality": r.quality,
+                    "response_time_ms": r.response_time_ms,
+                    "interval_days": float(interval[i]),
+                    "ease_factor": float(ease[i]),
+                    "repetition_count": int(reps[i]),
+                    "next_review_date": next_review,
+                    "reviewed_at": r.reviewed_at,
+                })
+                updates.append(SpacedRepetitionUpdate(
+                    card_id=str(r.card_id),
+                    ease_factor=round(float(ease[i]), 2),
+                    interval_days=round(float(interval[i]), 1),
+                    repetition_count=int(reps[i]),
+                    next_review_date=next_review,
+                    quality=r.quality,
+                ))
+                order.append(r)
+                last_review[i] = r
+                next_dates[i] = next_review
+
+        await self._db.execute(insert(FlashcardReview), review_rows)
+        await self._db.execute(
+            update(Flashcard),
+            [
+                {
+                    "id": cards[i].id,
+                    "ease_factor": float(ease[i]),
+                    "interval_days": float(interval[i]),
+                    "repetition_count": int(reps[i]),
+                    "next_review_date": next_dates[i],
+                    "last_reviewed_at": r.reviewed_at,
+                    "memory_stability": float(stability[i]),
+                    "memory_difficulty": float(difficulty[i]),
+                }
+                for i, r in last_review.items()
+            ],
+        )
+
+        touched = np.array(sorted(last_review))
+        was_reviewed = reviewed_before[touched]
+        mastered_after = is_mastered(ease, interval)
+        mastered_delta = (
+            mastered_after[touched].astype(int)
+            - mastered_before[touched].astype(int)
+        )
+        by_subject = dict(stats.mastered_by_subject or {})
+        for i, delta in zip(touched.tolist(), mastered_delta.tolist()):
+            if delta:
+                subject = cards[i].subject
+                by_subject[subject] = by_subject.get(subject, 0) + delta
+
+        stats.total_reviews += len(applied)
+        stats.reviewed_cards += int((~was_reviewed).sum())
+        stats.mastered_cards += int(mastered_delta.sum())
+        stats.ease_factor_sum += float(
+            ease[touched].sum() - ease_start[touched][was_reviewed].sum(),
+        )
+        stats.mastered_by_subject = by_subject
+        _advance_streak(stats, {r.reviewed_at.date() for r in applied})
+        await self._db.flush()
+
+        return ReviewBatchResult(
+            applied=order, updates=updates, skipped=len(reviews) - len(applied),
+        )
+
+    async def _lock_stats(
+        self, student_id: UUID, college_id: UUID,
+    ) -> FlashcardReviewStats:
+        """The student's stats row, created if missing, locked FOR UPDATE."""
+        await self._db.execute(
+            pg_insert(FlashcardReviewStats)
+            .values(college_id=college_id, student_id=student_id)
+            .on_conflict_do_nothing(
+                constraint="uq_flashcard_review_stats_student",
+            )
+        )
+        result = await self._db.execute(
+            select(FlashcardReviewStats)
+            .where(
+                FlashcardReviewStats.student_id == student_id,
+                FlashcardReviewStats.college_id == college_id,
+            )
+            .with_for_update()
+        )
+        return result.scalar_one()
+
+
+def _advance_streak(stats: FlashcardReviewStats, days: set[date]) -> None:
+    """Extend the review-day streak with the days of a batch.
+
+    Days at or before the last review day are already counted.
+    """
+    for day in sorted(days):
+        last = stats.last_review_date
+        if last is not None and day <= last:
+            continue
+        if last is not None and day == last + timedelta(days=1):
+            stats.streak_days += 1
+        else:
+            stats.streak_days = 1
+        stats.last_review_date = day
+
+
+def current_streak(stats: FlashcardReviewStats | None, today: date) -> int:
+    """Streak as of today: broken once a whole day passes without reviews."""
+    if (
+        stats is None
+        or stats.last_review_date is None
+        or stats.last_review_date < today - timedelta(days=1)
+    ):
+        return 0
+    return stats.streak_days
+
+
+# ---------------------------------------------------------------------------
+# Per-student FSRS fitting (ai.fit_fsrs_weights)
+# ---------------------------------------------------------------------------
+
+async def fit_student_weights(
+    db: AsyncSession, *, student_id: UUID, college_id: UUID,
+) -> FSRSFit | None:
+    """Fit and store FSRS weights for one student.
+
+    Weights are stored only if they predict the student's recall better
+    than the defaults. Returns the fit, or None without enough history.
+    """
+    result = await db.execute(
+        select(
+            FlashcardReview.flashcard_id,
+            FlashcardReview.quality,
+            func.date(FlashcardReview.reviewed_at),
+        )
+        .where(
+            FlashcardReview.student_id == student_id,
+            FlashcardReview.college_id == college_id,
+            FlashcardReview.reviewed_at.is_not(None),
+        )
+        .order_by(FlashcardReview.reviewed_at)
+    )
+    rows = result.all()
+    fit = fit_fsrs_weights(
+        [r[0] for r in rows],
+        quality_to_rating(np.array([r[1] or 0 for r in rows])).tolist(),
+        [r[2].toordinal() for r in rows],
+    )
+    if fit is None or fit.log_loss >= fit.default_log_loss:
+        return fit
+
+    await db.execute(
+        update(FlashcardReviewStats)
+        .where(
+            FlashcardReviewStats.student_id == student_id,
+            FlashcardReviewStats.college_id == college_id,
+        )
+        .values(
+            fsrs_weights=list(fit.weights),
+            fsrs_fitted_at=datetime.now(timezone.utc),
+        )
+    )
+    return fit
+
+
+async def _set_tenant(db: AsyncSession, college_id: UUID) -> None:
+    await db.execute(
+        text("SELECT set_config('app.current_college_id', :cid, false)"),
+        {"cid": str(college_id)},
+    )
+
+
+async def fit_college_weights(
+    db: AsyncSession, college_id: UUID,
+) -> dict[str, int]:
+    """Fit FSRS weights for every student of a college with enough reviews.
+
+    Commits after each student. A commit may hand back a new connection
+    (NullPool) without the session-level RLS setting, so the tenant
+    context is set here and re-applied after every commit. Returns
+    {"candidates": n, "fitted": n}.
+    """
+    await _set_tenant(db, college_id)
+    result = await db.execute(
+        select(FlashcardReviewStats.student_id).where(
+            FlashcardReviewStats.college_id == college_id,
+            FlashcardReviewStats.total_reviews >= FSRS_MIN_REVIEWS,
+        )
+    )
+    student_ids = [row[0] for row in result.all()]
+
+    fitted = 0
+    for student_id in student_ids:
+        fit = await fit_student_weights(
+            db, student_id=student_id, college_id=college_id,
+        )
+        await db.commit()
+        await _set_tenant(db, college_id)
+        if fit is not None and fit.log_loss < fit.default_log_loss:
+            fitted += 1
+            logger.info(
+                "FSRS weights fitted: student=%s, reviews=%d, "
+                "log_loss=%.4f (default %.4f)",
+                student_id, fit.reviews, fit.log_loss, fit.default_log_loss,
+            )
+    return {"candidates": len(student_ids), "fitted": fitted}
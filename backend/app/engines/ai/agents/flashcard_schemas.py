@@ -9,7 +9,7 @@ Used by:
 from datetime import date, datetime
 from typing import Any
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import AwareDatetime, BaseModel, ConfigDict, Field
 
 
 # ---------------------------------------------------------------------------
@@ -205,3 +205,32 @@ class ReviewRequest(BaseModel):
         ),
     )
     response_time_ms: int = Field(ge=0, description="Time to respond in ms")
+
+
+class BatchReviewItem(BaseModel):
+    """One review in a batch, with the time it was made on the device."""
+
+    card_id: str
+    response_quality: int = Field(..., ge=0, le=5, description="SM-2 quality (0-5)")
+    response_time_ms: int = Field(ge=0, description="Time to respond in ms")
+    reviewed_at: AwareDatetime = Field(
+        description="When the card was reviewed on the device",
+    )
+
+
+class ReviewBatchRequest(BaseModel):
+    """Request body for syncing offline reviews or importing review history."""
+
+    reviews: list[BatchReviewItem] = Field(..., min_length=1, max_length=1000)
+
+
+class ReviewBatchResponse(BaseModel):
+    """Result of a review batch."""
+
+    updates: list[SpacedRepetitionUpdate] = Field(
+        description="SM-2 state after each applied review, in review order",
+    )
+    applied: int
+    skipped: int = Field(
+        description="Reviews not newer than the card's last review (already synced)",
+    )
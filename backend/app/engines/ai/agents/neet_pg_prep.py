@@ -14,14 +14,19 @@ Bridge Layer: NOT APPLICABLE — this is a testing/analytics agent,
 not a tutoring agent. Students receive direct scores and analysis.
 """
 
+import asyncio
+import dataclasses
 import logging
 import math
 import random
+from collections import Counter, defaultdict
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any
 from uuid import UUID, uuid4
 
-from sqlalchemy import desc, func, select
+from sqlalchemy import desc, func, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.engines.ai.agents.neet_pg_schemas import (
@@ -43,6 +48,7 @@ from app.engines.ai.agents.neet_pg_schemas import (
     ImprovementArea,
     MockTestHistory,
     MockTestHistoryEntry,
+    MockTestStreamEvent,
     NEETPGAnalysis,
     NEETPGMockTest,
     NEETPGQuestion,
@@ -59,11 +65,39 @@ from app.engines.ai.models import (
     TaskType,
 )
 from app.engines.ai.prompt_registry import PromptRegistry
+from app.shared.exceptions import AcolyteException
 
 logger = logging.getLogger(__name__)
 
 AGENT_ID = "neet_pg_prep"
 
+# S2 generates at most this many questions per call.
+S2_MAX_BATCH_SIZE = 10
+
+# Concurrent S2 runs per mock test — each holds its own DB session.
+GENERATION_MAX_CONCURRENCY = 6
+# Retries per failed batch (other batches are unaffected).
+GENERATION_MAX_RETRIES = 2
+_GENERATION_RETRY_BACKOFF_SECONDS = 1.0
+
+
+@dataclass(frozen=True, slots=True)
+class _GenerationJob:
+    """One S2 call: up to S2_MAX_BATCH_SIZE questions for one subject."""
+
+    subject: str
+    topic: str
+    batch_index: int
+    difficulty_ratings: tuple[int, ...]
+
+    @property
+    def count(self) -> int:
+        return len(self.difficulty_ratings)
+
+    @property
+    def avg_difficulty(self) -> int:
+        return round(sum(self.difficulty_ratings) / self.count)
+
 
 # ---------------------------------------------------------------------------
 # Reference data — imported from seed script at module level
@@ -263,20 +297,49 @@ class NEETPGPrepAgent:
     ) -> NEETPGMockTest:
         """Generate a complete NEET-PG mock test.
 
+        Non-streaming wrapper around stream_mock_test — drains the
+        section events and returns the final mock test.
+        """
+        mock_test: NEETPGMockTest | None = None
+        async for event in self.stream_mock_test(
+            student_id=student_id,
+            college_id=college_id,
+            test_type=test_type,
+            subject_focus=subject_focus,
+            weak_area_focus=weak_area_focus,
+        ):
+            if event.event == "complete":
+                mock_test = event.mock_test
+        if mock_test is None:
+            raise AcolyteException(
+                "NEET-PG mock test stream ended without a complete event",
+            )
+        return mock_test
+
+    async def stream_mock_test(
+        self,
+        student_id: UUID,
+        college_id: UUID,
+        test_type: str = "full",
+        subject_focus: str | None = None,
+        weak_area_focus: bool = False,
+    ) -> AsyncIterator[MockTestStreamEvent]:
+        """Generate a NEET-PG mock test, yielding sections as they finish.
+
         Steps:
         1. Determine question distribution based on test_type
         2. If weak_area_focus: pull student's metacognitive profile
            and weight distribution towards weak subjects/topics
-        3. For each subject allocation, call Practice Question Generator (S2)
-           with NEET-PG specific params
-        4. Shuffle questions across subjects (NEET-PG is not subject-grouped)
-        5. Store test metadata in PracticeTest table
-        6. Return the complete mock test
+        3. Split each subject allocation into S2-sized batches
+        4. Serve unseen questions from the pre-generated question pool;
+           run only the shortfall batches through S2, concurrently
+           (bounded, one DB session per batch), each retried
+           independently on failure
+        5. Yield a "section" event per pooled subject and finished batch
+        6. Shuffle questions across subjects (NEET-PG is not subject-grouped)
+        7. Store test metadata in PracticeTest table
+        8. Yield a "complete" event with the full mock test
         """
-        from app.engines.ai.agents.practice_question_generator import (
-            generate_practice_questions,
-        )
-
         # Step 1: Determine distribution
         total_questions, duration, blueprint = self._get_distribution(
             test_type, subject_focus,
@@ -288,143 +351,53 @@ class NEETPGPrepAgent:
                 blueprint, student_id, college_id, total_questions,
             )
 
-        # Step 3: Determine difficulty allocation
+        # Step 3: Plan S2 batches with per-question difficulty
         difficulty_allocation = self._get_difficulty_allocation(total_questions)
+        difficulty_queue = self._build_difficulty_queue(difficulty_allocation)
+        jobs, difficulty_counts = self._plan_generation_jobs(
+            blueprint, difficulty_queue,
+        )
 
-        # Step 4: Generate questions per subject
+        # Step 4: Serve from the question pool, generate the rest live
         all_questions: list[NEETPGQuestion] = []
-        difficulty_counts: dict[str, int] = {"easy": 0, "moderate": 0, "difficult": 0}
         generation_errors: list[str] = []
 
-        # Track which difficulty tier to assign to each question
-        difficulty_queue = self._build_difficulty_queue(difficulty_allocation)
-        q_index = 0
-
-        for subject, count in blueprint.items():
-            if count <= 0:
-                continue
-
-            # Pick high-yield topics for this subject
-            subject_topics = [
-                t for t in HIGH_YIELD_TOPICS if t["subject"] == subject
-            ]
-
-            # Determine per-question difficulty from the queue
-            subject_difficulties: list[int] = []
-            for _ in range(count):
-                if q_index < len(difficulty_queue):
-                    tier = difficulty_queue[q_index]
-                    low, high = DIFFICULTY_TO_RANGE[tier]
-                    subject_difficulties.append(random.randint(low, high))
-                    difficulty_counts[tier] += 1
-                else:
-                    subject_difficulties.append(random.randint(3, 5))
-                    difficulty_counts["difficult"] += 1
-                q_index += 1
-
-            # Pick a topic (rotate through high-yield topics for this subject)
-            topic = ""
-            if subject_topics:
-                # Weighted random by frequency
-                weights = [t["frequency"] for t in subject_topics]
-                selected_topic = random.choices(subject_topics, weights=weights, k=1)[0]
-                topic = selected_topic["topic"]
-
-            # Generate via S2 pipeline
-            try:
-                avg_difficulty = round(sum(subject_difficulties) / len(subject_difficulties))
-                batch = await generate_practice_questions(
-                    db=self._db,
-                    gateway=self._gateway,
-                    prompt_registry=self._prompt_registry,
-                    subject=subject,
-                    topic=topic,
-                    difficulty=avg_difficulty,
-                    blooms_level="apply",  # NEET-PG is clinical application
-                    count=min(count, 10),  # S2 max is 10 per call
-                    question_type="mcq",
-                    student_id=student_id,
-                    college_id=college_id,
-                )
+        pooled, jobs = await self._serve_from_pool(
+            jobs, student_id=student_id, college_id=college_id,
+        )
+        completed = 0
+        total = len(pooled) + len(jobs)
+
+        for subject, questions in pooled.items():
+            completed += 1
+            all_questions.extend(questions)
+            yield MockTestStreamEvent(
+                event="section",
+                source="question_pool",
+                subject=subject,
+                questions=questions,
+                completed_batches=completed,
+                total_batches=total,
+            )
 
-                for i, q in enumerate(batch.questions):
-                    q_dict = q.model_dump()
-                    diff_idx = min(i, len(subject_difficulties) - 1)
-                    diff_rating = subject_difficulties[diff_idx]
-                    tier = self._rating_to_tier(diff_rating)
-
-                    all_questions.append(NEETPGQuestion(
-                        question_index=len(all_questions),
-                        stem=q_dict["stem"],
-                        lead_in=q_dict["lead_in"],
-                        options=q_dict["options"],
-                        correct_answer_index=q_dict["correct_answer_index"],
-                        subject=subject,
-                        topic=q_dict.get("topic", topic),
-                        competency_code=q_dict.get("competency_code", ""),
-                        blooms_level=q_dict.get("blooms_level", "apply"),
-                        difficulty_tier=tier,
-                        difficulty_rating=diff_rating,
-                        source_citations=q_dict.get("source_citations", []),
-                        clinical_pearl=q_dict.get("clinical_pearl", ""),
-                    ))
-            except Exception as e:
-                logger.error(
-                    "Failed to generate questions for %s: %s", subject, e,
+        async for job, questions, error in self._run_generation_jobs(
+            jobs, student_id=student_id, college_id=college_id,
+        ):
+            completed += 1
+            if error is not None:
+                generation_errors.append(
+                    f"{job.subject} (batch {job.batch_index}): {error}"
                 )
-                generation_errors.append(f"{subject}: {e}")
-
-            # If S2 max is 10 and we need more, make additional calls
-            if count > 10:
-                remaining = count - 10
-                while remaining > 0:
-                    batch_size = min(remaining, 10)
-                    # Rotate to a different topic
-                    if subject_topics and len(subject_topics) > 1:
-                        selected_topic = random.choices(
-                            subject_topics, weights=weights, k=1,
-                        )[0]
-                        topic = selected_topic["topic"]
-
-                    try:
-                        batch = await generate_practice_questions(
-                            db=self._db,
-                            gateway=self._gateway,
-                            prompt_registry=self._prompt_registry,
-                            subject=subject,
-                            topic=topic,
-                            difficulty=avg_difficulty,
-                            blooms_level="apply",
-                            count=batch_size,
-                            question_type="mcq",
-                            student_id=student_id,
-                            college_id=college_id,
-                        )
-
-                        for q in batch.questions:
-                            q_dict = q.model_dump()
-                            all_questions.append(NEETPGQuestion(
-                                question_index=len(all_questions),
-                                stem=q_dict["stem"],
-                                lead_in=q_dict["lead_in"],
-                                options=q_dict["options"],
-                                correct_answer_index=q_dict["correct_answer_index"],
-                                subject=subject,
-                                topic=q_dict.get("topic", topic),
-                                competency_code=q_dict.get("competency_code", ""),
-                                blooms_level=q_dict.get("blooms_level", "apply"),
-                                difficulty_tier=self._rating_to_tier(avg_difficulty),
-                                difficulty_rating=avg_difficulty,
-                                source_citations=q_dict.get("source_citations", []),
-                                clinical_pearl=q_dict.get("clinical_pearl", ""),
-                            ))
-                    except Exception as e:
-                        logger.error(
-                            "Failed additional batch for %s: %s", subject, e,
-                        )
-                        generation_errors.append(f"{subject} (batch): {e}")
-
-                    remaining -= batch_size
+            all_questions.extend(questions)
+            yield MockTestStreamEvent(
+                event="section",
+                subject=job.subject,
+                batch_index=job.batch_index,
+                questions=questions,
+                error=str(error) if error is not None else None,
+                completed_batches=completed,
+                total_batches=total,
+            )
 
         # Step 5: Shuffle questions (NEET-PG is NOT subject-grouped)
         random.shuffle(all_questions)
@@ -468,23 +441,30 @@ class NEETPGPrepAgent:
         self._db.add(execution)
         await self._db.flush()
 
-        return NEETPGMockTest(
-            test_id=str(test_id),
-            test_type=test_type,
-            subject_focus=subject_focus,
-            questions=all_questions,
-            question_count=len(all_questions),
-            duration_minutes=duration,
-            blueprint_used=blueprint,
-            difficulty_distribution=difficulty_counts,
-            total_marks=len(all_questions) * MARKS_PER_CORRECT,
-            weak_area_weighted=weak_area_focus,
-            generation_metadata={
-                "generation_errors": generation_errors,
-                "requested_questions": total_questions,
-                "generated_questions": len(all_questions),
-                "model": "claude-sonnet-4-5-20250929",
-            },
+        yield MockTestStreamEvent(
+            event="complete",
+            completed_batches=completed,
+            total_batches=total,
+            mock_test=NEETPGMockTest(
+                test_id=str(test_id),
+                test_type=test_type,
+                subject_focus=subject_focus,
+                questions=all_questions,
+                question_count=len(all_questions),
+                duration_minutes=duration,
+                blueprint_used=blueprint,
+                difficulty_distribution=difficulty_counts,
+                total_marks=len(all_questions) * MARKS_PER_CORRECT,
+                weak_area_weighted=weak_area_focus,
+                generation_metadata={
+                    "generation_errors": generation_errors,
+                    "requested_questions": total_questions,
+                    "generated_questions": len(all_questions),
+                    "pooled_questions": sum(len(q) for q in pooled.values()),
+                    "generation_batches": len(jobs),
+                    "model": "claude-sonnet-4-5-20250929",
+                },
+            ),
         )
 
     # ------------------------------------------------------------------
@@ -992,6 +972,263 @@ class NEETPGPrepAgent:
             score_trend=trend,
         )
 
+    # ------------------------------------------------------------------
+    # Private: concurrent generation scheduler
+    # ------------------------------------------------------------------
+
+    def _plan_generation_jobs(
+        self,
+        blueprint: dict[str, int],
+        difficulty_queue: list[str],
+    ) -> tuple[list[_GenerationJob], dict[str, int]]:
+        """Split the blueprint into S2-sized batches.
+
+        Each question gets a difficulty rating from the shuffled tier
+        queue; each batch gets its own high-yield topic (weighted by
+        past-paper frequency).
+
+        Returns (jobs, question count per difficulty tier).
+        """
+        jobs: list[_GenerationJob] = []
+        difficulty_counts: dict[str, int] = {
+            "easy": 0, "moderate": 0, "difficult": 0,
+        }
+        q_index = 0
+
+        for subject, count in blueprint.items():
+            if count <= 0:
+                continue
+
+            ratings: list[int] = []
+            for _ in range(count):
+                if q_index < len(difficulty_queue):
+                    tier = difficulty_queue[q_index]
+                    low, high = DIFFICULTY_TO_RANGE[tier]
+                    ratings.append(random.randint(low, high))
+                    difficulty_counts[tier] += 1
+                else:
+                    ratings.append(random.randint(3, 5))
+                    difficulty_counts["difficult"] += 1
+                q_index += 1
+
+            subject_topics = [
+                t for t in HIGH_YIELD_TOPICS if t["subject"] == subject
+            ]
+            weights = [t["frequency"] for t in subject_topics]
+
+            for batch_index, start in enumerate(
+                range(0, count, S2_MAX_BATCH_SIZE),
+            ):
+                topic = ""
+                if subject_topics:
+                    topic = random.choices(
+                        subject_topics, weights=weights, k=1,
+                    )[0]["topic"]
+                jobs.append(_GenerationJob(
+                    subject=subject,
+                    topic=topic,
+                    batch_index=batch_index,
+                    difficulty_ratings=tuple(
+                        ratings[start:start + S2_MAX_BATCH_SIZE]
+                    ),
+                ))
+
+        return jobs, difficulty_counts
+
+    async def _serve_from_pool(
+        self,
+        jobs: list[_GenerationJob],
+        *,
+        student_id: UUID,
+        college_id: UUID,
+    ) -> tuple[dict[str, list[NEETPGQuestion]], list[_GenerationJob]]:
+        """Fill planned questions from the question pool.
+
+        One pool query covers every (subject, tier) pair of the test.
+        Questions the pool cannot supply stay in (shrunk) jobs for live
+        generation, and their buckets are queued for refill.
+
+        Returns (pooled questions by subject, remaining jobs).
+        """
+        from app.engines.ai.question_pool import (
+            PoolBucket,
+            QuestionPool,
+            request_refill,
+        )
+
+        pool = QuestionPool(self._db)
+        served = await pool.sample(
+            college_id=college_id,
+            student_id=student_id,
+            needs=dict(Counter(
+                (job.subject, self._rating_to_tier(rating))
+                for job in jobs
+                for rating in job.difficulty_ratings
+            )),
+            served_context="neet_pg_mock",
+        )
+
+        pooled: dict[str, list[NEETPGQuestion]] = defaultdict(list)
+        remaining: list[_GenerationJob] = []
+        shortfall: set[PoolBucket] = set()
+        for job in jobs:
+            missing: list[int] = []
+            for rating in job.difficulty_ratings:
+                tier = self._rating_to_tier(rating)
+                items = served.get((job.subject, tier))
+                if not items:
+                    missing.append(rating)
+                    continue
+                item = items.pop()
+                q = item.question_data
+                pooled[job.subject].append(NEETPGQuestion(
+                    question_index=len(pooled[job.subject]),
+                    stem=q["stem"],
+                    lead_in=q["lead_in"],
+                    options=q["options"],
+                    correct_answer_index=q["correct_answer_index"],
+                    subject=job.subject,
+                    topic=q.get("topic", item.topic),
+                    competency_code=q.get("competency_code", ""),
+                    blooms_level=q.get("blooms_level", "apply"),
+                    difficulty_tier=tier,
+                    difficulty_rating=q.get("difficulty_rating", rating),
+                    source_citations=q.get("source_citations", []),
+                    clinical_pearl=q.get("clinical_pearl", ""),
+                ))
+            if missing:
+                remaining.append(dataclasses.replace(
+                    job, difficulty_ratings=tuple(missing),
+                ))
+                shortfall.update(
+                    PoolBucket(job.subject, job.topic, self._rating_to_tier(r))
+                    for r in missing
+                )
+
+        syllabus = await pool.on_syllabus(shortfall)
+        for bucket in shortfall:
+            request_refill(college_id, bucket, on_syllabus=bucket in syllabus)
+        await pool.refill_low_buckets(college_id, sorted(pooled))
+        return dict(pooled), remaining
+
+    async def _run_generation_jobs(
+        self,
+        jobs: list[_GenerationJob],
+        *,
+        student_id: UUID,
+        college_id: UUID,
+    ) -> AsyncIterator[
+        tuple[_GenerationJob, list[NEETPGQuestion], Exception | None]
+    ]:
+        """Run all jobs concurrently; yield (job, questions, error) in
+        completion order. Outstanding jobs are cancelled if the consumer
+        stops early (e.g. the client disconnects).
+        """
+        semaphore = asyncio.Semaphore(GENERATION_MAX_CONCURRENCY)
+
+        async def _run(
+            job: _GenerationJob,
+        ) -> tuple[_GenerationJob, list[NEETPGQuestion], Exception | None]:
+            try:
+                questions = await self._generate_batch(
+                    job, semaphore,
+                    student_id=student_id, college_id=college_id,
+                )
+            except Exception as e:
+                logger.error(
+                    "Failed to generate %s batch %d after %d attempts: %s",
+                    job.subject, job.batch_index,
+                    GENERATION_MAX_RETRIES + 1, e,
+                )
+                return job, [], e
+            return job, questions, None
+
+        tasks = [asyncio.create_task(_run(job)) for job in jobs]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _generate_batch(
+        self,
+        job: _GenerationJob,
+        semaphore: asyncio.Semaphore,
+        *,
+        student_id: UUID,
+        college_id: UUID,
+    ) -> list[NEETPGQuestion]:
+        """Run one S2 batch in its own session, retrying with backoff.
+
+        The semaphore is released between attempts so a failing batch
+        does not hold a slot while it waits.
+        """
+        from app.core.database import async_session_factory
+        from app.engines.ai.agents.practice_question_generator import (
+            generate_practice_questions,
+        )
+
+        for attempt in range(GENERATION_MAX_RETRIES + 1):
+            try:
+                async with semaphore, async_session_factory() as db:
+                    await db.execute(
+                        text(
+                            "SELECT set_config("
+                            "'app.current_college_id', :cid, false)"
+                        ),
+                        {"cid": str(college_id)},
+                    )
+                    batch = await generate_practice_questions(
+                        db=db,
+                        gateway=self._gateway,
+                        prompt_registry=self._prompt_registry,
+                        subject=job.subject,
+                        topic=job.topic,
+                        difficulty=job.avg_difficulty,
+                        blooms_level="apply",  # NEET-PG is clinical application
+                        count=job.count,
+                        question_type="mcq",
+                        student_id=student_id,
+                        college_id=college_id,
+                    )
+                    await db.commit()
+                break
+            except Exception as e:
+                if attempt == GENERATION_MAX_RETRIES:
+                    raise
+                logger.warning(
+                    "Retrying %s batch %d (attempt %d): %s",
+                    job.subject, job.batch_index, attempt + 1, e,
+                )
+                await asyncio.sleep(
+                    _GENERATION_RETRY_BACKOFF_SECONDS * 2 ** attempt,
+                )
+
+        questions: list[NEETPGQuestion] = []
+        for i, q in enumerate(batch.questions):
+            q_dict = q.model_dump()
+            diff_rating = job.difficulty_ratings[
+                min(i, job.count - 1)
+            ]
+            questions.append(NEETPGQuestion(
+                question_index=i,
+                stem=q_dict["stem"],
+                lead_in=q_dict["lead_in"],
+                options=q_dict["options"],
+                correct_answer_index=q_dict["correct_answer_index"],
+                subject=job.subject,
+                topic=q_dict.get("topic", job.topic),
+                competency_code=q_dict.get("competency_code", ""),
+                blooms_level=q_dict.get("blooms_level", "apply"),
+                difficulty_tier=self._rating_to_tier(diff_rating),
+                difficulty_rating=diff_rating,
+                source_citations=q_dict.get("source_citations", []),
+                clinical_pearl=q_dict.get("clinical_pearl", ""),
+            ))
+        return questions
+
     # ------------------------------------------------------------------
     # Private helpers
     # ------------------------------------------------------------------
@@ -1432,6 +1669,29 @@ async def generate_neetpg_mock_test(
     )
 
 
+async def stream_neetpg_mock_test(
+    *,
+    db: AsyncSession,
+    gateway: AIGateway,
+    prompt_registry: PromptRegistry,
+    student_id: UUID,
+    college_id: UUID,
+    test_type: str = "full",
+    subject_focus: str | None = None,
+    weak_area_focus: bool = False,
+) -> AsyncIterator[MockTestStreamEvent]:
+    """Stream a NEET-PG mock test section by section. Convenience wrapper."""
+    agent = NEETPGPrepAgent(db, gateway, prompt_registry)
+    async for event in agent.stream_mock_test(
+        student_id=student_id,
+        college_id=college_id,
+        test_type=test_type,
+        subject_focus=subject_focus,
+        weak_area_focus=weak_area_focus,
+    ):
+        yield event
+
+
 async def analyze_neetpg_result(
     *,
     db: AsyncSession,
@@ -121,6 +121,32 @@ class NEETPGMockTest(BaseModel):
     generation_metadata: dict[str, Any] = Field(default_factory=dict)
 
 
+class MockTestStreamEvent(BaseModel):
+    """One event of a streamed mock test generation.
+
+    "section" events carry one subject's questions served from the
+    question pool, or one finished live S2 batch (pre-shuffle, indices
+    local to the section); the final "complete" event carries the
+    shuffled, persisted mock test.
+    """
+
+    event: str = Field(description="section or complete")
+    source: str = Field(
+        default="live",
+        description="question_pool or live (section events)",
+    )
+    subject: str | None = None
+    batch_index: int | None = None
+    questions: list[NEETPGQuestion] = Field(default_factory=list)
+    error: str | None = Field(
+        default=None,
+        description="Set when the batch failed after all retries",
+    )
+    completed_batches: int
+    total_batches: int
+    mock_test: NEETPGMockTest | None = None
+
+
 # ---------------------------------------------------------------------------
 # Answer submission
 # ---------------------------------------------------------------------------
@@ -350,6 +376,10 @@ class GenerateMockTestRequest(BaseModel):
         default=False,
         description="Weight towards student's weak topics from metacognitive profile",
     )
+    stream: bool = Field(
+        default=False,
+        description="Stream finished sections as SSE events",
+    )
 
 
 class SubmitMockTestRequest(BaseModel):
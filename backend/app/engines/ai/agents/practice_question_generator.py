@@ -18,15 +18,24 @@ students think rather than providing answers.
 import json
 import logging
 from typing import Any
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import END, START, StateGraph
 from pydantic import BaseModel, ConfigDict, Field
+from pydantic.json_schema import SkipJsonSchema
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.engines.ai.dedup_index import (
+    DedupIndex,
+    DedupKind,
+    question_dedup_text,
+)
 from app.engines.ai.gateway import AIGateway
-from app.engines.ai.pipelines.medical_safety import MedicalSafetyPipeline
+from app.engines.ai.pipelines.medical_safety import (
+    MedicalSafetyPipeline,
+    SafetyItem,
+)
 from app.engines.ai.prompt_registry import PromptRegistry
 from app.engines.ai.question_intelligence import (
     CollegeQuestionProfile,
@@ -93,6 +102,9 @@ class GeneratedMCQ(BaseModel):
     clinical_pearl: str = Field(
         description="One-line teaching point shown after answering",
     )
+    # Assigned when the question passes validation (not generated): its
+    # dedup index item id, and its question_pool_items id once pooled.
+    id: SkipJsonSchema[str | None] = None
 
 
 class PracticeQuestionBatch(BaseModel):
@@ -276,7 +288,7 @@ async def generate_questions(
     Generates one question at a time for quality.
     """
     college_id = UUID(state["college_id"])
-    student_id = UUID(state["student_id"])
+    student_id = UUID(state["student_id"]) if state["student_id"] else None
     request = state["request"]
 
     subject = request.get("subject", "General")
@@ -408,22 +420,41 @@ async def validate_questions(
     content_data = retrieved[0] if retrieved else {}
     source_context = content_data.get("formatted_context", "")
 
-    for q in generated:
-        # Serialize question for safety pipeline
-        question_text = _format_question_for_validation(q)
-
-        result = await pipeline.validate(
-            db,
-            content=question_text,
-            content_type="mcq",
-            college_id=college_id,
-            source_context=source_context,
-            declared_blooms_level=q.get("blooms_level"),
-            is_summative=False,  # Practice questions are formative
-        )
+    # Drop near-duplicates of pooled questions (and of each other)
+    # before paying for safety checks on them
+    index = DedupIndex(db, college_id=college_id, kind=DedupKind.MCQ)
+    matches = await index.check([question_dedup_text(q) for q in generated])
+    for q, match in zip(generated, matches):
+        if match is not None:
+            newly_rejected.append({
+                **q,
+                "rejection_reasons": [
+                    "Near-duplicate of an existing question — write a "
+                    "different clinical scenario",
+                ],
+            })
+    generated = [q for q, match in zip(generated, matches) if match is None]
+
+    # One packed call per check type for the whole batch
+    results = await pipeline.validate_batch(
+        db,
+        items=[
+            SafetyItem(
+                # Serialize question for safety pipeline
+                content=_format_question_for_validation(q),
+                content_type="mcq",
+                source_context=source_context,
+                declared_blooms_level=q.get("blooms_level"),
+                is_summative=False,  # Practice questions are formative
+            )
+            for q in generated
+        ],
+        college_id=college_id,
+    )
 
+    for q, result in zip(generated, results):
         if result.passed:
-            newly_validated.append(q)
+            newly_validated.append({**q, "id": str(uuid4())})
         else:
             q_with_reasons = {**q, "rejection_reasons": result.rejection_reasons}
             newly_rejected.append(q_with_reasons)
@@ -433,6 +464,12 @@ async def validate_questions(
                 result.rejection_reasons[:2],
             )
 
+    # Register accepted questions so later batches (live or pooled)
+    # reject near-copies of them
+    await index.add([
+        (question_dedup_text(q), UUID(q["id"])) for q in newly_validated
+    ])
+
     return {
         "validated_questions": already_validated + newly_validated,
         "rejected_questions": newly_rejected,
@@ -636,7 +673,7 @@ async def generate_practice_questions(
     count: int = 5,
     question_type: str = "mcq",
     competency_code: str | None = None,
-    student_id: UUID,
+    student_id: UUID | None,
     college_id: UUID,
 ) -> PracticeQuestionBatch:
     """Run the Practice Question Generator agent.
@@ -649,7 +686,8 @@ async def generate_practice_questions(
         count: Number of questions to generate (1-10).
         question_type: "mcq" (others in future phases).
         competency_code: Optional NMC competency code.
-        student_id: Authenticated student UUID.
+        student_id: Authenticated student UUID; None for background
+            generation (question pool refills).
         college_id: Tenant UUID.
 
     Returns:
@@ -660,7 +698,7 @@ async def generate_practice_questions(
 
     initial_state: dict[str, Any] = {
         "college_id": str(college_id),
-        "student_id": str(student_id),
+        "student_id": str(student_id) if student_id else "",
         "request": {
             "subject": subject,
             "topic": topic,
@@ -686,7 +724,9 @@ async def generate_practice_questions(
         prompt_registry=prompt_registry,
     )
 
-    config = {"configurable": {"thread_id": f"qgen_{student_id}_{college_id}"}}
+    config = {"configurable": {
+        "thread_id": f"qgen_{student_id or 'pool'}_{college_id}",
+    }}
 
     final_state = await graph.ainvoke(initial_state, config=config)
 
@@ -11,10 +11,14 @@ Output types:
 4. Resource recommendations (practice tests, flashcards)
 5. Progress celebration (keeps students motivated)
 
-Graph: START → gather_student_data → analyze_knowledge_gaps
-             → assess_workload → generate_recommendations
+Graph: START → gather_student_data → assess_workload ─┐
+      START → analyze_knowledge_gaps ──────────────┴→ generate_recommendations
              → build_study_plan (if weekly) → END
 
+Gap analysis reads only the mastery profiles, so it runs alongside data
+gathering and workload assessment; generate_recommendations waits for
+both branches.
+
 Public interface:
     from app.engines.ai.agents.recommendation_engine import (
         run_recommendations,
@@ -25,13 +29,16 @@ Public interface:
     )
 """
 
+import asyncio
 import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from datetime import date, datetime, timedelta, timezone
 from typing import Any, TypedDict
 from uuid import UUID
 
 from langgraph.graph import END, START, StateGraph
-from sqlalchemy import select, update
+from sqlalchemy import select, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.engines.ai.agents.recommendation_schemas import (
@@ -129,9 +136,25 @@ class RecommendationState(TypedDict):
 # LangGraph nodes
 # ---------------------------------------------------------------------------
 
-async def gather_student_data(state: RecommendationState) -> dict:
-    """Node 1: Gather all student data from S8 metacognitive engine."""
+@asynccontextmanager
+async def _college_session(college_id: str) -> AsyncIterator[AsyncSession]:
+    """A fresh session scoped to the college's RLS tenant."""
     from app.core.database import async_session_factory
+
+    async with async_session_factory() as db:
+        await db.execute(
+            text("SELECT set_config('app.current_college_id', :cid, false)"),
+            {"cid": college_id},
+        )
+        yield db
+
+
+async def gather_student_data(state: RecommendationState) -> dict:
+    """Node 1: Gather all student data from S8 metacognitive engine.
+
+    The context, recent events and archetype are independent reads, each
+    run concurrently on its own session.
+    """
     from app.engines.ai.analytics.metacognitive import get_analytics_engine
 
     student_id = UUID(state["student_id"])
@@ -139,40 +162,41 @@ async def gather_student_data(state: RecommendationState) -> dict:
 
     engine = get_analytics_engine()
 
-    async with async_session_factory() as db:
-        from sqlalchemy import text
-        await db.execute(
-            text("SET app.current_college_id = :cid"),
-            {"cid": state["college_id"]},
-        )
-
-        # Get full student context
-        context = await engine.get_student_context_for_ai(
-            db, student_id, college_id,
-        )
+    async def load_context():
+        async with _college_session(state["college_id"]) as db:
+            return await engine.get_student_context_for_ai(
+                db, student_id, college_id,
+            )
 
-        # Get recent events (last 7 days)
+    async def load_events():
+        # Recent events (last 7 days)
         seven_days_ago = datetime.now(timezone.utc) - timedelta(days=7)
-        result = await db.execute(
-            select(MetacognitiveEvent)
-            .where(
-                MetacognitiveEvent.student_id == student_id,
-                MetacognitiveEvent.college_id == college_id,
-                MetacognitiveEvent.occurred_at >= seven_days_ago,
+        async with _college_session(state["college_id"]) as db:
+            result = await db.execute(
+                select(MetacognitiveEvent)
+                .where(
+                    MetacognitiveEvent.student_id == student_id,
+                    MetacognitiveEvent.college_id == college_id,
+                    MetacognitiveEvent.occurred_at >= seven_days_ago,
+                )
+                .order_by(MetacognitiveEvent.occurred_at.desc())
+                .limit(200)
             )
-            .order_by(MetacognitiveEvent.occurred_at.desc())
-            .limit(200)
-        )
-        events = result.scalars().all()
-
-        # Get archetype
-        arch_result = await db.execute(
-            select(StudentArchetypeProfile).where(
-                StudentArchetypeProfile.student_id == student_id,
-                StudentArchetypeProfile.college_id == college_id,
+            return result.scalars().all()
+
+    async def load_archetype():
+        async with _college_session(state["college_id"]) as db:
+            result = await db.execute(
+                select(StudentArchetypeProfile).where(
+                    StudentArchetypeProfile.student_id == student_id,
+                    StudentArchetypeProfile.college_id == college_id,
+                )
             )
-        )
-        arch = arch_result.scalars().first()
+            return result.scalars().first()
+
+    context, events, arch = await asyncio.gather(
+        load_context(), load_events(), load_archetype(),
+    )
 
     archetype = None
     if arch:
@@ -195,19 +219,15 @@ async def gather_student_data(state: RecommendationState) -> dict:
 
 
 async def analyze_knowledge_gaps(state: RecommendationState) -> dict:
-    """Node 2: Identify knowledge gaps from metacognitive profiles."""
+    """Node 2: Identify knowledge gaps from metacognitive profiles.
+
+    Needs none of the gathered data, so it runs in parallel with
+    gather_student_data → assess_workload.
+    """
     student_id = UUID(state["student_id"])
     college_id = UUID(state["college_id"])
 
-    from app.core.database import async_session_factory
-
-    async with async_session_factory() as db:
-        from sqlalchemy import text
-        await db.execute(
-            text("SET app.current_college_id = :cid"),
-            {"cid": state["college_id"]},
-        )
-
+    async with _college_session(state["college_id"]) as db:
         result = await db.execute(
             select(StudentMetacognitiveProfile).where(
                 StudentMetacognitiveProfile.student_id == student_id,
@@ -423,15 +443,7 @@ async def generate_recommendations(state: RecommendationState) -> dict:
     )
 
     # Create audit execution
-    from app.core.database import async_session_factory
-
-    async with async_session_factory() as db:
-        from sqlalchemy import text
-        await db.execute(
-            text("SET app.current_college_id = :cid"),
-            {"cid": state["college_id"]},
-        )
-
+    async with _college_session(state["college_id"]) as db:
         execution = AgentExecution(
             college_id=college_id,
             user_id=student_id,
@@ -555,15 +567,7 @@ async def build_study_plan(state: RecommendationState) -> dict:
         f"Create a comprehensive 7-day study plan."
     )
 
-    from app.core.database import async_session_factory
-
-    async with async_session_factory() as db:
-        from sqlalchemy import text
-        await db.execute(
-            text("SET app.current_college_id = :cid"),
-            {"cid": state["college_id"]},
-        )
-
+    async with _college_session(state["college_id"]) as db:
         plan: GeneratedWeeklyPlan = await gateway.complete_structured(
             db,
             system_prompt=system_prompt,
@@ -644,7 +648,12 @@ def should_build_plan(state: RecommendationState) -> str:
 # ---------------------------------------------------------------------------
 
 def build_recommendation_graph() -> StateGraph:
-    """Build the S6 Recommendation Engine LangGraph."""
+    """Build the S6 Recommendation Engine LangGraph.
+
+    Fans out from START into the data branch (gather → workload) and the
+    gap-analysis branch, and fans in at generate_recommendations. The
+    branches write disjoint state keys, so no reducers are needed.
+    """
     graph = StateGraph(RecommendationState)
 
     graph.add_node("gather_student_data", gather_student_data)
@@ -654,9 +663,12 @@ def build_recommendation_graph() -> StateGraph:
     graph.add_node("build_study_plan", build_study_plan)
 
     graph.add_edge(START, "gather_student_data")
-    graph.add_edge("gather_student_data", "analyze_knowledge_gaps")
-    graph.add_edge("analyze_knowledge_gaps", "assess_workload")
-    graph.add_edge("assess_workload", "generate_recommendations")
+    graph.add_edge(START, "analyze_knowledge_gaps")
+    graph.add_edge("gather_student_data", "assess_workload")
+    graph.add_edge(
+        ["analyze_knowledge_gaps", "assess_workload"],
+        "generate_recommendations",
+    )
     graph.add_conditional_edges(
         "generate_recommendations",
         should_build_plan,
@@ -9,7 +9,7 @@ framework can generate ANY compliance document from a template.
 
 Architecture:
 1. Load SAFTemplate with all sections and field definitions
-2. For each section, for each field:
+2. For every field of every section:
    a. If field.data_source is configured → use ComplianceDataFetcher
    b. If field.requires_narrative → use Sonnet to generate text from data
    c. If field has no data source → mark as "MANUAL_ENTRY_REQUIRED"
@@ -19,22 +19,33 @@ Architecture:
 6. Set requires_human_review = True (always for compliance docs)
 7. Return draft with auto-filled + manual-entry fields clearly marked
 
+A SAF has hundreds of fields, so step 2 is not a field-by-field loop.
+Each distinct (source, query config) is fetched once per run, fields are
+ordered into waves by the field codes their narratives depend on
+(``depends_on``), and each wave's narratives are written NARRATIVE_PACK_SIZE
+to a structured call, at most SAF_MAX_CONCURRENCY fetches or calls at once.
+
 PRINCIPLE: Every field definition, section structure, and narrative prompt
 comes from the template — never hardcoded. The engine works with any
 template structure.
 """
 
+import asyncio
+import json
 import logging
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, TypedDict
 from uuid import UUID
 
 from langgraph.graph import END, START, StateGraph
 from langgraph.checkpoint.memory import MemorySaver
+from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.engines.ai.agents.compliance_monitor import ComplianceDataFetcher
+from app.engines.ai.agents.compliance_schemas import DataFetchResult
 from app.engines.ai.agents.saf_schemas import (
     ComplianceDocumentResult,
     FilledField,
@@ -51,6 +62,154 @@ logger = logging.getLogger(__name__)
 
 AGENT_ID = "saf_generator"
 
+# Narrative fields written per structured call, and fetches / calls in
+# flight at once during one generation run.
+NARRATIVE_PACK_SIZE = 6
+SAF_MAX_CONCURRENCY = 8
+
+_NARRATIVE_SYSTEM_PROMPT = (
+    "You are a compliance document writer for an Indian medical "
+    "college. Generate professional, factual narrative text for "
+    "regulatory compliance forms (NMC SAF, NAAC SSR, NBA SAR). "
+    "Write in formal third-person prose. Be precise with numbers "
+    "and facts. Do not include information not present in the data."
+)
+
+_PACKED_NARRATIVE_SYSTEM_PROMPT = _NARRATIVE_SYSTEM_PROMPT + (
+    "\n\nYou will receive several numbered requests, each with its own "
+    'instruction and data. Respond with {"narratives": [...]}: one object '
+    'per request, in order, with "index" set to the request number and '
+    '"text" the narrative for that request, written from its data only.'
+)
+
+
+class _PackedNarrative(BaseModel):
+    index: int
+    text: str
+
+
+class _PackedNarrativeBatch(BaseModel):
+    narratives: list[_PackedNarrative]
+
+
+def _narrative_message(narrative_prompt: str, data_points: dict[str, Any]) -> str:
+    """Instruction + data block for one narrative field."""
+    data_summary = "\n".join(
+        f"- {k}: {v}" for k, v in data_points.items()
+        if v is not None
+    )
+    return (
+        f"Instruction: {narrative_prompt}\n\n"
+        f"Available data:\n{data_summary}"
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class _NarrativeRequest:
+    """A narrative still to be written for a field.
+
+    ``fallback`` is the field as filled if the narrative fails: the raw
+    fetched value, or manual entry for narrative-only fields.
+    """
+
+    narrative_prompt: str
+    data_points: dict[str, Any]
+    fallback: FilledField
+
+
+def field_waves(
+    field_defs: list[dict[str, Any]],
+) -> tuple[list[list[int]], list[int]]:
+    """Order fields into waves by their ``depends_on`` field codes.
+
+    Every field of a wave depends only on fields of earlier waves, so a
+    wave's fields can be filled concurrently. Returns (waves of positions
+    into field_defs, positions left on a dependency cycle). Dependencies
+    on field codes the template does not define are ignored.
+    """
+    positions = {f.get("field_code"): i for i, f in enumerate(field_defs)}
+    pending = {
+        i: {
+            positions[code] for code in f.get("depends_on") or []
+            if code in positions
+        }
+        for i, f in enumerate(field_defs)
+    }
+    waves: list[list[int]] = []
+    while pending:
+        wave = [i for i, deps in pending.items() if not deps]
+        if not wave:
+            break
+        waves.append(wave)
+        done = set(wave)
+        for i in wave:
+            del pending[i]
+        for deps in pending.values():
+            deps -= done
+    return waves, sorted(pending)
+
+
+def _fetch_key(
+    field_def: dict[str, Any], parameters: dict[str, Any],
+) -> tuple[str, str] | None:
+    """(source type, canonical merged config) a data field is fetched by.
+
+    Fields reading different attributes of one source ("college_profile.
+    name", "college_profile.address") share a key, hence one fetch.
+    """
+    data_source = field_def.get("data_source")
+    if not data_source:
+        return None
+    query_config = field_def.get("data_query_config") or {}
+    merged_config = {**query_config, **parameters}
+    return (
+        data_source.split(".")[0],
+        json.dumps(merged_config, sort_keys=True, default=str),
+    )
+
+
+def _manual_entry(
+    field_def: dict[str, Any],
+    error_message: str | None,
+    data_source_used: str | None = None,
+) -> FilledField:
+    return FilledField(
+        field_code=field_def.get("field_code", "?"),
+        label=field_def.get("label", ""),
+        field_type=field_def.get("field_type", "text"),
+        value=None,
+        source="manual_entry_required",
+        data_source_used=data_source_used,
+        error_message=error_message,
+    )
+
+
+def _build_section(
+    section_def: dict[str, Any], fields: list[FilledField],
+) -> FilledSection:
+    """Assemble a filled section and its per-source counts."""
+    auto_count = 0
+    manual_count = 0
+    narrative_count = 0
+    for filled in fields:
+        if filled.source == "auto_filled":
+            auto_count += 1
+        elif filled.source == "narrative_generated":
+            auto_count += 1
+            narrative_count += 1
+        elif filled.source == "manual_entry_required":
+            manual_count += 1
+
+    return FilledSection(
+        section_code=section_def.get("section_code", "?"),
+        title=section_def.get("title", "Untitled"),
+        order=section_def.get("order", 0),
+        fields=fields,
+        auto_filled_count=auto_count,
+        manual_required_count=manual_count,
+        narrative_count=narrative_count,
+    )
+
 
 # ═══════════════════════════════════════════════════════════════════════════
 # SAFGenerator — template-driven document generation
@@ -88,7 +247,7 @@ class SAFGenerator:
 
         Steps:
         1. Load SAFTemplate with all sections and field definitions
-        2. For each section, fill fields from data sources or mark as manual
+        2. Fill fields from data sources or mark as manual
         3. Generate narrative text for narrative fields (Sonnet)
         4. Compile all sections into document structure
         5. Calculate auto-fill percentage and identify data gaps
@@ -111,7 +270,18 @@ class SAFGenerator:
 
         params = parameters or {}
 
-        # Process each section
+        # Fill every field of every section together, then regroup
+        sections = sorted(
+            template.sections or [], key=lambda s: s.get("order", 0),
+        )
+        field_defs = [f for s in sections for f in s.get("fields", [])]
+        filled_fields = await self._fill_fields(
+            db,
+            field_defs,
+            college_id=college_id,
+            parameters=params,
+        )
+
         filled_sections: list[FilledSection] = []
         all_data_gaps: list[dict[str, Any]] = []
         total_fields = 0
@@ -119,14 +289,11 @@ class SAFGenerator:
         manual_required = 0
         narrative_count = 0
 
-        sections = template.sections or []
-        for section_def in sorted(sections, key=lambda s: s.get("order", 0)):
-            filled = await self._fill_section(
-                db,
-                section_def=section_def,
-                college_id=college_id,
-                parameters=params,
-            )
+        start = 0
+        for section_def in sections:
+            end = start + len(section_def.get("fields", []))
+            filled = _build_section(section_def, filled_fields[start:end])
+            start = end
             filled_sections.append(filled)
 
             total_fields += len(filled.fields)
@@ -196,153 +363,165 @@ class SAFGenerator:
             data_gaps=all_data_gaps,
         )
 
-    async def _fill_section(
+    # ------------------------------------------------------------------
+    # Field filling
+    # ------------------------------------------------------------------
+
+    async def _fill_fields(
         self,
         db: AsyncSession,
+        field_defs: list[dict[str, Any]],
         *,
-        section_def: dict[str, Any],
         college_id: UUID,
         parameters: dict[str, Any],
-    ) -> FilledSection:
-        """Fill a single template section using configured data sources."""
-        section_code = section_def.get("section_code", "?")
-        title = section_def.get("title", "Untitled")
-        order = section_def.get("order", 0)
-        fields_def = section_def.get("fields", [])
-
-        filled_fields: list[FilledField] = []
-        auto_count = 0
-        manual_count = 0
-        narrative_count = 0
+    ) -> list[FilledField]:
+        """Fill every field of a template, in input order.
 
-        for field_def in fields_def:
-            filled = await self._fill_field(
+        Each distinct data fetch runs once, up front. Fields then resolve
+        in dependency waves (see field_waves), so a narrative sees the
+        values of the fields it depends on; a wave's narratives are
+        written in packs, concurrently.
+        """
+        semaphore = asyncio.Semaphore(SAF_MAX_CONCURRENCY)
+        fetched = await self._fetch_all(
+            db,
+            field_defs,
+            college_id=college_id,
+            parameters=parameters,
+            semaphore=semaphore,
+        )
+
+        waves, cyclic = field_waves(field_defs)
+        filled: list[FilledField | None] = [None] * len(field_defs)
+        for i in cyclic:
+            filled[i] = _manual_entry(
+                field_defs[i],
+                "Field dependencies form a cycle — manual entry required",
+                field_defs[i].get("data_source"),
+            )
+
+        by_code: dict[str, FilledField] = {}
+        for wave in waves:
+            narratives: list[tuple[int, _NarrativeRequest]] = []
+            for i in wave:
+                field_def = field_defs[i]
+                key = _fetch_key(field_def, parameters)
+                resolved = self._resolve_field(
+                    field_def,
+                    fetch_result=fetched[key] if key else None,
+                    dependencies=[
+                        by_code[code]
+                        for code in field_def.get("depends_on") or []
+                        if code in by_code
+                    ],
+                    parameters=parameters,
+                )
+                if isinstance(resolved, _NarrativeRequest):
+                    narratives.append((i, resolved))
+                else:
+                    filled[i] = resolved
+
+            written = await self._write_narratives(
                 db,
-                field_def=field_def,
+                [request for _, request in narratives],
                 college_id=college_id,
-                parameters=parameters,
+                semaphore=semaphore,
             )
-            filled_fields.append(filled)
-
-            if filled.source == "auto_filled":
-                auto_count += 1
-            elif filled.source == "narrative_generated":
-                auto_count += 1
-                narrative_count += 1
-            elif filled.source == "manual_entry_required":
-                manual_count += 1
-
-        return FilledSection(
-            section_code=section_code,
-            title=title,
-            order=order,
-            fields=filled_fields,
-            auto_filled_count=auto_count,
-            manual_required_count=manual_count,
-            narrative_count=narrative_count,
-        )
+            for (i, _), field in zip(narratives, written):
+                filled[i] = field
+            for i in wave:
+                by_code[filled[i].field_code] = filled[i]
 
-    async def _fill_field(
+        return filled
+
+    async def _fetch_all(
         self,
         db: AsyncSession,
+        field_defs: list[dict[str, Any]],
         *,
-        field_def: dict[str, Any],
         college_id: UUID,
         parameters: dict[str, Any],
-    ) -> FilledField:
-        """Fill a single field using its configured data source."""
+        semaphore: asyncio.Semaphore,
+    ) -> dict[tuple[str, str], DataFetchResult]:
+        """Run each distinct data fetch of the template once.
+
+        Fetchers query ``db``, which concurrent gateway calls share, so
+        each holds the gateway's session lock.
+        """
+        configs: dict[tuple[str, str], dict[str, Any]] = {}
+        for field_def in field_defs:
+            key = _fetch_key(field_def, parameters)
+            if key is not None and key not in configs:
+                configs[key] = {
+                    **(field_def.get("data_query_config") or {}),
+                    **parameters,
+                }
+
+        lock = self._gateway.session_lock(db)
+
+        async def run(key: tuple[str, str]) -> DataFetchResult:
+            async with semaphore, lock:
+                return await self._fetcher.fetch(
+                    db,
+                    source_type=key[0],
+                    query_config=configs[key],
+                    college_id=college_id,
+                )
+
+        results = await asyncio.gather(*(run(key) for key in configs))
+        return dict(zip(configs, results))
+
+    @staticmethod
+    def _resolve_field(
+        field_def: dict[str, Any],
+        *,
+        fetch_result: DataFetchResult | None,
+        dependencies: list[FilledField],
+        parameters: dict[str, Any],
+    ) -> FilledField | _NarrativeRequest:
+        """Fill a field from its fetched data, or say what to write.
+
+        Returns the filled field, or a _NarrativeRequest when the field
+        still needs a narrative.
+        """
         field_code = field_def.get("field_code", "?")
         label = field_def.get("label", "")
         field_type = field_def.get("field_type", "text")
         data_source = field_def.get("data_source")
-        query_config = field_def.get("data_query_config") or {}
         requires_narrative = field_def.get("requires_narrative", False)
         narrative_prompt = field_def.get("narrative_prompt")
+        related = {
+            f.label or f.field_code: f.value
+            for f in dependencies if f.value is not None
+        }
 
         # No data source configured — mark for manual entry
         if not data_source and not requires_narrative:
-            return FilledField(
-                field_code=field_code,
-                label=label,
-                field_type=field_type,
-                value=None,
-                source="manual_entry_required",
-                error_message=field_def.get(
+            return _manual_entry(
+                field_def,
+                field_def.get(
                     "help_text", "No data source configured — manual entry required",
                 ),
             )
 
         # Narrative-only field (no data source, but AI generates text)
         if requires_narrative and not data_source:
-            if narrative_prompt:
-                try:
-                    text = await self._generate_narrative(
-                        db,
-                        data_points=parameters,
-                        narrative_prompt=narrative_prompt,
-                        college_id=college_id,
-                    )
-                    return FilledField(
-                        field_code=field_code,
-                        label=label,
-                        field_type=field_type,
-                        value=text,
-                        source="narrative_generated",
-                    )
-                except Exception as e:
-                    logger.warning(
-                        "Narrative generation failed for %s: %s",
-                        field_code, e,
-                    )
-            return FilledField(
-                field_code=field_code,
-                label=label,
-                field_type=field_type,
-                value=None,
-                source="manual_entry_required",
-                error_message="Narrative generation requires data — "
-                              "fill related fields first",
+            manual = _manual_entry(
+                field_def,
+                "Narrative generation requires data — "
+                "fill related fields first",
+            )
+            if not narrative_prompt:
+                return manual
+            return _NarrativeRequest(
+                narrative_prompt=narrative_prompt,
+                data_points={**parameters, **related},
+                fallback=manual,
             )
-
-        # Has a data source — try to fetch
-        # Merge parameters into query config
-        merged_config = {**query_config, **parameters}
-
-        fetch_result = await self._fetcher.fetch(
-            db,
-            source_type=data_source.split(".")[0] if "." in data_source else data_source,
-            query_config=merged_config,
-            college_id=college_id,
-        )
 
         if fetch_result.status == "ok" and fetch_result.value is not None:
             value = fetch_result.value
-
-            # If field also requires narrative, generate it from the data
-            if requires_narrative and narrative_prompt:
-                try:
-                    narrative = await self._generate_narrative(
-                        db,
-                        data_points={"value": value, "field": label, **parameters},
-                        narrative_prompt=narrative_prompt,
-                        college_id=college_id,
-                    )
-                    return FilledField(
-                        field_code=field_code,
-                        label=label,
-                        field_type=field_type,
-                        value=narrative,
-                        source="narrative_generated",
-                        data_source_used=data_source,
-                    )
-                except Exception as e:
-                    logger.warning(
-                        "Narrative generation failed for %s, "
-                        "falling back to raw data: %s",
-                        field_code, e,
-                    )
-
-            return FilledField(
+            filled = FilledField(
                 field_code=field_code,
                 label=label,
                 field_type=field_type,
@@ -351,20 +530,128 @@ class SAFGenerator:
                 data_source_used=data_source,
             )
 
+            # If field also requires narrative, generate it from the data
+            if requires_narrative and narrative_prompt:
+                return _NarrativeRequest(
+                    narrative_prompt=narrative_prompt,
+                    data_points={
+                        "value": value, "field": label, **parameters, **related,
+                    },
+                    fallback=filled,
+                )
+            return filled
+
         # Data source failed — mark for manual entry
-        return FilledField(
-            field_code=field_code,
-            label=label,
-            field_type=field_type,
-            value=None,
-            source="manual_entry_required",
-            data_source_used=data_source,
-            error_message=(
+        return _manual_entry(
+            field_def,
+            (
                 f"Data source '{data_source}' returned "
                 f"{fetch_result.status}: {fetch_result.message}"
             ),
+            data_source,
         )
 
+    # ------------------------------------------------------------------
+    # Narratives
+    # ------------------------------------------------------------------
+
+    async def _write_narratives(
+        self,
+        db: AsyncSession,
+        requests: list[_NarrativeRequest],
+        *,
+        college_id: UUID,
+        semaphore: asyncio.Semaphore,
+        pack_size: int = NARRATIVE_PACK_SIZE,
+    ) -> list[FilledField]:
+        """Write narratives in packs, results in input order."""
+        packs = [
+            requests[i:i + pack_size]
+            for i in range(0, len(requests), pack_size)
+        ]
+
+        async def run(pack: list[_NarrativeRequest]) -> list[FilledField]:
+            async with semaphore:
+                if len(pack) == 1:
+                    return [await self._write_narrative(
+                        db, pack[0], college_id=college_id,
+                    )]
+                return await self._write_pack(db, pack, college_id=college_id)
+
+        results = await asyncio.gather(*(run(pack) for pack in packs))
+        return [field for pack in results for field in pack]
+
+    async def _write_narrative(
+        self,
+        db: AsyncSession,
+        request: _NarrativeRequest,
+        *,
+        college_id: UUID,
+    ) -> FilledField:
+        """One field's narrative on its own call; fallback on failure."""
+        try:
+            text = await self._generate_narrative(
+                db,
+                data_points=request.data_points,
+                narrative_prompt=request.narrative_prompt,
+                college_id=college_id,
+            )
+        except Exception as e:
+            logger.warning(
+                "Narrative generation failed for %s: %s",
+                request.fallback.field_code, e,
+            )
+            return request.fallback
+        return _narrative_field(request, text)
+
+    async def _write_pack(
+        self,
+        db: AsyncSession,
+        pack: list[_NarrativeRequest],
+        *,
+        college_id: UUID,
+    ) -> list[FilledField]:
+        """One structured call writing every narrative of a pack.
+
+        A narrative missing from the answer is retried on its own; a
+        failed call leaves each field at its fallback.
+        """
+        user_message = "\n\n".join(
+            f"[Request {i}]\n"
+            f"{_narrative_message(r.narrative_prompt, r.data_points)}"
+            for i, r in enumerate(pack)
+        ) + "\n\nKeep each narrative concise and factual."
+        try:
+            batch = await self._gateway.complete_structured(
+                db,
+                system_prompt=_PACKED_NARRATIVE_SYSTEM_PROMPT,
+                user_message=user_message,
+                output_schema=_PackedNarrativeBatch,
+                model="claude-sonnet-4-5-20250929",
+                college_id=college_id,
+                agent_id=AGENT_ID,
+                task_type="saf_generation",
+                max_tokens=1024 * len(pack),
+                temperature=0.3,
+            )
+        except Exception as e:
+            logger.warning(
+                "Packed narrative generation for %d fields failed, "
+                "using fallbacks: %s", len(pack), e,
+            )
+            return [request.fallback for request in pack]
+
+        texts: list[str | None] = [None] * len(pack)
+        for narrative in batch.narratives:
+            if 0 <= narrative.index < len(pack) and narrative.text.strip():
+                texts[narrative.index] = texts[narrative.index] or narrative.text
+
+        return [
+            _narrative_field(request, text) if text is not None
+            else await self._write_narrative(db, request, college_id=college_id)
+            for request, text in zip(pack, texts)
+        ]
+
     async def _generate_narrative(
         self,
         db: AsyncSession,
@@ -378,28 +665,14 @@ class SAFGenerator:
         Uses Sonnet with the narrative_prompt from the template.
         The prompt is defined by Jason in the template — never hardcoded.
         """
-        system_prompt = (
-            "You are a compliance document writer for an Indian medical "
-            "college. Generate professional, factual narrative text for "
-            "regulatory compliance forms (NMC SAF, NAAC SSR, NBA SAR). "
-            "Write in formal third-person prose. Be precise with numbers "
-            "and facts. Do not include information not present in the data."
-        )
-
-        # Build user message from template's narrative_prompt + data
-        data_summary = "\n".join(
-            f"- {k}: {v}" for k, v in data_points.items()
-            if v is not None
-        )
         user_message = (
-            f"Instruction: {narrative_prompt}\n\n"
-            f"Available data:\n{data_summary}\n\n"
+            f"{_narrative_message(narrative_prompt, data_points)}\n\n"
             f"Generate the narrative text. Keep it concise and factual."
         )
 
         response = await self._gateway.complete(
             db,
-            system_prompt=system_prompt,
+            system_prompt=_NARRATIVE_SYSTEM_PROMPT,
             user_message=user_message,
             model="claude-sonnet-4-5-20250929",
             college_id=college_id,
@@ -413,6 +686,14 @@ class SAFGenerator:
         return response.content
 
 
+def _narrative_field(request: _NarrativeRequest, text: str) -> FilledField:
+    """The request's field, filled with its written narrative."""
+    return request.fallback.model_copy(update={
+        "value": text,
+        "source": "narrative_generated",
+        "error_message": None,
+    })
+
 # ═══════════════════════════════════════════════════════════════════════════
 # LangGraph Supervisor — orchestrates the full generation pipeline
 # ═══════════════════════════════════════════════════════════════════════════
@@ -39,6 +39,10 @@ class SAFFieldDefinition(BaseModel):
     )
     validation_rules: dict[str, Any] | None = None
     help_text: str | None = None
+    depends_on: list[str] = Field(
+        default_factory=list,
+        description="Field codes whose values this field's narrative uses",
+    )
 
 
 class SAFSectionDefinition(BaseModel):
@@ -6,20 +6,28 @@ it has multiple nodes with conditional routing, state checkpointing across
 sessions, and deterministic preservation gate enforcement.
 
 Graph structure:
-    START → retrieve_context → assess_knowledge → detect_misconceptions
-          → build_scaffold → preservation_gate
-                                   ├─ (pass) → deliver_response → END
-                                   └─ (fail, <3) → regenerate → preservation_gate
-                                   └─ (fail, >=3) → deliver_response (fallback) → END
+    START ─┬→ retrieve_context ──────┐
+           ├→ assess_knowledge ──────┼→ build_scaffold → preservation_gate
+           └→ detect_misconceptions ─┘
+    preservation_gate
+        ├─ (pass) → deliver_response → END
+        └─ (fail, <3) → regenerate → build_scaffold → preservation_gate
+        └─ (fail, >=3) → deliver_response (fallback) → END
+
+The three pre-processing branches are independent, so they run
+concurrently, each on its own session and within its own time budget; a
+branch that fails or overruns is replaced by a neutral fallback instead
+of holding up the turn.
 
 Every response passes through the CognitivePreservationPipeline before
 delivery. The AI CANNOT give direct answers — this is an architectural
 guarantee, not a prompt instruction.
 """
 
+import asyncio
 import json
 import logging
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Awaitable, Callable
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Annotated, Any
@@ -29,6 +37,7 @@ from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import add_messages
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.engines.ai.gateway import AIGateway, StreamChunk
@@ -37,6 +46,7 @@ from app.engines.ai.pipelines.cognitive_preservation import (
     CognitivePreservationPipeline,
     PreservationResult,
 )
+from app.engines.ai.pipelines.direct_answer_rules import RollingDirectAnswerGate
 from app.engines.ai.prompt_registry import PromptRegistry
 from app.engines.ai.rag import get_rag_engine
 from app.engines.ai.tools import get_tools_for_agent
@@ -51,6 +61,12 @@ logger = logging.getLogger(__name__)
 AGENT_ID = "socratic_study_buddy"
 MAX_REGENERATION_ATTEMPTS = 3
 
+# Time budgets (seconds) for the concurrent pre-processing branches. A
+# branch that overruns is dropped and the turn continues with its fallback.
+RETRIEVE_TIMEOUT_SECONDS = 8.0
+ASSESS_TIMEOUT_SECONDS = 3.0
+MISCONCEPTION_TIMEOUT_SECONDS = 3.0
+
 # Scaffolding levels — ordered from least to most supportive.
 # Escalation moves DOWN this list on preservation failures.
 SCAFFOLDING_LEVELS = ("hint", "guided_question", "decomposition", "analogy")
@@ -316,6 +332,26 @@ async def build_scaffold(
     Each call uses the current scaffolding level and any regeneration
     instructions from the preservation gate.
     """
+    request = await _scaffold_request(
+        state, db=db, prompt_registry=prompt_registry,
+    )
+
+    # Call the AI Gateway
+    ai_response = await gateway.complete(db, **request)
+
+    return {
+        "response": ai_response.content,
+        "scaffolding_attempts": state.get("scaffolding_attempts", 0) + 1,
+    }
+
+
+async def _scaffold_request(
+    state: SocraticState,
+    *,
+    db: AsyncSession,
+    prompt_registry: PromptRegistry,
+) -> dict[str, Any]:
+    """Gateway request for build_scaffold (complete) or streaming (stream)."""
     college_id = UUID(state["college_id"])
 
     # Load system prompt
@@ -379,25 +415,18 @@ async def build_scaffold(
         if cite_text:
             user_content += f"\n\n[Available source references:\n{cite_text}]"
 
-    # Call the AI Gateway
-    ai_response = await gateway.complete(
-        db,
-        system_prompt=system_prompt,
-        user_message=user_content,
-        messages=messages if messages else None,
-        model="claude-sonnet-4-5-20250929",
-        college_id=college_id,
-        user_id=UUID(state["student_id"]),
-        agent_id=AGENT_ID,
-        task_type="socratic_dialogue",
-        cache_system_prompt=True,
-        max_tokens=1024,
-        temperature=1.0,
-    )
-
     return {
-        "response": ai_response.content,
-        "scaffolding_attempts": state.get("scaffolding_attempts", 0) + 1,
+        "system_prompt": system_prompt,
+        "user_message": user_content,
+        "messages": messages if messages else None,
+        "model": "claude-sonnet-4-5-20250929",
+        "college_id": college_id,
+        "user_id": UUID(state["student_id"]),
+        "agent_id": AGENT_ID,
+        "task_type": "socratic_dialogue",
+        "cache_system_prompt": True,
+        "max_tokens": 1024,
+        "temperature": 1.0,
     }
 
 
@@ -430,6 +459,9 @@ async def preservation_gate(
         "active_chapter": state.get("active_chapter", ""),
         "active_page": state.get("active_page", ""),
         "active_source": state.get("active_pdf") or "their study materials",
+        "answer_key": [
+            p["content"] for p in state.get("retrieved_passages", [])
+        ],
     }
 
     result = await pipeline.evaluate(
@@ -559,6 +591,97 @@ async def deliver_response(
     }
 
 
+# ---------------------------------------------------------------------------
+# Pre-processing branches
+# ---------------------------------------------------------------------------
+
+# What build_scaffold sees from a branch that failed or overran: no
+# passages, the default student model, no known misconceptions.
+_RETRIEVE_FALLBACK: dict[str, Any] = {
+    "retrieved_passages": [],
+    "source_citations": [],
+}
+_ASSESS_FALLBACK: dict[str, Any] = {
+    "student_knowledge_level": "intermediate",
+    "known_concepts": [],
+    "zone_of_proximal_development": "guided_question",
+}
+_MISCONCEPTION_FALLBACK: dict[str, Any] = {"identified_misconceptions": []}
+
+
+async def _run_branch(
+    node: Callable[..., Awaitable[dict]],
+    state: SocraticState,
+    *,
+    gateway: AIGateway,
+    timeout: float,
+    fallback: dict[str, Any],
+) -> dict:
+    """Run a pre-processing node on its own tenant session.
+
+    Branches run concurrently and one AsyncSession cannot serve
+    concurrent queries, so each gets a fresh session. A node that raises
+    or overruns ``timeout`` — or whose tenant session cannot be set up —
+    yields ``fallback``. Gateway usage written on
+    the branch session (e.g. RAG routing/reranking calls, including ones
+    abandoned by the timeout) is drained and committed either way.
+    """
+    from app.core.database import async_session_factory
+
+    name = getattr(node, "__name__", "branch")
+    async with async_session_factory() as branch_db:
+        try:
+            await branch_db.execute(
+                text("SELECT set_config('app.current_college_id', :cid, false)"),
+                {"cid": state["college_id"]},
+            )
+            result = await asyncio.wait_for(node(state, db=branch_db), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Socratic %s exceeded %.1fs, continuing without it",
+                name, timeout,
+            )
+            result = fallback
+        except Exception:
+            logger.warning(
+                "Socratic %s failed, continuing without it", name,
+                exc_info=True,
+            )
+            result = fallback
+
+        await gateway.drain(branch_db)
+        try:
+            await branch_db.commit()
+        except Exception:
+            logger.warning(
+                "Socratic %s: could not commit branch session", name,
+                exc_info=True,
+            )
+    return result
+
+
+async def _retrieve_branch(state: SocraticState, *, gateway: AIGateway) -> dict:
+    return await _run_branch(
+        retrieve_context, state, gateway=gateway,
+        timeout=RETRIEVE_TIMEOUT_SECONDS, fallback=_RETRIEVE_FALLBACK,
+    )
+
+
+async def _assess_branch(state: SocraticState, *, gateway: AIGateway) -> dict:
+    return await _run_branch(
+        assess_knowledge, state, gateway=gateway,
+        timeout=ASSESS_TIMEOUT_SECONDS, fallback=_ASSESS_FALLBACK,
+    )
+
+
+async def _detect_branch(state: SocraticState, *, gateway: AIGateway) -> dict:
+    return await _run_branch(
+        detect_misconceptions, state, gateway=gateway,
+        timeout=MISCONCEPTION_TIMEOUT_SECONDS,
+        fallback=_MISCONCEPTION_FALLBACK,
+    )
+
+
 # ---------------------------------------------------------------------------
 # Conditional edge: preservation routing
 # ---------------------------------------------------------------------------
@@ -596,8 +719,14 @@ def build_socratic_graph(
 
     Returns a compiled graph ready for invocation.
 
+    retrieve_context, assess_knowledge and detect_misconceptions fan out
+    from START and join before build_scaffold; the regeneration loop
+    re-enters build_scaffold without re-running them.
+
     Args:
-        db: Database session (with RLS tenant context set).
+        db: Database session (with RLS tenant context set) for the
+            scaffold, gate and delivery nodes. The pre-processing
+            branches open their own.
         gateway: The singleton AIGateway.
         prompt_registry: The singleton PromptRegistry.
         checkpointer: LangGraph checkpointer for conversation continuity.
@@ -606,13 +735,13 @@ def build_socratic_graph(
     """
     # Bind dependencies to node functions via closures
     async def _retrieve(state: SocraticState) -> dict:
-        return await retrieve_context(state, db=db)
+        return await _retrieve_branch(state, gateway=gateway)
 
     async def _assess(state: SocraticState) -> dict:
-        return await assess_knowledge(state, db=db)
+        return await _assess_branch(state, gateway=gateway)
 
     async def _detect(state: SocraticState) -> dict:
-        return await detect_misconceptions(state, db=db)
+        return await _detect_branch(state, gateway=gateway)
 
     async def _build(state: SocraticState) -> dict:
         return await build_scaffold(
@@ -644,9 +773,12 @@ def build_socratic_graph(
 
     # Add edges
     graph.add_edge(START, "retrieve_context")
-    graph.add_edge("retrieve_context", "assess_knowledge")
-    graph.add_edge("assess_knowledge", "detect_misconceptions")
-    graph.add_edge("detect_misconceptions", "build_scaffold")
+    graph.add_edge(START, "assess_knowledge")
+    graph.add_edge(START, "detect_misconceptions")
+    graph.add_edge(
+        ["retrieve_context", "assess_knowledge", "detect_misconceptions"],
+        "build_scaffold",
+    )
     graph.add_edge("build_scaffold", "preservation_gate")
 
     # Conditional: preservation gate routing
@@ -707,29 +839,14 @@ async def run_socratic_study_buddy(
     # Build conversation thread ID
     thread_id = conversation_id or f"{student_id}_{college_id}"
 
-    # Build initial state
-    initial_state: dict[str, Any] = {
-        "student_id": str(student_id),
-        "college_id": str(college_id),
-        "question": question,
-        "active_pdf": active_pdf or "",
-        "active_chapter": active_chapter or "",
-        "active_page": active_page or 0,
-        "messages": [],
-        "turn_count": 0,
-        "student_knowledge_level": "intermediate",
-        "known_concepts": [],
-        "identified_misconceptions": [],
-        "zone_of_proximal_development": "guided_question",
-        "retrieved_passages": [],
-        "source_citations": [],
-        "current_scaffolding_level": "hint",
-        "scaffolding_attempts": 0,
-        "response": "",
-        "preservation_passed": False,
-        "regeneration_count": 0,
-        "regeneration_instructions": "",
-    }
+    initial_state = _initial_state(
+        question=question,
+        student_id=student_id,
+        college_id=college_id,
+        active_pdf=active_pdf,
+        active_chapter=active_chapter,
+        active_page=active_page,
+    )
 
     # Build and invoke graph
     graph = build_socratic_graph(
@@ -769,40 +886,136 @@ async def stream_socratic_study_buddy(
 ) -> AsyncIterator[StreamChunk]:
     """Stream the Socratic Study Buddy response via SSE.
 
-    Runs the full graph synchronously (context retrieval, knowledge
-    assessment, scaffolding, preservation gate) then streams the
-    final approved response text as chunks.
-
-    We don't stream the LLM generation itself because the preservation
-    pipeline must evaluate the COMPLETE response before delivery.
+    Runs the same steps as the graph, but streams build_scaffold's
+    generation as it is produced. Tokens pass through a
+    RollingDirectAnswerGate, which screens each sentence as it completes
+    and releases it one sentence later.
+
+    After the stream ends, the full preservation gate runs on the whole
+    response. A confirmed violation regenerates with escalated
+    scaffolding, like the graph's regenerate loop. A violation is either
+    a direct answer caught mid-stream or a failed gate. If any text has
+    already been released, a "retract" chunk tells the client to discard
+    it first. After MAX_REGENERATION_ATTEMPTS the fallback Socratic
+    template is delivered.
+
+    The turn runs outside the compiled graph, so ``conversation_id`` is
+    accepted for parity with run_socratic_study_buddy but not used.
     """
-    result = await run_socratic_study_buddy(
-        db=db,
-        gateway=gateway,
-        prompt_registry=prompt_registry,
+    state = _initial_state(
         question=question,
         student_id=student_id,
         college_id=college_id,
         active_pdf=active_pdf,
         active_chapter=active_chapter,
         active_page=active_page,
-        conversation_id=conversation_id,
     )
+    state.update(await _preprocess(state, gateway=gateway))
+
+    while True:
+        gate = RollingDirectAnswerGate(
+            p["content"] for p in state["retrieved_passages"]
+        )
+        request = await _scaffold_request(
+            state, db=db, prompt_registry=prompt_registry,
+        )
+        tokens = gateway.stream(db, **request)
+        generated: list[str] = []
+        try:
+            async for chunk in tokens:
+                if chunk.type != "text":
+                    continue
+                generated.append(chunk.text)
+                released = gate.feed(chunk.text)
+                if released:
+                    yield StreamChunk(type="text", text=released)
+                if gate.violation is not None:
+                    break
+        finally:
+            await tokens.aclose()
+        if gate.violation is None:
+            released = gate.finish()
+            if released:
+                yield StreamChunk(type="text", text=released)
+
+        state["response"] = "".join(generated)
+        state["scaffolding_attempts"] += 1
+        if gate.violation is not None:
+            state.update({
+                "preservation_passed": False,
+                "regeneration_instructions": (
+                    "Your response directly answered the student's "
+                    f'question. Evidence: "{gate.violation.evidence}". '
+                    "Guide them toward it with a question instead."
+                ),
+                "regeneration_count": state["regeneration_count"] + 1,
+            })
+        else:
+            state.update(await preservation_gate(
+                state, db=db, gateway=gateway, prompt_registry=prompt_registry,
+            ))
+        if state["preservation_passed"]:
+            break
 
-    response_text = result["response"]
+        if gate.released:
+            yield StreamChunk(type="retract")
+        if _route_after_preservation(state) == "deliver_response":
+            break
+        state.update(await regenerate(state))
 
-    # Yield the response in chunks for SSE streaming.
-    # Since the response is already complete (preservation-approved),
-    # we simulate streaming by chunking the text.
-    chunk_size = 50  # ~50 chars per chunk for smooth frontend rendering
-    for i in range(0, len(response_text), chunk_size):
-        chunk = response_text[i:i + chunk_size]
-        yield StreamChunk(type="text", text=chunk)
+    delivered = await deliver_response(state, db=db)
+    if not state["preservation_passed"]:
+        yield StreamChunk(type="text", text=delivered["response"])
 
-    # Final metadata event
     yield StreamChunk(type="end")
 
 
+async def _preprocess(state: SocraticState, *, gateway: AIGateway) -> dict:
+    """The graph's pre-processing branches, run concurrently."""
+    updates: dict[str, Any] = {}
+    for result in await asyncio.gather(
+        _retrieve_branch(state, gateway=gateway),
+        _assess_branch(state, gateway=gateway),
+        _detect_branch(state, gateway=gateway),
+    ):
+        updates.update(result)
+    return updates
+
+
+def _initial_state(
+    *,
+    question: str,
+    student_id: UUID,
+    college_id: UUID,
+    active_pdf: str | None,
+    active_chapter: str | None,
+    active_page: int | None,
+) -> dict[str, Any]:
+    """Graph input for one student message."""
+    return {
+        "student_id": str(student_id),
+        "college_id": str(college_id),
+        "question": question,
+        "active_pdf": active_pdf or "",
+        "active_chapter": active_chapter or "",
+        "active_page": active_page or 0,
+        "messages": [],
+        "turn_count": 0,
+        "student_knowledge_level": "intermediate",
+        "known_concepts": [],
+        "identified_misconceptions": [],
+        "zone_of_proximal_development": "guided_question",
+        "retrieved_passages": [],
+        "source_citations": [],
+        "current_scaffolding_level": "hint",
+        "scaffolding_attempts": 0,
+        "response": "",
+        "preservation_passed": False,
+        "regeneration_count": 0,
+        "regeneration_instructions": "",
+    }
+
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
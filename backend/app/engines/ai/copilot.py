@@ -35,7 +35,11 @@ from app.engines.ai.pipelines.cognitive_preservation import (
     PreservationResult,
 )
 from app.engines.ai.prompt_registry import PromptRegistry
-from app.engines.ai.tools import ToolExecutor, get_tools_for_agent
+from app.engines.ai.tools import (
+    ToolExecutor,
+    get_tools_for_agent,
+    serialize_tool_result,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -296,7 +300,7 @@ class AcolyteCopilot:
         """Implements the Anthropic tool use loop.
 
         1. Call the model with tools
-        2. If response has tool_use blocks, execute each tool
+        2. If response has tool_use blocks, execute them concurrently
         3. Append assistant message + tool results to messages
         4. Call the model again
         5. Repeat until model responds with only text (no tool calls)
@@ -347,7 +351,7 @@ class AcolyteCopilot:
 
             # Model wants to use tools — process tool_use blocks
             assistant_content: list[dict[str, Any]] = []
-            tool_results: list[dict[str, Any]] = []
+            tool_blocks: list[Any] = []
 
             for block in response.content:
                 if block.type == "text":
@@ -362,25 +366,31 @@ class AcolyteCopilot:
                         "name": block.name,
                         "input": block.input,
                     })
+                    tool_blocks.append(block)
 
-                    # Execute the tool
-                    logger.info(
-                        "Copilot %s calling tool %s (iteration %d)",
-                        self.agent_id, block.name, iteration + 1,
-                    )
-                    result = await executor(block.name, block.input)
-
-                    tool_calls_log.append({
-                        "tool": block.name,
-                        "input": block.input,
-                        "output_preview": str(result)[:200],
-                    })
+            # Execute the tools — independent calls run concurrently,
+            # so an iteration takes as long as its slowest tool
+            logger.info(
+                "Copilot %s calling tools %s (iteration %d)",
+                self.agent_id, [b.name for b in tool_blocks], iteration + 1,
+            )
+            results = await executor.execute_many(
+                [(block.name, block.input) for block in tool_blocks],
+            )
 
-                    tool_results.append({
-                        "type": "tool_result",
-                        "tool_use_id": block.id,
-                        "content": json.dumps(result, default=str),
-                    })
+            tool_results: list[dict[str, Any]] = []
+            for block, result in zip(tool_blocks, results):
+                tool_calls_log.append({
+                    "tool": block.name,
+                    "input": block.input,
+                    "output_preview": str(result)[:200],
+                })
+
+                tool_results.append({
+                    "type": "tool_result",
+                    "tool_use_id": block.id,
+                    "content": serialize_tool_result(result),
+                })
 
             # Append assistant message with tool_use blocks
             messages.append({"role": "assistant", "content": assistant_content})
@@ -0,0 +1,522 @@
+"""Dedup Index — near-duplicate detection for generated content.
+
+Generated MCQs, exam questions and flashcards are fingerprinted before they
+are stored (or, for questions, before the Medical Safety Pipeline spends
+calls validating them). Two signals, cheapest first:
+
+1. MinHash / LSH over the normalized stem — word 3-gram shingles,
+   NUM_PERM min-hashes, LSH_BANDS bands of LSH_ROWS rows. Candidates are
+   fetched with one array-overlap query on the GIN-indexed band hashes
+   and confirmed by estimated Jaccard >= JACCARD_THRESHOLD. Catches the
+   same stem with small edits (ages, option order, a reworded clause).
+2. Embedding cosine >= EMBEDDING_THRESHOLD against the nearest stored
+   item (pgvector HNSW) — catches paraphrases MinHash misses. Skipped
+   when no embedder is configured or the embedding call fails; dedup
+   never blocks generation.
+
+Duplicates within the same batch are caught too (earlier item wins).
+
+Indexes are partitioned by kind ("mcq", "exam_question", "flashcard")
+and scope (the student for flashcards, "" for college-wide content).
+
+Usage:
+    from app.engines.ai.dedup_index import DedupIndex, DedupKind
+
+    index = DedupIndex(db, college_id=college_id, kind=DedupKind.MCQ)
+    matches = await index.check([question_dedup_text(q) for q in questions])
+    fresh = [q for q, m in zip(questions, matches) if m is None]
+    ...
+    await index.add([(question_dedup_text(q), item_id) for ...])
+"""
+
+import enum
+import hashlib
+import logging
+import math
+import random
+import re
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from typing import Any
+from uuid import UUID, uuid4
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.engines.ai.models import ContentFingerprint
+
+logger = logging.getLogger(__name__)
+
+Embedder = Callable[[list[str]], Awaitable[list[list[float]]]]
+
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+NUM_PERM = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERM // LSH_BANDS
+SHINGLE_SIZE = 3
+
+# 16 bands x 4 rows: a pair at Jaccard 0.7 becomes a candidate with
+# p = 1 - (1 - 0.7^4)^16 ~ 0.99; at 0.3 with p ~ 0.12.
+JACCARD_THRESHOLD = 0.7
+EMBEDDING_THRESHOLD = 0.95
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(0x5EED)
+_PERMUTATIONS: tuple[tuple[int, int], ...] = tuple(
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERM)
+)
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+
+class DedupKind(str, enum.Enum):
+    MCQ = "mcq"
+    EXAM_QUESTION = "exam_question"
+    FLASHCARD = "flashcard"
+
+
+# ---------------------------------------------------------------------------
+# Fingerprints (pure)
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True, slots=True)
+class Fingerprint:
+    """MinHash signature and LSH band hashes of one normalized text."""
+
+    content_hash: str
+    minhash: tuple[int, ...]
+    bands: tuple[int, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class DedupMatch:
+    """Why an item was judged a duplicate."""
+
+    method: str  # "minhash" or "embedding"
+    similarity: float
+    item_id: UUID | None = None
+    batch_index: int | None = None  # set when the match is in the same batch
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace."""
+    return " ".join(_NON_WORD_RE.sub(" ", text.lower()).split())
+
+
+def question_dedup_text(question: dict[str, Any]) -> str:
+    """Text a generated question is deduplicated on (stem + lead-in)."""
+    return f"{question.get('stem', '')} {question.get('lead_in', '')}"
+
+
+def fingerprint(text: str) -> Fingerprint:
+    """Compute the MinHash signature and LSH bands of a text."""
+    normalized = normalize_text(text)
+    words = normalized.split()
+    if len(words) <= SHINGLE_SIZE:
+        shingles = {normalized}
+    else:
+        shingles = {
+            " ".join(words[i:i + SHINGLE_SIZE])
+            for i in range(len(words) - SHINGLE_SIZE + 1)
+        }
+    hashes = [
+        int.from_bytes(
+            hashlib.blake2b(s.encode(), digest_size=8).digest(), "big",
+        )
+        for s in shingles
+    ]
+    minhash = tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+    bands = tuple(
+        int.from_bytes(
+            hashlib.blake2b(
+                repr((band, minhash[band * LSH_ROWS:(band + 1) * LSH_ROWS]))
+                .encode(),
+                digest_size=8,
+            ).digest(),
+            "big",
+            signed=True,  # fits BIGINT
+        )
+        for band in range(LSH_BANDS)
+    )
+    return Fingerprint(
+        content_hash=hashlib.sha256(normalized.encode()).hexdigest(),
+        minhash=minhash,
+        bands=bands,
+    )
+
+
+def estimate_jaccard(a: Sequence[int], b: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def cosine_similarity(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def find_batch_duplicates(
+    fingerprints: Sequence[Fingerprint],
+) -> list[DedupMatch | None]:
+    """MinHash duplicates within one batch; the earlier item wins."""
+    buckets: dict[int, list[int]] = {}
+    matches: list[DedupMatch | None] = []
+    for i, fp in enumerate(fingerprints):
+        best: DedupMatch | None = None
+        candidates = {j for band in fp.bands for j in buckets.get(band, ())}
+        for j in sorted(candidates):
+            sim = estimate_jaccard(fp.minhash, fingerprints[j].minhash)
+            if sim >= JACCARD_THRESHOLD and (best is None or sim > best.similarity):
+                best = DedupMatch("minhash", sim, batch_index=j)
+        matches.append(best)
+        if best is None:
+            for band in fp.bands:
+                buckets.setdefault(band, []).append(i)
+    return matches
+
+
+# ---------------------------------------------------------------------------
+# Embeddings
+# ---------------------------------------------------------------------------
+
+_openai_client: Any = None
+
+
+def default_embedder() -> Embedder | None:
+    """Batch embedder on the RAG embedding model, or None if unconfigured."""
+    from app.config import get_settings
+
+    settings = get_settings()
+    if not settings.OPENAI_API_KEY:
+        return None
+
+    async def embed(texts: list[str]) -> list[list[float]]:
+        global _openai_client
+        from openai import AsyncOpenAI
+
+        from app.engines.ai.rag.semantic_search import (
+            EMBEDDING_DIMENSIONS,
+            EMBEDDING_MODEL,
+        )
+
+        if _openai_client is None:
+            _openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        response = await _openai_client.embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=texts,
+            dimensions=EMBEDDING_DIMENSIONS,
+        )
+        return [d.embedding for d in response.data]
+
+    return embed
+
+
+_DEFAULT = object()
+
+
+# ---------------------------------------------------------------------------
+# DedupIndex
+# ---------------------------------------------------------------------------
+
+class DedupIndex:
+    """Near-duplicate lookup and registration over content_fingerprints."""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        *,
+        college_id: UUID,
+        kind: DedupKind,
+        scope: str = "",
+        embedder: Embedder | None | object = _DEFAULT,
+    ) -> None:
+        self._db = db
+        self._college_id = college_id
+        self._kind = kind.value
+        self._scope = scope
+        self._embedder = (
+            default_embedder() if embedder is _DEFAULT else embedder
+        )
+        # Reused by add() for texts already seen by check()
+        self._fingerprints: dict[str, Fingerprint] = {}
+        self._embeddings: dict[str, list[float]] = {}
+
+    async def check(self, texts: list[str]) -> list[DedupMatch | None]:
+        """Return, per text, its duplicate match or None if it is new.
+
+        Order matters within the batch: a later near-copy of an earlier
+        text is the duplicate.
+        """
+        fps = [self._fingerprint(t) for t in texts]
+        matches = find_batch_duplicates(fps)
+
+        pending = [i for i, m in enumerate(matches) if m is None]
+        if pending:
+            stored = await self._minhash_candidates(
+                [fps[i] for i in pending],
+            )
+            for i in pending:
+                matches[i] = self._best_stored_match(fps[i], stored)
+
+        pending = [i for i, m in enumerate(matches) if m is None]
+        if pending and self._embedder is not None:
+            await self._embedding_pass(texts, pending, matches)
+
+        duplicates = sum(m is not None for m in matches)
+        if duplicates:
+            logger.info(
+                "Dedup (%s): %d of %d items are near-duplicates",
+                self._kind, duplicates, len(texts),
+            )
+        return matches
+
+    async def add(self, entries: list[tuple[str, UUID | None]]) -> int:
+        """Register (text, item_id) pairs; already-indexed texts are skipped.
+
+        Returns the number of new fingerprints.
+        """
+        if not entries:
+            return 0
+        texts = [t for t, _ in entries]
+        missing = [t for t in texts if t not in self._embeddings]
+        if missing and self._embedder is not None:
+            try:
+                for t, vec in zip(missing, await self._embedder(missing)):
+                    self._embeddings[t] = vec
+            except Exception as e:
+                logger.warning("Dedup embedding failed on add: %s", e)
+
+        rows = []
+        for text_, item_id in entries:
+            fp = self._fingerprint(text_)
+            rows.append({
+                "id": uuid4(),
+                "college_id": self._college_id,
+                "kind": self._kind,
+                "scope": self._scope,
+                "item_id": item_id,
+                "content_hash": fp.content_hash,
+                "minhash": list(fp.minhash),
+                "lsh_bands": list(fp.bands),
+                "embedding": self._embeddings.get(text_),
+            })
+        result = await self._db.execute(
+            pg_insert(ContentFingerprint)
+            .values(rows)
+            .on_conflict_do_nothing(constraint="uq_content_fingerprint_hash")
+            .returning(ContentFingerprint.id)
+        )
+        return len(result.all())
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _fingerprint(self, text_: str) -> Fingerprint:
+        fp = self._fingerprints.get(text_)
+        if fp is None:
+            fp = self._fingerprints[text_] = fingerprint(text_)
+        return fp
+
+    def _scoped(self, query: Any) -> Any:
+        return query.where(
+            ContentFingerprint.college_id == self._college_id,
+            ContentFingerprint.kind == self._kind,
+            ContentFingerprint.scope == self._scope,
+        )
+
+    async def _minhash_candidates(
+        self, fps: list[Fingerprint],
+    ) -> list[tuple[UUID | None, list[int], set[int]]]:
+        """Stored fingerprints sharing at least one band with any of fps."""
+        all_bands = sorted({b for fp in fps for b in fp.bands})
+        result = await self._db.execute(
+            self._scoped(
+                select(
+                    ContentFingerprint.item_id,
+                    ContentFingerprint.minhash,
+                    ContentFingerprint.lsh_bands,
+                ).where(ContentFingerprint.lsh_bands.overlap(all_bands))
+            )
+        )
+        return [
+            (item_id, minhash, set(bands))
+            for item_id, minhash, bands in result.all()
+        ]
+
+    @staticmethod
+    def _best_stored_match(
+        fp: Fingerprint,
+        stored: list[tuple[UUID | None, list[int], set[int]]],
+    ) -> DedupMatch | None:
+        best: DedupMatch | None = None
+        for item_id, minhash, bands in stored:
+            if bands.isdisjoint(fp.bands):
+                continue
+            sim = estimate_jaccard(fp.minhash, minhash)
+            if sim >= JACCARD_THRESHOLD and (best is None or sim > best.similarity):
+                best = DedupMatch("minhash", sim, item_id=item_id)
+        return best
+
+    async def _embedding_pass(
+        self,
+        texts: list[str],
+        pending: list[int],
+        matches: list[DedupMatch | None],
+    ) -> None:
+        """Paraphrase check for items that passed MinHash (in place)."""
+        try:
+            vectors = await self._embedder([texts[i] for i in pending])
+        except Exception as e:
+            logger.warning("Dedup embedding failed, MinHash only: %s", e)
+            return
+
+        kept: list[int] = []
+        for i, vec in zip(pending, vectors):
+            self._embeddings[texts[i]] = vec
+            for j in kept:
+                sim = cosine_similarity(vec, self._embeddings[texts[j]])
+                if sim >= EMBEDDING_THRESHOLD:
+                    matches[i] = DedupMatch("embedding", sim, batch_index=j)
+                    break
+            else:
+                distance = ContentFingerprint.embedding.cosine_distance(vec)
+                row = (await self._db.execute(
+                    self._scoped(
+                        select(ContentFingerprint.item_id, distance)
+                        .where(ContentFingerprint.embedding.isnot(None))
+                        .order_by(distance)
+                        .limit(1)
+                    )
+                )).first()
+                if row is not None and 1.0 - row[1] >= EMBEDDING_THRESHOLD:
+                    matches[i] = DedupMatch(
+                        "embedding", 1.0 - row[1], item_id=row[0],
+                    )
+                else:
+                    kept.append(i)
+
+
+# ---------------------------------------------------------------------------
+# Backfill
+# ---------------------------------------------------------------------------
+
+BACKFILL_BATCH_SIZE = 200
+
+
+async def backfill_dedup_index(
+    db: AsyncSession,
+    college_id: UUID,
+    kind: DedupKind,
+    *,
+    embedder: Embedder | None | object = _DEFAULT,
+) -> dict[str, int]:
+    """Index a college's existing content, oldest first.
+
+    Items that are near-duplicates of something indexed earlier are
+    counted, not indexed; duplicate pool questions are also retired
+    (status "duplicate") so they stop being served. Student flashcards
+    are left untouched. Exam questions live only in review drafts and
+    are indexed as they are generated.
+
+    Returns {"scanned": n, "indexed": n, "duplicates": n}.
+    """
+    from sqlalchemy import update
+
+    from app.engines.ai.models import QuestionPoolItem
+    from app.engines.student.models import Flashcard
+
+    stats = {"scanned": 0, "indexed": 0, "duplicates": 0}
+    indexes: dict[str, DedupIndex] = {}
+
+    def index_for(scope: str) -> DedupIndex:
+        if scope not in indexes:
+            indexes[scope] = DedupIndex(
+                db, college_id=college_id, kind=kind, scope=scope,
+                embedder=embedder,
+            )
+        return indexes[scope]
+
+    if kind is DedupKind.FLASHCARD:
+        query = (
+            select(Flashcard.id, Flashcard.student_id, Flashcard.front)
+            .where(
+                Flashcard.college_id == college_id,
+                Flashcard.is_active.is_(True),
+            )
+            .order_by(Flashcard.created_at, Flashcard.id)
+        )
+    elif kind is DedupKind.MCQ:
+        query = (
+            select(QuestionPoolItem.id, QuestionPoolItem.question_data)
+            .where(
+                QuestionPoolItem.college_id == college_id,
+                QuestionPoolItem.status == "available",
+            )
+            .order_by(QuestionPoolItem.created_at, QuestionPoolItem.id)
+        )
+    else:
+        return stats
+
+    offset = 0
+    while True:
+        rows = (await db.execute(
+            query.offset(offset).limit(BACKFILL_BATCH_SIZE)
+        )).all()
+        if not rows:
+            break
+        offset += len(rows)
+
+        by_scope: dict[str, list[tuple[UUID, str]]] = {}
+        for row in rows:
+            if kind is DedupKind.FLASHCARD:
+                item_id, student_id, front = row
+                by_scope.setdefault(str(student_id), []).append((item_id, front))
+            else:
+                item_id, data = row
+                by_scope.setdefault("", []).append(
+                    (item_id, question_dedup_text(data)),
+                )
+
+        retired: list[UUID] = []
+        for scope, items in by_scope.items():
+            index = index_for(scope)
+            matches = await index.check([t for _, t in items])
+            fresh = [
+                (t, item_id)
+                for (item_id, t), m in zip(items, matches)
+                if m is None
+            ]
+            retired.extend(
+                item_id
+                for (item_id, _), m in zip(items, matches)
+                if m is not None and m.item_id != item_id
+            )
+            stats["indexed"] += await index.add(fresh)
+
+        stats["scanned"] += len(rows)
+        stats["duplicates"] += len(retired)
+        if kind is DedupKind.MCQ and retired:
+            await db.execute(
+                update(QuestionPoolItem)
+                .where(QuestionPoolItem.id.in_(retired))
+                .values(status="duplicate")
+            )
+            # Retired rows drop out of the "available" query
+            offset -= len(retired)
+
+    logger.info(
+        "Dedup backfill (%s) for college %s: %s", kind.value, college_id, stats,
+    )
+    return stats
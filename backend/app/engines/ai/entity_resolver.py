@@ -0,0 +1,213 @@
+"""Entity Resolver — map free-text terms to knowledge graph entities.
+
+Agents name entities loosely: "MI", "heart attack", "myocardial
+infarction" and "myocardial infraction" all mean one MedicalEntity.
+Lookups go through medical_entity_aliases (every entity's name, its
+aliases and curated synonyms, normalized by normalize_name) instead of
+ilike scans on medical_entities.name:
+
+1. Exact normalized hits are answered from the in-process knowledge
+   graph snapshot, with no query.
+2. The remaining terms are resolved together in ONE query: unnest the
+   terms, and per term a LATERAL lookup on the pg_trgm GIN index over
+   normalized_alias returns the top candidates. Ranks: exact, prefix,
+   substring, then trigram similarity (pg_trgm's % operator, default
+   threshold 0.3 — catches misspellings). Within a rank, higher
+   similarity, then the shorter alias, wins.
+3. Types in EXACT_ONLY_ENTITY_TYPES (drugs) keep exact hits only: a
+   near miss there is a different, look-alike entity (hydroxyzine →
+   hydralazine scores 0.41, prednisone → prednisolone 0.71), not a typo.
+
+Every term gets a ranked candidate list (possibly empty) instead of the
+old scalar_one_or_none(), which failed as soon as two entities matched.
+
+Usage:
+    from app.engines.ai.entity_resolver import EntityResolver
+
+    resolver = EntityResolver(db, graph=await get_knowledge_graph(db))
+    found = await resolver.resolve_many(["MI", "dyspnoea"])
+    best = found["MI"][0] if found["MI"] else None
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.engines.ai.knowledge_graph import KnowledgeGraphSnapshot, normalize_name
+
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+RESOLVER_CANDIDATES = 3
+"""Candidates returned per term by default."""
+
+MATCH_RANKS = ("exact", "prefix", "substring", "trigram")
+
+EXACT_ONLY_ENTITY_TYPES = frozenset({"drug"})
+"""Entity types never resolved by prefix, substring or similarity."""
+
+# Normalization of the SQL side; must agree with normalize_name
+NORMALIZE_SQL = "btrim(regexp_replace(lower({col}), '[^a-z0-9+]+', ' ', 'g'))"
+
+_RESOLVE_SQL = text("""
+    SELECT t.ord, c.entity_id, c.name, c.entity_type, c.alias, c.rank, c.score
+    FROM unnest(CAST(:terms AS text[])) WITH ORDINALITY AS t(term, ord)
+    CROSS JOIN LATERAL (
+        SELECT * FROM (
+            SELECT DISTINCT ON (e.id)
+                   e.id AS entity_id, e.name, e.entity_type, a.alias,
+                   CASE
+                       WHEN a.normalized_alias = t.term THEN 0
+                       WHEN a.normalized_alias LIKE t.term || '%' THEN 1
+                       WHEN a.normalized_alias LIKE '%' || t.term || '%' THEN 2
+                       ELSE 3
+                   END AS rank,
+                   similarity(a.normalized_alias, t.term) AS score,
+                   length(a.normalized_alias) AS alias_length
+            FROM medical_entity_aliases AS a
+            JOIN medical_entities AS e ON e.id = a.entity_id
+            WHERE e.is_active
+              AND (
+                  CAST(:entity_types AS text[]) IS NULL
+                  OR e.entity_type = ANY(CAST(:entity_types AS text[]))
+              )
+              AND (
+                  a.normalized_alias LIKE '%' || t.term || '%'
+                  OR a.normalized_alias % t.term
+              )
+            ORDER BY e.id, rank, score DESC, alias_length
+        ) AS best
+        ORDER BY rank, score DESC, alias_length, name
+        LIMIT :limit
+    ) AS c
+    ORDER BY t.ord, c.rank, c.score DESC, c.alias_length, c.name
+""")
+
+_SYNC_ALIASES_SQL = text(f"""
+    INSERT INTO medical_entity_aliases (
+        id, entity_id, alias, normalized_alias, source
+    )
+    SELECT gen_random_uuid(), n.entity_id, n.alias,
+           {NORMALIZE_SQL.format(col="n.alias")}, n.source
+    FROM (
+        SELECT e.id AS entity_id, e.name AS alias, 'name' AS source
+        FROM medical_entities AS e
+        UNION ALL
+        SELECT e.id, a.alias, 'alias'
+        FROM medical_entities AS e,
+             jsonb_array_elements_text(
+                 CASE WHEN jsonb_typeof(e.aliases) = 'array'
+                      THEN e.aliases ELSE '[]'::jsonb END
+             ) AS a(alias)
+    ) AS n
+    WHERE {NORMALIZE_SQL.format(col="n.alias")} <> ''
+    ON CONFLICT (entity_id, normalized_alias) DO NOTHING
+""")
+
+
+@dataclass(frozen=True)
+class EntityCandidate:
+    entity_id: UUID
+    name: str
+    entity_type: str
+    matched_alias: str
+    match: str  # one of MATCH_RANKS
+    score: float  # trigram similarity of the matched alias, 1.0 if exact
+
+
+class EntityResolver:
+    """Batched, ranked term → entity resolution."""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        graph: KnowledgeGraphSnapshot | None = None,
+    ) -> None:
+        self.db = db
+        self.graph = graph
+
+    async def resolve_many(
+        self,
+        terms: Sequence[str],
+        entity_types: Sequence[str] | None = None,
+        *,
+        limit: int = RESOLVER_CANDIDATES,
+    ) -> dict[str, list[EntityCandidate]]:
+        """Ranked candidates for every term, best first.
+
+        Duplicate terms (after normalization) are looked up once; terms
+        that normalize to nothing get no candidates. Non-exact candidates
+        of an EXACT_ONLY_ENTITY_TYPES type are dropped.
+        """
+        keys = {term: normalize_name(term) for term in terms}
+        found: dict[str, list[EntityCandidate]] = {}
+
+        if self.graph is not None:
+            for key in set(keys.values()):
+                exact = self._exact(key, entity_types)
+                if exact:
+                    found[key] = exact[:limit]
+
+        pending = sorted({k for k in keys.values() if k and k not in found})
+        if pending:
+            result = await self.db.execute(_RESOLVE_SQL, {
+                "terms": pending,
+                "entity_types": list(entity_types) if entity_types else None,
+                "limit": limit,
+            })
+            for row in result.all():
+                candidate = EntityCandidate(
+                    entity_id=row.entity_id,
+                    name=row.name,
+                    entity_type=row.entity_type,
+                    matched_alias=row.alias,
+                    match=MATCH_RANKS[row.rank],
+                    score=float(row.score),
+                )
+                if (
+                    candidate.match != "exact"
+                    and candidate.entity_type in EXACT_ONLY_ENTITY_TYPES
+                ):
+                    continue
+                found.setdefault(pending[row.ord - 1], []).append(candidate)
+
+        return {term: found.get(key, []) for term, key in keys.items()}
+
+    async def resolve(
+        self, term: str, entity_types: Sequence[str] | None = None,
+    ) -> EntityCandidate | None:
+        """Best candidate for one term, or None."""
+        candidates = (await self.resolve_many([term], entity_types))[term]
+        return candidates[0] if candidates else None
+
+    def _exact(
+        self, key: str, entity_types: Sequence[str] | None,
+    ) -> list[EntityCandidate]:
+        """Exact name / alias hits from the snapshot, by name."""
+        candidates = []
+        for i in self.graph.exact(key, entity_types):
+            entity = self.graph.entities[i]
+            candidates.append(EntityCandidate(
+                entity_id=entity.id,
+                name=entity.name,
+                entity_type=entity.entity_type,
+                matched_alias=key,
+                match="exact",
+                score=1.0,
+            ))
+        return candidates
+
+
+async def sync_entity_aliases(db: AsyncSession) -> int:
+    """Add missing "name" / "alias" rows for every entity.
+
+    Idempotent; run after writing MedicalEntity rows. Returns the number
+    of rows added.
+    """
+    result = await db.execute(_SYNC_ALIASES_SQL)
+    return result.rowcount or 0
@@ -5,7 +5,9 @@ no background task ever calls Anthropic directly — everything routes here.
 
 Responsibilities:
 1. Budget control per college (monthly token limits)
-2. Model routing and automatic fallback (sonnet → haiku on budget warning)
+2. Model routing and automatic fallback (sonnet → haiku on budget warning,
+   capability tiers resolved by ModelRoutingPolicy under latency/cost SLOs,
+   sibling failover on sustained errors)
 3. Prompt caching (Anthropic cache_control for 90% cost reduction)
 4. Execution logging (every call tracked with tokens, cost, latency)
 5. Batch API routing for overnight bulk operations (50% discount)
@@ -16,11 +18,12 @@ Responsibilities:
 import asyncio
 import logging
 import time
-from collections.abc import AsyncIterator
+import weakref
+from collections.abc import AsyncIterator, Awaitable
 from dataclasses import dataclass
 from datetime import date, datetime, timezone
 from decimal import Decimal
-from typing import Any, Type
+from typing import Any, Type, TypeVar
 from uuid import UUID, uuid4
 
 import anthropic
@@ -28,6 +31,7 @@ from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.engines.ai.model_routing import CapabilityTier, ModelRoutingPolicy
 from app.engines.ai.models import (
     AgentExecution,
     AIBudget,
@@ -78,6 +82,8 @@ _MODEL_DOWNGRADE: dict[str, str] = {
 
 _PER_MILLION = Decimal("1000000")
 
+_T = TypeVar("_T")
+
 
 # ---------------------------------------------------------------------------
 # Data classes
@@ -98,7 +104,7 @@ class AIResponse:
 class StreamChunk:
     """A single chunk from a streaming AI response."""
 
-    type: str              # "text", "thinking", "end"
+    type: str              # "text", "thinking", "end", "retract"
     text: str = ""
     thinking: str = ""
 
@@ -153,8 +159,22 @@ class AIGateway:
     Every LLM call in Acolyte goes through this class.
     """
 
-    def __init__(self, api_key: str) -> None:
+    def __init__(
+        self,
+        api_key: str,
+        routing_policy: ModelRoutingPolicy | None = None,
+    ) -> None:
         self.client = anthropic.AsyncAnthropic(api_key=api_key)
+        self.routing = routing_policy or ModelRoutingPolicy()
+        # Concurrent calls may share one AsyncSession (e.g. parallel safety
+        # checks). Budget reads and audit writes on a session are serialized
+        # through a per-session lock; LLM round-trips still overlap.
+        self._session_locks: weakref.WeakKeyDictionary[
+            AsyncSession, asyncio.Lock
+        ] = weakref.WeakKeyDictionary()
+        self._session_writes: weakref.WeakKeyDictionary[
+            AsyncSession, set[asyncio.Task]
+        ] = weakref.WeakKeyDictionary()
 
     # ------------------------------------------------------------------
     # 1. complete — non-streaming completion
@@ -168,6 +188,7 @@ class AIGateway:
         user_message: str,
         messages: list[dict[str, Any]] | None = None,
         model: str = "claude-sonnet-4-5-20250929",
+        tier: CapabilityTier | str | None = None,
         tools: list[dict[str, Any]] | None = None,
         college_id: UUID,
         user_id: UUID | None = None,
@@ -181,13 +202,16 @@ class AIGateway:
 
         Steps:
         a. Check college budget → raise BudgetExceededException or downgrade
+           (when ``tier`` is given, the routing policy picks the model)
         b. Build Anthropic request with prompt caching
         c. Call API with single retry on rate limit
         d. Log AgentExecution record
         e. Update AIBudget totals and status thresholds
         """
-        model_requested = model
-        model = await self._check_budget(db, college_id, model, task_type)
+        model_requested = self._requested_label(model, tier)
+        model = await self._guarded(db, self._check_budget(
+            db, college_id, model, task_type, agent_id=agent_id, tier=tier,
+        ))
 
         params = self._build_request(
             system_prompt=system_prompt,
@@ -207,8 +231,9 @@ class AIGateway:
         )
         usage = self._extract_usage(response)
         cost = self._calculate_cost(usage, model)
+        self.routing.record_success(model, latency_ms, cost)
 
-        execution_id = await self._log_execution(
+        execution_id = await self._guarded(db, self._log_execution(
             db,
             college_id=college_id,
             user_id=user_id,
@@ -219,7 +244,7 @@ class AIGateway:
             usage=usage,
             cost=cost,
             latency_ms=latency_ms,
-        )
+        ))
 
         return AIResponse(
             content=content,
@@ -241,6 +266,7 @@ class AIGateway:
         user_message: str,
         output_schema: Type[BaseModel],
         model: str = "claude-sonnet-4-5-20250929",
+        tier: CapabilityTier | str | None = None,
         college_id: UUID,
         user_id: UUID | None = None,
         agent_id: str = "unknown",
@@ -255,8 +281,10 @@ class AIGateway:
         Used by every agent that produces structured data: MCQ generation,
         compliance reports, SAF forms, classifications, safety checks.
         """
-        model_requested = model
-        model = await self._check_budget(db, college_id, model, task_type)
+        model_requested = self._requested_label(model, tier)
+        model = await self._guarded(db, self._check_budget(
+            db, college_id, model, task_type, agent_id=agent_id, tier=tier,
+        ))
 
         params = self._build_request(
             system_prompt=system_prompt,
@@ -285,8 +313,9 @@ class AIGateway:
         )
         usage = self._extract_usage(response)
         cost = self._calculate_cost(usage, model)
+        self.routing.record_success(model, latency_ms, cost)
 
-        await self._log_execution(
+        await self._guarded(db, self._log_execution(
             db,
             college_id=college_id,
             user_id=user_id,
@@ -297,7 +326,7 @@ class AIGateway:
             usage=usage,
             cost=cost,
             latency_ms=latency_ms,
-        )
+        ))
 
         return output_schema.model_validate_json(content)
 
@@ -311,7 +340,9 @@ class AIGateway:
         *,
         system_prompt: str,
         user_message: str,
+        messages: list[dict[str, Any]] | None = None,
         model: str = "claude-sonnet-4-5-20250929",
+        tier: CapabilityTier | str | None = None,
         college_id: UUID,
         user_id: UUID | None = None,
         agent_id: str = "unknown",
@@ -326,15 +357,19 @@ class AIGateway:
         Class Prep TA (F4).
 
         Yields StreamChunk objects with incremental text deltas.
-        After the stream completes, logs AgentExecution with final
-        token counts.
+        Logs AgentExecution when the stream ends — with the final token
+        counts, or, if the consumer closes it early (e.g. the Study
+        Buddy's direct-answer gate), with the partial usage.
         """
-        model_requested = model
-        model = await self._check_budget(db, college_id, model, task_type)
+        model_requested = self._requested_label(model, tier)
+        model = await self._guarded(db, self._check_budget(
+            db, college_id, model, task_type, agent_id=agent_id, tier=tier,
+        ))
 
         params = self._build_request(
             system_prompt=system_prompt,
             user_message=user_message,
+            messages=messages,
             model=model,
             cache_system_prompt=cache_system_prompt,
             max_tokens=max_tokens,
@@ -342,35 +377,48 @@ class AIGateway:
         )
 
         start_ns = time.monotonic_ns()
+        stream = None
         final_message = None
+        streamed_chars = 0
+        failed = False
 
         try:
             async with self.client.messages.stream(**params) as stream:
                 async for text in stream.text_stream:
+                    streamed_chars += len(text)
                     yield StreamChunk(type="text", text=text)
                 final_message = await stream.get_final_message()
         except anthropic.APIError as e:
+            failed = True
             logger.error("Anthropic streaming error: %s", e)
-            raise ExternalServiceException("Anthropic", str(e))
-
-        # Log execution after stream completes
-        if final_message is not None:
-            latency_ms = (time.monotonic_ns() - start_ns) // 1_000_000
-            usage = self._extract_usage(final_message)
-            cost = self._calculate_cost(usage, model)
-
-            await self._log_execution(
-                db,
-                college_id=college_id,
-                user_id=user_id,
-                agent_id=agent_id,
-                task_type=task_type,
-                model_requested=model_requested,
-                model_used=model,
-                usage=usage,
-                cost=cost,
-                latency_ms=latency_ms,
+            self.routing.record_failure(
+                model, (time.monotonic_ns() - start_ns) // 1_000_000,
             )
+            raise ExternalServiceException("Anthropic", str(e))
+        finally:
+            # Also runs on early close (aclose / cancel): tokens already
+            # generated are billed and must reach the budget.
+            if not failed:
+                latency_ms = (time.monotonic_ns() - start_ns) // 1_000_000
+                if final_message is not None:
+                    usage = self._extract_usage(final_message)
+                else:
+                    usage = self._partial_usage(stream, params, streamed_chars)
+                cost = self._calculate_cost(usage, model)
+                self.routing.record_success(model, latency_ms, cost)
+
+                await self._guarded(db, self._log_execution(
+                    db,
+                    college_id=college_id,
+                    user_id=user_id,
+                    agent_id=agent_id,
+                    task_type=task_type,
+                    model_requested=model_requested,
+                    model_used=model,
+                    usage=usage,
+                    cost=cost,
+                    latency_ms=latency_ms,
+                ))
 
         yield StreamChunk(type="end")
 
@@ -394,7 +442,7 @@ class AIGateway:
         Returns the batch_id for status polling.
         """
         try:
-            result = await self.client.batches.create(
+            result = await self.client.messages.batches.create(
                 requests=[r.to_anthropic_request() for r in requests],
             )
         except anthropic.APIError as e:
@@ -408,6 +456,71 @@ class AIGateway:
 
         return result.id
 
+    async def batch_results(
+        self,
+        db: AsyncSession,
+        *,
+        batch_id: str,
+        college_id: UUID,
+        agent_id: str = "batch",
+        task_type: str = "batch_processing",
+    ) -> dict[str, str] | None:
+        """Results of a Batch API job, or None while it is still processing.
+
+        Returns {custom_id: response text} for succeeded requests; errored
+        and expired requests are left out (callers handle missing ids).
+        Usage is logged as one AgentExecution per model at batch prices.
+        """
+        try:
+            status = await self.client.messages.batches.retrieve(batch_id)
+            if status.processing_status != "ended":
+                return None
+
+            texts: dict[str, str] = {}
+            usage_by_model: dict[str, dict[str, int]] = {}
+            async for entry in await self.client.messages.batches.results(
+                batch_id,
+            ):
+                if entry.result.type != "succeeded":
+                    continue
+                message = entry.result.message
+                texts[entry.custom_id] = "".join(
+                    block.text for block in message.content
+                    if hasattr(block, "text")
+                )
+                totals = usage_by_model.setdefault(
+                    message.model, dict.fromkeys(
+                        ("input_tokens", "output_tokens",
+                         "cache_read_input_tokens",
+                         "cache_creation_input_tokens"), 0,
+                    ),
+                )
+                for key, value in self._extract_usage(message).items():
+                    totals[key] += value
+        except anthropic.APIError as e:
+            logger.error("Anthropic batch results error: %s", e)
+            raise ExternalServiceException("Anthropic", str(e))
+
+        for model, usage in usage_by_model.items():
+            await self._guarded(db, self._log_execution(
+                db,
+                college_id=college_id,
+                user_id=None,
+                agent_id=agent_id,
+                task_type=task_type,
+                model_requested=model,
+                model_used=model,
+                usage=usage,
+                cost=self._calculate_cost(usage, model, is_batch=True),
+                latency_ms=0,
+            ))
+
+        logger.info(
+            "Batch %s ended: %d succeeded (college=%s, task=%s)",
+            batch_id, len(texts), college_id, task_type,
+        )
+        return texts
+
     # ------------------------------------------------------------------
     # 5. _calculate_cost
     # ------------------------------------------------------------------
@@ -450,21 +563,88 @@ class AIGateway:
     # 6. _downgrade_model
     # ------------------------------------------------------------------
 
-    @staticmethod
-    def _downgrade_model(model: str) -> str:
+    def _downgrade_model(
+        self, model: str, *, agent_id: str, task_type: str,
+    ) -> str:
         """Downgrade model when budget is in warning state.
 
-        Maps sonnet → haiku. Haiku stays haiku. Logs the downgrade.
+        Maps sonnet → haiku. Haiku stays haiku. A downgrade target that
+        is unhealthy under the routing policy is skipped, so a failover
+        away from it is never undone. Logs the downgrade.
         """
         downgraded = _MODEL_DOWNGRADE.get(model, model)
-        if downgraded != model:
-            logger.info("Budget warning: downgrading %s → %s", model, downgraded)
+        if downgraded == model:
+            return model
+        if not self.routing.is_healthy(
+            downgraded, agent_id=agent_id, task_type=task_type,
+        ):
+            logger.info(
+                "Budget warning: keeping %s — %s is failed over",
+                model, downgraded,
+            )
+            return model
+        logger.info("Budget warning: downgrading %s → %s", model, downgraded)
         return downgraded
 
+    # ------------------------------------------------------------------
+    # 7. drain — wait for session work left by cancelled calls
+    # ------------------------------------------------------------------
+
+    async def drain(self, db: AsyncSession) -> None:
+        """Wait for budget/audit work still running on ``db``.
+
+        Callers that cancel in-flight gateway calls (e.g. safety checks
+        short-circuited by a hard reject) must drain before touching the
+        session again — the shielded audit writes outlive the cancellation.
+        """
+        pending = self._session_writes.get(db)
+        if pending:
+            await asyncio.gather(*list(pending), return_exceptions=True)
+
+    def session_lock(self, db: AsyncSession) -> asyncio.Lock:
+        """The lock serializing gateway DB work on ``db``.
+
+        Callers that run their own queries on a session shared with
+        concurrent gateway calls hold it around those queries.
+        """
+        lock = self._session_locks.get(db)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._session_locks[db] = lock
+        return lock
+
     # ------------------------------------------------------------------
     # Private helpers
     # ------------------------------------------------------------------
 
+    async def _guarded(self, db: AsyncSession, work: Awaitable[_T]) -> _T:
+        """Run a DB section under the session lock, shielded from cancel.
+
+        Cancelling a caller mid-flush would leave the session unusable and
+        lose the audit record for tokens already spent, so the section
+        always runs to completion.
+        """
+        lock = self.session_lock(db)
+
+        async def _locked() -> _T:
+            async with lock:
+                return await work
+
+        task = asyncio.ensure_future(_locked())
+        pending = self._session_writes.setdefault(db, set())
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _requested_label(
+        model: str, tier: CapabilityTier | str | None,
+    ) -> str:
+        """Audit label for AgentExecution.model_requested."""
+        if tier is None:
+            return model
+        return f"tier:{CapabilityTier(tier).value}"
+
     def _build_request(
         self,
         *,
@@ -519,20 +699,25 @@ class AIGateway:
     ) -> tuple[Any, int]:
         """Call Anthropic messages.create() with single retry on rate limit.
 
-        Returns (response, latency_ms).
+        Returns (response, latency_ms). Failures are fed to the routing
+        policy so sustained errors trigger sibling failover.
         """
         start_ns = time.monotonic_ns()
         try:
-            response = await self.client.messages.create(**params)
-        except anthropic.RateLimitError:
-            logger.warning("Anthropic rate limited — retrying after 2s")
-            await asyncio.sleep(2)
-            response = await self.client.messages.create(**params)
+            try:
+                response = await self.client.messages.create(**params)
+            except anthropic.RateLimitError:
+                logger.warning("Anthropic rate limited — retrying after 2s")
+                await asyncio.sleep(2)
+                response = await self.client.messages.create(**params)
         except anthropic.AuthenticationError:
             logger.error("Anthropic auth failed — check ANTHROPIC_API_KEY")
             raise ExternalServiceException("Anthropic", "Authentication failed")
         except anthropic.APIError as e:
             logger.error("Anthropic API error: %s", e)
+            self.routing.record_failure(
+                params["model"], (time.monotonic_ns() - start_ns) // 1_000_000,
+            )
             raise ExternalServiceException("Anthropic", str(e))
 
         latency_ms = (time.monotonic_ns() - start_ns) // 1_000_000
@@ -552,19 +737,54 @@ class AIGateway:
             ) or 0,
         }
 
+    @classmethod
+    def _partial_usage(
+        cls, stream: Any, params: dict[str, Any], streamed_chars: int,
+    ) -> dict[str, int]:
+        """Token usage of a stream closed before its final message.
+
+        Input (and cache) tokens come from the message_start snapshot
+        when one arrived, else from a ~4 chars/token estimate of the
+        prompt. The snapshot's output count only moves at message_delta,
+        so output tokens are estimated from the text streamed so far.
+        """
+        output_estimate = streamed_chars // 4 + 1 if streamed_chars else 0
+        try:
+            usage = cls._extract_usage(stream.current_message_snapshot)
+        except (AttributeError, AssertionError):  # no message_start yet
+            system = params["system"]
+            chars = sum(len(block["text"]) for block in system) if isinstance(
+                system, list,
+            ) else len(system)
+            chars += sum(len(str(m["content"])) for m in params["messages"])
+            return {
+                "input_tokens": chars // 4 + 1,
+                "output_tokens": output_estimate,
+                "cache_read_input_tokens": 0,
+                "cache_creation_input_tokens": 0,
+            }
+        usage["output_tokens"] = max(usage["output_tokens"], output_estimate)
+        return usage
+
     async def _check_budget(
         self,
         db: AsyncSession,
         college_id: UUID,
         model: str,
         task_type: str,
+        *,
+        agent_id: str = "unknown",
+        tier: CapabilityTier | str | None = None,
     ) -> str:
         """Check college AI budget, raise or downgrade model as needed.
 
         Returns the (possibly downgraded) model string.
+        - tier given → routing policy picks the model using budget headroom
+        - tier not given → pinned model, swapped for a sibling on failover
         - budget_status == "exceeded" + non-critical task → raise
         - budget_status == "exceeded" + critical task → allow (logged)
-        - budget_status == "warning" → downgrade sonnet → haiku
+        - budget_status == "warning" → downgrade sonnet → haiku, unless
+          haiku is unhealthy (never undoes a failover)
         - No budget row → no restrictions
         """
         today = date.today()
@@ -577,6 +797,24 @@ class AIGateway:
         )
         budget = result.scalar_one_or_none()
 
+        headroom: float | None = None
+        if budget is not None and budget.total_budget_usd:
+            headroom = float(
+                1 - budget.used_amount_usd / budget.total_budget_usd
+            )
+
+        if tier is not None:
+            model = self.routing.select(
+                tier=tier,
+                agent_id=agent_id,
+                task_type=task_type,
+                budget_headroom=headroom,
+            )
+        else:
+            model = self.routing.failover(
+                model, agent_id=agent_id, task_type=task_type,
+            )
+
         if budget is None:
             return model
 
@@ -589,7 +827,9 @@ class AIGateway:
             )
 
         if budget.budget_status == BudgetStatus.WARNING.value:
-            model = self._downgrade_model(model)
+            model = self._downgrade_model(
+                model, agent_id=agent_id, task_type=task_type,
+            )
 
         return model
 
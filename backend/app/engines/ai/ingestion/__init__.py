@@ -6,6 +6,9 @@ the RAG engine has no content to search.
 
 Pipeline:  PDF → Extract text → Chunk → Classify metadata → Embed → Store
 
+Text extraction runs on a process pool (PDFExtractionService), shared
+with flashcard generation from uploaded PDFs.
+
 Usage:
     from app.engines.ai.ingestion import (
         MedicalContentIngester,
@@ -19,4 +22,8 @@ Usage:
 
 from app.engines.ai.ingestion.chunker import MedicalTextChunker  # noqa: F401
 from app.engines.ai.ingestion.metadata_extractor import MetadataExtractor  # noqa: F401
+from app.engines.ai.ingestion.pdf_extraction import (  # noqa: F401
+    PDFExtractionService,
+    get_pdf_extraction_service,
+)
 from app.engines.ai.ingestion.pdf_processor import MedicalContentIngester  # noqa: F401
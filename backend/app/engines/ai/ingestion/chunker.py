@@ -6,7 +6,8 @@ Splits extracted document text into overlapping chunks that respect:
 - Medical content structure (tables, lists, clinical protocols)
 
 Architecture spec: 500-800 tokens, 100 token overlap.
-Uses tiktoken (cl100k_base) for accurate token counting.
+Uses tiktoken (cl100k_base) for accurate token counting — see tokens.py;
+any TokenCounter can be plugged in.
 """
 
 import hashlib
@@ -14,21 +15,14 @@ import logging
 import re
 from dataclasses import dataclass, field
 
-logger = logging.getLogger(__name__)
-
-# ---------------------------------------------------------------------------
-# Token counting — lightweight estimation without tiktoken dependency.
-# Average English word ≈ 1.3 tokens (OpenAI cl100k_base empirical).
-# Medical text averages ~1.4 due to terminology. We use 1.35 as a balance.
-# ---------------------------------------------------------------------------
-
-_TOKENS_PER_WORD = 1.35
+from app.engines.ai.ingestion.tokens import TokenCounter, default_token_counter
 
+logger = logging.getLogger(__name__)
 
-def _estimate_tokens(text: str) -> int:
-    """Estimate token count from text (no external dependency)."""
-    words = len(text.split())
-    return int(words * _TOKENS_PER_WORD)
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+_LINE_BREAK = re.compile(r"\n")
+_WORD_BREAK = re.compile(r"\s+")
 
 
 # ---------------------------------------------------------------------------
@@ -79,6 +73,34 @@ class TextChunk:
             ).hexdigest()
 
 
+@dataclass(frozen=True, slots=True)
+class _Unit:
+    """A sentence (or line / word run of an oversized one) in a section."""
+
+    start: int
+    end: int
+    tokens: int
+    # Tokens of the whitespace separating it from the previous unit
+    sep_tokens: int
+    paragraph_start: bool
+
+
+def _split_spans(
+    text: str, start: int, end: int, boundary: re.Pattern,
+) -> list[tuple[int, int]]:
+    """Split text[start:end] at boundary matches into stripped spans."""
+    cuts = [(m.start(), m.end()) for m in boundary.finditer(text, start, end)]
+    spans: list[tuple[int, int]] = []
+    pos = start
+    for cut_start, cut_end in [*cuts, (end, end)]:
+        segment = text[pos:cut_start]
+        if segment.strip():
+            lead = len(segment) - len(segment.lstrip())
+            spans.append((pos + lead, pos + len(segment.rstrip())))
+        pos = cut_end
+    return spans
+
+
 # ---------------------------------------------------------------------------
 # MedicalTextChunker
 # ---------------------------------------------------------------------------
@@ -88,9 +110,14 @@ class MedicalTextChunker:
 
     Strategy:
     1. Split text into sections at heading boundaries
-    2. Within each section, split at paragraph boundaries
-    3. If a paragraph exceeds max tokens, split at sentence boundaries
-    4. Apply overlap by prepending tail of previous chunk
+    2. Split each section into sentences (lines, then words, for
+       sentences over budget — tables and dosage lists)
+    3. Pack sentences into chunks of target_tokens, ending chunks at a
+       paragraph boundary unless that leaves them under min_tokens
+    4. Apply overlap by prepending the last overlap_tokens of the
+       previous chunk
+
+    All sizes are counted by token_counter (cl100k_base BPE by default).
     """
 
     def __init__(
@@ -99,11 +126,13 @@ class MedicalTextChunker:
         min_tokens: int = 200,
         max_tokens: int = 800,
         overlap_tokens: int = 100,
+        token_counter: TokenCounter | None = None,
     ) -> None:
         self.target_tokens = target_tokens
         self.min_tokens = min_tokens
         self.max_tokens = max_tokens
         self.overlap_tokens = overlap_tokens
+        self.token_counter = token_counter or default_token_counter()
 
     def chunk_text(
         self,
@@ -134,8 +163,9 @@ class MedicalTextChunker:
         chunks = self._apply_overlap(raw_chunks, document_title)
 
         logger.info(
-            "Chunked %d chars into %d chunks (target=%d tokens, overlap=%d)",
-            len(text), len(chunks), self.target_tokens, self.overlap_tokens,
+            "Chunked %d chars into %d chunks (target=%d %s tokens, overlap=%d)",
+            len(text), len(chunks), self.target_tokens,
+            self.token_counter.name, self.overlap_tokens,
         )
         return chunks
 
@@ -149,6 +179,7 @@ class MedicalTextChunker:
         """Split text at heading boundaries.
 
         Returns: [(heading, section_text, start_char, end_char), ...]
+        where start_char is the offset of section_text (after its heading).
         """
         lines = text.split("\n")
         sections: list[tuple[str | None, str, int, int]] = []
@@ -172,10 +203,10 @@ class MedicalTextChunker:
                 ))
                 current_heading = line.strip()
                 current_lines = []
-                current_start = char_pos
+                current_start = char_pos + line_len
             elif _is_heading(line):
                 current_heading = line.strip()
-                current_start = char_pos
+                current_start = char_pos + line_len
             else:
                 current_lines.append(line)
 
@@ -198,7 +229,7 @@ class MedicalTextChunker:
         return sections
 
     # ------------------------------------------------------------------
-    # Section chunking (paragraph + sentence boundaries)
+    # Section chunking (token-budget sentence packing)
     # ------------------------------------------------------------------
 
     def _chunk_section(
@@ -207,110 +238,85 @@ class MedicalTextChunker:
         heading: str | None,
         offset: int,
     ) -> list[tuple[str, str | None, int, int]]:
-        """Chunk a section at paragraph boundaries.
+        """Pack a section's sentences into chunks of target_tokens.
+
+        Chunk text is a slice of the section, so offsets are exact.
 
         Returns: [(chunk_text, heading, start_char, end_char), ...]
         """
-        paragraphs = re.split(r"\n\s*\n", text)
         chunks: list[tuple[str, str | None, int, int]] = []
-
-        current_parts: list[str] = []
-        current_tokens = 0
-        chunk_start = offset
-
-        for para in paragraphs:
-            para = para.strip()
-            if not para:
-                continue
-
-            para_tokens = _estimate_tokens(para)
-
-            # If single paragraph exceeds max, split at sentences
-            if para_tokens > self.max_tokens:
-                # Flush current accumulation first
-                if current_parts:
-                    chunk_text = "\n\n".join(current_parts)
-                    chunks.append((
-                        chunk_text, heading, chunk_start,
-                        chunk_start + len(chunk_text),
-                    ))
-                    chunk_start += len(chunk_text) + 2
-                    current_parts = []
-                    current_tokens = 0
-
-                # Split long paragraph at sentences
-                sentence_chunks = self._split_at_sentences(
-                    para, heading, chunk_start,
-                )
-                chunks.extend(sentence_chunks)
-                chunk_start += len(para) + 2
-                continue
-
-            # Would adding this paragraph exceed target?
-            if (current_tokens + para_tokens > self.target_tokens
-                    and current_parts):
-                chunk_text = "\n\n".join(current_parts)
-                chunks.append((
-                    chunk_text, heading, chunk_start,
-                    chunk_start + len(chunk_text),
-                ))
-                chunk_start += len(chunk_text) + 2
-                current_parts = []
-                current_tokens = 0
-
-            current_parts.append(para)
-            current_tokens += para_tokens
-
-        # Flush remainder
-        if current_parts:
-            chunk_text = "\n\n".join(current_parts)
-            chunks.append((
-                chunk_text, heading, chunk_start,
-                chunk_start + len(chunk_text),
-            ))
-
+        current: list[_Unit] = []
+
+        def emit(units: list[_Unit]) -> None:
+            start, end = units[0].start, units[-1].end
+            chunks.append((text[start:end], heading, offset + start, offset + end))
+
+        for unit in self._split_units(text):
+            while current and (
+                self._packed_tokens(current) + unit.sep_tokens + unit.tokens
+                > self.target_tokens
+            ):
+                cut = self._cut_point(current)
+                emit(current[:cut])
+                current = current[cut:]
+            current.append(unit)
+
+        if current:
+            emit(current)
         return chunks
 
-    def _split_at_sentences(
-        self,
-        text: str,
-        heading: str | None,
-        offset: int,
-    ) -> list[tuple[str, str | None, int, int]]:
-        """Split a long paragraph at sentence boundaries."""
-        # Split at sentence-ending punctuation followed by space
-        sentences = re.split(r"(?<=[.!?])\s+", text)
-        chunks: list[tuple[str, str | None, int, int]] = []
-
-        current_parts: list[str] = []
-        current_tokens = 0
-        chunk_start = offset
-
-        for sent in sentences:
-            sent_tokens = _estimate_tokens(sent)
-
-            if (current_tokens + sent_tokens > self.target_tokens
-                    and current_parts):
-                chunk_text = " ".join(current_parts)
-                chunks.append((
-                    chunk_text, heading, chunk_start,
-                    chunk_start + len(chunk_text),
-                ))
-                chunk_start += len(chunk_text) + 1
-                current_parts = []
-                current_tokens = 0
-
-            current_parts.append(sent)
-            current_tokens += sent_tokens
-
-        if current_parts:
-            chunk_text = " ".join(current_parts)
-            chunks.append((
-                chunk_text, heading, chunk_start,
-                chunk_start + len(chunk_text),
+    def _split_units(self, text: str) -> list[_Unit]:
+        """Sentences of each paragraph, split further if over budget."""
+        count = self.token_counter.count
+        units: list[_Unit] = []
+        prev_end = 0
+
+        def add(start: int, end: int, paragraph_start: bool) -> None:
+            nonlocal prev_end
+            separator = text[prev_end:start]
+            units.append(_Unit(
+                start=start,
+                end=end,
+                tokens=count(text[start:end]),
+                sep_tokens=(1 if "\n" in separator else 0) if units else 0,
+                paragraph_start=paragraph_start,
             ))
-
-        return chunks
+            prev_end = end
+
+        def split(start: int, end: int, levels: tuple, first: bool) -> bool:
+            for span_start, span_end in _split_spans(text, start, end, levels[0]):
+                if len(levels) > 1 and (
+                    count(text[span_start:span_end]) > self.target_tokens
+                ):
+                    first = split(span_start, span_end, levels[1:], first)
+                else:
+                    add(span_start, span_end, first)
+                    first = False
+            return first
+
+        for para_start, para_end in _split_spans(
+            text, 0, len(text), _PARAGRAPH_BREAK,
+        ):
+            split(
+                para_start, para_end,
+                (_SENTENCE_BREAK, _LINE_BREAK, _WORD_BREAK),
+                True,
+            )
+        return units
+
+    @staticmethod
+    def _packed_tokens(units: list[_Unit]) -> int:
+        return sum(u.tokens for u in units) + sum(u.sep_tokens for u in units[1:])
+
+    def _cut_point(self, units: list[_Unit]) -> int:
+        """Where to end the chunk: the last paragraph start that leaves at
+        least min_tokens before it, else after all units."""
+        for i in range(len(units) - 1, 0, -1):
+            if units[i].paragraph_start:
+                if self._packed_tokens(units[:i]) >= self.min_tokens:
+                    return i
+                break
+        return len(units)
 
     # ------------------------------------------------------------------
     # Overlap application
@@ -334,13 +340,13 @@ class MedicalTextChunker:
             # Prepend overlap from previous chunk (except for first)
             if i > 0 and self.overlap_tokens > 0:
                 prev_text = raw_chunks[i - 1][0]
-                overlap_text = self._get_tail_tokens(
+                overlap_text = self.token_counter.tail(
                     prev_text, self.overlap_tokens,
                 )
                 if overlap_text:
                     content = overlap_text + "\n\n" + text
 
-            tokens = _estimate_tokens(content)
+            tokens = self.token_counter.count(content)
 
             # Skip chunks that are too small (likely noise)
             if tokens < self.min_tokens and i < len(raw_chunks) - 1:
@@ -364,11 +370,3 @@ class MedicalTextChunker:
             chunk.chunk_index = i
 
         return chunks
-
-    def _get_tail_tokens(self, text: str, target_tokens: int) -> str:
-        """Get the last ~target_tokens worth of text."""
-        words = text.split()
-        target_words = int(target_tokens / _TOKENS_PER_WORD)
-        if len(words) <= target_words:
-            return text
-        return " ".join(words[-target_words:])
@@ -0,0 +1,196 @@
+"""Rate-aware, pipelined chunk embedding — Section L1 of architecture document.
+
+Embedding is the longest, entirely I/O-bound step of ingesting a large
+corpus. ChunkEmbedder keeps several embedding requests in flight:
+
+- Batches are sized by tokens (EMBED_BATCH_TOKENS), not by count, so a
+  page range of dense tables costs as many requests as it has tokens.
+- AdaptiveLimiter sets how many requests may be in flight: it grows
+  additively while responses are fast and halves on 429s or transient
+  API errors (AIMD), so throughput settles just under the account's
+  rate limit instead of hammering it.
+- Throttled batches are retried after Retry-After (or exponential
+  backoff) outside their limiter slot.
+
+The embedder is shared across all page ranges of an ingestion, so the
+learned limit carries from one range to the next.
+"""
+
+import asyncio
+import logging
+import random
+import time
+
+from openai import (
+    APIConnectionError,
+    AsyncOpenAI,
+    InternalServerError,
+    RateLimitError,
+)
+
+from app.engines.ai.rag.semantic_search import (
+    EMBEDDING_DIMENSIONS,
+    EMBEDDING_MODEL,
+)
+
+logger = logging.getLogger(__name__)
+
+# Tokens per request (the API accepts up to 300k per request and 8k per
+# input; smaller batches give the limiter more requests to pipeline).
+EMBED_BATCH_TOKENS = 40_000
+EMBED_BATCH_MAX_INPUTS = 256
+
+EMBED_INITIAL_CONCURRENCY = 4
+EMBED_MAX_CONCURRENCY = 16
+# Responses slower than this count as back-pressure from the API.
+EMBED_LATENCY_TARGET_SECONDS = 8.0
+EMBED_MAX_RETRIES = 6
+EMBED_MAX_BACKOFF_SECONDS = 30.0
+
+_RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+
+
+# ---------------------------------------------------------------------------
+# Adaptive concurrency
+# ---------------------------------------------------------------------------
+
+class AdaptiveLimiter:
+    """Concurrency limit adjusted by AIMD on throttling and latency."""
+
+    def __init__(
+        self,
+        initial: int = EMBED_INITIAL_CONCURRENCY,
+        minimum: int = 1,
+        maximum: int = EMBED_MAX_CONCURRENCY,
+        latency_target_seconds: float = EMBED_LATENCY_TARGET_SECONDS,
+    ) -> None:
+        self._limit = float(initial)
+        self._minimum = minimum
+        self._maximum = maximum
+        self._latency_target = latency_target_seconds
+        self._in_flight = 0
+        self._cond = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        return max(self._minimum, int(self._limit))
+
+    async def __aenter__(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        async with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self, latency_seconds: float) -> None:
+        """Additive increase (one slot per window) unless responses slow."""
+        if latency_seconds > self._latency_target:
+            self._limit = max(self._minimum, self._limit * 0.8)
+        else:
+            self._limit = min(self._maximum, self._limit + 1 / self._limit)
+
+    def on_throttle(self) -> None:
+        """Multiplicative decrease on a 429 or transient API error."""
+        self._limit = max(self._minimum, self._limit / 2)
+
+
+# ---------------------------------------------------------------------------
+# Batching
+# ---------------------------------------------------------------------------
+
+def token_batches(
+    token_counts: list[int],
+    max_tokens: int = EMBED_BATCH_TOKENS,
+    max_inputs: int = EMBED_BATCH_MAX_INPUTS,
+) -> list[tuple[int, int]]:
+    """Split inputs into [start, end) spans of at most max_tokens each.
+
+    An input larger than max_tokens gets a span of its own.
+    """
+    spans: list[tuple[int, int]] = []
+    start, tokens = 0, 0
+    for i, count in enumerate(token_counts):
+        if i > start and (
+            tokens + count > max_tokens or i - start >= max_inputs
+        ):
+            spans.append((start, i))
+            start, tokens = i, 0
+        tokens += count
+    if start < len(token_counts):
+        spans.append((start, len(token_counts)))
+    return spans
+
+
+# ---------------------------------------------------------------------------
+# ChunkEmbedder
+# ---------------------------------------------------------------------------
+
+class ChunkEmbedder:
+    """Embeds chunk texts with token-sized batches kept in flight."""
+
+    def __init__(
+        self,
+        client: AsyncOpenAI,
+        *,
+        limiter: AdaptiveLimiter | None = None,
+        batch_tokens: int = EMBED_BATCH_TOKENS,
+    ) -> None:
+        self._client = client
+        self._limiter = limiter or AdaptiveLimiter()
+        self._batch_tokens = batch_tokens
+
+    async def embed(
+        self, texts: list[str], token_counts: list[int],
+    ) -> list[list[float]]:
+        """Embeddings for texts, in input order."""
+        parts = await asyncio.gather(*(
+            self._embed_batch(texts[start:end])
+            for start, end in token_batches(token_counts, self._batch_tokens)
+        ))
+        return [embedding for part in parts for embedding in part]
+
+    async def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        attempt = 0
+        while True:
+            async with self._limiter:
+                started = time.monotonic()
+                try:
+                    response = await self._client.embeddings.create(
+                        model=EMBEDDING_MODEL,
+                        input=texts,
+                        dimensions=EMBEDDING_DIMENSIONS,
+                    )
+                except _RETRYABLE_ERRORS as exc:
+                    if attempt == EMBED_MAX_RETRIES:
+                        raise
+                    self._limiter.on_throttle()
+                    delay = _retry_delay(exc, attempt)
+                    logger.info(
+                        "Embedding batch throttled (%s); limit now %d, "
+                        "retrying in %.1fs",
+                        type(exc).__name__, self._limiter.limit, delay,
+                    )
+                else:
+                    self._limiter.on_success(time.monotonic() - started)
+                    # Response data is ordered by index
+                    return [
+                        item.embedding
+                        for item in sorted(response.data, key=lambda x: x.index)
+                    ]
+            # Back off without holding a limiter slot.
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+def _retry_delay(exc: Exception, attempt: int) -> float:
+    """Retry-After from a 429 if present, else jittered exponential backoff."""
+    response = getattr(exc, "response", None)
+    if response is not None:
+        try:
+            return float(response.headers.get("retry-after", ""))
+        except ValueError:
+            pass
+    return min(EMBED_MAX_BACKOFF_SECONDS, 2 ** attempt) * (0.5 + random.random())
@@ -10,20 +10,33 @@ Uses Claude Haiku to classify each chunk with structured medical metadata:
 
 Cost: ~$0.80/M input tokens with Haiku — negligible for batch ingestion.
 All calls go through AIGateway to respect budget limits.
+
+A textbook produces thousands of chunks, so bulk classification packs
+CLASSIFY_PACK_SIZE chunks into one structured call and runs up to
+CLASSIFY_MAX_CONCURRENCY packs at once. For ingestion that can wait,
+the same packs are submitted to the Message Batches API instead
+(submit_offline / fetch_offline) at half the price.
 """
 
+import asyncio
 import json
 import logging
 from dataclasses import dataclass
 from typing import Any
 from uuid import UUID
 
+from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.engines.ai.gateway import AIGateway
+from app.engines.ai.gateway import AIGateway, BatchRequest
 
 logger = logging.getLogger(__name__)
 
+CLASSIFY_MODEL = "claude-haiku-4-5-20251001"
+CLASSIFY_PACK_SIZE = 15
+CLASSIFY_MAX_CONCURRENCY = 8
+_PACKED_CHUNK_CHARS = 2000  # per chunk in a packed call (single: 3000)
+
 
 # ---------------------------------------------------------------------------
 # Classification result
@@ -70,6 +83,36 @@ def _build_classify_message(chunk_text: str, document_title: str) -> str:
     )
 
 
+_PACKED_SYSTEM_PROMPT = _CLASSIFY_SYSTEM_PROMPT + """
+
+You will receive several numbered chunks instead of one. Respond with \
+{"classifications": [...]}: one object of the form above per chunk, in \
+order, each with an extra "index" field set to the chunk number."""
+
+
+class _PackedClassification(BaseModel):
+    index: int
+    subject: str
+    topic: str
+    medical_entity_type: str | None = None
+    blooms_level: str = "understand"
+    organ_system: str | None = None
+    content_type: str | None = None
+    key_terms: list[str] = Field(default_factory=list)
+
+
+class _PackedClassificationBatch(BaseModel):
+    classifications: list[_PackedClassification]
+
+
+def _build_packed_message(chunks: list[tuple[str, str]]) -> str:
+    """Build the user message for a pack of (chunk_text, title) pairs."""
+    return "\n\n".join(
+        f"[Chunk {i}] (Document: {title})\n{text[:_PACKED_CHUNK_CHARS]}"
+        for i, (text, title) in enumerate(chunks)
+    )
+
+
 # ---------------------------------------------------------------------------
 # MetadataExtractor
 # ---------------------------------------------------------------------------
@@ -123,22 +166,155 @@ class MetadataExtractor:
         db: AsyncSession,
         chunks: list[tuple[str, str]],
         college_id: UUID,
+        *,
+        pack_size: int = CLASSIFY_PACK_SIZE,
+        max_concurrency: int = CLASSIFY_MAX_CONCURRENCY,
     ) -> list[ChunkMetadata]:
-        """Classify multiple chunks sequentially.
+        """Classify many chunks: packed calls, bounded concurrency.
 
         Args:
             chunks: List of (chunk_text, document_title) tuples.
+            pack_size: Chunks per structured call (1 = one call each).
+            max_concurrency: Packs in flight at once.
 
-        For very large batches (100+ chunks), consider using the Batch API
-        through AIGateway for 50% cost savings. This method uses sequential
-        calls which are simpler and sufficient for typical uploads (10-50 chunks).
+        Results are in input order. A chunk missing from its pack's
+        answer is retried on its own; a failed pack falls back to
+        defaults, like classify_chunk. For ingestion that can wait, use
+        submit_offline() for Batch API pricing.
         """
-        results: list[ChunkMetadata] = []
-        for chunk_text, doc_title in chunks:
-            metadata = await self.classify_chunk(
-                db, chunk_text, doc_title, college_id,
+        if not chunks:
+            return []
+        packs = [
+            chunks[i:i + pack_size] for i in range(0, len(chunks), pack_size)
+        ]
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(pack: list[tuple[str, str]]) -> list[ChunkMetadata]:
+            async with semaphore:
+                if len(pack) == 1:
+                    return [await self.classify_chunk(
+                        db, pack[0][0], pack[0][1], college_id,
+                    )]
+                return await self._classify_pack(db, pack, college_id)
+
+        results = await asyncio.gather(*(run(pack) for pack in packs))
+        return [metadata for pack in results for metadata in pack]
+
+    async def _classify_pack(
+        self,
+        db: AsyncSession,
+        pack: list[tuple[str, str]],
+        college_id: UUID,
+    ) -> list[ChunkMetadata]:
+        """One structured call classifying every chunk of a pack."""
+        try:
+            batch = await self._gateway.complete_structured(
+                db,
+                system_prompt=_PACKED_SYSTEM_PROMPT,
+                user_message=_build_packed_message(pack),
+                output_schema=_PackedClassificationBatch,
+                model=CLASSIFY_MODEL,
+                college_id=college_id,
+                agent_id="content_classifier",
+                task_type="metadata_extraction",
+                max_tokens=300 * len(pack),
+                temperature=0.0,
+            )
+            parsed = self._from_packed(batch, len(pack))
+        except Exception as e:
+            logger.warning(
+                "Packed classification of %d chunks failed, using "
+                "defaults: %s", len(pack), e,
             )
-            results.append(metadata)
+            return [
+                ChunkMetadata(subject="Other", topic="Unclassified")
+                for _ in pack
+            ]
+
+        return [
+            metadata if metadata is not None
+            else await self.classify_chunk(db, text, title, college_id)
+            for metadata, (text, title) in zip(parsed, pack)
+        ]
+
+    # ------------------------------------------------------------------
+    # Offline (Message Batches API)
+    # ------------------------------------------------------------------
+
+    async def submit_offline(
+        self,
+        db: AsyncSession,
+        chunks: list[tuple[str, str]],
+        college_id: UUID,
+        *,
+        custom_id_prefix: str,
+        pack_size: int = CLASSIFY_PACK_SIZE,
+    ) -> tuple[str, list[tuple[str, int]]]:
+        """Submit packed classification requests to the Batch API.
+
+        Returns (batch_id, assignments) where assignments[i] is the
+        (custom_id, position) under which chunk i will be answered —
+        persist them to apply results later with fetch_offline().
+        """
+        requests: list[BatchRequest] = []
+        assignments: list[tuple[str, int]] = []
+        for p, start in enumerate(range(0, len(chunks), pack_size)):
+            pack = chunks[start:start + pack_size]
+            custom_id = f"{custom_id_prefix}-{p}"
+            requests.append(BatchRequest(
+                custom_id=custom_id,
+                model=CLASSIFY_MODEL,
+                system_prompt=_PACKED_SYSTEM_PROMPT,
+                user_message=_build_packed_message(pack),
+                max_tokens=300 * len(pack),
+            ))
+            assignments.extend((custom_id, i) for i in range(len(pack)))
+
+        batch_id = await self._gateway.batch(
+            db,
+            requests=requests,
+            college_id=college_id,
+            task_type="metadata_extraction",
+        )
+        return batch_id, assignments
+
+    async def fetch_offline(
+        self,
+        db: AsyncSession,
+        batch_id: str,
+        college_id: UUID,
+        pack_sizes: dict[str, int],
+    ) -> dict[str, list[ChunkMetadata | None]] | None:
+        """Parsed results of an offline batch; None while processing.
+
+        Args:
+            pack_sizes: {custom_id: number of chunks in that pack}.
+
+        Returns {custom_id: metadata per position}; None entries (and
+        custom_ids missing entirely) could not be classified.
+        """
+        texts = await self._gateway.batch_results(
+            db,
+            batch_id=batch_id,
+            college_id=college_id,
+            agent_id="content_classifier",
+            task_type="metadata_extraction",
+        )
+        if texts is None:
+            return None
+
+        results: dict[str, list[ChunkMetadata | None]] = {}
+        for custom_id, size in pack_sizes.items():
+            try:
+                batch = _PackedClassificationBatch.model_validate_json(
+                    _strip_fences(texts[custom_id]),
+                )
+                results[custom_id] = self._from_packed(batch, size)
+            except Exception as e:
+                logger.warning(
+                    "Offline classification %s unusable: %s", custom_id, e,
+                )
+                results[custom_id] = [None] * size
         return results
 
     # ------------------------------------------------------------------
@@ -147,16 +323,7 @@ class MetadataExtractor:
 
     def _parse_response(self, content: str) -> ChunkMetadata:
         """Parse Haiku JSON response into ChunkMetadata."""
-        # Strip markdown fences if present
-        text = content.strip()
-        if text.startswith("```"):
-            lines = text.split("\n")
-            text = "\n".join(lines[1:])
-            if text.endswith("```"):
-                text = text[:-3]
-            text = text.strip()
-
-        data = json.loads(text)
+        data = json.loads(_strip_fences(content))
 
         return ChunkMetadata(
             subject=data.get("subject", "Other"),
@@ -167,3 +334,34 @@ class MetadataExtractor:
             content_type=data.get("content_type", "theory"),
             key_terms=data.get("key_terms"),
         )
+
+    @staticmethod
+    def _from_packed(
+        batch: _PackedClassificationBatch, size: int,
+    ) -> list[ChunkMetadata | None]:
+        """Map a packed answer to positions 0..size-1 (None if missing)."""
+        by_index: list[ChunkMetadata | None] = [None] * size
+        for c in batch.classifications:
+            if 0 <= c.index < size and by_index[c.index] is None:
+                by_index[c.index] = ChunkMetadata(
+                    subject=c.subject or "Other",
+                    topic=c.topic or "Unclassified",
+                    medical_entity_type=c.medical_entity_type,
+                    blooms_level=c.blooms_level or "understand",
+                    organ_system=c.organ_system,
+                    content_type=c.content_type or "theory",
+                    key_terms=c.key_terms or None,
+                )
+        return by_index
+
+
+def _strip_fences(content: str) -> str:
+    """Strip markdown code fences if present."""
+    text = content.strip()
+    if text.startswith("```"):
+        lines = text.split("\n")
+        text = "\n".join(lines[1:])
+        if text.endswith("```"):
+            text = text[:-3]
+        text = text.strip()
+    return text
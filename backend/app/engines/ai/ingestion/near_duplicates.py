@@ -0,0 +1,298 @@
+"""Near-duplicate chunk detection — Section L1 of architecture document.
+
+Exact content_hash dedup misses the same paragraph in two textbooks, or
+one differing only in whitespace, hyphenation or OCR noise; both copies
+get embedded and then crowd the same RAG top-k. MedicalContent rows
+carry the MinHash signature and LSH band hashes of the generated-content
+dedup index (app.engines.ai.dedup_index: word 3-gram shingles, NUM_PERM
+min-hashes, LSH_BANDS bands), with the bands GIN-indexed so candidates
+come from one array-overlap query.
+
+- Ingestion drops new chunks that near-duplicate an active canonical
+  chunk visible to the same audience, before classification and
+  embedding.
+- ai.cluster_near_duplicate_chunks fingerprints older rows and points
+  canonical_id of each near-duplicate at the earliest row of its
+  cluster. Retrieval only returns canonical rows.
+
+A chunk is only a near-duplicate of another if both contain the same
+numbers: a paragraph that differs in one dose or lab value is distinct
+medical content however similar the rest of it is.
+"""
+
+import logging
+import re
+from collections.abc import Sequence
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.engines.ai.dedup_index import Fingerprint, estimate_jaccard, fingerprint
+from app.engines.ai.models import MedicalContent
+
+logger = logging.getLogger(__name__)
+
+# Stricter than the question index (0.7): chunks are long, so 0.8 still
+# absorbs OCR noise and reflowed text but not a rewritten passage.
+CHUNK_JACCARD_THRESHOLD = 0.8
+CLUSTER_BATCH_SIZE = 500
+
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+
+
+# ---------------------------------------------------------------------------
+# Pure helpers
+# ---------------------------------------------------------------------------
+
+def fingerprint_chunks(texts: list[str]) -> list[Fingerprint]:
+    """Fingerprints of chunk texts.
+
+    Module-level so the ingester can run it on the extraction pool;
+    MinHash over a full chunk costs ~15ms of CPU.
+    """
+    return [fingerprint(t) for t in texts]
+
+
+def same_numbers(a: str, b: str) -> bool:
+    """Whether two texts contain the same numbers (doses, values, ages)."""
+    return sorted(_NUMBER_RE.findall(a)) == sorted(_NUMBER_RE.findall(b))
+
+
+def visible_to(candidate_college: UUID | None, college_id: UUID | None) -> bool:
+    """Whether a chunk of candidate_college is shown to college_id's users.
+
+    Platform-wide chunks are visible to everyone, college chunks only
+    to their own college.
+    """
+    return candidate_college is None or candidate_college == college_id
+
+
+def _is_near_duplicate(
+    fp: Fingerprint, text: str, minhash: Sequence[int], other_text: str,
+) -> float | None:
+    """Estimated Jaccard if the pair is a near-duplicate, else None."""
+    sim = estimate_jaccard(fp.minhash, minhash)
+    if sim >= CHUNK_JACCARD_THRESHOLD and same_numbers(text, other_text):
+        return sim
+    return None
+
+
+def _scope_filter(college_id: UUID | None) -> Any:
+    if college_id is None:
+        return MedicalContent.college_id.is_(None)
+    return (
+        MedicalContent.college_id.is_(None)
+        | (MedicalContent.college_id == college_id)
+    )
+
+
+# ---------------------------------------------------------------------------
+# Ingestion check
+# ---------------------------------------------------------------------------
+
+async def find_near_duplicates(
+    db: AsyncSession,
+    texts: list[str],
+    fingerprints: list[Fingerprint],
+    *,
+    college_id: UUID | None,
+    exclude_document_id: UUID | None = None,
+    pending: Sequence[tuple[Fingerprint, str]] = (),
+) -> list[bool]:
+    """Per text, whether it near-duplicates a stored or earlier text.
+
+    Stored candidates are active canonical chunks visible to college_id,
+    except those of exclude_document_id (the version being replaced,
+    whose near-copies are exactly the edits to keep). pending are texts
+    accepted earlier but not stored yet; they and earlier texts of the
+    batch win over later ones.
+    """
+    if not texts:
+        return []
+    all_bands = sorted({b for fp in fingerprints for b in fp.bands})
+    query = select(
+        MedicalContent.minhash,
+        MedicalContent.lsh_bands,
+        MedicalContent.content,
+    ).where(
+        MedicalContent.lsh_bands.overlap(all_bands),
+        MedicalContent.is_active.is_(True),
+        MedicalContent.canonical_id.is_(None),
+        _scope_filter(college_id),
+    )
+    if exclude_document_id is not None:
+        query = query.where(
+            MedicalContent.parent_document_id.is_distinct_from(
+                exclude_document_id,
+            ),
+        )
+    stored = [
+        (minhash, set(bands), content)
+        for minhash, bands, content in (await db.execute(query)).all()
+    ]
+
+    stored += [(fp.minhash, set(fp.bands), text) for fp, text in pending]
+
+    duplicates: list[bool] = []
+    for fp, text in zip(fingerprints, texts, strict=True):
+        duplicate = any(
+            _is_near_duplicate(fp, text, minhash, other) is not None
+            for minhash, bands, other in stored
+            if not bands.isdisjoint(fp.bands)
+        )
+        duplicates.append(duplicate)
+        if not duplicate:
+            stored.append((fp.minhash, set(fp.bands), text))
+    return duplicates
+
+
+# ---------------------------------------------------------------------------
+# Clustering job
+# ---------------------------------------------------------------------------
+
+async def release_orphaned_duplicates(db: AsyncSession) -> int:
+    """Make near-duplicates canonical again when their canonical row is
+    no longer active (retired by a new edition, or deactivated).
+
+    One set-based UPDATE; returns the number of rows released.
+    """
+    canonical = aliased(MedicalContent)
+    result = await db.execute(
+        update(MedicalContent)
+        .where(
+            MedicalContent.canonical_id == canonical.id,
+            canonical.is_active.is_(False),
+        )
+        .values(canonical_id=None)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+async def cluster_near_duplicates(
+    db: AsyncSession, *, batch_size: int = CLUSTER_BATCH_SIZE,
+) -> dict[str, int]:
+    """Mark near-duplicate MedicalContent rows across the whole corpus.
+
+    Active rows are walked oldest first in keyset batches. Rows without
+    a fingerprint get one; each canonical row is then compared with
+    earlier canonical rows visible to its audience, and a near-duplicate
+    gets canonical_id set to its best match. Commits after every batch,
+    so a long run keeps its progress and a re-run picks up new rows.
+
+    Returns {"scanned": n, "fingerprinted": n, "duplicates": n,
+    "released": n}.
+    """
+    stats = {
+        "scanned": 0,
+        "fingerprinted": 0,
+        "duplicates": 0,
+        "released": await release_orphaned_duplicates(db),
+    }
+    order_key = tuple_(MedicalContent.created_at, MedicalContent.id)
+    last: tuple[Any, UUID] | None = None
+
+    while True:
+        query = (
+            select(
+                MedicalContent.id,
+                MedicalContent.college_id,
+                MedicalContent.created_at,
+                MedicalContent.content,
+                MedicalContent.minhash,
+                MedicalContent.lsh_bands,
+                MedicalContent.canonical_id,
+            )
+            .where(MedicalContent.is_active.is_(True))
+            .order_by(MedicalContent.created_at, MedicalContent.id)
+            .limit(batch_size)
+        )
+        if last is not None:
+            query = query.where(order_key > tuple_(*last))
+        rows = (await db.execute(query)).all()
+        if not rows:
+            break
+        last = (rows[-1].created_at, rows[-1].id)
+
+        fps: dict[UUID, Fingerprint] = {}
+        backfill: list[dict[str, Any]] = []
+        for row in rows:
+            if row.minhash is None:
+                fp = fingerprint(row.content)
+                backfill.append({
+                    "id": row.id,
+                    "minhash": list(fp.minhash),
+                    "lsh_bands": list(fp.bands),
+                })
+            else:
+                fp = Fingerprint("", tuple(row.minhash), tuple(row.lsh_bands))
+            fps[row.id] = fp
+        if backfill:
+            await db.execute(update(MedicalContent), backfill)
+
+        pending = [row for row in rows if row.canonical_id is None]
+        marks = await _cluster_batch(db, pending, fps, last)
+        if marks:
+            await db.execute(update(MedicalContent), marks)
+
+        await db.commit()
+        stats["scanned"] += len(rows)
+        stats["fingerprinted"] += len(backfill)
+        stats["duplicates"] += len(marks)
+
+    logger.info("Near-duplicate clustering: %s", stats)
+    return stats
+
+
+async def _cluster_batch(
+    db: AsyncSession,
+    rows: list[Any],
+    fps: dict[UUID, Fingerprint],
+    last: tuple[Any, UUID],
+) -> list[dict[str, Any]]:
+    """canonical_id updates for the near-duplicates among rows."""
+    if not rows:
+        return []
+    all_bands = sorted({b for row in rows for b in fps[row.id].bands})
+    result = await db.execute(
+        select(
+            MedicalContent.id,
+            MedicalContent.college_id,
+            MedicalContent.created_at,
+            MedicalContent.content,
+            MedicalContent.minhash,
+            MedicalContent.lsh_bands,
+        ).where(
+            MedicalContent.lsh_bands.overlap(all_bands),
+            MedicalContent.is_active.is_(True),
+            MedicalContent.canonical_id.is_(None),
+            tuple_(MedicalContent.created_at, MedicalContent.id)
+            <= tuple_(*last),
+        )
+    )
+    candidates = result.all()
+
+    marks: list[dict[str, Any]] = []
+    marked: set[UUID] = set()
+    for row in rows:
+        key = (row.created_at, row.id)
+        fp = fps[row.id]
+        best: tuple[float, UUID] | None = None
+        for c in candidates:
+            if (
+                (c.created_at, c.id) >= key
+                or c.id in marked
+                or not visible_to(c.college_id, row.college_id)
+                or set(c.lsh_bands).isdisjoint(fp.bands)
+            ):
+                continue
+            sim = _is_near_duplicate(fp, row.content, c.minhash, c.content)
+            if sim is not None and (best is None or sim > best[0]):
+                best = (sim, c.id)
+        if best is not None:
+            marks.append({"id": row.id, "canonical_id": best[1]})
+            marked.add(row.id)
+    return marks
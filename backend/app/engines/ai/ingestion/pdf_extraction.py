@@ -0,0 +1,205 @@
+"""Process-pool PDF text extraction — Section L1 of architecture document.
+
+PyMuPDF extraction is CPU-bound and synchronous; run inline it blocks
+the event loop for seconds on a large textbook. PDFExtractionService
+runs it in a ProcessPoolExecutor instead:
+
+- The document is spooled once to a temp file and workers open it by
+  path, so only page numbers and page texts cross the process boundary.
+- A page range is split into sub-ranges across the workers and the
+  results are reassembled in page order.
+- Every call goes through loop.run_in_executor, so callers just await.
+
+Shared by MedicalContentIngester.ingest_pdf and
+FlashcardGenerator.generate_from_pdf.
+
+Usage:
+    service = get_pdf_extraction_service()
+    async with service.open(file_bytes) as pdf:
+        pages = await pdf.extract(0, 16)  # one string per page, in order
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import re
+import tempfile
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+MAX_EXTRACTION_WORKERS = 4
+# Sub-ranges smaller than this cost more in dispatch than they save.
+MIN_PAGES_PER_TASK = 4
+
+
+# ---------------------------------------------------------------------------
+# Worker functions — module-level so the process pool can pickle them
+# ---------------------------------------------------------------------------
+
+def clean_pdf_text(text: str) -> str:
+    """Clean common PDF extraction artifacts."""
+    # Remove excessive whitespace but preserve paragraph breaks
+    text = re.sub(r"[ \t]+", " ", text)
+    # Normalize line breaks (PDF often has many single newlines)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    # Remove page headers/footers (common patterns)
+    text = re.sub(
+        r"^\s*(?:Page\s+\d+|\d+\s*$)",
+        "",
+        text,
+        flags=re.MULTILINE,
+    )
+    return text.strip()
+
+
+def count_pdf_pages(path: str) -> int:
+    import fitz  # PyMuPDF
+
+    with fitz.open(path) as doc:
+        return doc.page_count
+
+
+def extract_page_range(path: str, start: int, end: int) -> list[str]:
+    """Cleaned text of pages [start, end), one string per page.
+
+    PyMuPDF (fitz) is the fastest Python PDF library — 10x faster
+    than PyPDF2, supports OCR fallback via Tesseract if needed.
+    """
+    import fitz  # PyMuPDF
+
+    with fitz.open(path) as doc:
+        return [
+            clean_pdf_text(page.get_text("text"))
+            for page in doc.pages(start, end)
+        ]
+
+
+def split_page_range(
+    start: int,
+    end: int,
+    parts: int,
+    min_pages: int = MIN_PAGES_PER_TASK,
+) -> list[tuple[int, int]]:
+    """Split [start, end) into at most ``parts`` contiguous sub-ranges."""
+    size = max(min_pages, -(-(end - start) // max(parts, 1)))
+    return [(s, min(s + size, end)) for s in range(start, end, size)]
+
+
+def _spool(file_bytes: bytes) -> str:
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        f.write(file_bytes)
+        return f.name
+
+
+# ---------------------------------------------------------------------------
+# Service
+# ---------------------------------------------------------------------------
+
+class SpooledPDF:
+    """A PDF spooled to disk for the extraction workers."""
+
+    def __init__(
+        self, service: "PDFExtractionService", path: str, page_count: int,
+    ) -> None:
+        self._service = service
+        self.path = path
+        self.page_count = page_count
+
+    async def extract(self, start: int = 0, end: int | None = None) -> list[str]:
+        """Page texts of [start, end), in page order (blank pages as "")."""
+        end = self.page_count if end is None else min(end, self.page_count)
+        if start >= end:
+            return []
+        return await self._service.extract_path(self.path, start, end)
+
+
+class PDFExtractionService:
+    """Extracts PDF page text on a process pool, off the event loop."""
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        self._max_workers = max_workers or min(
+            MAX_EXTRACTION_WORKERS, os.cpu_count() or 1,
+        )
+        self._executor: Executor | None = None
+
+    @property
+    def executor(self) -> Executor:
+        """Lazy-init the pool.
+
+        Celery prefork children are daemonic and may not start processes
+        of their own; there extraction falls back to threads (still off
+        the event loop, just not parallel across cores).
+        """
+        if self._executor is None:
+            if multiprocessing.current_process().daemon:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix="pdf-extract",
+                )
+            else:
+                # spawn, not fork: the API process runs threads
+                # (DB/HTTP pools) that must not be forked mid-lock.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+        return self._executor
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, fn, *args)
+
+    @asynccontextmanager
+    async def open(self, file_bytes: bytes) -> AsyncIterator[SpooledPDF]:
+        """Spool a PDF to a temp file for the duration of the block."""
+        path = await asyncio.to_thread(_spool, file_bytes)
+        try:
+            page_count = await self._run(count_pdf_pages, path)
+            yield SpooledPDF(self, path, page_count)
+        finally:
+            os.unlink(path)
+
+    async def extract_pages(
+        self, file_bytes: bytes, start: int = 0, end: int | None = None,
+    ) -> list[str]:
+        """One-shot extraction of pages [start, end) of a PDF."""
+        async with self.open(file_bytes) as pdf:
+            return await pdf.extract(start, end)
+
+    async def extract_path(self, path: str, start: int, end: int) -> list[str]:
+        """Extract [start, end) of a spooled PDF in parallel sub-ranges."""
+        parts = await asyncio.gather(*(
+            self._run(extract_page_range, path, s, e)
+            for s, e in split_page_range(start, end, self._max_workers)
+        ))
+        return [page for part in parts for page in part]
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# ---------------------------------------------------------------------------
+# Singleton
+# ---------------------------------------------------------------------------
+
+_extraction_service: PDFExtractionService | None = None
+
+
+def get_pdf_extraction_service() -> PDFExtractionService:
+    """Process-wide extraction service (the pool starts on first use)."""
+    global _extraction_service
+    if _extraction_service is None:
+        _extraction_service = PDFExtractionService()
+    return _extraction_service
+
+
+def shutdown_pdf_extraction_service() -> None:
+    if _extraction_service is not None:
+        _extraction_service.shutdown()
@@ -4,35 +4,90 @@ Main entry point for the content ingestion pipeline. Processes uploaded
 medical PDFs into searchable, embedded chunks in the MedicalContent table.
 
 Pipeline:
-    PDF bytes → PyMuPDF text extraction → MedicalTextChunker (500-800 tokens,
-    100 overlap) → MetadataExtractor (Haiku classification) →
-    OpenAI text-embedding-3-large (1536 dims) → MedicalContent INSERT
-    (with content_hash deduplication).
+    PDF bytes → PyMuPDF text extraction (process pool) →
+    MedicalTextChunker (500-800 tokens, 100 overlap) →
+    content_hash + MinHash near-duplicate filter →
+    MetadataExtractor (Haiku classification) →
+    OpenAI text-embedding-3-large (1536 dims) → MedicalContent INSERT.
+
+The stages run concurrently over page ranges connected by small queues,
+so a 1,500-page textbook never holds more than a few ranges of text,
+chunks and embeddings at once. Every range is committed with an
+IngestionCheckpoint; re-ingesting the same file resumes after the last
+committed range.
+
+A new edition of a document is ingested against the one it replaces
+(previous_document_id): chunks whose content hash is unchanged keep
+their stored row, embedding and classification and are moved to the
+new version; only new chunks are classified and embedded, and chunks
+the new edition dropped are soft-retired in one UPDATE at the end.
+
+Classification runs online (packed, concurrent Haiku calls) by default.
+With offline_classification=True the chunks are stored immediately with
+placeholder metadata marked "pending" and classified through the Message
+Batches API, one job per OFFLINE_BATCH_CHUNKS new chunks (ranges wait
+for their job before being stored); ai.apply_offline_classification
+writes the results back.
 
 Without this pipeline, the RAG engine has no content to search.
 """
 
+import asyncio
 import hashlib
 import logging
-from dataclasses import dataclass
+from collections import deque
+from itertools import islice
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
 from typing import Any
 from uuid import UUID, uuid4
 
 from openai import AsyncOpenAI
-from sqlalchemy import func, select
+from sqlalchemy import func, select, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.engines.ai.dedup_index import Fingerprint
 from app.engines.ai.gateway import AIGateway
-from app.engines.ai.ingestion.chunker import MedicalTextChunker
-from app.engines.ai.ingestion.metadata_extractor import MetadataExtractor
-from app.engines.ai.models import MedicalContent
-from app.engines.ai.rag.semantic_search import (
-    EMBEDDING_DIMENSIONS,
-    EMBEDDING_MODEL,
+from app.engines.ai.ingestion.chunker import MedicalTextChunker, TextChunk
+from app.engines.ai.ingestion.embedder import ChunkEmbedder
+from app.engines.ai.ingestion.metadata_extractor import (
+    CLASSIFY_MAX_CONCURRENCY,
+    ChunkMetadata,
+    MetadataExtractor,
 )
+from app.engines.ai.ingestion.near_duplicates import (
+    find_near_duplicates,
+    fingerprint_chunks,
+    release_orphaned_duplicates,
+)
+from app.engines.ai.ingestion.pdf_extraction import (
+    PDFExtractionService,
+    SpooledPDF,
+    get_pdf_extraction_service,
+)
+from app.engines.ai.models import IngestionCheckpoint, MedicalContent
+from app.shared.exceptions import NotFoundException
 
 logger = logging.getLogger(__name__)
 
+# Pages per pipeline item and per checkpoint commit.
+PAGE_RANGE_SIZE = 16
+# Items buffered between two stages; bounds memory to a few page ranges.
+STAGE_QUEUE_DEPTH = 2
+# Page ranges embedded at once; the embedder's limiter decides how many
+# of their requests actually run concurrently.
+EMBED_STAGE_CONCURRENCY = 4
+# Page ranges classified at once. A range fills only a couple of packed
+# calls, so the classify stage needs several ranges in flight to reach
+# CLASSIFY_MAX_CONCURRENCY calls; the calls are split between them.
+CLASSIFY_STAGE_CONCURRENCY = 4
+# Offline classification collects ranges until this many new chunks are
+# waiting, then submits them as one Message Batches job.
+OFFLINE_BATCH_CHUNKS = 2_000
+# A trailing paragraph longer than this is chunked rather than carried
+# into the next page range.
+MAX_CARRY_CHARS = 20_000
+
 
 # ---------------------------------------------------------------------------
 # Result data classes
@@ -49,6 +104,12 @@ class IngestionResult:
     chunks_skipped_duplicate: int
     pages_extracted: int
     source_type: str
+    classification_batch_ids: list[str] = field(default_factory=list)
+    version: int = 1
+    previous_document_id: UUID | None = None
+    chunks_reused: int = 0
+    chunks_retired: int = 0
+    chunks_skipped_near_duplicate: int = 0
 
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -57,8 +118,17 @@ class IngestionResult:
             "total_chunks": self.total_chunks,
             "chunks_stored": self.chunks_stored,
             "chunks_skipped_duplicate": self.chunks_skipped_duplicate,
+            "chunks_skipped_near_duplicate": self.chunks_skipped_near_duplicate,
             "pages_extracted": self.pages_extracted,
             "source_type": self.source_type,
+            "classification_batch_ids": self.classification_batch_ids,
+            "version": self.version,
+            "previous_document_id": (
+                str(self.previous_document_id)
+                if self.previous_document_id else None
+            ),
+            "chunks_reused": self.chunks_reused,
+            "chunks_retired": self.chunks_retired,
         }
 
 
@@ -84,6 +154,168 @@ class ContentStats:
         }
 
 
+# ---------------------------------------------------------------------------
+# Streaming pipeline plumbing
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True, slots=True)
+class _StoredChunk:
+    """The parts of an existing MedicalContent row dedupe decides on."""
+
+    id: UUID
+    parent_document_id: UUID | None
+    college_id: UUID | None
+    is_active: bool
+    metadata: dict[str, Any]
+
+    @property
+    def retired(self) -> bool:
+        return not self.is_active and "retired_by_document_id" in self.metadata
+
+
+@dataclass(slots=True)
+class _PageRange:
+    """One page range as it moves through the ingestion stages."""
+
+    start_page: int
+    end_page: int
+    pages: list[str]
+    pages_extracted: int = 0
+    chunks: list[TextChunk] = field(default_factory=list)
+    skipped: int = 0
+    near_duplicates: int = 0
+    fingerprints: list[Fingerprint] = field(default_factory=list)
+    # Unchanged chunks whose stored rows move to this version.
+    reused: list[tuple[TextChunk, _StoredChunk]] = field(default_factory=list)
+    metadata: list[ChunkMetadata] = field(default_factory=list)
+    extras: list[dict[str, Any]] = field(default_factory=list)
+    embeddings: list[list[float]] = field(default_factory=list)
+    batch_id: str | None = None
+    # Chunker state after this range, persisted with its checkpoint.
+    carry: str = ""
+    next_chunk_index: int = 0
+    char_offset: int = 0
+
+
+def _partition_chunks(
+    chunks: list[TextChunk],
+    stored: dict[str, _StoredChunk],
+    in_flight: set[str],
+    *,
+    college_id: UUID | None,
+    previous_document_id: UUID | None,
+) -> tuple[list[TextChunk], list[tuple[TextChunk, _StoredChunk]]]:
+    """Split chunks into (new, reused); the rest are duplicates.
+
+    A stored chunk in the same scope is reused when it is an active chunk
+    of the previous version, or was retired by an earlier version (an
+    edition restoring text a previous one dropped). Any other stored hash is a
+    duplicate, as is a hash already in flight. Accepted hashes are added
+    to in_flight.
+    """
+    fresh: list[TextChunk] = []
+    reused: list[tuple[TextChunk, _StoredChunk]] = []
+    for c in chunks:
+        if c.content_hash in in_flight:
+            continue
+        row = stored.get(c.content_hash)
+        if row is None:
+            fresh.append(c)
+        elif row.college_id == college_id and (
+            row.retired
+            or (
+                row.is_active
+                and previous_document_id is not None
+                and row.parent_document_id == previous_document_id
+            )
+        ):
+            reused.append((c, row))
+        else:
+            continue
+        in_flight.add(c.content_hash)
+    return fresh, reused
+
+
+def _split_carry(text: str, *, final: bool) -> tuple[str, str]:
+    """Split text into (head to chunk now, trailing paragraph to carry).
+
+    A page range usually ends mid-paragraph; carrying the last paragraph
+    into the next range keeps the chunker from cutting it in two.
+    """
+    if final:
+        return text, ""
+    cut = text.rfind("\n\n")
+    if cut <= 0 or len(text) - cut > MAX_CARRY_CHARS:
+        return text, ""
+    return text[:cut], text[cut + 2:]
+
+
+async def _pipe(
+    inbox: asyncio.Queue,
+    outbox: asyncio.Queue | None,
+    work: Callable[[Any], Awaitable[Any]],
+    concurrency: int = 1,
+) -> None:
+    """Run work over inbox items until the None sentinel, forwarding it.
+
+    With concurrency > 1 up to that many items are worked on at once;
+    results are still forwarded in input order.
+    """
+    running: deque[asyncio.Task] = deque()
+
+    async def forward(task: asyncio.Task) -> None:
+        result = await task
+        if outbox is not None:
+            await outbox.put(result)
+
+    try:
+        while (item := await inbox.get()) is not None:
+            running.append(asyncio.create_task(work(item)))
+            if len(running) >= concurrency:
+                await forward(running.popleft())
+        while running:
+            await forward(running.popleft())
+    finally:
+        for task in running:
+            task.cancel()
+    if outbox is not None:
+        await outbox.put(None)
+
+
+async def _pipe_grouped(
+    inbox: asyncio.Queue,
+    outbox: asyncio.Queue,
+    work: Callable[[list[Any]], Awaitable[None]],
+    *,
+    size: Callable[[Any], int],
+    limit: int,
+) -> None:
+    """Run work over groups of inbox items, forwarding them in order.
+
+    Items are collected until their total size reaches limit (or the None
+    sentinel arrives); work then updates the whole group in place before
+    its items are forwarded.
+    """
+    group: list[Any] = []
+    total = 0
+
+    async def flush() -> None:
+        nonlocal group, total
+        if group:
+            await work(group)
+            for item in group:
+                await outbox.put(item)
+        group, total = [], 0
+
+    while (item := await inbox.get()) is not None:
+        group.append(item)
+        total += size(item)
+        if total >= limit:
+            await flush()
+    await flush()
+    await outbox.put(None)
+
+
 # ---------------------------------------------------------------------------
 # MedicalContentIngester
 # ---------------------------------------------------------------------------
@@ -99,11 +331,16 @@ class MedicalContentIngester:
         self,
         openai_api_key: str,
         gateway: AIGateway,
+        extraction: PDFExtractionService | None = None,
     ) -> None:
-        self._openai = AsyncOpenAI(api_key=openai_api_key)
+        # Retries are left to ChunkEmbedder, which also adapts its
+        # concurrency to the 429s the client would otherwise hide.
+        self._openai = AsyncOpenAI(api_key=openai_api_key, max_retries=0)
+        self._embedder = ChunkEmbedder(self._openai)
         self._gateway = gateway
         self._chunker = MedicalTextChunker()
         self._extractor = MetadataExtractor(gateway)
+        self._extraction = extraction or get_pdf_extraction_service()
 
     # ------------------------------------------------------------------
     # Main pipeline
@@ -116,246 +353,738 @@ class MedicalContentIngester:
         filename: str,
         college_id: UUID | None = None,
         source_type: str = "textbook",
+        offline_classification: bool = False,
+        previous_document_id: UUID | None = None,
     ) -> IngestionResult:
         """Process a PDF file through the full ingestion pipeline.
 
+        The document streams through bounded stages (extract → chunk →
+        dedupe → classify → embed → insert) PAGE_RANGE_SIZE pages at a
+        time, so memory stays flat regardless of page count. Each page
+        range is committed together with its IngestionCheckpoint;
+        uploading the same file again after a crash resumes at the first
+        unfinished range.
+
         Args:
-            db: Database session (must be committed by the caller).
+            db: Database session. Page ranges are committed as they
+                finish; the caller commits the final checkpoint update.
             file_bytes: Raw PDF bytes.
             filename: Original filename for reference.
             college_id: None for platform-wide, UUID for college-specific.
             source_type: Content type (textbook, lecture_notes, guidelines, etc.)
+            offline_classification: Classify via the Batch API (50% cheaper,
+                results within 24h). The caller must enqueue
+                ai.apply_offline_classification for each batch after
+                committing.
+            previous_document_id: Document this upload is a new version
+                of. Unchanged chunks are carried over without being
+                classified or embedded again, and chunks it no longer
+                contains are retired (is_active=False).
 
         Returns:
             IngestionResult with chunk counts and document ID.
         """
-        document_id = uuid4()
-
-        # Step 1: Extract text from PDF
         logger.info("Ingesting PDF: %s (%d bytes)", filename, len(file_bytes))
-        pages = self._extract_pdf_text(file_bytes)
-        full_text = "\n\n".join(pages)
-
-        if not full_text.strip():
-            logger.warning("No text extracted from PDF: %s", filename)
-            return IngestionResult(
-                document_id=document_id,
+        async with self._extraction.open(file_bytes) as pdf:
+            checkpoint = await self._load_checkpoint(
+                db,
+                file_hash=hashlib.sha256(file_bytes).hexdigest(),
                 filename=filename,
-                total_chunks=0,
-                chunks_stored=0,
-                chunks_skipped_duplicate=0,
-                pages_extracted=0,
+                college_id=college_id,
                 source_type=source_type,
+                total_pages=pdf.page_count,
+                previous_document_id=previous_document_id,
+            )
+            if checkpoint.pages_done:
+                logger.info(
+                    "Resuming %s at page %d/%d",
+                    filename, checkpoint.pages_done, pdf.page_count,
+                )
+
+            await self._run_pipeline(
+                db,
+                pdf,
+                checkpoint,
+                offline_classification=offline_classification,
             )
 
+        if not checkpoint.pages_extracted:
+            logger.warning("No text extracted from PDF: %s", filename)
+
+        # Rows were stored with the running chunk count; the document's
+        # total is only known now.
+        await db.execute(
+            update(MedicalContent)
+            .where(MedicalContent.parent_document_id == checkpoint.document_id)
+            .values(total_chunks=checkpoint.next_chunk_index)
+        )
+        retired = await self._retire_previous_version(db, checkpoint)
+        checkpoint.status = "complete"
+        await db.flush()
         logger.info(
-            "Extracted %d pages, %d chars from %s",
-            len(pages), len(full_text), filename,
+            "Stored %d chunks for %s v%d (reused %d, retired %d, "
+            "skipped %d duplicates, %d near-duplicates)",
+            checkpoint.chunks_stored, filename, checkpoint.version,
+            checkpoint.chunks_reused, retired, checkpoint.chunks_skipped,
+            checkpoint.chunks_near_duplicate,
         )
 
-        # Step 2: Chunk the text
-        chunks = self._chunker.chunk_text(
-            full_text, document_title=filename,
+        return IngestionResult(
+            document_id=checkpoint.document_id,
+            filename=filename,
+            total_chunks=checkpoint.next_chunk_index,
+            chunks_stored=checkpoint.chunks_stored,
+            chunks_skipped_duplicate=checkpoint.chunks_skipped,
+            pages_extracted=checkpoint.pages_extracted,
+            source_type=source_type,
+            classification_batch_ids=list(checkpoint.classification_batch_ids),
+            version=checkpoint.version,
+            previous_document_id=checkpoint.previous_document_id,
+            chunks_reused=checkpoint.chunks_reused,
+            chunks_retired=retired,
+            chunks_skipped_near_duplicate=checkpoint.chunks_near_duplicate,
         )
-        total_chunks = len(chunks)
-        logger.info("Created %d chunks from %s", total_chunks, filename)
 
-        # Step 3: Check for duplicates (by content_hash)
-        existing_hashes = await self._get_existing_hashes(
-            db, [c.content_hash for c in chunks],
-        )
+    async def _run_pipeline(
+        self,
+        db: AsyncSession,
+        pdf: SpooledPDF,
+        checkpoint: IngestionCheckpoint,
+        *,
+        offline_classification: bool,
+    ) -> None:
+        """Stream the unfinished page ranges through the stage queues.
+
+        Stages run concurrently and hand _PageRange items over queues of
+        STAGE_QUEUE_DEPTH, so a slow stage (usually classify or embed)
+        blocks the ones upstream of it instead of letting pages pile up.
+        The classify and embed stages work on CLASSIFY_STAGE_CONCURRENCY
+        and EMBED_STAGE_CONCURRENCY ranges at once (forwarded in page
+        order), so inserting one range overlaps the work on the next ones.
+        Offline classification instead holds ranges back until
+        OFFLINE_BATCH_CHUNKS new chunks can go out as one Batch API job.
+        Stages touching the session hold the gateway's session lock.
+        """
+        lock = self._gateway.session_lock(db)
+        tenant = await self._current_tenant(db)
+        filename = checkpoint.filename
+        total_pages = checkpoint.total_pages
+        # Use the actual college_id for budget tracking; fall back to a
+        # zero UUID for platform-wide content.
+        classify_college = checkpoint.college_id or UUID(int=0)
+
+        # Chunker state, advanced in page order by the chunk stage.
+        carry = checkpoint.carry_text
+        chunk_index = checkpoint.next_chunk_index
+        char_offset = checkpoint.char_offset
+        # Hashes past dedupe but not yet committed (bounded by the
+        # pipeline depth), so repeats across adjacent ranges are caught.
+        in_flight: set[str] = set()
+        # Fingerprints of new chunks past dedupe but not yet committed,
+        # for near-duplicates across adjacent ranges.
+        pending: dict[str, tuple[Fingerprint, str]] = {}
+
+        async def extract(outbox: asyncio.Queue) -> None:
+            for start in range(checkpoint.pages_done, total_pages, PAGE_RANGE_SIZE):
+                end = min(start + PAGE_RANGE_SIZE, total_pages)
+                # Blank pages are dropped, as the chunker has nothing
+                # to do with them.
+                pages = [p for p in await pdf.extract(start, end) if p]
+                await outbox.put(_PageRange(start, end, pages))
+            await outbox.put(None)
+
+        async def chunk(batch: _PageRange) -> _PageRange:
+            nonlocal carry, chunk_index, char_offset
+            text = "\n\n".join(p for p in (carry, *batch.pages) if p)
+            head, carry = _split_carry(text, final=batch.end_page == total_pages)
+            batch.chunks = self._chunker.chunk_text(head, document_title=filename)
+            for c in batch.chunks:
+                c.chunk_index += chunk_index
+                c.start_char += char_offset
+                c.end_char += char_offset
+            chunk_index += len(batch.chunks)
+            if head:
+                char_offset += len(head) + 2
+            batch.carry = carry
+            batch.next_chunk_index = chunk_index
+            batch.char_offset = char_offset
+            batch.pages_extracted = len(batch.pages)
+            batch.pages = []
+            return batch
+
+        async def dedupe(batch: _PageRange) -> _PageRange:
+            async with lock:
+                stored = await self._get_stored_chunks(
+                    db, [c.content_hash for c in batch.chunks],
+                )
+            fresh, batch.reused = _partition_chunks(
+                batch.chunks,
+                stored,
+                in_flight,
+                college_id=checkpoint.college_id,
+                previous_document_id=checkpoint.previous_document_id,
+            )
+            batch.skipped = len(batch.chunks) - len(fresh) - len(batch.reused)
+            batch.chunks = fresh
+            if fresh:
+                await self._drop_near_duplicates(
+                    db, lock, batch, checkpoint, pending,
+                )
+                kept = {c.content_hash for c in batch.chunks}
+                in_flight.difference_update(
+                    c.content_hash for c in fresh if c.content_hash not in kept
+                )
+            return batch
+
+        async def classify(batch: _PageRange) -> _PageRange:
+            if batch.chunks:
+                batch.metadata = await self._extractor.classify_chunks_batch(
+                    db,
+                    [(c.content, filename) for c in batch.chunks],
+                    classify_college,
+                    max_concurrency=max(
+                        1, CLASSIFY_MAX_CONCURRENCY // CLASSIFY_STAGE_CONCURRENCY,
+                    ),
+                )
+                batch.extras = [{} for _ in batch.chunks]
+            return batch
+
+        async def classify_offline(group: list[_PageRange]) -> None:
+            chunks = [c for batch in group for c in batch.chunks]
+            if not chunks:
+                return
+            first_page = group[0].start_page
+            batch_id, assignments = await self._extractor.submit_offline(
+                db,
+                [(c.content, filename) for c in chunks],
+                classify_college,
+                custom_id_prefix=f"{checkpoint.document_id.hex}-p{first_page}",
+            )
+            pending = iter(assignments)
+            for batch in group:
+                if not batch.chunks:
+                    continue
+                batch.batch_id = batch_id
+                batch.metadata = [
+                    ChunkMetadata(subject="Other", topic="Unclassified")
+                    for _ in batch.chunks
+                ]
+                batch.extras = [
+                    {
+                        "classification": {
+                            "status": "pending",
+                            "batch_id": batch_id,
+                            "custom_id": custom_id,
+                            "position": position,
+                        },
+                    }
+                    for custom_id, position in islice(
+                        pending, len(batch.chunks),
+                    )
+                ]
+
+        async def embed(batch: _PageRange) -> _PageRange:
+            if batch.chunks:
+                batch.embeddings = await self._embed_chunks(batch.chunks)
+            return batch
+
+        async def insert(batch: _PageRange) -> None:
+            records = [
+                self._build_record(
+                    chunk,
+                    metadata,
+                    embedding,
+                    extra,
+                    fp,
+                    checkpoint=checkpoint,
+                    total_chunks=batch.next_chunk_index,
+                )
+                for chunk, metadata, embedding, extra, fp in zip(
+                    batch.chunks, batch.metadata, batch.embeddings,
+                    batch.extras, batch.fingerprints, strict=True,
+                )
+            ]
+            reused = [
+                self._reuse_values(
+                    chunk,
+                    row,
+                    checkpoint=checkpoint,
+                    total_chunks=batch.next_chunk_index,
+                )
+                for chunk, row in batch.reused
+            ]
+            async with lock:
+                db.add_all(records)
+                if reused:
+                    # Bulk UPDATE by primary key, one executemany
+                    await db.execute(update(MedicalContent), reused)
+                checkpoint.pages_done = batch.end_page
+                checkpoint.pages_extracted += batch.pages_extracted
+                checkpoint.next_chunk_index = batch.next_chunk_index
+                checkpoint.char_offset = batch.char_offset
+                checkpoint.carry_text = batch.carry
+                checkpoint.chunks_stored += len(records)
+                checkpoint.chunks_skipped += batch.skipped
+                checkpoint.chunks_reused += len(reused)
+                checkpoint.chunks_near_duplicate += batch.near_duplicates
+                if batch.batch_id and batch.batch_id not in (
+                    checkpoint.classification_batch_ids
+                ):
+                    checkpoint.classification_batch_ids = [
+                        *checkpoint.classification_batch_ids, batch.batch_id,
+                    ]
+                await db.commit()
+                await self._restore_tenant(db, tenant)
+                # Committed rows are not needed again; keep the identity
+                # map from growing with the document.
+                for record in records:
+                    db.expunge(record)
+            in_flight.difference_update(c.content_hash for c in batch.chunks)
+            for c in batch.chunks:
+                pending.pop(c.content_hash, None)
+            in_flight.difference_update(c.content_hash for c, _ in batch.reused)
+            logger.debug(
+                "Committed pages %d-%d of %s (%d new, %d reused chunks)",
+                batch.start_page + 1, batch.end_page, filename,
+                len(records), len(reused),
+            )
 
-        # Step 4: Process non-duplicate chunks
-        new_chunks = [
-            c for c in chunks if c.content_hash not in existing_hashes
+        queues: list[asyncio.Queue] = [
+            asyncio.Queue(STAGE_QUEUE_DEPTH) for _ in range(5)
         ]
-        skipped = total_chunks - len(new_chunks)
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(extract(queues[0]))
+                for inbox, outbox, work in zip(
+                    queues, queues[1:3], (chunk, dedupe),
+                ):
+                    tg.create_task(_pipe(inbox, outbox, work))
+                if offline_classification:
+                    tg.create_task(_pipe_grouped(
+                        queues[2], queues[3], classify_offline,
+                        size=lambda batch: len(batch.chunks),
+                        limit=OFFLINE_BATCH_CHUNKS,
+                    ))
+                else:
+                    tg.create_task(_pipe(
+                        queues[2], queues[3], classify,
+                        concurrency=CLASSIFY_STAGE_CONCURRENCY,
+                    ))
+                tg.create_task(_pipe(
+                    queues[3], queues[4], embed,
+                    concurrency=EMBED_STAGE_CONCURRENCY,
+                ))
+                tg.create_task(_pipe(queues[-1], None, insert))
+        except ExceptionGroup as group:
+            await self._gateway.drain(db)
+            raise group.exceptions[0] from None
 
-        if not new_chunks:
-            logger.info("All %d chunks already exist, skipping", total_chunks)
-            return IngestionResult(
-                document_id=document_id,
-                filename=filename,
-                total_chunks=total_chunks,
-                chunks_stored=0,
-                chunks_skipped_duplicate=skipped,
-                pages_extracted=len(pages),
-                source_type=source_type,
+    @staticmethod
+    async def _load_checkpoint(
+        db: AsyncSession,
+        *,
+        file_hash: str,
+        filename: str,
+        college_id: UUID | None,
+        source_type: str,
+        total_pages: int,
+        previous_document_id: UUID | None,
+    ) -> IngestionCheckpoint:
+        """Resume the unfinished ingestion of this file, or start one."""
+        result = await db.execute(
+            select(IngestionCheckpoint)
+            .where(
+                IngestionCheckpoint.file_hash == file_hash,
+                IngestionCheckpoint.college_id.is_not_distinct_from(college_id),
+                IngestionCheckpoint.source_type == source_type,
+                IngestionCheckpoint.previous_document_id.is_not_distinct_from(
+                    previous_document_id,
+                ),
+                IngestionCheckpoint.status == "in_progress",
             )
-
-        # Step 5: Classify metadata via Haiku
-        # Use the actual college_id for budget tracking; fall back to a
-        # zero UUID for platform-wide content.
-        classify_college = college_id or UUID(int=0)
-        metadata_list = await self._extractor.classify_chunks_batch(
-            db,
-            [(c.content, filename) for c in new_chunks],
-            classify_college,
+            .order_by(IngestionCheckpoint.created_at.desc())
+            .limit(1)
         )
+        checkpoint = result.scalar_one_or_none()
+        if checkpoint is not None:
+            return checkpoint
+
+        version = 1
+        if previous_document_id is not None:
+            version = await MedicalContentIngester._next_version(
+                db, previous_document_id, college_id,
+            )
 
-        # Step 6: Generate embeddings
-        embeddings = await self._embed_chunks(
-            [c.content for c in new_chunks],
+        checkpoint = IngestionCheckpoint(
+            id=uuid4(),
+            college_id=college_id,
+            file_hash=file_hash,
+            document_id=uuid4(),
+            previous_document_id=previous_document_id,
+            version=version,
+            filename=filename,
+            source_type=source_type,
+            status="in_progress",
+            total_pages=total_pages,
+            pages_done=0,
+            pages_extracted=0,
+            next_chunk_index=0,
+            char_offset=0,
+            carry_text="",
+            chunks_stored=0,
+            chunks_skipped=0,
+            chunks_reused=0,
+            chunks_near_duplicate=0,
+            classification_batch_ids=[],
         )
+        db.add(checkpoint)
+        return checkpoint
 
-        # Step 7: Store in MedicalContent table
-        stored = 0
-        for chunk, metadata, embedding in zip(
-            new_chunks, metadata_list, embeddings, strict=True,
-        ):
-            record = MedicalContent(
-                id=uuid4(),
-                college_id=college_id,
-                source_type=source_type,
-                title=self._build_chunk_title(filename, chunk),
-                content=chunk.content,
-                content_hash=chunk.content_hash,
-                embedding=embedding,
-                chunk_index=chunk.chunk_index,
-                total_chunks=total_chunks,
-                parent_document_id=document_id,
-                metadata_={
-                    "book": filename,
-                    "chapter": chunk.heading or "",
-                    "subject": metadata.subject,
-                    "topic": metadata.topic,
-                    "blooms_level": metadata.blooms_level,
-                    "organ_system": metadata.organ_system or "",
-                    "content_type": metadata.content_type,
-                    "key_terms": metadata.key_terms or [],
-                    "start_char": chunk.start_char,
-                    "end_char": chunk.end_char,
-                    "estimated_tokens": chunk.estimated_tokens,
-                },
-                source_reference=filename,
-                medical_entity_type=metadata.medical_entity_type,
-                is_active=True,
+    @staticmethod
+    async def _next_version(
+        db: AsyncSession,
+        previous_document_id: UUID,
+        college_id: UUID | None,
+    ) -> int:
+        """Version number following previous_document_id, if it is in scope."""
+        result = await db.execute(
+            select(func.count())
+            .select_from(MedicalContent)
+            .where(
+                MedicalContent.parent_document_id == previous_document_id,
+                MedicalContent.college_id.is_not_distinct_from(college_id),
+                MedicalContent.is_active.is_(True),
             )
-            db.add(record)
-            stored += 1
+        )
+        if not result.scalar():
+            raise NotFoundException("Document", str(previous_document_id))
 
-        await db.flush()
-        logger.info(
-            "Stored %d chunks for %s (skipped %d duplicates)",
-            stored, filename, skipped,
+        # Documents ingested before versioning have no checkpoint: v1.
+        result = await db.execute(
+            select(func.max(IngestionCheckpoint.version)).where(
+                IngestionCheckpoint.document_id == previous_document_id,
+            )
         )
+        return (result.scalar() or 1) + 1
 
-        return IngestionResult(
-            document_id=document_id,
-            filename=filename,
-            total_chunks=total_chunks,
-            chunks_stored=stored,
-            chunks_skipped_duplicate=skipped,
-            pages_extracted=len(pages),
-            source_type=source_type,
+    @staticmethod
+    async def _current_tenant(db: AsyncSession) -> str:
+        result = await db.execute(
+            text("SELECT current_setting('app.current_college_id', true)")
         )
+        return result.scalar() or ""
+
+    @staticmethod
+    async def _restore_tenant(db: AsyncSession, tenant: str) -> None:
+        """Re-apply the RLS context; a commit may hand back a new connection."""
+        if tenant:
+            await db.execute(
+                text("SELECT set_config('app.current_college_id', :cid, false)"),
+                {"cid": tenant},
+            )
 
     # ------------------------------------------------------------------
-    # PDF text extraction
+    # Offline classification
     # ------------------------------------------------------------------
 
-    def _extract_pdf_text(self, file_bytes: bytes) -> list[str]:
-        """Extract text from PDF using PyMuPDF.
-
-        Returns a list of strings, one per page.
-        PyMuPDF (fitz) is the fastest Python PDF library — 10x faster
-        than PyPDF2, supports OCR fallback via Tesseract if needed.
+    async def apply_offline_classification(
+        self,
+        db: AsyncSession,
+        *,
+        batch_id: str,
+        document_id: UUID,
+        college_id: UUID | None,
+        give_up: bool = False,
+    ) -> int | None:
+        """Write Batch API classifications back onto a document's chunks.
+
+        Returns the number of chunks updated, or None while the batch is
+        still processing. Chunks the batch could not classify are
+        classified online instead — with ``give_up`` (the poller's last
+        attempt), so is every chunk of a batch that has not ended, rather
+        than leaving them pending for good.
         """
-        import fitz  # PyMuPDF
-
-        pages: list[str] = []
+        result = await db.execute(
+            select(MedicalContent).where(
+                # Matched by batch, not document: a chunk reused by a newer
+                # version changes document while still pending.
+                MedicalContent.metadata_.contains(
+                    {"classification": {"batch_id": batch_id}},
+                ),
+            )
+        )
+        rows = [
+            r for r in result.scalars()
+            if (r.metadata_ or {}).get("classification", {}).get("batch_id")
+            == batch_id
+            and r.metadata_["classification"].get("status") == "pending"
+        ]
+        if not rows:
+            return 0
 
-        with fitz.open(stream=file_bytes, filetype="pdf") as doc:
-            for page in doc:
-                text = page.get_text("text")
-                # Clean up common PDF artifacts
-                text = self._clean_pdf_text(text)
-                if text.strip():
-                    pages.append(text)
+        classify_college = college_id or UUID(int=0)
+        pack_sizes: dict[str, int] = {}
+        for r in rows:
+            info = r.metadata_["classification"]
+            pack_sizes[info["custom_id"]] = max(
+                pack_sizes.get(info["custom_id"], 0), info["position"] + 1,
+            )
+        results = await self._extractor.fetch_offline(
+            db, batch_id, classify_college, pack_sizes,
+        )
+        if results is None:
+            if not give_up:
+                return None
+            logger.warning(
+                "Batch %s has not ended — classifying %d chunks online",
+                batch_id, len(rows),
+            )
+            results = {}
+
+        resolved: list[tuple[MedicalContent, ChunkMetadata | None]] = []
+        for r in rows:
+            info = r.metadata_["classification"]
+            pack = results.get(info["custom_id"])
+            resolved.append((r, pack[info["position"]] if pack else None))
+
+        missing = [r for r, metadata in resolved if metadata is None]
+        if missing:
+            fallback = iter(await self._extractor.classify_chunks_batch(
+                db,
+                [(r.content, r.source_reference) for r in missing],
+                classify_college,
+            ))
+            resolved = [
+                (r, metadata or next(fallback)) for r, metadata in resolved
+            ]
 
-        return pages
+        for r, metadata in resolved:
+            r.metadata_ = {
+                **r.metadata_,
+                "subject": metadata.subject,
+                "topic": metadata.topic,
+                "blooms_level": metadata.blooms_level,
+                "organ_system": metadata.organ_system or "",
+                "content_type": metadata.content_type,
+                "key_terms": metadata.key_terms or [],
+                "classification": {"status": "done", "batch_id": batch_id},
+            }
+            r.medical_entity_type = metadata.medical_entity_type
 
-    @staticmethod
-    def _clean_pdf_text(text: str) -> str:
-        """Clean common PDF extraction artifacts."""
-        import re
-
-        # Remove excessive whitespace but preserve paragraph breaks
-        text = re.sub(r"[ \t]+", " ", text)
-        # Normalize line breaks (PDF often has many single newlines)
-        text = re.sub(r"\n{3,}", "\n\n", text)
-        # Remove page headers/footers (common patterns)
-        text = re.sub(
-            r"^\s*(?:Page\s+\d+|\d+\s*$)",
-            "",
-            text,
-            flags=re.MULTILINE,
+        await db.flush()
+        logger.info(
+            "Applied batch %s classifications to %d chunks of document %s",
+            batch_id, len(resolved), document_id,
         )
-        return text.strip()
+        return len(resolved)
 
     # ------------------------------------------------------------------
     # Embedding generation
     # ------------------------------------------------------------------
 
     async def _embed_chunks(
-        self, texts: list[str]
+        self, chunks: list[TextChunk]
     ) -> list[list[float]]:
         """Generate embeddings for multiple text chunks.
 
-        Uses OpenAI batch embedding API — up to 2048 inputs per call.
-        text-embedding-3-large with dimensions=1536 for Neon pgvector
-        2000-dim index limit compatibility.
+        Token-sized batches run concurrently under ChunkEmbedder's
+        adaptive limit. text-embedding-3-large with dimensions=1536 for
+        Neon pgvector 2000-dim index limit compatibility.
         """
-        embeddings: list[list[float]] = []
-        batch_size = 100  # OpenAI recommends ≤2048, we use 100 for safety
-
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i : i + batch_size]
-            response = await self._openai.embeddings.create(
-                model=EMBEDDING_MODEL,
-                input=batch,
-                dimensions=EMBEDDING_DIMENSIONS,
-            )
-            # Response data is ordered by index
-            batch_embeddings = [
-                item.embedding
-                for item in sorted(response.data, key=lambda x: x.index)
-            ]
-            embeddings.extend(batch_embeddings)
-
-        return embeddings
+        return await self._embedder.embed(
+            [c.content for c in chunks],
+            [c.estimated_tokens for c in chunks],
+        )
 
     # ------------------------------------------------------------------
-    # Deduplication
+    # Deduplication and versioning
     # ------------------------------------------------------------------
 
     @staticmethod
-    async def _get_existing_hashes(
+    async def _get_stored_chunks(
         db: AsyncSession, hashes: list[str],
-    ) -> set[str]:
-        """Check which content hashes already exist in the database."""
+    ) -> dict[str, _StoredChunk]:
+        """Look up which content hashes already exist in the database."""
         if not hashes:
-            return set()
+            return {}
 
         # Query in batches to avoid overly large IN clauses
-        existing: set[str] = set()
+        stored: dict[str, _StoredChunk] = {}
         batch_size = 500
 
         for i in range(0, len(hashes), batch_size):
             batch = hashes[i : i + batch_size]
             result = await db.execute(
-                select(MedicalContent.content_hash).where(
-                    MedicalContent.content_hash.in_(batch)
-                )
+                select(
+                    MedicalContent.content_hash,
+                    MedicalContent.id,
+                    MedicalContent.parent_document_id,
+                    MedicalContent.college_id,
+                    MedicalContent.is_active,
+                    MedicalContent.metadata_,
+                ).where(MedicalContent.content_hash.in_(batch))
             )
-            existing.update(row[0] for row in result.all())
+            for content_hash, *row in result.all():
+                stored[content_hash] = _StoredChunk(*row)
+
+        return stored
+
+    async def _drop_near_duplicates(
+        self,
+        db: AsyncSession,
+        lock: asyncio.Lock,
+        batch: _PageRange,
+        checkpoint: IngestionCheckpoint,
+        pending: dict[str, tuple[Fingerprint, str]],
+    ) -> None:
+        """Fingerprint a range's new chunks and drop near-duplicates.
 
-        return existing
+        MinHash runs on the extraction pool; what survives is recorded in
+        pending until its range commits.
+        """
+        texts = [c.content for c in batch.chunks]
+        fps = await asyncio.get_running_loop().run_in_executor(
+            self._extraction.executor, fingerprint_chunks, texts,
+        )
+        async with lock:
+            duplicates = await find_near_duplicates(
+                db,
+                texts,
+                fps,
+                college_id=checkpoint.college_id,
+                exclude_document_id=checkpoint.previous_document_id,
+                pending=list(pending.values()),
+            )
+        kept = [
+            (chunk, fp)
+            for chunk, fp, duplicate in zip(batch.chunks, fps, duplicates)
+            if not duplicate
+        ]
+        batch.near_duplicates = len(batch.chunks) - len(kept)
+        batch.chunks = [chunk for chunk, _ in kept]
+        batch.fingerprints = [fp for _, fp in kept]
+        for chunk, fp in kept:
+            pending[chunk.content_hash] = (fp, chunk.content)
+
+    def _reuse_values(
+        self,
+        chunk: TextChunk,
+        row: _StoredChunk,
+        *,
+        checkpoint: IngestionCheckpoint,
+        total_chunks: int,
+    ) -> dict[str, Any]:
+        """Bulk-update parameters moving a stored chunk to this version.
+
+        Embedding and classification are kept; position, title and
+        provenance are rewritten for the new document.
+        """
+        metadata = {
+            k: v for k, v in row.metadata.items()
+            if k != "retired_by_document_id"
+        }
+        return {
+            "id": row.id,
+            "parent_document_id": checkpoint.document_id,
+            "title": self._build_chunk_title(checkpoint.filename, chunk),
+            "chunk_index": chunk.chunk_index,
+            "total_chunks": total_chunks,
+            "source_reference": checkpoint.filename,
+            "is_active": True,
+            "metadata_": {
+                **metadata,
+                "book": checkpoint.filename,
+                "chapter": chunk.heading or "",
+                "start_char": chunk.start_char,
+                "end_char": chunk.end_char,
+                "estimated_tokens": chunk.estimated_tokens,
+                "document_version": checkpoint.version,
+            },
+        }
+
+    @staticmethod
+    async def _retire_previous_version(
+        db: AsyncSession, checkpoint: IngestionCheckpoint,
+    ) -> int:
+        """Soft-retire the previous version's chunks not carried over.
+
+        Reused chunks were already moved to the new document, so whatever
+        still hangs off the previous one was dropped by the new edition.
+        One set-based UPDATE; returns the number of chunks retired.
+        """
+        if checkpoint.previous_document_id is None:
+            return 0
+        result = await db.execute(
+            update(MedicalContent)
+            .where(
+                MedicalContent.parent_document_id
+                == checkpoint.previous_document_id,
+                MedicalContent.is_active.is_(True),
+            )
+            .values(
+                is_active=False,
+                metadata_=MedicalContent.metadata_.op("||")(
+                    func.jsonb_build_object(
+                        "retired_by_document_id", str(checkpoint.document_id),
+                    )
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        # Near-duplicates elsewhere that pointed at a retired chunk
+        # become canonical again.
+        await release_orphaned_duplicates(db)
+        return result.rowcount
 
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
 
+    def _build_record(
+        self,
+        chunk: TextChunk,
+        metadata: ChunkMetadata,
+        embedding: list[float],
+        extra: dict[str, Any],
+        fp: Fingerprint,
+        *,
+        checkpoint: IngestionCheckpoint,
+        total_chunks: int,
+    ) -> MedicalContent:
+        filename = checkpoint.filename
+        return MedicalContent(
+            id=uuid4(),
+            college_id=checkpoint.college_id,
+            source_type=checkpoint.source_type,
+            title=self._build_chunk_title(filename, chunk),
+            content=chunk.content,
+            content_hash=chunk.content_hash,
+            embedding=embedding,
+            chunk_index=chunk.chunk_index,
+            total_chunks=total_chunks,
+            parent_document_id=checkpoint.document_id,
+            metadata_={
+                "book": filename,
+                "chapter": chunk.heading or "",
+                "subject": metadata.subject,
+                "topic": metadata.topic,
+                "blooms_level": metadata.blooms_level,
+                "organ_system": metadata.organ_system or "",
+                "content_type": metadata.content_type,
+                "key_terms": metadata.key_terms or [],
+                "start_char": chunk.start_char,
+                "end_char": chunk.end_char,
+                "estimated_tokens": chunk.estimated_tokens,
+                "document_version": checkpoint.version,
+                **extra,
+            },
+            source_reference=filename,
+            medical_entity_type=metadata.medical_entity_type,
+            is_active=True,
+            minhash=list(fp.minhash),
+            lsh_bands=list(fp.bands),
+        )
+
     @staticmethod
     def _build_chunk_title(filename: str, chunk) -> str:
         """Build a descriptive title for a chunk."""
@@ -408,7 +1137,12 @@ class MedicalContentIngester:
                 func.count(
                     func.distinct(MedicalContent.parent_document_id)
                 )
-            ).where(scope_filter, MedicalContent.parent_document_id.isnot(None))
+            ).where(
+                scope_filter,
+                MedicalContent.parent_document_id.isnot(None),
+                # Superseded versions only hold retired chunks
+                MedicalContent.is_active.is_(True),
+            )
         )
         total_documents = doc_count.scalar() or 0
 
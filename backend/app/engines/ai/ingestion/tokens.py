@@ -0,0 +1,168 @@
+"""Token counting for chunk sizing — Section L1 of architecture document.
+
+Chunks are sized in the embedding model's own tokens: cl100k_base, the
+BPE vocabulary of text-embedding-3-large. Word-count estimates drift far
+from real token counts on drug-dosage tables, lab values and Latin-heavy
+anatomy text, which wastes embedding tokens and retrieval context.
+
+- BPETokenCounter: tiktoken over the cl100k_base vocabulary bundled at
+  BPE_VOCAB_PATH (fetched into the image at build time by
+  scripts/fetch_bpe_vocab.py, hash-checked, never downloaded at
+  runtime). Counts are cached per line — running headers, table rows
+  and dosage lines repeat heavily across a textbook.
+- EstimatedTokenCounter: the previous 1.35-tokens-per-word estimate,
+  used when tiktoken or the bundled vocabulary is unavailable.
+
+Usage:
+    counter = default_token_counter()
+    counter.count(text)             # tokens in text
+    counter.tail(text, 100)         # last ~100 tokens, on a word boundary
+"""
+
+import base64
+import hashlib
+import logging
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Protocol
+
+logger = logging.getLogger(__name__)
+
+BPE_VOCAB_PATH = Path(__file__).parent / "data" / "cl100k_base.tiktoken"
+BPE_VOCAB_URL = (
+    "https://openaipublic.blob.core.windows.net/encodings/cl100k_base.tiktoken"
+)
+BPE_VOCAB_SHA256 = (
+    "223921b76ee99bde995b7ff738513eef100fb51d18c93597a113bcffe865b2a7"
+)
+
+# Pre-tokenization pattern and special tokens of cl100k_base (as shipped
+# in tiktoken_ext.openai_public).
+_CL100K_PATTERN = (
+    r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}++|\p{N}{1,3}+|"""
+    r""" ?[^\s\p{L}\p{N}]++[\r\n]*+|\s++$|\s*[\r\n]|\s+(?!\S)|\s"""
+)
+_CL100K_SPECIAL_TOKENS = {
+    "<|endoftext|>": 100257,
+    "<|fim_prefix|>": 100258,
+    "<|fim_middle|>": 100259,
+    "<|fim_suffix|>": 100260,
+    "<|endofprompt|>": 100276,
+}
+
+LINE_CACHE_SIZE = 65_536
+
+# Average English word ≈ 1.3 tokens (OpenAI cl100k_base empirical).
+# Medical text averages ~1.4 due to terminology. We use 1.35 as a balance.
+_TOKENS_PER_WORD = 1.35
+
+_NEWLINE_RUNS = re.compile(r"\n+")
+
+
+class TokenCounter(Protocol):
+    """What MedicalTextChunker needs from a tokenizer."""
+
+    name: str
+
+    def count(self, text: str) -> int: ...
+
+    def tail(self, text: str, max_tokens: int) -> str: ...
+
+
+# ---------------------------------------------------------------------------
+# Word-count estimate (no dependencies)
+# ---------------------------------------------------------------------------
+
+class EstimatedTokenCounter:
+    """Estimate token count from word count (no external dependency)."""
+
+    name = "estimate"
+
+    def count(self, text: str) -> int:
+        return int(len(text.split()) * _TOKENS_PER_WORD)
+
+    def tail(self, text: str, max_tokens: int) -> str:
+        words = text.split()
+        target_words = int(max_tokens / _TOKENS_PER_WORD)
+        if len(words) <= target_words:
+            return text
+        return " ".join(words[-target_words:])
+
+
+# ---------------------------------------------------------------------------
+# BPE (cl100k_base)
+# ---------------------------------------------------------------------------
+
+class BPETokenCounter:
+    """cl100k_base token counts with a per-line LRU cache.
+
+    count() sums cached per-line counts plus one token per run of
+    newlines. BPE merges never cross a newline run in cl100k's
+    pre-tokenizer except after punctuation, so the sum stays within a
+    token or two of encoding the whole text.
+    """
+
+    def __init__(self, encoding, line_cache_size: int = LINE_CACHE_SIZE) -> None:
+        self._encoding = encoding
+        self.name = encoding.name
+        self._count_line = lru_cache(maxsize=line_cache_size)(self._encode_count)
+
+    def _encode_count(self, line: str) -> int:
+        return len(self._encoding.encode_ordinary(line))
+
+    def count(self, text: str) -> int:
+        return sum(
+            self._count_line(line) for line in text.split("\n") if line
+        ) + len(_NEWLINE_RUNS.findall(text))
+
+    def tail(self, text: str, max_tokens: int) -> str:
+        tokens = self._encoding.encode_ordinary(text)
+        if len(tokens) <= max_tokens:
+            return text
+        tail = self._encoding.decode(tokens[-max_tokens:])
+        # Drop the partial word the cut landed in.
+        boundary = re.search(r"\s", tail)
+        return tail[boundary.end():].lstrip() if boundary else tail
+
+    def cache_info(self):
+        return self._count_line.cache_info()
+
+
+def load_bpe_vocab(path: Path = BPE_VOCAB_PATH) -> dict[bytes, int]:
+    """Parse a .tiktoken vocabulary file (base64 token, rank per line)."""
+    data = path.read_bytes()
+    if hashlib.sha256(data).hexdigest() != BPE_VOCAB_SHA256:
+        raise ValueError(f"BPE vocabulary at {path} fails its sha256 check")
+    ranks: dict[bytes, int] = {}
+    for line in data.splitlines():
+        if line:
+            token, rank = line.split()
+            ranks[base64.b64decode(token)] = int(rank)
+    return ranks
+
+
+def load_bpe_counter(path: Path = BPE_VOCAB_PATH) -> BPETokenCounter:
+    import tiktoken
+
+    encoding = tiktoken.Encoding(
+        name="cl100k_base",
+        pat_str=_CL100K_PATTERN,
+        mergeable_ranks=load_bpe_vocab(path),
+        special_tokens=_CL100K_SPECIAL_TOKENS,
+    )
+    return BPETokenCounter(encoding)
+
+
+@lru_cache(maxsize=1)
+def default_token_counter() -> TokenCounter:
+    """The bundled BPE counter, or the word estimate if it cannot load."""
+    try:
+        return load_bpe_counter()
+    except (ImportError, OSError, ValueError) as exc:
+        logger.warning(
+            "BPE vocabulary unavailable (%s) — chunk sizes fall back to "
+            "the word-count estimate",
+            exc,
+        )
+        return EstimatedTokenCounter()
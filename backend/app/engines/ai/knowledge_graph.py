@@ -0,0 +1,549 @@
+"""Knowledge Graph Snapshot — in-process copy of the medical knowledge graph.
+
+MedicalEntity / MedicalEntityRelationship are platform-wide, small and
+change only when content is seeded or ingested, yet MedicalKnowledgeServer
+used to resolve every name with an ilike('%term%') scan and walk every
+hop (and every symptom) with its own query. The graph tools now read a
+versioned snapshot held in process memory:
+
+- Entities are numbered 0..n-1. Edges are stored per relationship type
+  in CSR form, forward (source → targets) and reverse (target →
+  sources): an indptr / indices pair of numpy arrays, so the neighbours
+  of a node are one slice. Targets within a row are sorted, so a pair
+  lookup is a binary search.
+- Names and aliases (MedicalEntity.aliases and medical_entity_aliases)
+  are normalized (lowercased, punctuation to spaces) into a NameTrie
+  for exact and shortest-completion lookups, plus a substring scan as
+  the last resort. The tools resolve terms through EntityResolver
+  (app.engines.ai.entity_resolver), which answers exact hits from here
+  and sends the rest to the pg_trgm alias index.
+
+Only active entities, and active edges between them, are loaded.
+
+Refresh: get_knowledge_graph() loads a new snapshot (with a new version)
+when the current one is older than SNAPSHOT_MAX_AGE_SECONDS or has been
+invalidated. Writers call notify_knowledge_graph_updated(), which
+publishes KNOWLEDGE_GRAPH_CHANNEL on the event bus; API processes run
+listen_for_updates() (started in the app lifespan), which invalidates the
+snapshot and the cached graph tool results. Processes that do not listen
+(Celery workers) pick changes up through the max age.
+
+Usage:
+    from app.engines.ai.knowledge_graph import get_knowledge_graph
+
+    graph = await get_knowledge_graph(db)
+    mi = graph.resolve("heart attack", ("disease",))
+    for target, edge in graph.out_edges(mi, "differential_of"):
+        ...
+"""
+
+import asyncio
+import itertools
+import logging
+import re
+import time
+from collections import defaultdict
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.engines.ai.models import (
+    MedicalEntity,
+    MedicalEntityAlias,
+    MedicalEntityRelationship,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+SNAPSHOT_MAX_AGE_SECONDS = 600.0
+"""A snapshot older than this is reloaded on next use, event or not."""
+
+KNOWLEDGE_GRAPH_CHANNEL = "knowledge_graph.updated"
+
+LISTENER_RETRY_SECONDS = 30.0
+
+# MedicalKnowledgeServer tools whose cached results come from the graph
+_GRAPH_TOOLS = (
+    "get_differential_diagnoses",
+    "get_drug_interactions",
+    "get_competency_details",
+    "get_misconceptions",
+)
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9+]+")
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase and collapse everything but [a-z0-9+] to single spaces.
+
+    "+" is kept, since it is meaningful in names like "Na+ Channel
+    Blockade". medical_entity_aliases.normalized_alias holds the same
+    normalization computed in SQL (entity_resolver.NORMALIZE_SQL).
+    """
+    return _NON_WORD_RE.sub(" ", name.lower()).strip()
+
+
+# ---------------------------------------------------------------------------
+# Name index
+# ---------------------------------------------------------------------------
+
+class _TrieNode:
+    __slots__ = ("children", "entities")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        self.entities: list[int] = []
+
+
+class NameTrie:
+    """Normalized names and aliases → entity indices."""
+
+    def __init__(self) -> None:
+        self._root = _TrieNode()
+
+    def add(self, key: str, entity: int) -> None:
+        node = self._root
+        for char in key:
+            node = node.children.setdefault(char, _TrieNode())
+        if entity not in node.entities:
+            node.entities.append(entity)
+
+    def _node(self, key: str) -> _TrieNode | None:
+        node = self._root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def exact(self, key: str) -> list[int]:
+        node = self._node(key)
+        return list(node.entities) if node else []
+
+    def completions(self, prefix: str) -> Iterator[list[int]]:
+        """Entities under prefix, one list per key length, shortest first."""
+        node = self._node(prefix)
+        level = [node] if node else []
+        while level:
+            found = [e for n in level for e in n.entities]
+            if found:
+                yield found
+            level = [child for n in level for child in n.children.values()]
+
+
+# ---------------------------------------------------------------------------
+# Snapshot
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class GraphEntity:
+    id: UUID
+    entity_type: str
+    name: str
+    aliases: tuple[str, ...]
+    properties: dict[str, Any]
+
+
+@dataclass(frozen=True)
+class GraphEdge:
+    source: int
+    target: int
+    relationship_type: str
+    properties: dict[str, Any]
+    confidence: float
+    source_reference: str | None
+
+
+@dataclass(frozen=True)
+class _Adjacency:
+    """CSR adjacency of one relationship type, one direction."""
+
+    indptr: np.ndarray
+    indices: np.ndarray
+    edges: np.ndarray  # CSR position → index into the snapshot's edges
+
+    @classmethod
+    def build(
+        cls,
+        size: int,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        edge_ids: np.ndarray,
+    ) -> "_Adjacency":
+        order = np.lexsort((cols, rows))
+        indptr = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=size), out=indptr[1:])
+        return cls(indptr, cols[order], edge_ids[order])
+
+    def row(self, node: int) -> tuple[np.ndarray, np.ndarray]:
+        start, end = self.indptr[node], self.indptr[node + 1]
+        return self.indices[start:end], self.edges[start:end]
+
+
+_versions = itertools.count(1)
+
+
+class KnowledgeGraphSnapshot:
+    """Immutable, versioned copy of the active knowledge graph."""
+
+    def __init__(
+        self,
+        entities: Sequence[GraphEntity],
+        edges: Sequence[GraphEdge],
+    ) -> None:
+        self.version = next(_versions)
+        self.loaded_at = time.monotonic()
+        self.entities = tuple(entities)
+        self.edges = tuple(edges)
+        self._by_id = {e.id: i for i, e in enumerate(self.entities)}
+        self._name_rank = np.argsort(
+            np.argsort([e.name for e in self.entities], kind="stable"),
+        )
+
+        self._names = NameTrie()
+        self._keys: list[tuple[str, int]] = []
+        for i, entity in enumerate(self.entities):
+            names = (entity.name, *entity.aliases)
+            for key in {normalize_name(n) for n in names}:
+                if key:
+                    self._names.add(key, i)
+                    self._keys.append((key, i))
+
+        by_type: dict[str, list[int]] = defaultdict(list)
+        for i, edge in enumerate(self.edges):
+            by_type[edge.relationship_type].append(i)
+        self._forward: dict[str, _Adjacency] = {}
+        self._reverse: dict[str, _Adjacency] = {}
+        size = len(self.entities)
+        for rel_type, ids in by_type.items():
+            edge_ids = np.asarray(ids, dtype=np.int64)
+            sources = np.fromiter(
+                (self.edges[i].source for i in ids), np.int64, len(ids),
+            )
+            targets = np.fromiter(
+                (self.edges[i].target for i in ids), np.int64, len(ids),
+            )
+            self._forward[rel_type] = _Adjacency.build(
+                size, sources, targets, edge_ids,
+            )
+            self._reverse[rel_type] = _Adjacency.build(
+                size, targets, sources, edge_ids,
+            )
+
+    @classmethod
+    def from_rows(
+        cls,
+        entity_rows: Iterable[Any],
+        edge_rows: Iterable[Any],
+        alias_rows: Iterable[Any] = (),
+    ) -> "KnowledgeGraphSnapshot":
+        """Build from MedicalEntity / MedicalEntityRelationship rows.
+
+        alias_rows (MedicalEntityAlias entity_id / alias) add to each
+        entity's own aliases. Edges whose endpoints are not among the
+        entities are dropped.
+        """
+        extra: dict[UUID, list[str]] = defaultdict(list)
+        for row in alias_rows:
+            extra[row.entity_id].append(row.alias)
+        entities = [
+            GraphEntity(
+                id=row.id,
+                entity_type=row.entity_type,
+                name=row.name,
+                aliases=tuple(dict.fromkeys([*(row.aliases or ()), *extra[row.id]])),
+                properties=row.properties or {},
+            )
+            for row in entity_rows
+        ]
+        index = {e.id: i for i, e in enumerate(entities)}
+        edges = [
+            GraphEdge(
+                source=index[row.source_entity_id],
+                target=index[row.target_entity_id],
+                relationship_type=row.relationship_type,
+                properties=row.properties or {},
+                confidence=float(row.confidence),
+                source_reference=row.source_reference,
+            )
+            for row in edge_rows
+            if row.source_entity_id in index and row.target_entity_id in index
+        ]
+        return cls(entities, edges)
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def index_of(self, entity_id: UUID) -> int | None:
+        return self._by_id.get(entity_id)
+
+    # -- name resolution -----------------------------------------------
+
+    def _candidates(self, key: str) -> Iterator[list[int]]:
+        """Candidate groups for a normalized term, best group first."""
+        if not key:
+            return
+        yield from self._names.completions(key)
+        contains = sorted((len(k), i) for k, i in self._keys if key in k)
+        for _, group in itertools.groupby(contains, key=lambda c: c[0]):
+            yield [i for _, i in group]
+
+    def exact(
+        self, key: str, entity_types: Sequence[str] | None = None,
+    ) -> list[int]:
+        """Entities with key as a normalized name or alias, by name."""
+        return sorted(
+            (i for i in self._names.exact(key) if self._allowed(i, entity_types)),
+            key=lambda i: self.entities[i].name,
+        )
+
+    def search(
+        self, term: str, entity_types: Sequence[str] | None = None,
+    ) -> list[int]:
+        """Entities matching term, best first.
+
+        Exact name or alias matches, then the shortest completions of the
+        term, then names or aliases containing it (the old ilike
+        '%term%'). Ties are broken by name.
+        """
+        ranked: list[int] = []
+        seen: set[int] = set()
+        for group in self._candidates(normalize_name(term)):
+            fresh = {
+                i for i in group
+                if i not in seen and self._allowed(i, entity_types)
+            }
+            ranked.extend(sorted(fresh, key=lambda i: self.entities[i].name))
+            seen.update(fresh)
+        return ranked
+
+    def resolve(
+        self, term: str, entity_types: Sequence[str] | None = None,
+    ) -> int | None:
+        """Best entity for term, or None."""
+        for group in self._candidates(normalize_name(term)):
+            allowed = [i for i in group if self._allowed(i, entity_types)]
+            if allowed:
+                return min(allowed, key=lambda i: self.entities[i].name)
+        return None
+
+    def _allowed(self, node: int, entity_types: Sequence[str] | None) -> bool:
+        return (
+            entity_types is None
+            or self.entities[node].entity_type in entity_types
+        )
+
+    # -- traversal -----------------------------------------------------
+
+    def out_edges(
+        self, node: int, relationship_type: str,
+    ) -> Iterator[tuple[int, GraphEdge]]:
+        """(target, edge) for node's outgoing edges of one type."""
+        return self._walk(self._forward, node, relationship_type)
+
+    def in_edges(
+        self, node: int, relationship_type: str,
+    ) -> Iterator[tuple[int, GraphEdge]]:
+        """(source, edge) for node's incoming edges of one type."""
+        return self._walk(self._reverse, node, relationship_type)
+
+    def _walk(
+        self,
+        adjacency: dict[str, _Adjacency],
+        node: int,
+        relationship_type: str,
+    ) -> Iterator[tuple[int, GraphEdge]]:
+        csr = adjacency.get(relationship_type)
+        if csr is None:
+            return iter(())
+        neighbours, edge_ids = csr.row(node)
+        return (
+            (int(n), self.edges[e])
+            for n, e in zip(neighbours.tolist(), edge_ids.tolist())
+        )
+
+    def edges_between(
+        self, a: int, b: int, relationship_types: Sequence[str],
+    ) -> list[GraphEdge]:
+        """Edges a → b and b → a of the given types."""
+        found: list[GraphEdge] = []
+        for rel_type in relationship_types:
+            csr = self._forward.get(rel_type)
+            if csr is None:
+                continue
+            for source, target in ((a, b), (b, a)):
+                neighbours, edge_ids = csr.row(source)
+                pos = np.searchsorted(neighbours, target)
+                while pos < len(neighbours) and neighbours[pos] == target:
+                    found.append(self.edges[int(edge_ids[pos])])
+                    pos += 1
+        return found
+
+    def shared_sources(
+        self, targets: Sequence[int], relationship_type: str,
+    ) -> list[tuple[int, int, float]]:
+        """Nodes with an edge to several of targets, most shared first.
+
+        Returns (source, shared count, best confidence), ties broken by
+        name — e.g. the diseases sharing the most of a set of symptoms
+        over has_symptom.
+        """
+        csr = self._reverse.get(relationship_type)
+        if csr is None or not targets:
+            return []
+        rows = [csr.row(t) for t in dict.fromkeys(targets)]
+        sources = np.concatenate([r[0] for r in rows])
+        if not len(sources):
+            return []
+        edge_ids = np.concatenate([r[1] for r in rows])
+        counts = np.bincount(sources, minlength=len(self.entities))
+        confidence = np.zeros(len(self.entities))
+        np.maximum.at(
+            confidence,
+            sources,
+            np.fromiter(
+                (self.edges[e].confidence for e in edge_ids.tolist()),
+                float, len(edge_ids),
+            ),
+        )
+        hit = np.flatnonzero(counts)
+        order = np.lexsort(
+            (self._name_rank[hit], -confidence[hit], -counts[hit]),
+        )
+        return [
+            (int(i), int(counts[i]), float(confidence[i])) for i in hit[order]
+        ]
+
+
+# ---------------------------------------------------------------------------
+# Process-wide snapshot
+# ---------------------------------------------------------------------------
+
+_snapshot: KnowledgeGraphSnapshot | None = None
+_stale = False
+_loading = False
+
+
+async def load_knowledge_graph(db: AsyncSession) -> KnowledgeGraphSnapshot:
+    """Read the active graph: three queries, no per-hop round-trips."""
+    entity_rows = (await db.execute(
+        select(
+            MedicalEntity.id,
+            MedicalEntity.entity_type,
+            MedicalEntity.name,
+            MedicalEntity.aliases,
+            MedicalEntity.properties,
+        )
+        .where(MedicalEntity.is_active.is_(True))
+        .order_by(MedicalEntity.entity_type, MedicalEntity.name)
+    )).all()
+    edge_rows = (await db.execute(
+        select(
+            MedicalEntityRelationship.source_entity_id,
+            MedicalEntityRelationship.target_entity_id,
+            MedicalEntityRelationship.relationship_type,
+            MedicalEntityRelationship.properties,
+            MedicalEntityRelationship.confidence,
+            MedicalEntityRelationship.source_reference,
+        ).where(MedicalEntityRelationship.is_active.is_(True))
+    )).all()
+    alias_rows = (await db.execute(
+        select(MedicalEntityAlias.entity_id, MedicalEntityAlias.alias)
+    )).all()
+    return KnowledgeGraphSnapshot.from_rows(entity_rows, edge_rows, alias_rows)
+
+
+async def get_knowledge_graph(db: AsyncSession) -> KnowledgeGraphSnapshot:
+    """The current snapshot, reloaded on db if stale or expired.
+
+    While one caller reloads, concurrent callers keep using the previous
+    snapshot rather than loading their own.
+    """
+    global _snapshot, _stale, _loading
+    current = _snapshot
+    fresh = (
+        current is not None
+        and not _stale
+        and time.monotonic() - current.loaded_at < SNAPSHOT_MAX_AGE_SECONDS
+    )
+    if fresh or (current is not None and _loading):
+        return current
+
+    _loading = True
+    _stale = False
+    try:
+        loaded = await load_knowledge_graph(db)
+    except Exception:
+        if current is None:
+            raise
+        logger.warning(
+            "Knowledge graph reload failed; serving version %d",
+            current.version, exc_info=True,
+        )
+        return current
+    finally:
+        _loading = False
+
+    _snapshot = loaded
+    logger.info(
+        "Knowledge graph snapshot v%d: %d entities, %d edges",
+        loaded.version, len(loaded.entities), len(loaded.edges),
+    )
+    return loaded
+
+
+def invalidate_knowledge_graph() -> None:
+    """Reload the snapshot on next use and drop cached graph tool results."""
+    from app.engines.ai.tools.results import tool_result_cache
+
+    global _stale
+    _stale = True
+    for tool_name in _GRAPH_TOOLS:
+        tool_result_cache.invalidate(tool_name=tool_name)
+
+
+async def notify_knowledge_graph_updated() -> None:
+    """Tell every process to refresh. Call after committing graph writes."""
+    from app.core.events import publish_event
+
+    invalidate_knowledge_graph()
+    try:
+        await publish_event(KNOWLEDGE_GRAPH_CHANNEL, {})
+    except Exception:
+        logger.warning(
+            "Failed to publish %s; other processes refresh within %.0fs",
+            KNOWLEDGE_GRAPH_CHANNEL, SNAPSHOT_MAX_AGE_SECONDS,
+        )
+
+
+async def listen_for_updates() -> None:
+    """Invalidate on KNOWLEDGE_GRAPH_CHANNEL events until cancelled.
+
+    Resubscribes after Redis errors; run as a background task.
+    """
+    from app.core.events import subscribe
+
+    async def on_update(data: dict[str, Any]) -> None:
+        invalidate_knowledge_graph()
+
+    while True:
+        try:
+            await subscribe(KNOWLEDGE_GRAPH_CHANNEL, on_update)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.warning(
+                "Knowledge graph listener lost Redis; retrying in %.0fs",
+                LISTENER_RETRY_SECONDS,
+            )
+        await asyncio.sleep(LISTENER_RETRY_SECONDS)
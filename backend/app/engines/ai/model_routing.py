@@ -0,0 +1,308 @@
+"""Model Routing Policy — Section L5 of architecture document.
+
+Agents ask the AI Gateway for a capability tier ("fast", "balanced")
+instead of hardcoding a model string. The policy picks a concrete model
+per (agent_id, task_type) from:
+
+1. Configured latency / cost SLOs for the (agent_id, task_type) pair
+2. Rolling p95 latency, error rate and mean call cost per model
+3. College budget headroom (cheapest sibling when headroom is low)
+
+A model with a sustained error rate is put into cooldown and calls fail
+over to the next sibling in the same tier until the cooldown expires.
+
+State is per-process and in-memory — the gateway is a process singleton
+(see gateway_deps), so every call in a worker feeds the same tracker.
+"""
+
+import enum
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from decimal import Decimal
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------
+# Tiers and model catalogue
+# ---------------------------------------------------------------------------
+
+class CapabilityTier(str, enum.Enum):
+    FAST = "fast"            # Classification, routing, reranking, checks
+    BALANCED = "balanced"    # Generation, tutoring, structured reports
+
+
+# Ordered candidates per tier: primary first, then failover siblings.
+MODEL_TIERS: dict[CapabilityTier, tuple[str, ...]] = {
+    CapabilityTier.FAST: (
+        "claude-haiku-4-5-20251001",
+        "claude-sonnet-4-5-20250929",
+    ),
+    CapabilityTier.BALANCED: (
+        "claude-sonnet-4-5-20250929",
+        "claude-haiku-4-5-20251001",
+    ),
+}
+
+# Rolling window per model — oldest samples fall out by count and by age.
+_WINDOW_SIZE = 200
+_WINDOW_MAX_AGE_S = 300.0
+
+# Below this many samples p95 / error rate are not trusted.
+_MIN_SAMPLES = 10
+
+# A model whose windowed error rate crosses its SLO threshold is skipped
+# for this long before being tried again.
+_FAILOVER_COOLDOWN_S = 60.0
+
+
+# ---------------------------------------------------------------------------
+# SLO configuration
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True, slots=True)
+class RoutingSLO:
+    """Latency / cost / reliability targets for one (agent_id, task_type)."""
+
+    p95_latency_ms: int | None = None
+    max_cost_per_call_usd: Decimal | None = None
+    max_error_rate: float = 0.25
+    # Fraction of the monthly budget that must remain before the policy
+    # stops preferring the cheapest model in the tier.
+    min_budget_headroom: float = 0.20
+
+
+DEFAULT_SLO = RoutingSLO()
+
+# Keyed by (agent_id, task_type). "*" matches any agent_id.
+ROUTING_SLOS: dict[tuple[str, str], RoutingSLO] = {
+    ("retrieval_router", "retrieval_routing"): RoutingSLO(
+        p95_latency_ms=1500,
+        max_cost_per_call_usd=Decimal("0.002"),
+    ),
+    ("retrieval_reranker", "retrieval_routing"): RoutingSLO(
+        p95_latency_ms=2500,
+        max_cost_per_call_usd=Decimal("0.005"),
+    ),
+    ("*", "safety_check"): RoutingSLO(
+        p95_latency_ms=4000,
+        max_error_rate=0.10,
+    ),
+    ("*", "socratic_dialogue"): RoutingSLO(p95_latency_ms=8000),
+    ("*", "classification"): RoutingSLO(
+        p95_latency_ms=3000,
+        max_cost_per_call_usd=Decimal("0.003"),
+    ),
+}
+
+
+def get_slo(agent_id: str, task_type: str) -> RoutingSLO:
+    """Return the most specific SLO for (agent_id, task_type)."""
+    return (
+        ROUTING_SLOS.get((agent_id, task_type))
+        or ROUTING_SLOS.get(("*", task_type))
+        or DEFAULT_SLO
+    )
+
+
+# ---------------------------------------------------------------------------
+# Rolling model health
+# ---------------------------------------------------------------------------
+
+@dataclass(slots=True)
+class _CallSample:
+    at: float
+    latency_ms: int
+    ok: bool
+    cost_usd: Decimal
+
+
+class ModelHealthTracker:
+    """Rolling per-model latency, error rate and cost window."""
+
+    def __init__(
+        self,
+        window_size: int = _WINDOW_SIZE,
+        max_age_s: float = _WINDOW_MAX_AGE_S,
+    ) -> None:
+        self._window_size = window_size
+        self._max_age_s = max_age_s
+        self._samples: dict[str, deque[_CallSample]] = {}
+        self._cooldown_until: dict[str, float] = {}
+
+    def record(
+        self,
+        model: str,
+        *,
+        latency_ms: int,
+        ok: bool,
+        cost_usd: Decimal = Decimal("0"),
+    ) -> None:
+        window = self._samples.get(model)
+        if window is None:
+            window = deque(maxlen=self._window_size)
+            self._samples[model] = window
+        window.append(_CallSample(time.monotonic(), latency_ms, ok, cost_usd))
+        if not ok:
+            self._maybe_cool_down(model)
+
+    def _maybe_cool_down(self, model: str) -> None:
+        """Start a cooldown once the error rate crosses the default SLO.
+
+        Stricter per-task thresholds are applied by is_healthy() without
+        a cooldown; this only decides when a model is taken out for all
+        callers.
+        """
+        rate = self.error_rate(model)
+        if rate is None or rate < DEFAULT_SLO.max_error_rate:
+            return
+        self._cooldown_until[model] = time.monotonic() + _FAILOVER_COOLDOWN_S
+        # Start the model with a clean slate once the cooldown ends.
+        self._samples.pop(model, None)
+        logger.warning(
+            "Model %s error rate %.0f%% ≥ %.0f%% — failing over for %ds",
+            model, rate * 100, DEFAULT_SLO.max_error_rate * 100,
+            int(_FAILOVER_COOLDOWN_S),
+        )
+
+    def _window(self, model: str) -> deque[_CallSample]:
+        window = self._samples.get(model)
+        if window is None:
+            return deque()
+        cutoff = time.monotonic() - self._max_age_s
+        while window and window[0].at < cutoff:
+            window.popleft()
+        return window
+
+    def sample_count(self, model: str) -> int:
+        return len(self._window(model))
+
+    def p95_latency_ms(self, model: str) -> int | None:
+        """p95 of successful-call latency, or None below _MIN_SAMPLES."""
+        latencies = sorted(s.latency_ms for s in self._window(model) if s.ok)
+        if len(latencies) < _MIN_SAMPLES:
+            return None
+        rank = max(0, math.ceil(0.95 * len(latencies)) - 1)
+        return latencies[rank]
+
+    def error_rate(self, model: str) -> float | None:
+        window = self._window(model)
+        if len(window) < _MIN_SAMPLES:
+            return None
+        return sum(1 for s in window if not s.ok) / len(window)
+
+    def mean_cost_usd(self, model: str) -> Decimal | None:
+        costs = [s.cost_usd for s in self._window(model) if s.ok]
+        if len(costs) < _MIN_SAMPLES:
+            return None
+        return sum(costs, Decimal("0")) / len(costs)
+
+    def is_healthy(self, model: str, max_error_rate: float) -> bool:
+        """False while cooling down or at/above ``max_error_rate``.
+
+        Read-only — cooldowns are started by record(), never by a check.
+        """
+        if self._cooldown_until.get(model, 0.0) > time.monotonic():
+            return False
+        rate = self.error_rate(model)
+        return rate is None or rate < max_error_rate
+
+
+# ---------------------------------------------------------------------------
+# Policy
+# ---------------------------------------------------------------------------
+
+class ModelRoutingPolicy:
+    """Selects a concrete model for a tier under SLOs and budget headroom."""
+
+    def __init__(self, tracker: ModelHealthTracker | None = None) -> None:
+        self.tracker = tracker or ModelHealthTracker()
+
+    def select(
+        self,
+        *,
+        tier: CapabilityTier | str,
+        agent_id: str,
+        task_type: str,
+        budget_headroom: float | None = None,
+    ) -> str:
+        """Pick a model for this call.
+
+        Order of preference:
+        a. Candidates of the tier, cheapest-first if budget headroom is low
+        b. Drop models in failover cooldown (keep all if none are healthy)
+        c. First candidate meeting the latency and cost SLOs
+        d. Otherwise the first healthy candidate
+        """
+        tier = CapabilityTier(tier)
+        slo = get_slo(agent_id, task_type)
+        candidates = list(MODEL_TIERS[tier])
+
+        if (
+            budget_headroom is not None
+            and budget_headroom < slo.min_budget_headroom
+        ):
+            candidates.sort(key=_input_price)
+
+        healthy = [
+            m for m in candidates
+            if self.tracker.is_healthy(m, slo.max_error_rate)
+        ] or candidates
+
+        for model in healthy:
+            if self._meets_slo(model, slo):
+                return model
+
+        return healthy[0]
+
+    def failover(self, model: str, *, agent_id: str, task_type: str) -> str:
+        """Swap a pinned model for a healthy sibling on sustained errors."""
+        slo = get_slo(agent_id, task_type)
+        if self.tracker.is_healthy(model, slo.max_error_rate):
+            return model
+
+        for tier_models in MODEL_TIERS.values():
+            if tier_models[0] != model:
+                continue
+            for sibling in tier_models[1:]:
+                if self.tracker.is_healthy(sibling, slo.max_error_rate):
+                    logger.info("Failing over %s → %s", model, sibling)
+                    return sibling
+        return model
+
+    def is_healthy(self, model: str, *, agent_id: str, task_type: str) -> bool:
+        """Whether ``model`` is usable under the (agent_id, task_type) SLO."""
+        slo = get_slo(agent_id, task_type)
+        return self.tracker.is_healthy(model, slo.max_error_rate)
+
+    def record_success(
+        self, model: str, latency_ms: int, cost_usd: Decimal,
+    ) -> None:
+        self.tracker.record(
+            model, latency_ms=latency_ms, ok=True, cost_usd=cost_usd,
+        )
+
+    def record_failure(self, model: str, latency_ms: int) -> None:
+        self.tracker.record(model, latency_ms=latency_ms, ok=False)
+
+    def _meets_slo(self, model: str, slo: RoutingSLO) -> bool:
+        if slo.p95_latency_ms is not None:
+            p95 = self.tracker.p95_latency_ms(model)
+            if p95 is not None and p95 > slo.p95_latency_ms:
+                return False
+        if slo.max_cost_per_call_usd is not None:
+            mean_cost = self.tracker.mean_cost_usd(model)
+            if mean_cost is not None and mean_cost > slo.max_cost_per_call_usd:
+                return False
+        return True
+
+
+def _input_price(model: str) -> Decimal:
+    # Imported lazily: gateway imports this module at load time.
+    from app.engines.ai.gateway import MODEL_PRICING
+
+    pricing = MODEL_PRICING.get(model)
+    return pricing["input"] if pricing else Decimal("0")
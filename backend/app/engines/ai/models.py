@@ -34,7 +34,7 @@ from sqlalchemy import (
     UniqueConstraint,
     text,
 )
-from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
 
 from pgvector.sqlalchemy import Vector
 
@@ -424,6 +424,10 @@ class MedicalContent(Base):
     search_vector is a generated tsvector column for BM25 full-text search.
     embedding stores text-embedding-3-large vectors (1536 dimensions via
     the API dimensions parameter — Neon pgvector has 2000-dim index limit).
+
+    minhash / lsh_bands fingerprint the chunk for near-duplicate detection
+    (see ingestion/near_duplicates.py); canonical_id is set on a
+    near-duplicate to the row it duplicates, and retrieval skips it.
     """
     __tablename__ = "medical_content"
     __table_args__ = (
@@ -435,7 +439,11 @@ class MedicalContent(Base):
             "ix_medical_content_parent_doc",
             "parent_document_id",
         ),
-        # HNSW (embedding), GIN (search_vector, metadata) indexes
+        Index(
+            "ix_medical_content_canonical",
+            "canonical_id",
+        ),
+        # HNSW (embedding), GIN (search_vector, metadata, lsh_bands) indexes
         # created manually in migration — Alembic doesn't auto-generate them.
     )
 
@@ -457,6 +465,9 @@ class MedicalContent(Base):
     source_reference = Column(String(500), nullable=False)
     medical_entity_type = Column(String(30), nullable=True)
     is_active = Column(Boolean, nullable=False, server_default="true")
+    minhash = Column(ARRAY(BigInteger), nullable=True)
+    lsh_bands = Column(ARRAY(BigInteger), nullable=True)
+    canonical_id = Column(UUID(as_uuid=True), nullable=True)
     last_verified_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(
         DateTime(timezone=True),
@@ -813,3 +824,208 @@ class StudentStudyPlan(TenantModel):
     focus_subjects = Column(JSONB, nullable=True)
     weekly_goal = Column(String(500), nullable=True)
     status = Column(String(20), nullable=False, server_default="active")
+
+
+# ---------------------------------------------------------------------------
+# 15. QuestionPoolItem — Pre-generated, safety-validated questions (S2/S3)
+#     Tenant-scoped. Filled overnight and refilled below the low watermark.
+# ---------------------------------------------------------------------------
+
+class QuestionPoolItem(TenantModel):
+    """A validated practice question waiting to be served from the pool.
+
+    Bucketed by (subject, topic, difficulty_tier, blooms_level). Questions
+    are generated through the full S2 pipeline (RAG, generation, Medical
+    Safety Pipeline) by background jobs, so serving one is a plain read.
+    """
+    __tablename__ = "question_pool_items"
+    __table_args__ = (
+        UniqueConstraint(
+            "college_id", "content_hash",
+            name="uq_question_pool_content_hash",
+        ),
+        Index(
+            "ix_question_pool_bucket",
+            "college_id", "subject", "difficulty_tier", "blooms_level",
+            "topic", "status",
+        ),
+    )
+
+    subject = Column(String(100), nullable=False)
+    topic = Column(String(200), nullable=False)
+    difficulty_tier = Column(String(10), nullable=False)
+    blooms_level = Column(String(20), nullable=False)
+    question_type = Column(String(10), nullable=False, server_default="mcq")
+    question_data = Column(JSONB, nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    served_count = Column(Integer, nullable=False, server_default="0")
+    last_served_at = Column(DateTime(timezone=True), nullable=True)
+    status = Column(String(20), nullable=False, server_default="available")
+
+
+# ---------------------------------------------------------------------------
+# 16. StudentQuestionExposure — Which pool questions a student has seen
+#     Tenant-scoped. Enforces per-student no-repeat sampling.
+# ---------------------------------------------------------------------------
+
+class StudentQuestionExposure(TenantModel):
+    """One row per (student, pool question) served."""
+    __tablename__ = "student_question_exposures"
+    __table_args__ = (
+        UniqueConstraint(
+            "college_id", "student_id", "pool_item_id",
+            name="uq_question_exposure_student_item",
+        ),
+    )
+
+    student_id = Column(UUID(as_uuid=True), nullable=False)
+    pool_item_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("question_pool_items.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    served_context = Column(String(30), nullable=False)
+    served_at = Column(DateTime(timezone=True), nullable=False)
+
+
+# ---------------------------------------------------------------------------
+# 17. ContentFingerprint — Near-duplicate index for generated content
+#     Tenant-scoped. MinHash/LSH bands + optional embedding per item.
+# ---------------------------------------------------------------------------
+
+class ContentFingerprint(TenantModel):
+    """Dedup fingerprint of one generated question or flashcard.
+
+    kind separates the indexes ("mcq", "exam_question", "flashcard");
+    scope narrows one further (the student for flashcards, "" for
+    college-wide content). lsh_bands is GIN-indexed so candidate lookup
+    is a single array-overlap query; embedding is HNSW-indexed for the
+    paraphrase check.
+    """
+    __tablename__ = "content_fingerprints"
+    __table_args__ = (
+        UniqueConstraint(
+            "college_id", "kind", "scope", "content_hash",
+            name="uq_content_fingerprint_hash",
+        ),
+        Index(
+            "ix_content_fingerprint_item",
+            "kind", "item_id",
+        ),
+        # GIN (lsh_bands) and HNSW (embedding) indexes created manually
+        # in migration — Alembic doesn't auto-generate them.
+    )
+
+    kind = Column(String(20), nullable=False)
+    scope = Column(String(64), nullable=False, server_default="")
+    item_id = Column(UUID(as_uuid=True), nullable=True)
+    content_hash = Column(String(64), nullable=False)
+    minhash = Column(ARRAY(BigInteger), nullable=False)
+    lsh_bands = Column(ARRAY(BigInteger), nullable=False)
+    embedding = Column(Vector(1536), nullable=True)
+
+
+# ---------------------------------------------------------------------------
+# 18. IngestionCheckpoint — Resumable progress of one PDF ingestion (L1)
+#     college_id nullable like MedicalContent (NULL = platform-wide).
+# ---------------------------------------------------------------------------
+
+class IngestionCheckpoint(Base):
+    """Progress of a streaming PDF ingestion, committed per page range.
+
+    Each page range's MedicalContent rows are committed together with the
+    checkpoint, so re-uploading the same file (same file_hash and scope)
+    after a crash resumes at pages_done. carry_text, next_chunk_index and
+    char_offset are the chunker state at that page boundary.
+
+    A new edition of a document links to the one it replaces through
+    previous_document_id; version counts up from 1 along that chain.
+    """
+    __tablename__ = "ingestion_checkpoints"
+    __table_args__ = (
+        Index(
+            "ix_ingestion_checkpoint_file",
+            "file_hash", "status",
+        ),
+        Index(
+            "ix_ingestion_checkpoint_document",
+            "document_id",
+        ),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    college_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("colleges.id"),
+        nullable=True,
+    )
+    file_hash = Column(String(64), nullable=False)
+    document_id = Column(UUID(as_uuid=True), nullable=False)
+    previous_document_id = Column(UUID(as_uuid=True), nullable=True)
+    version = Column(Integer, nullable=False, default=1)
+    filename = Column(String(500), nullable=False)
+    source_type = Column(String(30), nullable=False)
+    status = Column(String(20), nullable=False, default="in_progress")
+    total_pages = Column(Integer, nullable=False)
+    pages_done = Column(Integer, nullable=False, default=0)
+    pages_extracted = Column(Integer, nullable=False, default=0)
+    next_chunk_index = Column(Integer, nullable=False, default=0)
+    char_offset = Column(Integer, nullable=False, default=0)
+    carry_text = Column(Text, nullable=False, default="")
+    chunks_stored = Column(Integer, nullable=False, default=0)
+    chunks_skipped = Column(Integer, nullable=False, default=0)
+    chunks_reused = Column(Integer, nullable=False, default=0)
+    chunks_near_duplicate = Column(Integer, nullable=False, default=0)
+    classification_batch_ids = Column(
+        ARRAY(String), nullable=False, server_default="{}",
+    )
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=text("NOW()"),
+        nullable=False,
+    )
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=text("NOW()"),
+        onupdate=text("NOW()"),
+        nullable=False,
+    )
+
+
+# ---------------------------------------------------------------------------
+# 19. MedicalEntityAlias — Names and synonyms of knowledge graph nodes
+#     NOT tenant-scoped — medical knowledge graph is platform-wide.
+# ---------------------------------------------------------------------------
+
+class MedicalEntityAlias(Base):
+    """One name an entity can be looked up by: "MI", "heart attack", ...
+
+    Every entity has a "name" row and one "alias" row per entry of
+    MedicalEntity.aliases; curated "synonym" rows add more. Lookups go
+    through normalized_alias (see knowledge_graph.normalize_name), which
+    carries a pg_trgm GIN index (created in migration) for the entity
+    resolver's fuzzy matching.
+    """
+    __tablename__ = "medical_entity_aliases"
+    __table_args__ = (
+        UniqueConstraint(
+            "entity_id", "normalized_alias",
+            name="uq_entity_alias",
+        ),
+        Index("ix_entity_alias_normalized", "normalized_alias"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    entity_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("medical_entities.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    alias = Column(String(500), nullable=False)
+    normalized_alias = Column(String(500), nullable=False)
+    source = Column(String(20), nullable=False, default="synonym")
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=text("NOW()"),
+        nullable=False,
+    )
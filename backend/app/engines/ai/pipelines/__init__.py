@@ -29,8 +29,10 @@ from app.engines.ai.pipelines.medical_safety import (  # noqa: F401
     BiasDetectionCheck,
     BloomsVerificationCheck,
     ClinicalAccuracyCheck,
+    CombinedSafetyCheck,
     ItemWritingFlawCheck,
     MedicalSafetyPipeline,
+    SafetyItem,
     SafetyResult,
     SourceGroundingCheck,
 )
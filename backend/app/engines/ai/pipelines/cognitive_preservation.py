@@ -12,6 +12,12 @@ Pipeline stages:
 3. DifficultyCalibrator — ensures scaffolding matches student ZPD
 4. SourceCitationVerifier — ensures claims reference specific sources
 
+Stage 1 is gated by a local pre-screen (direct_answer_rules): clear direct
+answers and clear Socratic replies are decided without an LLM call. The
+remaining LLM stages are independent and run concurrently, and every stage
+verdict is cached by a hash of its exact inputs, so an unchanged response
+(e.g. an identical regeneration) is never re-checked.
+
 If a response fails ANY stage, it is REJECTED and sent back to the
 generating agent with specific instructions for regeneration.
 Maximum regeneration attempts: 3. After 3 failures, the response is
@@ -24,8 +30,11 @@ This pipeline does NOT apply to:
 - Emergency/safety content (never Socratic — direct and clear)
 """
 
+import asyncio
 import hashlib
 import logging
+import time
+from collections import OrderedDict
 from collections.abc import Awaitable, Callable
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
@@ -36,6 +45,11 @@ from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.engines.ai.models import BridgeLayerResult, SafetyCheck
+from app.engines.ai.pipelines.direct_answer_rules import (
+    LocalDirectAnswerResult,
+    LocalVerdict,
+    detect_direct_answer_locally,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -52,6 +66,21 @@ SCAFFOLDING_LEVELS = (
 )
 
 
+# ---------------------------------------------------------------------------
+# Stage verdict cache — keyed by a hash of the stage's exact inputs
+# ---------------------------------------------------------------------------
+
+STAGE_CACHE_TTL = 900  # 15 minutes
+STAGE_CACHE_MAX_ENTRIES = 4096
+
+_stage_cache: OrderedDict[str, tuple[BaseModel, float]] = OrderedDict()
+
+
+def invalidate_stage_cache() -> None:
+    """Drop all cached stage verdicts (e.g. after a stage prompt change)."""
+    _stage_cache.clear()
+
+
 # ---------------------------------------------------------------------------
 # Pydantic schemas for structured output (constrained decoding)
 # ---------------------------------------------------------------------------
@@ -272,7 +301,9 @@ class CognitivePreservationPipeline:
             student_profile: Dict with keys: knowledge_level, mastery_score,
                 known_concepts, misconceptions.
             context: Dict with keys: active_pdf, active_chapter, active_page,
-                active_source (for citation verification).
+                active_source (for citation verification), answer_key
+                (retrieved passages containing the answer, for the local
+                direct-answer pre-screen).
             college_id: For budget tracking on Haiku calls.
 
         Returns:
@@ -282,12 +313,40 @@ class CognitivePreservationPipeline:
         stage_results: list[StageResult] = []
         regeneration_parts: list[str] = []
 
-        # --- Stage 1: Direct Answer Detection ---
-        detection = await self._stage_direct_answer(
-            db, student_question, ai_response,
-            student_profile.get("knowledge_level", "intermediate"),
-            college_id,
+        active_source = context.get(
+            "active_source",
+            context.get("active_pdf", "their study materials"),
+        )
+
+        # Stage 1 local gate — clear cases skip the LLM detector.
+        local = detect_direct_answer_locally(
+            ai_response, context.get("answer_key") or (),
         )
+        if local.decided:
+            detection_job = self._resolved(_detection_from_local(local))
+        else:
+            detection_job = self._stage_direct_answer(
+                db, student_question, ai_response,
+                student_profile.get("knowledge_level", "intermediate"),
+                college_id,
+            )
+
+        # Stages are independent — run them concurrently.
+        detection, scaffolding, calibration, citation = await self._gather(
+            db,
+            detection_job,
+            self._stage_scaffolding(
+                db, student_question, ai_response, student_profile,
+                college_id,
+            ),
+            self._stage_difficulty(
+                db, student_question, ai_response, student_profile,
+                college_id,
+            ),
+            self._stage_citation(db, ai_response, active_source, college_id),
+        )
+
+        # --- Stage 1: Direct Answer Detection ---
         stage_results.append(StageResult(
             stage_name="direct_answer_detection",
             passed=not detection.gives_direct_answer,
@@ -295,6 +354,7 @@ class CognitivePreservationPipeline:
                 "gives_direct_answer": detection.gives_direct_answer,
                 "evidence": detection.evidence,
                 "engagement_score": detection.engagement_score,
+                "detector": "local" if local.decided else "llm",
             },
         ))
         if detection.gives_direct_answer:
@@ -305,9 +365,6 @@ class CognitivePreservationPipeline:
             )
 
         # --- Stage 2: Scaffolding Evaluation ---
-        scaffolding = await self._stage_scaffolding(
-            db, student_question, ai_response, student_profile, college_id,
-        )
         stage_results.append(StageResult(
             stage_name="scaffolding_evaluation",
             passed=scaffolding.asks_question and scaffolding.scaffolding_appropriate,
@@ -330,9 +387,6 @@ class CognitivePreservationPipeline:
             )
 
         # --- Stage 3: Difficulty Calibration (ZPD) ---
-        calibration = await self._stage_difficulty(
-            db, student_question, ai_response, student_profile, college_id,
-        )
         stage_results.append(StageResult(
             stage_name="difficulty_calibration",
             passed=calibration.difficulty_appropriate,
@@ -350,13 +404,6 @@ class CognitivePreservationPipeline:
             )
 
         # --- Stage 4: Source Citation Verification ---
-        active_source = context.get(
-            "active_source",
-            context.get("active_pdf", "their study materials"),
-        )
-        citation = await self._stage_citation(
-            db, ai_response, active_source, college_id,
-        )
         stage_results.append(StageResult(
             stage_name="source_citation_verification",
             passed=citation.has_source_citations and citation.points_to_where,
@@ -521,18 +568,13 @@ class CognitivePreservationPipeline:
             f"Student's current knowledge level: {knowledge_level}"
         )
 
-        return await self.gateway.complete_structured(
+        return await self._complete_stage(
             db,
             system_prompt=DIRECT_ANSWER_DETECTION_PROMPT,
             user_message=user_message,
             output_schema=DirectAnswerDetection,
-            model="claude-haiku-4-5-20251001",
-            college_id=college_id,
-            agent_id="bridge_layer",
-            task_type="bridge_layer_check",
-            cache_system_prompt=True,
             max_tokens=512,
-            temperature=0.0,
+            college_id=college_id,
         )
 
     async def _stage_scaffolding(
@@ -558,18 +600,13 @@ class CognitivePreservationPipeline:
             f"AI's proposed response: {ai_response}"
         )
 
-        return await self.gateway.complete_structured(
+        return await self._complete_stage(
             db,
             system_prompt=prompt,
             user_message=user_message,
             output_schema=ScaffoldingEvaluation,
-            model="claude-haiku-4-5-20251001",
-            college_id=college_id,
-            agent_id="bridge_layer",
-            task_type="bridge_layer_check",
-            cache_system_prompt=True,
             max_tokens=512,
-            temperature=0.0,
+            college_id=college_id,
         )
 
     async def _stage_difficulty(
@@ -599,18 +636,13 @@ class CognitivePreservationPipeline:
             f"AI's proposed response: {ai_response}"
         )
 
-        return await self.gateway.complete_structured(
+        return await self._complete_stage(
             db,
             system_prompt=prompt,
             user_message=user_message,
             output_schema=DifficultyCalibration,
-            model="claude-haiku-4-5-20251001",
-            college_id=college_id,
-            agent_id="bridge_layer",
-            task_type="bridge_layer_check",
-            cache_system_prompt=True,
             max_tokens=512,
-            temperature=0.0,
+            college_id=college_id,
         )
 
     async def _stage_citation(
@@ -625,20 +657,90 @@ class CognitivePreservationPipeline:
             active_source=active_source,
         )
 
-        return await self.gateway.complete_structured(
+        return await self._complete_stage(
             db,
             system_prompt=prompt,
             user_message=f"AI's proposed response:\n\n{ai_response}",
             output_schema=CitationCheck,
+            max_tokens=256,
+            college_id=college_id,
+        )
+
+    # ------------------------------------------------------------------
+    # Stage execution (private)
+    # ------------------------------------------------------------------
+
+    async def _complete_stage(
+        self,
+        db: AsyncSession,
+        *,
+        system_prompt: str,
+        user_message: str,
+        output_schema: type[BaseModel],
+        max_tokens: int,
+        college_id: UUID,
+    ) -> BaseModel:
+        """Run one LLM stage, reusing a cached verdict for identical input.
+
+        The key covers everything the verdict depends on — the rendered
+        system prompt (student profile, active source), the user message
+        (question and response) and the schema — so a hit is exactly the
+        call that would have been made.
+        """
+        key = hashlib.sha256(
+            "\x1f".join((
+                str(college_id), output_schema.__name__,
+                system_prompt, user_message,
+            )).encode()
+        ).hexdigest()
+
+        now = time.monotonic()
+        cached = _stage_cache.get(key)
+        if cached and (now - cached[1]) < STAGE_CACHE_TTL:
+            _stage_cache.move_to_end(key)
+            return cached[0]
+
+        verdict = await self.gateway.complete_structured(
+            db,
+            system_prompt=system_prompt,
+            user_message=user_message,
+            output_schema=output_schema,
             model="claude-haiku-4-5-20251001",
             college_id=college_id,
             agent_id="bridge_layer",
             task_type="bridge_layer_check",
             cache_system_prompt=True,
-            max_tokens=256,
+            max_tokens=max_tokens,
             temperature=0.0,
         )
 
+        _stage_cache[key] = (verdict, now)
+        _stage_cache.move_to_end(key)
+        while len(_stage_cache) > STAGE_CACHE_MAX_ENTRIES:
+            _stage_cache.popitem(last=False)
+        return verdict
+
+    async def _gather(
+        self,
+        db: AsyncSession,
+        *stages: Awaitable[Any],
+    ) -> list[Any]:
+        """Await stages concurrently; cancel the rest if one fails."""
+        tasks = [asyncio.ensure_future(stage) for stage in stages]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # Audit writes of cancelled calls finish in the background.
+            await self.gateway.drain(db)
+            raise
+
+    @staticmethod
+    async def _resolved(value: Any) -> Any:
+        return value
+
     # ------------------------------------------------------------------
     # Fallback
     # ------------------------------------------------------------------
@@ -658,3 +760,19 @@ class CognitivePreservationPipeline:
             context.get("active_pdf", "this topic"),
         )
         return FALLBACK_SOCRATIC_TEMPLATE.format(topic=topic)
+
+
+def _detection_from_local(local: LocalDirectAnswerResult) -> DirectAnswerDetection:
+    """Stage 1 verdict from a decided local pre-screen."""
+    gives_direct_answer = local.verdict is LocalVerdict.DIRECT
+    return DirectAnswerDetection(
+        gives_direct_answer=gives_direct_answer,
+        evidence=local.evidence,
+        suggested_socratic_approach=(
+            "ask a guiding question that leads the student to this "
+            "conclusion and point them to where they can verify it"
+            if gives_direct_answer
+            else ""
+        ),
+        engagement_score=local.engagement_score,
+    )
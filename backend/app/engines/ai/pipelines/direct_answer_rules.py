@@ -0,0 +1,268 @@
+"""Deterministic direct-answer pre-screen for the Bridge Layer.
+
+Runs before the LLM DirectAnswerDetector stage of the
+CognitivePreservationPipeline (Section L2). Two cheap signals decide the
+clear cases locally — no LLM call:
+
+- giveaway phrases   — "The answer is...", "The diagnosis is...",
+                        "Option C is correct", "This is caused by..."
+                        (ignored inside questions: "What do you think
+                        the answer is?")
+- answer-key overlap — a declarative sentence of the response restates a
+                        sentence of the retrieved answer key (content-word
+                        containment)
+
+Verdicts:
+
+- DIRECT    — a giveaway phrase, or a declarative sentence that restates
+              the answer key. The stage fails without asking the LLM.
+- SOCRATIC  — the response asks a question, has no giveaway phrase and
+              every declarative sentence was long enough to score and
+              barely overlaps the answer key. The stage passes without
+              asking the LLM. Requires an answer key — without one there
+              is nothing to compare against.
+- UNCERTAIN — anything else; the LLM stage decides.
+
+RollingDirectAnswerGate applies the same screen to streamed text, a
+sliding window of sentences at a time, so a streaming agent can deliver
+text as it is generated and stop at the first confirmed direct answer.
+"""
+
+import enum
+import re
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+# Declarative sentence containment at or above this → restates the key.
+DIRECT_OVERLAP_THRESHOLD = 0.7
+# Maximum containment for a local Socratic pass.
+SOCRATIC_OVERLAP_THRESHOLD = 0.3
+# Sentences with fewer content words are too short to judge.
+_MIN_SENTENCE_TOKENS = 5
+# Rolling gate: sentences screened together, and completed sentences held
+# back before delivery.
+WINDOW_SENTENCES = 3
+LOOKAHEAD_SENTENCES = 1
+
+
+# ---------------------------------------------------------------------------
+# Compiled patterns
+# ---------------------------------------------------------------------------
+
+_GIVEAWAY_RE = re.compile(
+    r"\bthe\s+(?:correct\s+|right\s+|final\s+)?"
+    r"(?:answer|diagnosis|option|choice)\s+(?:is|would\s+be)\b"
+    r"|\bthe\s+most\s+likely\s+(?:diagnosis|cause|answer)\s+is\b"
+    r"|\b(?:option|choice)\s+\(?[A-E]\)?\s+is\s+(?:the\s+)?(?:correct|right)\b"
+    r"|\bthis\s+is\s+(?:caused\s+by|due\s+to)\b"
+    r"|\byou\s+should\s+know\s+that\b",
+    re.IGNORECASE,
+)
+# A giveaway phrase inside a question asks for the answer, not gives it.
+_INTERROGATIVE_RE = re.compile(
+    r"^\W*(?:what\s+do\s+you\s+think|(?:can|could)\s+you|why)\b",
+    re.IGNORECASE,
+)
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD_RE = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+_STOPWORDS = frozenset({
+    "the", "and", "for", "are", "was", "were", "with", "that", "this",
+    "from", "which", "what", "when", "where", "who", "why", "how", "has",
+    "have", "had", "its", "into", "can", "could", "would", "should", "will",
+    "may", "might", "not", "but", "you", "your", "their", "they", "there",
+    "these", "those", "then", "than", "also", "such", "some", "any", "all",
+    "more", "most", "very", "been", "being", "does", "did", "our", "about",
+})
+
+
+# ---------------------------------------------------------------------------
+# Data classes
+# ---------------------------------------------------------------------------
+
+class LocalVerdict(str, enum.Enum):
+    DIRECT = "direct"
+    SOCRATIC = "socratic"
+    UNCERTAIN = "uncertain"
+
+
+@dataclass(frozen=True, slots=True)
+class LocalDirectAnswerResult:
+    """Outcome of the local direct-answer pre-screen."""
+
+    verdict: LocalVerdict
+    evidence: str
+    max_overlap: float
+
+    @property
+    def decided(self) -> bool:
+        return self.verdict is not LocalVerdict.UNCERTAIN
+
+    @property
+    def engagement_score(self) -> float:
+        if self.verdict is LocalVerdict.DIRECT:
+            return 0.0
+        return round(1.0 - self.max_overlap, 2)
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+def detect_direct_answer_locally(
+    ai_response: str,
+    answer_key: Iterable[str] = (),
+) -> LocalDirectAnswerResult:
+    """Classify a response as DIRECT / SOCRATIC / UNCERTAIN without an LLM.
+
+    Args:
+        ai_response: The response to screen.
+        answer_key: Retrieved passages that contain the answer (e.g. the
+            Study Buddy's RAG passages). Empty disables the overlap signal
+            and the local Socratic pass.
+    """
+    for match in _GIVEAWAY_RE.finditer(ai_response):
+        sentence = _sentence_around(ai_response, match.start(), match.end())
+        if _is_question(sentence):
+            continue
+        return LocalDirectAnswerResult(
+            verdict=LocalVerdict.DIRECT,
+            evidence=sentence,
+            max_overlap=1.0,
+        )
+
+    key_sentences = [
+        tokens
+        for passage in answer_key
+        for sentence in _SENTENCE_SPLIT_RE.split(passage)
+        if (tokens := _content_tokens(sentence))
+    ]
+    max_overlap = 0.0
+    evidence = ""
+    # A short declarative ("It's an MI.") can give the answer away without
+    # enough words to score, so it rules out a local Socratic pass.
+    unscored = False
+    if key_sentences:
+        for sentence in _SENTENCE_SPLIT_RE.split(ai_response):
+            sentence = sentence.strip()
+            if not sentence or _is_question(sentence):
+                continue
+            tokens = _content_tokens(sentence)
+            if len(tokens) < _MIN_SENTENCE_TOKENS:
+                unscored = True
+                continue
+            overlap = max(len(tokens & key) for key in key_sentences)
+            containment = overlap / len(tokens)
+            if containment > max_overlap:
+                max_overlap, evidence = containment, sentence
+
+    if max_overlap >= DIRECT_OVERLAP_THRESHOLD:
+        verdict = LocalVerdict.DIRECT
+    elif (
+        key_sentences
+        and "?" in ai_response
+        and not unscored
+        and max_overlap < SOCRATIC_OVERLAP_THRESHOLD
+    ):
+        verdict = LocalVerdict.SOCRATIC
+    else:
+        verdict = LocalVerdict.UNCERTAIN
+
+    return LocalDirectAnswerResult(
+        verdict=verdict,
+        evidence=evidence,
+        max_overlap=round(max_overlap, 3),
+    )
+
+
+class RollingDirectAnswerGate:
+    """Incremental detect_direct_answer_locally over streamed text.
+
+    Feed text deltas as they arrive. Each sentence is screened when it
+    completes, together with the sentences before it (WINDOW_SENTENCES in
+    all), and released once LOOKAHEAD_SENTENCES later sentences have been
+    screened too: the splitter also breaks at abbreviations and decimals,
+    so a giveaway can span what it sees as two sentences. The first
+    DIRECT verdict is a confirmed violation — nothing more is released.
+    UNCERTAIN windows pass; the full pipeline judges the whole response.
+    """
+
+    def __init__(self, answer_key: Iterable[str] = ()) -> None:
+        self._answer_key = list(answer_key)
+        self._pending = ""
+        self._held: list[str] = []
+        self._window: deque[str] = deque(maxlen=WINDOW_SENTENCES)
+        self.violation: LocalDirectAnswerResult | None = None
+        self.released = ""
+
+    def feed(self, text: str) -> str:
+        """Add streamed text; return the text now safe to deliver."""
+        if self.violation is not None:
+            return ""
+        self._pending += text
+        while (boundary := _SENTENCE_SPLIT_RE.search(self._pending)):
+            sentence = self._pending[:boundary.end()]
+            self._pending = self._pending[boundary.end():]
+            if not self._screen(sentence):
+                return ""
+        return self._release(LOOKAHEAD_SENTENCES)
+
+    def finish(self) -> str:
+        """Screen the trailing sentence; return everything still held."""
+        if self.violation is not None:
+            return ""
+        sentence, self._pending = self._pending, ""
+        if not self._screen(sentence):
+            return ""
+        return self._release(0)
+
+    def _screen(self, sentence: str) -> bool:
+        """Hold a completed sentence; False on a confirmed violation."""
+        self._held.append(sentence)
+        if not sentence.strip():
+            return True
+        self._window.append(sentence.strip())
+        result = detect_direct_answer_locally(
+            " ".join(self._window), self._answer_key,
+        )
+        if result.verdict is LocalVerdict.DIRECT:
+            self.violation = result
+            return False
+        return True
+
+    def _release(self, keep: int) -> str:
+        """Release held sentences, keeping the last ``keep`` non-blank."""
+        held = sum(1 for s in self._held if s.strip())
+        out: list[str] = []
+        while self._held and (held > keep or not self._held[0].strip()):
+            sentence = self._held.pop(0)
+            held -= bool(sentence.strip())
+            out.append(sentence)
+        text = "".join(out)
+        self.released += text
+        return text
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _content_tokens(text: str) -> frozenset[str]:
+    return frozenset(
+        w for w in _WORD_RE.findall(text.lower())
+        if len(w) > 2 and w not in _STOPWORDS
+    )
+
+
+def _is_question(sentence: str) -> bool:
+    sentence = sentence.strip()
+    return sentence.endswith("?") or bool(_INTERROGATIVE_RE.match(sentence))
+
+
+def _sentence_around(text: str, start: int, end: int) -> str:
+    """Return the sentence containing text[start:end]."""
+    left = max(text.rfind(c, 0, start) for c in ".!?\n") + 1
+    rights = [i for c in ".!?\n" if (i := text.find(c, end)) != -1]
+    right = min(rights) + 1 if rights else len(text)
+    return text[left:right].strip()
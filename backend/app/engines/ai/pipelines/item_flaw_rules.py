@@ -0,0 +1,384 @@
+"""Deterministic NBME item-writing flaw pre-screen.
+
+Runs before the LLM item-writing flaw check in MedicalSafetyPipeline
+(Section L3). Flaws with a mechanical signature are detected locally with
+precompiled patterns in a single pass over the parsed MCQ — no LLM call:
+
+- all_none_of_above   — "All/None of the above" options
+- absolute_terms      — always / never in options
+- longest_answer_bias — key is clearly the longest option
+- grammatical_cues    — "a"/"an" at the end of the lead-in agrees only
+                        with the key
+- negative_stem_no_emphasis — lowercase not / except / "least likely"
+                        in lead-in
+- convergence_cues    — key shares the most elements with other options
+- k_type_items        — "1 and 3" / "2, 3 and 4 only" options
+- logical_cues        — one option's words are a subset of another's
+- word_repeats        — distinctive stem word repeated only in the key
+
+Option-length skew and other testwise cues stay with the LLM, which also
+looks at formatting cues the rules cannot see.
+
+Only the flaws in RULE_COVERED_FLAWS are removed from the LLM prompt; the
+remaining semantic flaws (implausible distractors, window dressing, ...)
+are still reviewed by the LLM.
+"""
+
+import re
+from dataclasses import dataclass, field
+
+from app.engines.ai.pipelines.nbme_standards import ItemWritingFlaw
+
+# Flaws fully decided by the rules — the LLM is not asked about these.
+RULE_COVERED_FLAWS: frozenset[ItemWritingFlaw] = frozenset({
+    ItemWritingFlaw.ALL_NONE_OF_ABOVE,
+    ItemWritingFlaw.ABSOLUTE_TERMS,
+    ItemWritingFlaw.LONGEST_ANSWER_BIAS,
+    ItemWritingFlaw.GRAMMATICAL_CUES,
+    ItemWritingFlaw.NEGATIVE_STEM_NO_EMPHASIS,
+    ItemWritingFlaw.CONVERGENCE_CUES,
+    ItemWritingFlaw.K_TYPE_ITEMS,
+    ItemWritingFlaw.LOGICAL_CUES,
+    ItemWritingFlaw.WORD_REPEATS,
+})
+
+# Key must be ≥ this multiple of the mean distractor length (words)...
+LONGEST_ANSWER_RATIO = 1.5
+# ...and at least this many words longer.
+LONGEST_ANSWER_MIN_DIFF = 3
+
+# Word-repeat cue only counts distinctive words of this length or more.
+_WORD_REPEAT_MIN_LEN = 6
+
+
+# ---------------------------------------------------------------------------
+# Compiled patterns
+# ---------------------------------------------------------------------------
+
+# Formatted question fields as produced by _format_question_for_validation.
+_FIELD_RE = re.compile(
+    r"^\s*(?P<field>Stem|Lead-in|Correct answer)\s*:\s*(?P<value>.*)$",
+    re.IGNORECASE | re.MULTILINE,
+)
+_OPTION_RE = re.compile(
+    r"^\s*(?P<letter>[A-E])[.)]\s+(?P<text>.*\S)\s*$", re.MULTILINE,
+)
+
+# One pass per option. Bare "all" / "none" / "every" are ordinary words
+# in options ("All patients need...") and are not flagged.
+_OPTION_LEXICAL_RE = re.compile(
+    r"(?P<all_none>\b(?:all|none)\s+of\s+the\s+above\b)"
+    r"|(?P<absolute>\b(?:always|never)\b)",
+    re.IGNORECASE,
+)
+_K_TYPE_RE = re.compile(
+    r"^\s*(?:\d+|[ivx]+)(?:\s*(?:,|and|&)\s*(?:\d+|[ivx]+))*"
+    r"(?:\s+only)?\s*\.?\s*$",
+    re.IGNORECASE,
+)
+# Case-sensitive: NOT / EXCEPT / LEAST in capitals is the accepted emphasis.
+# "least" only in the "least likely / appropriate" lead-in form — "at
+# least 2 weeks" is not a negation.
+_NEGATIVE_RE = re.compile(
+    r"\b(?:not|except|incorrect)\b"
+    r"|\bleast(?=\s+(?:likely|appropriate|common|accurate|useful)\b)"
+)
+_TRAILING_ARTICLE_RE = re.compile(r"\b(?P<article>an?)\W*$", re.IGNORECASE)
+_ELEMENT_SPLIT_RE = re.compile(
+    r",|;|/|\+|\band\b|\bor\b|\bwith\b", re.IGNORECASE,
+)
+_WORD_RE = re.compile(r"[a-z][a-z\-]+")
+
+_STOPWORDS = frozenset({
+    "patient", "patients", "following", "presents", "history", "likely",
+    "diagnosis", "management", "treatment", "which", "should", "because",
+    "through", "without", "within", "before", "during", "between",
+    "symptoms", "examination", "findings", "reveals", "appropriate",
+})
+
+
+# ---------------------------------------------------------------------------
+# Data classes
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True, slots=True)
+class ParsedMCQ:
+    """A single-best-answer MCQ split into stem, lead-in and options."""
+
+    stem: str
+    lead_in: str
+    options: tuple[str, ...]
+    correct_index: int | None
+
+
+@dataclass(frozen=True, slots=True)
+class RuleFlaw:
+    """A flaw detected by a deterministic rule."""
+
+    code: ItemWritingFlaw
+    evidence: str
+    explanation: str
+    suggested_fix: str
+
+
+@dataclass(slots=True)
+class PrescreenResult:
+    """Outcome of the rule pre-screen for one question."""
+
+    parsed: ParsedMCQ
+    flaws: list[RuleFlaw] = field(default_factory=list)
+
+    @property
+    def clean(self) -> bool:
+        return not self.flaws
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+
+def parse_mcq(content: str) -> ParsedMCQ | None:
+    """Parse formatted MCQ text; None if it is not a ≥3-option MCQ."""
+    options = [m.group("text") for m in _OPTION_RE.finditer(content)]
+    if len(options) < 3:
+        return None
+
+    fields = {
+        m.group("field").lower(): m.group("value").strip()
+        for m in _FIELD_RE.finditer(content)
+    }
+
+    stem = fields.get("stem", "")
+    lead_in = fields.get("lead-in", "")
+    if not stem and not lead_in:
+        # Unlabelled question: everything before the first option.
+        first_option = _OPTION_RE.search(content)
+        stem = content[:first_option.start()].strip() if first_option else ""
+        sentences = re.split(r"(?<=[.?!])\s+", stem)
+        lead_in = sentences[-1] if sentences else ""
+
+    correct_index: int | None = None
+    answer = fields.get("correct answer", "")
+    if answer[:1] and answer[:1].upper() in "ABCDE":
+        index = "ABCDE".index(answer[:1].upper())
+        if index < len(options):
+            correct_index = index
+
+    return ParsedMCQ(
+        stem=stem,
+        lead_in=lead_in,
+        options=tuple(options),
+        correct_index=correct_index,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Pre-screen
+# ---------------------------------------------------------------------------
+
+def prescreen_item_flaws(content: str) -> PrescreenResult | None:
+    """Run every rule over one question.
+
+    Returns None when the content cannot be parsed as an MCQ (SAQ, LAQ,
+    free text) — the caller must then fall back to the full LLM check.
+    """
+    parsed = parse_mcq(content)
+    if parsed is None:
+        return None
+
+    flaws: list[RuleFlaw] = []
+    options = parsed.options
+    key = parsed.correct_index
+    option_words = [_WORD_RE.findall(o.lower()) for o in options]
+    lengths = [len(o.split()) for o in options]
+
+    # --- Lexical rules: one scan per option ---
+    k_type_count = 0
+    absolute_hits: list[str] = []
+    for i, text in enumerate(options):
+        for match in _OPTION_LEXICAL_RE.finditer(text):
+            if match.group("all_none"):
+                flaws.append(RuleFlaw(
+                    code=ItemWritingFlaw.ALL_NONE_OF_ABOVE,
+                    evidence=f"{'ABCDE'[i]}. {text}",
+                    explanation=(
+                        "Partial knowledge of the other options is enough "
+                        "to select or eliminate this option."
+                    ),
+                    suggested_fix=(
+                        "Replace with a plausible, independent distractor."
+                    ),
+                ))
+            elif f"{'ABCDE'[i]}. {text}" not in absolute_hits:
+                absolute_hits.append(f"{'ABCDE'[i]}. {text}")
+        if _K_TYPE_RE.match(text):
+            k_type_count += 1
+
+    if absolute_hits:
+        flaws.append(RuleFlaw(
+            code=ItemWritingFlaw.ABSOLUTE_TERMS,
+            evidence="; ".join(absolute_hits[:3]),
+            explanation=(
+                "Absolute qualifiers signal a wrong option to test-wise "
+                "students."
+            ),
+            suggested_fix="Remove the absolute qualifier or quantify it.",
+        ))
+
+    if k_type_count >= 2:
+        flaws.append(RuleFlaw(
+            code=ItemWritingFlaw.K_TYPE_ITEMS,
+            evidence=" | ".join(options),
+            explanation="Combination options penalize partial knowledge.",
+            suggested_fix="Rewrite as a single-best-answer item.",
+        ))
+
+    # --- Negative lead-in without emphasis ---
+    negative = _NEGATIVE_RE.search(parsed.lead_in)
+    if negative:
+        flaws.append(RuleFlaw(
+            code=ItemWritingFlaw.NEGATIVE_STEM_NO_EMPHASIS,
+            evidence=parsed.lead_in,
+            explanation=(
+                f"'{negative.group(0)}' is easy to miss and reverses the "
+                "expected answer."
+            ),
+            suggested_fix=(
+                "Rephrase positively, or capitalize the negation "
+                f"('{negative.group(0).upper()}')."
+            ),
+        ))
+
+    if key is not None:
+        flaws.extend(_key_rules(parsed, key, option_words, lengths))
+
+    # --- Logical cues: one option's words contained in another's ---
+    subset = _find_subset_option(option_words)
+    if subset is not None:
+        i, j = subset
+        flaws.append(RuleFlaw(
+            code=ItemWritingFlaw.LOGICAL_CUES,
+            evidence=(
+                f"{'ABCDE'[i]}. {options[i]} ⊂ {'ABCDE'[j]}. {options[j]}"
+            ),
+            explanation=(
+                "One option is a subset of another, so options can be "
+                "eliminated by logic alone."
+            ),
+            suggested_fix="Make every option independent.",
+        ))
+
+    return PrescreenResult(parsed=parsed, flaws=flaws)
+
+
+def _find_subset_option(
+    option_words: list[list[str]],
+) -> tuple[int, int] | None:
+    """First (i, j) where option i's words are a strict subset of j's."""
+    word_sets = [set(words) for words in option_words]
+    for i, small in enumerate(word_sets):
+        if len(small) < 2:
+            continue
+        for j, large in enumerate(word_sets):
+            if i != j and len(large) > len(small) and small <= large:
+                return i, j
+    return None
+
+
+def _key_rules(
+    parsed: ParsedMCQ,
+    key: int,
+    option_words: list[list[str]],
+    lengths: list[int],
+) -> list[RuleFlaw]:
+    """Rules that compare the correct answer with the distractors."""
+    flaws: list[RuleFlaw] = []
+    options = parsed.options
+    key_label = f"{'ABCDE'[key]}. {options[key]}"
+    distractor_lengths = [n for i, n in enumerate(lengths) if i != key]
+    mean_distractor = sum(distractor_lengths) / len(distractor_lengths)
+
+    # --- Longest answer bias ---
+    if (
+        lengths[key] > max(distractor_lengths)
+        and lengths[key] >= LONGEST_ANSWER_RATIO * mean_distractor
+        and lengths[key] - mean_distractor >= LONGEST_ANSWER_MIN_DIFF
+    ):
+        flaws.append(RuleFlaw(
+            code=ItemWritingFlaw.LONGEST_ANSWER_BIAS,
+            evidence=f"{key_label} ({lengths[key]} words vs "
+            f"{mean_distractor:.1f} mean for distractors)",
+            explanation="The key is noticeably longer than every distractor.",
+            suggested_fix="Balance option lengths and level of detail.",
+        ))
+
+    # --- Grammatical cue: trailing article agrees only with the key ---
+    article = _TRAILING_ARTICLE_RE.search(parsed.lead_in or parsed.stem)
+    if article:
+        wants_vowel = article.group("article").lower() == "an"
+
+        def _agrees(text: str) -> bool:
+            return (text[:1].lower() in "aeiou") == wants_vowel
+
+        if _agrees(options[key]) and any(
+            not _agrees(o) for i, o in enumerate(options) if i != key
+        ):
+            flaws.append(RuleFlaw(
+                code=ItemWritingFlaw.GRAMMATICAL_CUES,
+                evidence=f"Lead-in ends with '{article.group('article')}'",
+                explanation=(
+                    "The article agrees with the key but not with every "
+                    "distractor."
+                ),
+                suggested_fix=(
+                    "Use 'a/an' in each option, or end with a question."
+                ),
+            ))
+
+    # --- Convergence: key shares the most elements with other options ---
+    elements = [
+        {e.strip().lower() for e in _ELEMENT_SPLIT_RE.split(o) if e.strip()}
+        for o in options
+    ]
+    if sum(1 for e in elements if len(e) > 1) >= 2:
+        frequency: dict[str, int] = {}
+        for option_elements in elements:
+            for element in option_elements:
+                frequency[element] = frequency.get(element, 0) + 1
+        scores = [sum(frequency[e] - 1 for e in es) for es in elements]
+        best = max(scores)
+        if best >= 2 and scores[key] == best and scores.count(best) == 1:
+            flaws.append(RuleFlaw(
+                code=ItemWritingFlaw.CONVERGENCE_CUES,
+                evidence=key_label,
+                explanation=(
+                    "The key combines the elements that recur most across "
+                    "the other options."
+                ),
+                suggested_fix="Vary option elements so none converges.",
+            ))
+
+    # --- Word repeats between stem and key only ---
+    stem_words = set(
+        _WORD_RE.findall(f"{parsed.stem} {parsed.lead_in}".lower())
+    )
+    distractor_words = {
+        w for i, words in enumerate(option_words) if i != key for w in words
+    }
+    repeats = sorted(
+        w for w in set(option_words[key]) & stem_words
+        if len(w) >= _WORD_REPEAT_MIN_LEN
+        and w not in _STOPWORDS
+        and w not in distractor_words
+    )
+    if repeats:
+        flaws.append(RuleFlaw(
+            code=ItemWritingFlaw.WORD_REPEATS,
+            evidence=f"{key_label} — repeats: {', '.join(repeats[:3])}",
+            explanation=(
+                "The key echoes stem vocabulary that no distractor shares."
+            ),
+            suggested_fix="Reword the key or use the term in distractors too.",
+        ))
+
+    return flaws
@@ -8,9 +8,17 @@ Pipeline checks (in order):
 1. Source Grounding Verification — are claims supported by RAG sources?
 2. Clinical Accuracy Validation — cross-reference against knowledge base
 3. Bias Detection — demographic, cultural, gender stereotypes
-4. Item-Writing Flaw Detection — 19 NBME flaw patterns (questions only)
+4. Item-Writing Flaw Detection — 19 NBME flaw patterns (questions only);
+   mechanical flaws are decided by a local rule pre-screen (item_flaw_rules)
 5. Bloom's Level Verification — cognitive level alignment (questions only)
 
+Execution modes:
+- concurrent (default): checks run in parallel under a semaphore; once the
+  best achievable overall confidence drops below the review threshold the
+  outstanding checks are cancelled (hard reject)
+- sequential: same checks and short-circuit, one at a time
+- combined: a single structured call returns all verdicts
+
 Thresholds (configurable per college):
 - Auto-approve: confidence > 0.95 (low-stakes / formative only)
 - Human review: confidence 0.70 - 0.95
@@ -23,17 +31,25 @@ This pipeline does NOT apply to:
 - Non-medical content
 """
 
+import asyncio
 import hashlib
 import logging
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from pydantic import BaseModel
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.engines.ai.models import SafetyCheck
+from app.engines.ai.pipelines.item_flaw_rules import (
+    RULE_COVERED_FLAWS,
+    PrescreenResult,
+    prescreen_item_flaws,
+)
 from app.engines.ai.pipelines.nbme_standards import (
     ItemWritingFlaw,
     build_item_writing_flaw_prompt,
@@ -48,6 +64,28 @@ logger = logging.getLogger(__name__)
 
 QUESTION_CONTENT_TYPES = frozenset({"mcq", "saq", "laq", "emq", "osce", "viva"})
 
+# "concurrent": parallel checks with hard-reject short-circuit (default)
+# "sequential": one check at a time, same short-circuit
+# "combined":   all verdicts from one structured Haiku call
+VALIDATION_MODES = ("concurrent", "sequential", "combined")
+
+# validate_batch packing limits. Input size is estimated at ~4 chars/token;
+# output is budgeted per packed item.
+BATCH_INPUT_TOKEN_BUDGET = 12_000
+BATCH_MAX_ITEMS = 10
+_BATCH_OUTPUT_TOKENS_PER_ITEM = 400
+
+_SCREENED_GROUP = "prescreened"
+
+# Confidence lost per flaw found by the deterministic pre-screen.
+RULE_FLAW_PENALTY = 0.20
+
+_BATCH_INSTRUCTIONS = """
+
+You will receive several numbered <item> elements. Review each item \
+independently, exactly as you would review it alone. Return one verdict \
+per item in `verdicts`, with `item_index` set to that item's index."""
+
 
 # ---------------------------------------------------------------------------
 # Pydantic schemas for structured output (constrained decoding)
@@ -117,6 +155,59 @@ class BloomsVerificationCheck(BaseModel):
     confidence: float  # 0.0 (severe mismatch) to 1.0 (perfect match)
 
 
+class CombinedSafetyCheck(BaseModel):
+    """All five verdicts from a single structured call ("combined" mode)."""
+
+    source_grounding: SourceGroundingCheck
+    clinical_accuracy: ClinicalAccuracyCheck
+    bias_detection: BiasDetectionCheck
+    item_writing_flaws: ItemWritingFlawCheck | None = None  # questions only
+    blooms_verification: BloomsVerificationCheck | None = None
+
+
+# Batched variants (validate_batch): one verdict per packed item, matched
+# back to the caller's item by item_index.
+
+class _BatchedSourceGrounding(SourceGroundingCheck):
+    item_index: int
+
+
+class _BatchedClinicalAccuracy(ClinicalAccuracyCheck):
+    item_index: int
+
+
+class _BatchedBiasDetection(BiasDetectionCheck):
+    item_index: int
+
+
+class _BatchedItemWritingFlaw(ItemWritingFlawCheck):
+    item_index: int
+
+
+class _BatchedBloomsVerification(BloomsVerificationCheck):
+    item_index: int
+
+
+class SourceGroundingBatch(BaseModel):
+    verdicts: list[_BatchedSourceGrounding]
+
+
+class ClinicalAccuracyBatch(BaseModel):
+    verdicts: list[_BatchedClinicalAccuracy]
+
+
+class BiasDetectionBatch(BaseModel):
+    verdicts: list[_BatchedBiasDetection]
+
+
+class ItemWritingFlawBatch(BaseModel):
+    verdicts: list[_BatchedItemWritingFlaw]
+
+
+class BloomsVerificationBatch(BaseModel):
+    verdicts: list[_BatchedBloomsVerification]
+
+
 # ---------------------------------------------------------------------------
 # Safety result
 # ---------------------------------------------------------------------------
@@ -141,6 +232,19 @@ class SafetyResult:
     checks: list[SafetyCheckResult] = field(default_factory=list)
     rejection_reasons: list[str] = field(default_factory=list)
     is_summative_override: bool = False
+    # Checks cancelled because the content was already a certain reject.
+    skipped_checks: list[str] = field(default_factory=list)
+
+
+@dataclass
+class SafetyItem:
+    """One piece of content for MedicalSafetyPipeline.validate_batch."""
+
+    content: str
+    content_type: str
+    source_context: str = ""
+    declared_blooms_level: str | None = None
+    is_summative: bool = False
 
 
 # ---------------------------------------------------------------------------
@@ -279,8 +383,18 @@ class MedicalSafetyPipeline:
         "blooms_verification": 0.10,
     }
 
-    def __init__(self, ai_gateway: Any) -> None:
+    def __init__(
+        self,
+        ai_gateway: Any,
+        *,
+        max_concurrency: int = 5,
+        rules_only_flaw_check: bool = False,
+    ) -> None:
         self.gateway = ai_gateway
+        self.max_concurrency = max_concurrency
+        # True → parseable MCQs skip the LLM item-writing flaw check and
+        # rely on the deterministic pre-screen alone.
+        self.rules_only_flaw_check = rules_only_flaw_check
 
     # ------------------------------------------------------------------
     # Public API
@@ -296,6 +410,7 @@ class MedicalSafetyPipeline:
         source_context: str = "",
         declared_blooms_level: str | None = None,
         is_summative: bool = False,
+        mode: str = "concurrent",
     ) -> SafetyResult:
         """Run all applicable safety checks on medical content.
 
@@ -308,77 +423,481 @@ class MedicalSafetyPipeline:
             declared_blooms_level: The claimed Bloom's level (questions only).
             is_summative: Whether this is summative assessment content.
                 If True, recommendation is ALWAYS "needs_faculty_review".
+            mode: "concurrent" (default) runs independent checks in
+                parallel and cancels the rest on a hard reject;
+                "sequential" runs them one at a time; "combined" asks for
+                all verdicts in a single structured call.
 
         Returns:
             SafetyResult with overall confidence, per-check results,
             and routing recommendation.
         """
-        checks: list[SafetyCheckResult] = []
-        rejection_reasons: list[str] = []
+        if mode not in VALIDATION_MODES:
+            raise ValueError(f"Unknown validation mode: {mode}")
+
         is_question = content_type in QUESTION_CONTENT_TYPES
+        check_blooms = is_question and bool(declared_blooms_level)
+
+        if mode == "combined":
+            verdicts = await self._check_combined(
+                db,
+                content=content,
+                content_type=content_type,
+                source_context=source_context,
+                declared_blooms_level=declared_blooms_level,
+                is_question=is_question,
+                college_id=college_id,
+            )
+            skipped: list[str] = []
+        else:
+            jobs: list[tuple[str, Callable[[], Awaitable[BaseModel]]]] = [
+                ("source_grounding", lambda: self._check_source_grounding(
+                    db, content, source_context, college_id,
+                )),
+                ("clinical_accuracy", lambda: self._check_clinical_accuracy(
+                    db, content, content_type, college_id,
+                )),
+                ("bias_detection", lambda: self._check_bias(
+                    db, content, content_type, college_id,
+                )),
+            ]
+            if is_question:
+                jobs.append(("item_writing_flaws", lambda: (
+                    self._check_item_writing_flaws(db, content, college_id)
+                )))
+            if check_blooms:
+                jobs.append(("blooms_verification", lambda: (
+                    self._check_blooms_alignment(
+                        db, content, declared_blooms_level, college_id,
+                    )
+                )))
+
+            verdicts, skipped = await self._run_checks(
+                db,
+                jobs,
+                max_concurrency=(
+                    1 if mode == "sequential" else self.max_concurrency
+                ),
+                # Summative content always goes to faculty review, who
+                # should see every check — never short-circuit it.
+                short_circuit=not is_summative,
+            )
 
-        # --- Check 1: Source Grounding Verification ---
-        grounding = await self._check_source_grounding(
-            db, content, source_context, college_id,
+        return self._build_result(
+            verdicts, skipped, is_question=is_question, is_summative=is_summative,
+        )
+
+    async def validate_batch(
+        self,
+        db: AsyncSession,
+        *,
+        items: list[SafetyItem],
+        college_id: UUID,
+    ) -> list[SafetyResult]:
+        """Validate many items with one packed call per check type.
+
+        Items are packed into structured calls of at most BATCH_MAX_ITEMS
+        and BATCH_INPUT_TOKEN_BUDGET estimated input tokens; every call
+        returns a verdict array keyed by item_index. Source grounding is
+        packed per distinct source_context so shared RAG context is sent
+        once per call. Any verdict missing from a packed response falls
+        back to a single-item call. Batches run concurrently under
+        max_concurrency.
+
+        Returns one SafetyResult per item, in input order. Persist them
+        with log_checks_batch (single bulk INSERT).
+        """
+        if not items:
+            return []
+
+        def _applies(check_name: str, item: SafetyItem) -> bool:
+            is_question = item.content_type in QUESTION_CONTENT_TYPES
+            if check_name == "item_writing_flaws":
+                return is_question
+            if check_name == "blooms_verification":
+                return is_question and bool(item.declared_blooms_level)
+            return True
+
+        verdicts: list[dict[str, BaseModel]] = [{} for _ in items]
+
+        # (check_name, group key, packed item indices). The group key is
+        # the shared source context for source grounding, and whether the
+        # rule pre-screen parsed the items for item-writing flaws.
+        batches: list[tuple[str, str, list[int]]] = []
+        for check_name in self.CHECK_WEIGHTS:
+            indices = [
+                i for i, item in enumerate(items) if _applies(check_name, item)
+            ]
+            if check_name == "source_grounding":
+                by_source: dict[str, list[int]] = {}
+                for i in indices:
+                    by_source.setdefault(items[i].source_context, []).append(i)
+                groups = list(by_source.items())
+            elif check_name == "item_writing_flaws":
+                screened: list[int] = []
+                unscreened: list[int] = []
+                for i in indices:
+                    screen = prescreen_item_flaws(items[i].content)
+                    if screen is None:
+                        unscreened.append(i)
+                    elif self.rules_only_flaw_check:
+                        verdicts[i][check_name] = _merge_flaw_verdicts(
+                            screen, None,
+                        )
+                    else:
+                        screened.append(i)
+                groups = [("", unscreened), (_SCREENED_GROUP, screened)]
+            else:
+                groups = [("", indices)]
+
+            for group_key, group in groups:
+                budget = BATCH_INPUT_TOKEN_BUDGET - _estimate_tokens(group_key)
+                for packed in _pack_by_tokens(
+                    group,
+                    [_estimate_tokens(items[i].content) for i in group],
+                    token_budget=budget,
+                    max_items=BATCH_MAX_ITEMS,
+                ):
+                    batches.append((check_name, group_key, packed))
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _run(
+            check_name: str, group_key: str, packed: list[int],
+        ) -> tuple[str, dict[int, BaseModel]]:
+            async with semaphore:
+                try:
+                    found = await self._check_packed(
+                        db, check_name, items, packed, college_id,
+                        source_context=(
+                            group_key if check_name == "source_grounding"
+                            else ""
+                        ),
+                        screened=group_key == _SCREENED_GROUP,
+                    )
+                except Exception:
+                    logger.warning(
+                        "Packed %s check failed for %d items — "
+                        "falling back to single-item calls",
+                        check_name, len(packed), exc_info=True,
+                    )
+                    found = {}
+                return check_name, found
+
+        packed_results = await asyncio.gather(
+            *(_run(*batch) for batch in batches)
         )
-        checks.append(SafetyCheckResult(
-            check_name="source_grounding",
-            passed=grounding.all_claims_grounded,
-            confidence=grounding.confidence,
-            details={
-                "grounded": grounding.grounded_claim_count,
-                "total": grounding.total_claim_count,
-                "ungrounded_claims": grounding.ungrounded_claims,
-            },
-        ))
-        if not grounding.all_claims_grounded:
-            rejection_reasons.append(
-                f"Ungrounded claims: {', '.join(grounding.ungrounded_claims[:3])}"
+
+        for check_name, found in packed_results:
+            for i, verdict in found.items():
+                verdicts[i][check_name] = verdict
+
+        # Single-item fallback for verdicts the packed calls did not return.
+        missing = [
+            (i, check_name)
+            for check_name, _, packed in batches
+            for i in packed
+            if check_name not in verdicts[i]
+        ]
+
+        async def _single(i: int, check_name: str) -> None:
+            async with semaphore:
+                verdicts[i][check_name] = await self._check_single(
+                    db, check_name, items[i], college_id,
+                )
+
+        if missing:
+            logger.info(
+                "validate_batch: %d verdicts missing from packed calls — "
+                "re-checking individually", len(missing),
+            )
+            await asyncio.gather(*(_single(i, name) for i, name in missing))
+
+        return [
+            self._build_result(
+                verdicts[i],
+                [],
+                is_question=item.content_type in QUESTION_CONTENT_TYPES,
+                is_summative=item.is_summative,
             )
+            for i, item in enumerate(items)
+        ]
 
-        # --- Check 2: Clinical Accuracy Validation ---
-        accuracy = await self._check_clinical_accuracy(
-            db, content, content_type, college_id,
+    async def _check_packed(
+        self,
+        db: AsyncSession,
+        check_name: str,
+        items: list[SafetyItem],
+        packed: list[int],
+        college_id: UUID,
+        *,
+        source_context: str = "",
+        screened: bool = False,
+    ) -> dict[int, BaseModel]:
+        """One structured call for several items; keyed by caller index.
+
+        ``screened`` item-writing flaw batches only ask about the flaws the
+        rule pre-screen cannot decide, and merge in the rule findings.
+        """
+        system_prompt, batch_schema = {
+            "source_grounding": (SOURCE_GROUNDING_PROMPT, SourceGroundingBatch),
+            "clinical_accuracy": (
+                CLINICAL_ACCURACY_PROMPT, ClinicalAccuracyBatch,
+            ),
+            "bias_detection": (BIAS_DETECTION_PROMPT, BiasDetectionBatch),
+            "item_writing_flaws": (
+                build_item_writing_flaw_prompt(
+                    RULE_COVERED_FLAWS if screened else frozenset(),
+                ),
+                ItemWritingFlawBatch,
+            ),
+            "blooms_verification": (
+                BLOOMS_VERIFICATION_PROMPT, BloomsVerificationBatch,
+            ),
+        }[check_name]
+
+        parts: list[str] = []
+        for local_index, i in enumerate(packed):
+            item = items[i]
+            header = f"Content type: {item.content_type}\n"
+            if check_name == "blooms_verification":
+                header += (
+                    f"Declared Bloom's level: {item.declared_blooms_level}\n"
+                )
+            parts.append(
+                f'<item index="{local_index}">\n{header}\n'
+                f"{item.content}\n</item>"
+            )
+        user_message = "\n\n".join(parts)
+
+        if check_name == "source_grounding":
+            source_info = source_context if source_context else (
+                "No source context was provided. Flag all non-trivial medical "
+                "claims as ungrounded since there are no sources to verify "
+                "against."
+            )
+            user_message += (
+                f"\n\nSource materials (shared by all items):\n{source_info}"
+            )
+
+        batch = await self.gateway.complete_structured(
+            db,
+            system_prompt=system_prompt + _BATCH_INSTRUCTIONS,
+            user_message=user_message,
+            output_schema=batch_schema,
+            model="claude-haiku-4-5-20251001",
+            college_id=college_id,
+            agent_id="medical_safety",
+            task_type="safety_check",
+            cache_system_prompt=True,
+            max_tokens=min(
+                8192, 256 + _BATCH_OUTPUT_TOKENS_PER_ITEM * len(packed),
+            ),
+            temperature=0.0,
         )
-        checks.append(SafetyCheckResult(
-            check_name="clinical_accuracy",
-            passed=accuracy.clinically_accurate,
-            confidence=accuracy.confidence,
-            details={
-                "inaccuracies": accuracy.inaccuracies,
-                "outdated": accuracy.outdated_information,
-            },
-        ))
-        if not accuracy.clinically_accurate:
-            issues = accuracy.inaccuracies + accuracy.outdated_information
-            rejection_reasons.append(
-                f"Clinical issues: {', '.join(issues[:3])}"
+
+        found: dict[int, BaseModel] = {}
+        for verdict in batch.verdicts:
+            if 0 <= verdict.item_index < len(packed):
+                found.setdefault(packed[verdict.item_index], verdict)
+
+        if screened:
+            for i, verdict in found.items():
+                screen = prescreen_item_flaws(items[i].content)
+                if screen is not None:
+                    found[i] = _merge_flaw_verdicts(screen, verdict)
+        return found
+
+    async def _check_single(
+        self,
+        db: AsyncSession,
+        check_name: str,
+        item: SafetyItem,
+        college_id: UUID,
+    ) -> BaseModel:
+        """Run one check for one item (validate_batch fallback)."""
+        if check_name == "source_grounding":
+            return await self._check_source_grounding(
+                db, item.content, item.source_context, college_id,
+            )
+        if check_name == "clinical_accuracy":
+            return await self._check_clinical_accuracy(
+                db, item.content, item.content_type, college_id,
+            )
+        if check_name == "bias_detection":
+            return await self._check_bias(
+                db, item.content, item.content_type, college_id,
             )
+        if check_name == "item_writing_flaws":
+            return await self._check_item_writing_flaws(
+                db, item.content, college_id,
+            )
+        return await self._check_blooms_alignment(
+            db, item.content, item.declared_blooms_level or "", college_id,
+        )
 
-        # --- Check 3: Bias Detection ---
-        bias = await self._check_bias(db, content, content_type, college_id)
-        checks.append(SafetyCheckResult(
-            check_name="bias_detection",
-            passed=bias.bias_free,
-            confidence=bias.confidence,
-            details={
-                "biases_found": [
-                    {"type": b.bias_type, "description": b.description}
-                    for b in bias.biases_found
-                ],
-            },
-        ))
-        if not bias.bias_free:
-            for b in bias.biases_found[:2]:
+    # ------------------------------------------------------------------
+    # Check execution
+    # ------------------------------------------------------------------
+
+    async def _run_checks(
+        self,
+        db: AsyncSession,
+        jobs: list[tuple[str, Callable[[], Awaitable[BaseModel]]]],
+        *,
+        max_concurrency: int,
+        short_circuit: bool,
+    ) -> tuple[dict[str, BaseModel], list[str]]:
+        """Run checks under a semaphore, cancelling on a hard reject.
+
+        Checks are started in pipeline order; with max_concurrency=1 this
+        is the original strictly sequential pipeline. After every verdict
+        the best achievable overall confidence is recomputed (pending
+        checks assumed perfect) — once it falls below REVIEW_THRESHOLD the
+        content is rejected whatever the remaining checks say, so they are
+        cancelled.
+
+        Returns (verdicts by check name, names of skipped checks).
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _bounded(
+            factory: Callable[[], Awaitable[BaseModel]],
+        ) -> BaseModel:
+            async with semaphore:
+                return await factory()
+
+        tasks = {
+            asyncio.create_task(_bounded(factory)): name
+            for name, factory in jobs
+        }
+        verdicts: dict[str, BaseModel] = {}
+        pending = set(tasks)
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    verdicts[tasks[task]] = task.result()
+
+                if short_circuit and pending and self._is_hard_reject(
+                    verdicts, [tasks[t] for t in pending],
+                ):
+                    logger.info(
+                        "Safety pipeline hard reject after %s — cancelling %s",
+                        sorted(verdicts), sorted(tasks[t] for t in pending),
+                    )
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+                # Audit writes of cancelled calls finish in the background.
+                await self.gateway.drain(db)
+
+        skipped = [name for name, _ in jobs if name not in verdicts]
+        return verdicts, skipped
+
+    def _is_hard_reject(
+        self,
+        verdicts: dict[str, BaseModel],
+        pending: list[str],
+    ) -> bool:
+        """True if no outcome of the pending checks can avoid "reject"."""
+        weighted_sum = 0.0
+        total_weight = 0.0
+        for name, verdict in verdicts.items():
+            weight = self.CHECK_WEIGHTS.get(name, 0.10)
+            weighted_sum += verdict.confidence * weight
+            total_weight += weight
+        for name in pending:
+            weight = self.CHECK_WEIGHTS.get(name, 0.10)
+            weighted_sum += weight
+            total_weight += weight
+
+        if total_weight == 0.0:
+            return False
+        return weighted_sum / total_weight < self.REVIEW_THRESHOLD
+
+    # ------------------------------------------------------------------
+    # Result assembly
+    # ------------------------------------------------------------------
+
+    def _build_result(
+        self,
+        verdicts: dict[str, BaseModel],
+        skipped: list[str],
+        *,
+        is_question: bool,
+        is_summative: bool,
+    ) -> SafetyResult:
+        """Convert raw check verdicts into a routed SafetyResult."""
+        checks: list[SafetyCheckResult] = []
+        rejection_reasons: list[str] = []
+
+        # --- Check 1: Source Grounding Verification ---
+        grounding = verdicts.get("source_grounding")
+        if grounding is not None:
+            checks.append(SafetyCheckResult(
+                check_name="source_grounding",
+                passed=grounding.all_claims_grounded,
+                confidence=grounding.confidence,
+                details={
+                    "grounded": grounding.grounded_claim_count,
+                    "total": grounding.total_claim_count,
+                    "ungrounded_claims": grounding.ungrounded_claims,
+                },
+            ))
+            if not grounding.all_claims_grounded:
                 rejection_reasons.append(
-                    f"Bias ({b.bias_type}): {b.description}"
+                    "Ungrounded claims: "
+                    f"{', '.join(grounding.ungrounded_claims[:3])}"
                 )
 
+        # --- Check 2: Clinical Accuracy Validation ---
+        accuracy = verdicts.get("clinical_accuracy")
+        if accuracy is not None:
+            checks.append(SafetyCheckResult(
+                check_name="clinical_accuracy",
+                passed=accuracy.clinically_accurate,
+                confidence=accuracy.confidence,
+                details={
+                    "inaccuracies": accuracy.inaccuracies,
+                    "outdated": accuracy.outdated_information,
+                },
+            ))
+            if not accuracy.clinically_accurate:
+                issues = accuracy.inaccuracies + accuracy.outdated_information
+                rejection_reasons.append(
+                    f"Clinical issues: {', '.join(issues[:3])}"
+                )
+
+        # --- Check 3: Bias Detection ---
+        bias = verdicts.get("bias_detection")
+        if bias is not None:
+            checks.append(SafetyCheckResult(
+                check_name="bias_detection",
+                passed=bias.bias_free,
+                confidence=bias.confidence,
+                details={
+                    "biases_found": [
+                        {"type": b.bias_type, "description": b.description}
+                        for b in bias.biases_found
+                    ],
+                },
+            ))
+            if not bias.bias_free:
+                for b in bias.biases_found[:2]:
+                    rejection_reasons.append(
+                        f"Bias ({b.bias_type}): {b.description}"
+                    )
+
         # --- Check 4: Item-Writing Flaw Detection (questions only) ---
-        if is_question:
-            flaws = await self._check_item_writing_flaws(
-                db, content, college_id,
-            )
+        flaws = verdicts.get("item_writing_flaws")
+        if flaws is not None:
             checks.append(SafetyCheckResult(
                 check_name="item_writing_flaws",
                 passed=flaws.meets_standards,
@@ -398,10 +917,8 @@ class MedicalSafetyPipeline:
                 )
 
         # --- Check 5: Bloom's Level Verification (questions only) ---
-        if is_question and declared_blooms_level:
-            blooms = await self._check_blooms_alignment(
-                db, content, declared_blooms_level, college_id,
-            )
+        blooms = verdicts.get("blooms_verification")
+        if blooms is not None:
             checks.append(SafetyCheckResult(
                 check_name="blooms_verification",
                 passed=blooms.blooms_aligned,
@@ -438,6 +955,7 @@ class MedicalSafetyPipeline:
             checks=checks,
             rejection_reasons=rejection_reasons,
             is_summative_override=is_summative,
+            skipped_checks=skipped,
         )
 
     # ------------------------------------------------------------------
@@ -453,21 +971,42 @@ class MedicalSafetyPipeline:
         content: str,
     ) -> None:
         """Write SafetyCheck records for each check in the pipeline."""
-        content_hash = hashlib.sha256(content.encode()).hexdigest()
+        await self.log_checks_batch(
+            db, execution_id, college_id, [(result, content)],
+        )
 
-        for i, check in enumerate(result.checks):
-            db.add(SafetyCheck(
-                college_id=college_id,
-                execution_id=execution_id,
-                check_type=f"medical_safety_{check.check_name}",
-                input_content_hash=content_hash,
-                result="passed" if check.passed else "failed",
-                confidence_score=check.confidence,
-                details=check.details,
-                checker_model="claude-haiku-4-5-20251001",
-                pipeline_stage=i + 1,
-                checked_at=datetime.now(timezone.utc),
-            ))
+    async def log_checks_batch(
+        self,
+        db: AsyncSession,
+        execution_id: UUID,
+        college_id: UUID,
+        results: list[tuple[SafetyResult, str]],
+    ) -> None:
+        """Write SafetyCheck records for many items in one bulk INSERT."""
+        now = datetime.now(timezone.utc)
+        rows: list[dict[str, Any]] = []
+
+        for result, content in results:
+            content_hash = hashlib.sha256(content.encode()).hexdigest()
+            for i, check in enumerate(result.checks):
+                rows.append({
+                    "id": uuid4(),
+                    "college_id": college_id,
+                    "execution_id": execution_id,
+                    "check_type": f"medical_safety_{check.check_name}",
+                    "input_content_hash": content_hash,
+                    "result": "passed" if check.passed else "failed",
+                    "confidence_score": check.confidence,
+                    "details": check.details,
+                    "checker_model": "claude-haiku-4-5-20251001",
+                    "pipeline_stage": i + 1,
+                    "checked_at": now,
+                })
+
+        if rows:
+            # The session is shared with the gateway's execution logging.
+            async with self.gateway.session_lock(db):
+                await db.execute(insert(SafetyCheck), rows)
 
     # ------------------------------------------------------------------
     # Overall confidence calculation
@@ -595,10 +1134,22 @@ class MedicalSafetyPipeline:
         content: str,
         college_id: UUID,
     ) -> ItemWritingFlawCheck:
-        """Check 4: detect NBME item-writing flaws in questions."""
-        system_prompt = build_item_writing_flaw_prompt()
+        """Check 4: detect NBME item-writing flaws in questions.
 
-        return await self.gateway.complete_structured(
+        The deterministic pre-screen decides the mechanically detectable
+        flaws locally; the LLM is only asked about the rest (or skipped
+        entirely with rules_only_flaw_check). Unparseable questions get
+        the full 19-flaw LLM review.
+        """
+        screen = prescreen_item_flaws(content)
+        if screen is not None and self.rules_only_flaw_check:
+            return _merge_flaw_verdicts(screen, None)
+
+        system_prompt = build_item_writing_flaw_prompt(
+            RULE_COVERED_FLAWS if screen is not None else frozenset(),
+        )
+
+        llm_check = await self.gateway.complete_structured(
             db,
             system_prompt=system_prompt,
             user_message=f"Question to analyze:\n{content}",
@@ -611,6 +1162,9 @@ class MedicalSafetyPipeline:
             max_tokens=1024,
             temperature=0.0,
         )
+        if screen is None:
+            return llm_check
+        return _merge_flaw_verdicts(screen, llm_check)
 
     async def _check_blooms_alignment(
         self,
@@ -638,3 +1192,189 @@ class MedicalSafetyPipeline:
             max_tokens=512,
             temperature=0.0,
         )
+
+    async def _check_combined(
+        self,
+        db: AsyncSession,
+        *,
+        content: str,
+        content_type: str,
+        source_context: str,
+        declared_blooms_level: str | None,
+        is_question: bool,
+        college_id: UUID,
+    ) -> dict[str, BaseModel]:
+        """All checks in one call — one round-trip instead of five.
+
+        The item-writing flaw pre-screen applies as in the other modes.
+        A requested verdict the combined response leaves null is re-run
+        as its own check rather than dropped, so confidence is never
+        computed without it.
+        """
+        check_blooms = is_question and bool(declared_blooms_level)
+        screen = prescreen_item_flaws(content) if is_question else None
+        ask_flaws = is_question and not (
+            screen is not None and self.rules_only_flaw_check
+        )
+        sections = [
+            ("source_grounding", SOURCE_GROUNDING_PROMPT),
+            ("clinical_accuracy", CLINICAL_ACCURACY_PROMPT),
+            ("bias_detection", BIAS_DETECTION_PROMPT),
+        ]
+        if ask_flaws:
+            flaw_prompt = build_item_writing_flaw_prompt(
+                RULE_COVERED_FLAWS if screen is not None else frozenset(),
+            )
+            sections.append(("item_writing_flaws", flaw_prompt))
+        if check_blooms:
+            sections.append(("blooms_verification", BLOOMS_VERIFICATION_PROMPT))
+
+        system_prompt = (
+            "You are a medical content safety reviewer. Perform each review "
+            "below independently and return every verdict in its named "
+            "field. Leave fields for reviews not listed here null.\n\n"
+            + "\n\n".join(
+                f"## Review: {name}\n{prompt}" for name, prompt in sections
+            )
+        )
+
+        source_info = source_context if source_context else (
+            "No source context was provided. Flag all non-trivial medical "
+            "claims as ungrounded since there are no sources to verify against."
+        )
+        user_message = (
+            f"Content type: {content_type}\n"
+            + (
+                f"Declared Bloom's level: {declared_blooms_level}\n"
+                if check_blooms else ""
+            )
+            + f"\nAI-generated content:\n{content}\n\n"
+            f"Source materials:\n{source_info}"
+        )
+
+        combined = await self.gateway.complete_structured(
+            db,
+            system_prompt=system_prompt,
+            user_message=user_message,
+            output_schema=CombinedSafetyCheck,
+            model="claude-haiku-4-5-20251001",
+            college_id=college_id,
+            agent_id="medical_safety",
+            task_type="safety_check",
+            cache_system_prompt=True,
+            max_tokens=3072,
+            temperature=0.0,
+        )
+
+        verdicts: dict[str, BaseModel] = {
+            "source_grounding": combined.source_grounding,
+            "clinical_accuracy": combined.clinical_accuracy,
+            "bias_detection": combined.bias_detection,
+        }
+        reruns: dict[str, Awaitable[BaseModel]] = {}
+        if is_question and not ask_flaws:
+            verdicts["item_writing_flaws"] = _merge_flaw_verdicts(screen, None)
+        elif is_question and combined.item_writing_flaws is None:
+            reruns["item_writing_flaws"] = self._check_item_writing_flaws(
+                db, content, college_id,
+            )
+        elif is_question:
+            verdicts["item_writing_flaws"] = (
+                combined.item_writing_flaws if screen is None
+                else _merge_flaw_verdicts(screen, combined.item_writing_flaws)
+            )
+        if check_blooms and combined.blooms_verification is None:
+            reruns["blooms_verification"] = self._check_blooms_alignment(
+                db, content, declared_blooms_level, college_id,
+            )
+        elif check_blooms:
+            verdicts["blooms_verification"] = combined.blooms_verification
+
+        if reruns:
+            logger.warning(
+                "Combined safety check returned no %s verdict — re-running",
+                sorted(reruns),
+            )
+            for name, verdict in zip(
+                reruns, await asyncio.gather(*reruns.values()),
+            ):
+                verdicts[name] = verdict
+        return verdicts
+
+
+# ---------------------------------------------------------------------------
+# Item-writing flaw pre-screen merge
+# ---------------------------------------------------------------------------
+
+def _merge_flaw_verdicts(
+    screen: PrescreenResult,
+    llm_check: ItemWritingFlawCheck | None,
+) -> ItemWritingFlawCheck:
+    """Combine rule findings with the LLM verdict on the remaining flaws.
+
+    Rules are authoritative for RULE_COVERED_FLAWS — any LLM report of
+    those codes is dropped in favour of the rule result.
+    """
+    covered = {code.value for code in RULE_COVERED_FLAWS}
+    flaws = [
+        DetectedFlaw(
+            flaw_code=f.code.value,
+            evidence=f.evidence,
+            explanation=f.explanation,
+            suggested_fix=f.suggested_fix,
+        )
+        for f in screen.flaws
+    ]
+    confidence = max(0.0, 1.0 - RULE_FLAW_PENALTY * len(flaws))
+
+    if llm_check is not None:
+        flaws += [
+            f for f in llm_check.flaws_detected if f.flaw_code not in covered
+        ]
+        confidence = min(confidence, llm_check.confidence)
+
+    return ItemWritingFlawCheck(
+        meets_standards=not flaws,
+        flaws_detected=flaws,
+        total_flaw_count=len(flaws),
+        confidence=confidence,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Batch packing helpers
+# ---------------------------------------------------------------------------
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+def _pack_by_tokens(
+    indices: list[int],
+    token_counts: list[int],
+    *,
+    token_budget: int,
+    max_items: int,
+) -> list[list[int]]:
+    """Greedily pack indices into batches bounded by tokens and count.
+
+    An item larger than the budget on its own still gets its own batch.
+    """
+    batches: list[list[int]] = []
+    current: list[int] = []
+    current_tokens = 0
+
+    for index, tokens in zip(indices, token_counts):
+        if current and (
+            current_tokens + tokens > token_budget
+            or len(current) >= max_items
+        ):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(index)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
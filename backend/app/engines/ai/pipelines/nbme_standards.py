@@ -333,14 +333,19 @@ FLAW_CODE_LIST: list[str] = [fp.code.value for fp in NBME_FLAW_PATTERNS]
 # Detection prompt
 # ---------------------------------------------------------------------------
 
-def build_item_writing_flaw_prompt() -> str:
-    """Build the detection prompt listing all 19 NBME flaw patterns.
+def build_item_writing_flaw_prompt(
+    exclude: frozenset[ItemWritingFlaw] = frozenset(),
+) -> str:
+    """Build the detection prompt listing the NBME flaw patterns.
 
     The prompt instructs the model to check the question for each flaw
     and return structured output with detected flaws and their evidence.
+    Flaws in ``exclude`` (already decided by the deterministic pre-screen
+    in item_flaw_rules) are left out of the prompt.
     """
+    patterns = [fp for fp in NBME_FLAW_PATTERNS if fp.code not in exclude]
     flaw_descriptions = []
-    for i, fp in enumerate(NBME_FLAW_PATTERNS, 1):
+    for i, fp in enumerate(patterns, 1):
         flaw_descriptions.append(
             f"{i}. {fp.name} ({fp.code.value}): {fp.description}"
         )
@@ -352,7 +357,7 @@ You are a medical education assessment expert trained in the NBME \
 Item-Writing Guide (6th Edition). Analyze the given question for \
 item-writing flaws.
 
-Check for ALL of the following 19 flaw patterns:
+Check for ALL of the following {len(patterns)} flaw patterns:
 
 {flaw_list}
 
@@ -0,0 +1,643 @@
+"""Question Pool — pre-generated practice questions for S2 / S3.
+
+Live generation runs the full S2 pipeline (RAG → generate → Medical
+Safety Pipeline → retry) per request, which takes tens of seconds per
+batch and minutes for a NEET-PG mock. The pool moves that work off the
+request path:
+
+- Background jobs (Celery, ai queue) generate and safety-validate
+  questions per bucket — (subject, topic, difficulty tier, Bloom's level)
+  — and store them in question_pool_items. A nightly job tops syllabus
+  buckets and buckets served within POOL_IDLE_DAYS up to
+  POOL_TARGET_SIZE; idle free-text buckets are left to expire.
+- Requests sample the pool with one ranked query, skipping questions the
+  student has already been served (student_question_exposures), and
+  record the new exposures and usage counters.
+- Buckets that fall below POOL_LOW_WATERMARK, or that could not satisfy a
+  request, are refilled asynchronously; the request generates only the
+  shortfall live. Only syllabus buckets (NEET-PG high-yield topics and
+  competency topics) are refilled on the first miss — a free-text topic
+  must be asked for REFILL_DEMAND_THRESHOLD times first.
+
+Usage:
+    from app.engines.ai.question_pool import PoolBucket, QuestionPool
+
+    pool = QuestionPool(db)
+    served = await pool.sample(
+        college_id=college_id,
+        student_id=student_id,
+        needs={("Pharmacology", "difficult"): 10},
+        served_context="neet_pg_mock",
+    )
+"""
+
+import hashlib
+import logging
+import time
+from collections import OrderedDict, defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from uuid import UUID, uuid4
+
+from sqlalchemy import exists, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.engines.ai.agents.neet_pg_schemas import DIFFICULTY_TO_RANGE
+from app.engines.ai.dedup_index import DedupIndex, DedupKind, question_dedup_text
+from app.engines.ai.models import QuestionPoolItem, StudentQuestionExposure
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+POOL_LOW_WATERMARK = 20
+"""Available questions per bucket below which a refill is enqueued."""
+
+POOL_TARGET_SIZE = 60
+"""Refills top a bucket up to this many available questions."""
+
+_REFILL_BATCH_SIZE = 10  # S2 max per call
+_REFILL_MAX_ROUNDS = 8   # bounds LLM spend of a single refill job
+
+_REFILL_DEBOUNCE_SECONDS = 600
+"""A bucket is enqueued for refill at most once per window per process."""
+
+REFILL_DEMAND_THRESHOLD = 3
+"""Misses on an off-syllabus bucket before it is refilled."""
+
+_REFILL_DEMAND_WINDOW_SECONDS = 24 * 3600
+
+POOL_IDLE_DAYS = 30
+"""Off-syllabus buckets not served for this long drop out of the nightly fill."""
+
+_REFILL_TRACKING_MAX_KEYS = 10_000
+
+_BucketKey = tuple[str, str, str, str, str]
+
+# Per-process refill bookkeeping, oldest entry first (LRU-bounded).
+_recent_refills: OrderedDict[_BucketKey, float] = OrderedDict()
+_bucket_demand: OrderedDict[_BucketKey, tuple[int, float]] = OrderedDict()
+
+
+# ---------------------------------------------------------------------------
+# Buckets
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True, slots=True)
+class PoolBucket:
+    """Pool partition key."""
+
+    subject: str
+    topic: str
+    difficulty_tier: str
+    blooms_level: str = "apply"
+
+
+def rating_to_tier(rating: int) -> str:
+    """Convert a 1-5 difficulty rating to its pool tier."""
+    for tier, (low, high) in DIFFICULTY_TO_RANGE.items():
+        if low <= rating <= high:
+            return tier
+    return "difficult"
+
+
+def content_hash(question: dict[str, Any]) -> str:
+    """Stable hash of a question's stem and lead-in (whitespace/case-folded)."""
+    text = f"{question.get('stem', '')}\x1f{question.get('lead_in', '')}"
+    normalized = " ".join(text.lower().split())
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# QuestionPool
+# ---------------------------------------------------------------------------
+
+class QuestionPool:
+    """Sampling and storage over question_pool_items for one session."""
+
+    def __init__(self, db: AsyncSession) -> None:
+        self._db = db
+
+    async def sample(
+        self,
+        *,
+        college_id: UUID,
+        student_id: UUID,
+        needs: dict[tuple[str, str], int],
+        served_context: str,
+        blooms_level: str = "apply",
+        topic: str | None = None,
+    ) -> dict[tuple[str, str], list[QuestionPoolItem]]:
+        """Serve unseen questions for several (subject, tier) pairs at once.
+
+        One ranked query picks, per pair, the least-served questions the
+        student has not seen (random tie-break); exposures and usage
+        counters are written in two bulk statements. Pairs may come back
+        short — callers generate the shortfall live.
+
+        Args:
+            needs: {(subject, difficulty_tier): count}.
+            served_context: Recorded on the exposure (e.g. "neet_pg_mock").
+            topic: Restrict to one topic; None samples across topics.
+        """
+        needs = {k: n for k, n in needs.items() if n > 0}
+        if not needs:
+            return {}
+
+        seen = exists().where(
+            StudentQuestionExposure.student_id == student_id,
+            StudentQuestionExposure.pool_item_id == QuestionPoolItem.id,
+        )
+        rank = func.row_number().over(
+            partition_by=(
+                QuestionPoolItem.subject, QuestionPoolItem.difficulty_tier,
+            ),
+            order_by=(QuestionPoolItem.served_count, func.random()),
+        ).label("rank")
+        ranked = (
+            select(QuestionPoolItem.id, rank)
+            .where(
+                QuestionPoolItem.college_id == college_id,
+                QuestionPoolItem.status == "available",
+                QuestionPoolItem.blooms_level == blooms_level,
+                QuestionPoolItem.subject.in_(sorted({s for s, _ in needs})),
+                QuestionPoolItem.difficulty_tier.in_(
+                    sorted({t for _, t in needs}),
+                ),
+                ~seen,
+            )
+        )
+        if topic is not None:
+            ranked = ranked.where(QuestionPoolItem.topic == topic)
+        ranked = ranked.subquery()
+
+        result = await self._db.execute(
+            select(QuestionPoolItem)
+            .join(ranked, ranked.c.id == QuestionPoolItem.id)
+            .where(ranked.c.rank <= max(needs.values()))
+            .order_by(ranked.c.rank)
+        )
+
+        served: dict[tuple[str, str], list[QuestionPoolItem]] = defaultdict(list)
+        for item in result.scalars():
+            key = (item.subject, item.difficulty_tier)
+            if len(served[key]) < needs.get(key, 0):
+                served[key].append(item)
+
+        items = [item for group in served.values() for item in group]
+        if items:
+            await self._record_exposures(
+                college_id, student_id, items, served_context,
+            )
+        return dict(served)
+
+    async def add_questions(
+        self,
+        college_id: UUID,
+        bucket: PoolBucket,
+        questions: list[dict[str, Any]],
+    ) -> int:
+        """Store validated questions in a bucket; duplicates are skipped.
+
+        New rows are registered in the MCQ dedup index, so later
+        generation rejects near-copies of them before safety checks. A
+        question's ``id`` (set when it passed validation, and already
+        indexed under it) becomes its row id.
+
+        Returns the number of new rows.
+        """
+        if not questions:
+            return 0
+        rows = []
+        for q in questions:
+            item_id = UUID(q["id"]) if q.get("id") else uuid4()
+            rows.append({
+                "id": item_id,
+                "college_id": college_id,
+                "subject": bucket.subject,
+                "topic": bucket.topic,
+                "difficulty_tier": bucket.difficulty_tier,
+                "blooms_level": bucket.blooms_level,
+                "question_data": {**q, "id": str(item_id)},
+                "content_hash": content_hash(q),
+            })
+        result = await self._db.execute(
+            pg_insert(QuestionPoolItem)
+            .values(rows)
+            .on_conflict_do_nothing(constraint="uq_question_pool_content_hash")
+            .returning(QuestionPoolItem.id, QuestionPoolItem.content_hash)
+        )
+        inserted = dict(result.all())
+        by_hash = {row["content_hash"]: row["question_data"] for row in rows}
+        await DedupIndex(
+            self._db, college_id=college_id, kind=DedupKind.MCQ,
+        ).add([
+            (question_dedup_text(by_hash[h]), item_id)
+            for item_id, h in inserted.items()
+        ])
+        return len(inserted)
+
+    async def bucket_sizes(
+        self,
+        college_id: UUID,
+        subjects: list[str] | None = None,
+    ) -> dict[PoolBucket, int]:
+        """Available question count per bucket (optionally per subjects)."""
+        query = (
+            select(
+                QuestionPoolItem.subject,
+                QuestionPoolItem.topic,
+                QuestionPoolItem.difficulty_tier,
+                QuestionPoolItem.blooms_level,
+                func.count(),
+            )
+            .where(
+                QuestionPoolItem.college_id == college_id,
+                QuestionPoolItem.status == "available",
+            )
+            .group_by(
+                QuestionPoolItem.subject,
+                QuestionPoolItem.topic,
+                QuestionPoolItem.difficulty_tier,
+                QuestionPoolItem.blooms_level,
+            )
+        )
+        if subjects is not None:
+            query = query.where(QuestionPoolItem.subject.in_(subjects))
+        result = await self._db.execute(query)
+        return {
+            PoolBucket(subject, topic, tier, blooms): count
+            for subject, topic, tier, blooms, count in result.all()
+        }
+
+    async def bucket_last_active(
+        self,
+        college_id: UUID,
+    ) -> dict[PoolBucket, datetime]:
+        """Latest serve (or, if never served, insert) time per bucket."""
+        result = await self._db.execute(
+            select(
+                QuestionPoolItem.subject,
+                QuestionPoolItem.topic,
+                QuestionPoolItem.difficulty_tier,
+                QuestionPoolItem.blooms_level,
+                func.max(func.coalesce(
+                    QuestionPoolItem.last_served_at, QuestionPoolItem.created_at,
+                )),
+            )
+            .where(QuestionPoolItem.college_id == college_id)
+            .group_by(
+                QuestionPoolItem.subject,
+                QuestionPoolItem.topic,
+                QuestionPoolItem.difficulty_tier,
+                QuestionPoolItem.blooms_level,
+            )
+        )
+        return {
+            PoolBucket(subject, topic, tier, blooms): last_active
+            for subject, topic, tier, blooms, last_active in result.all()
+        }
+
+    async def on_syllabus(
+        self,
+        buckets: Iterable[PoolBucket],
+    ) -> set[PoolBucket]:
+        """The buckets whose topic is a NEET-PG high-yield or competency topic.
+
+        Matching is case-insensitive on (subject, topic); competency
+        topics are looked up in one query.
+        """
+        from app.engines.ai.agents.neet_pg_prep import HIGH_YIELD_TOPICS
+        from app.engines.faculty.models import Competency
+
+        buckets = set(buckets)
+        if not buckets:
+            return set()
+        known = {
+            (t["subject"].lower(), t["topic"].lower())
+            for t in HIGH_YIELD_TOPICS
+        }
+        pairs = {(b.subject.lower(), b.topic.lower()) for b in buckets} - known
+        if pairs:
+            result = await self._db.execute(
+                select(func.lower(Competency.subject), func.lower(Competency.topic))
+                .where(tuple_(
+                    func.lower(Competency.subject), func.lower(Competency.topic),
+                ).in_(sorted(pairs)))
+                .distinct()
+            )
+            known.update(tuple(row) for row in result.all())
+        return {
+            b for b in buckets if (b.subject.lower(), b.topic.lower()) in known
+        }
+
+    async def refill_low_buckets(
+        self,
+        college_id: UUID,
+        subjects: list[str],
+    ) -> int:
+        """Enqueue refills for buckets of these subjects below the watermark."""
+        sizes = await self.bucket_sizes(college_id, subjects)
+        low = [b for b, n in sizes.items() if n < POOL_LOW_WATERMARK]
+        syllabus = await self.on_syllabus(low)
+        for bucket in low:
+            request_refill(college_id, bucket, on_syllabus=bucket in syllabus)
+        return len(low)
+
+    # ------------------------------------------------------------------
+    # Private
+    # ------------------------------------------------------------------
+
+    async def _record_exposures(
+        self,
+        college_id: UUID,
+        student_id: UUID,
+        items: list[QuestionPoolItem],
+        served_context: str,
+    ) -> None:
+        now = datetime.now(timezone.utc)
+        ids = [item.id for item in items]
+        await self._db.execute(
+            pg_insert(StudentQuestionExposure)
+            .values([
+                {
+                    "id": uuid4(),
+                    "college_id": college_id,
+                    "student_id": student_id,
+                    "pool_item_id": item_id,
+                    "served_context": served_context,
+                    "served_at": now,
+                }
+                for item_id in ids
+            ])
+            .on_conflict_do_nothing(
+                constraint="uq_question_exposure_student_item",
+            )
+        )
+        await self._db.execute(
+            update(QuestionPoolItem)
+            .where(QuestionPoolItem.id.in_(ids))
+            .values(
+                served_count=QuestionPoolItem.served_count + 1,
+                last_served_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+
+# ---------------------------------------------------------------------------
+# Serving
+# ---------------------------------------------------------------------------
+
+async def serve_practice_questions(
+    db: AsyncSession,
+    gateway: Any,
+    prompt_registry: Any,
+    *,
+    subject: str,
+    topic: str,
+    difficulty: int = 3,
+    blooms_level: str = "apply",
+    count: int = 5,
+    question_type: str = "mcq",
+    competency_code: str | None = None,
+    student_id: UUID,
+    college_id: UUID,
+) -> Any:
+    """Practice questions from the pool, generating only the shortfall live.
+
+    Competency-targeted and non-MCQ requests are not pooled and always go
+    through live S2 generation. Returns a PracticeQuestionBatch.
+    """
+    from app.engines.ai.agents.practice_question_generator import (
+        GeneratedMCQ,
+        PracticeQuestionBatch,
+        generate_practice_questions,
+    )
+
+    pool = QuestionPool(db)
+    bucket = PoolBucket(subject, topic, rating_to_tier(difficulty), blooms_level)
+    pooled: list[Any] = []
+
+    if question_type == "mcq" and not competency_code:
+        served = await pool.sample(
+            college_id=college_id,
+            student_id=student_id,
+            needs={(subject, bucket.difficulty_tier): count},
+            served_context="practice",
+            blooms_level=blooms_level,
+            topic=topic,
+        )
+        pooled = [
+            GeneratedMCQ.model_validate(item.question_data)
+            for item in served.get((subject, bucket.difficulty_tier), [])
+        ]
+
+    if len(pooled) >= count:
+        await pool.refill_low_buckets(college_id, [subject])
+        return PracticeQuestionBatch(
+            questions=pooled,
+            generation_metadata={
+                "source": "question_pool",
+                "requested_count": count,
+                "generated_count": len(pooled),
+                "subject": subject,
+                "topic": topic,
+            },
+        )
+
+    if question_type == "mcq" and not competency_code:
+        request_refill(
+            college_id, bucket,
+            on_syllabus=bucket in await pool.on_syllabus([bucket]),
+        )
+
+    live = await generate_practice_questions(
+        db=db,
+        gateway=gateway,
+        prompt_registry=prompt_registry,
+        subject=subject,
+        topic=topic,
+        difficulty=difficulty,
+        blooms_level=blooms_level,
+        count=count - len(pooled),
+        question_type=question_type,
+        competency_code=competency_code,
+        student_id=student_id,
+        college_id=college_id,
+    )
+    return PracticeQuestionBatch(
+        questions=pooled + live.questions,
+        generation_metadata={
+            **live.generation_metadata,
+            "source": "question_pool+live" if pooled else "live",
+            "pooled_count": len(pooled),
+        },
+    )
+
+
+# ---------------------------------------------------------------------------
+# Refill
+# ---------------------------------------------------------------------------
+
+def request_refill(
+    college_id: UUID,
+    bucket: PoolBucket,
+    *,
+    on_syllabus: bool,
+) -> bool:
+    """Enqueue an asynchronous refill for a bucket (debounced).
+
+    An off-syllabus bucket (a free-text practice topic) is only refilled
+    once it has been requested REFILL_DEMAND_THRESHOLD times within the
+    demand window, so one-off topics do not each cost a refill job.
+
+    Never raises — a missing broker must not fail the request that
+    noticed the low bucket. Returns True if a task was enqueued.
+    """
+    key = (
+        str(college_id), bucket.subject, bucket.topic,
+        bucket.difficulty_tier, bucket.blooms_level,
+    )
+    now = time.monotonic()
+    _expire(_recent_refills, now - _REFILL_DEBOUNCE_SECONDS)
+    if key in _recent_refills:
+        return False
+
+    if not on_syllabus:
+        count, since = _bucket_demand.get(key, (0, now))
+        if now - since >= _REFILL_DEMAND_WINDOW_SECONDS:
+            count, since = 0, now
+        _remember(_bucket_demand, key, (count + 1, since))
+        if count + 1 < REFILL_DEMAND_THRESHOLD:
+            return False
+
+    try:
+        from app.engines.ai.tasks import refill_question_pool_bucket
+
+        refill_question_pool_bucket.delay(
+            str(college_id),
+            bucket.subject,
+            bucket.topic,
+            bucket.difficulty_tier,
+            bucket.blooms_level,
+        )
+    except Exception:
+        logger.warning(
+            "Failed to enqueue question pool refill for %s", key,
+            exc_info=True,
+        )
+        return False
+
+    _remember(_recent_refills, key, now)
+    _bucket_demand.pop(key, None)
+    return True
+
+
+def _remember(cache: OrderedDict, key: _BucketKey, value: Any) -> None:
+    """Set ``key`` as the newest entry, evicting the oldest past the cap."""
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > _REFILL_TRACKING_MAX_KEYS:
+        cache.popitem(last=False)
+
+
+def _expire(cache: OrderedDict[_BucketKey, float], cutoff: float) -> None:
+    """Drop entries recorded before ``cutoff`` (oldest first)."""
+    while cache and next(iter(cache.values())) < cutoff:
+        cache.popitem(last=False)
+
+
+async def refill_bucket(
+    db: AsyncSession,
+    gateway: Any,
+    prompt_registry: Any,
+    *,
+    college_id: UUID,
+    bucket: PoolBucket,
+    target: int = POOL_TARGET_SIZE,
+) -> int:
+    """Top a bucket up to `target` through the full S2 pipeline.
+
+    Generated questions have already passed the Medical Safety Pipeline
+    inside S2. A failed S2 run ends the refill but keeps the questions
+    added so far; the caller commits. Returns the number of questions
+    added.
+    """
+    from app.engines.ai.agents.practice_question_generator import (
+        generate_practice_questions,
+    )
+
+    pool = QuestionPool(db)
+    low, high = DIFFICULTY_TO_RANGE[bucket.difficulty_tier]
+    added = 0
+
+    for _ in range(_REFILL_MAX_ROUNDS):
+        sizes = await pool.bucket_sizes(college_id, [bucket.subject])
+        missing = target - sizes.get(bucket, 0)
+        if missing <= 0:
+            break
+
+        try:
+            batch = await generate_practice_questions(
+                db=db,
+                gateway=gateway,
+                prompt_registry=prompt_registry,
+                subject=bucket.subject,
+                topic=bucket.topic,
+                difficulty=round((low + high) / 2),
+                blooms_level=bucket.blooms_level,
+                count=min(missing, _REFILL_BATCH_SIZE),
+                question_type="mcq",
+                # Background generation — no student to attribute it to.
+                student_id=None,
+                college_id=college_id,
+            )
+        except Exception:
+            logger.warning(
+                "Question pool refill stopped for %s", bucket, exc_info=True,
+            )
+            break
+
+        new = await pool.add_questions(
+            college_id, bucket, [q.model_dump() for q in batch.questions],
+        )
+        added += new
+        if new == 0:
+            break  # Nothing new validated — stop spending on this bucket.
+
+    return added
+
+
+async def nightly_buckets(
+    db: AsyncSession,
+    college_id: UUID,
+) -> list[PoolBucket]:
+    """Buckets the nightly job tops up.
+
+    The NEET-PG high-yield topics at every difficulty tier, plus the
+    buckets already in the pool (practice requests create them on demand)
+    that are on the syllabus or were served within POOL_IDLE_DAYS. Idle
+    off-syllabus buckets are not refilled and drain away.
+    """
+    from app.engines.ai.agents.neet_pg_prep import HIGH_YIELD_TOPICS
+
+    pool = QuestionPool(db)
+    last_active = await pool.bucket_last_active(college_id)
+    idle_before = datetime.now(timezone.utc) - timedelta(days=POOL_IDLE_DAYS)
+    idle = {b for b, at in last_active.items() if at < idle_before}
+
+    buckets = (set(last_active) - idle) | await pool.on_syllabus(idle)
+    for topic in HIGH_YIELD_TOPICS:
+        for tier in DIFFICULTY_TO_RANGE:
+            buckets.add(PoolBucket(topic["subject"], topic["topic"], tier))
+    return sorted(
+        buckets,
+        key=lambda b: (b.subject, b.topic, b.difficulty_tier, b.blooms_level),
+    )
@@ -60,6 +60,8 @@ class BM25MedicalSearch:
             .where(
                 text("search_vector @@ plainto_tsquery('english', :query)"),
                 MedicalContent.is_active.is_(True),
+                # Near-duplicates defer to their canonical chunk
+                MedicalContent.canonical_id.is_(None),
             )
             .params(query=query)
         )
@@ -16,6 +16,7 @@ from uuid import UUID
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.engines.ai.model_routing import CapabilityTier
 from app.engines.ai.rag.models import RetrievalResult
 
 logger = logging.getLogger(__name__)
@@ -130,7 +131,7 @@ class RetrievalFusion:
                 system_prompt=_RERANK_PROMPT,
                 user_message=user_message,
                 output_schema=_RerankOutput,
-                model="claude-haiku-4-5-20251001",
+                tier=CapabilityTier.FAST,
                 college_id=college_id,
                 agent_id="retrieval_reranker",
                 task_type="retrieval_routing",
@@ -23,6 +23,7 @@ from typing import Any
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.engines.ai.model_routing import CapabilityTier
 from app.engines.ai.rag.models import QueryClassification, RetrievalPlan
 
 logger = logging.getLogger(__name__)
@@ -142,7 +143,7 @@ class AgenticRetrievalRouter:
                 system_prompt=CLASSIFICATION_PROMPT,
                 user_message=query,
                 output_schema=_QueryClassificationSchema,
-                model="claude-haiku-4-5-20251001",
+                tier=CapabilityTier.FAST,
                 college_id=college_id,
                 agent_id="retrieval_router",
                 task_type="retrieval_routing",
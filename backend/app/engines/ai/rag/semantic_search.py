@@ -89,6 +89,8 @@ class SemanticMedicalSearch:
             )
             .where(
                 MedicalContent.is_active.is_(True),
+                # Near-duplicates defer to their canonical chunk
+                MedicalContent.canonical_id.is_(None),
                 MedicalContent.embedding.isnot(None),
                 cosine_dist < max_distance,
             )
@@ -15,6 +15,7 @@ import json
 import logging
 from datetime import date
 from typing import Any
+from uuid import UUID
 
 from fastapi import APIRouter, Depends, File, Query, UploadFile
 from fastapi.responses import StreamingResponse
@@ -279,6 +280,9 @@ async def _study_buddy_sse_generator(
             if chunk.type == "text":
                 data = json.dumps({"text": chunk.text})
                 yield f"event: text\ndata: {data}\n\n"
+            elif chunk.type == "retract":
+                # Discard the text streamed so far; a regenerated reply follows
+                yield f"event: retract\ndata: {{}}\n\n"
             elif chunk.type == "end":
                 yield f"event: done\ndata: {{}}\n\n"
     except Exception as e:
@@ -1073,6 +1077,20 @@ async def ingest_content(
         default=False,
         description="If true, content is platform-wide (no college scope).",
     ),
+    offline_classification: bool = Query(
+        default=False,
+        description=(
+            "If true, classify chunks via the Batch API (half price, "
+            "metadata filled in within 24h)."
+        ),
+    ),
+    replaces_document_id: UUID | None = Query(
+        default=None,
+        description=(
+            "Document this upload is a new edition of. Only changed chunks "
+            "are classified and embedded; chunks it dropped are retired."
+        ),
+    ),
     user: CurrentUser = Depends(require_college_admin),
     db: AsyncSession = Depends(get_tenant_db),
 ):
@@ -1082,8 +1100,17 @@ async def ingest_content(
     100 overlap) → metadata classification (Haiku) → embedding
     (text-embedding-3-large, 1536 dims) → MedicalContent table.
 
-    Duplicate chunks (by SHA-256 content hash) are automatically skipped.
+    Duplicate chunks (by SHA-256 content hash) are automatically skipped,
+    as are near-duplicates (MinHash) of chunks already in the corpus.
     Upload the PDF as multipart form data with field name 'file'.
+    Progress is committed every few pages; re-uploading a file whose
+    ingestion was interrupted resumes where it stopped.
+
+    Large textbooks can set offline_classification: chunks are searchable
+    immediately and get their metadata once the Batch API job finishes.
+
+    A corrected PDF or new edition sets replaces_document_id, so
+    re-ingestion costs only what changed between the two versions.
     """
     from app.config import get_settings
     from app.engines.ai.ingestion.pdf_processor import MedicalContentIngester
@@ -1111,9 +1138,25 @@ async def ingest_content(
         filename=file.filename,
         college_id=college_id,
         source_type=source_type,
+        offline_classification=offline_classification,
+        previous_document_id=replaces_document_id,
     )
 
     await db.commit()
+
+    if result.classification_batch_ids:
+        from app.engines.ai.tasks import apply_offline_classification
+
+        for batch_id in result.classification_batch_ids:
+            apply_offline_classification.apply_async(
+                args=[
+                    batch_id,
+                    str(result.document_id),
+                    str(college_id) if college_id else None,
+                ],
+                countdown=apply_offline_classification.default_retry_delay,
+            )
+
     return result.to_dict()
 
 
@@ -332,6 +332,9 @@ async def _study_buddy_sse_generator(
             if chunk.type == "text":
                 data = json.dumps({"text": chunk.text})
                 yield f"event: text\ndata: {data}\n\n"
+            elif chunk.type == "retract":
+                # Discard the text streamed so far; a regenerated reply follows
+                yield f"event: retract\ndata: {{}}\n\n"
             elif chunk.type == "end":
                 yield f"event: done\ndata: {{}}\n\n"
     except Exception as e:
@@ -378,23 +381,24 @@ async def generate_practice_questions_endpoint(
     5. Validate through Medical Safety Pipeline (L3)
     6. Retry rejected questions (up to 2 attempts)
 
+    Questions the student has not seen are served from the pre-generated
+    question pool first; only the shortfall runs the pipeline live.
+
     Returns validated PracticeQuestionBatch as JSON.
     """
     from uuid import UUID as _UUID
 
-    from app.engines.ai.agents.practice_question_generator import (
-        generate_practice_questions,
-    )
+    from app.engines.ai.question_pool import serve_practice_questions
 
     gateway = get_ai_gateway()
     registry = get_prompt_registry()
 
     student_id = _UUID(user.user_id) if user.user_id else user.college_id
 
-    result = await generate_practice_questions(
-        db=db,
-        gateway=gateway,
-        prompt_registry=registry,
+    result = await serve_practice_questions(
+        db,
+        gateway,
+        registry,
         subject=body.subject,
         topic=body.topic,
         difficulty=body.difficulty,
@@ -1646,7 +1650,9 @@ async def generate_neetpg_mock_test(
     If weak_area_focus=True, weights question distribution towards
     the student's weak topics from their metacognitive profile.
 
-    Returns NEETPGMockTest with questions, duration, and blueprint.
+    Returns NEETPGMockTest with questions, duration, and blueprint. With
+    stream=True, returns SSE: one "section" event per finished subject
+    batch, then a "complete" event with the full mock test.
     """
     from uuid import UUID as _UUID
 
@@ -1659,6 +1665,26 @@ async def generate_neetpg_mock_test(
 
     student_id = _UUID(user.user_id) if user.user_id else user.college_id
 
+    if parsed.stream:
+        return StreamingResponse(
+            _neetpg_mock_sse_generator(
+                db=db,
+                gateway=gateway,
+                registry=registry,
+                student_id=student_id,
+                college_id=user.college_id,
+                test_type=parsed.test_type,
+                subject_focus=parsed.subject_focus,
+                weak_area_focus=parsed.weak_area_focus,
+            ),
+            media_type="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "Connection": "keep-alive",
+                "X-Agent": "neet_pg_prep",
+            },
+        )
+
     result = await generate_neetpg_mock_test(
         db=db,
         gateway=gateway,
@@ -1673,6 +1699,43 @@ async def generate_neetpg_mock_test(
     return result.model_dump()
 
 
+async def _neetpg_mock_sse_generator(
+    *,
+    db: AsyncSession,
+    gateway,
+    registry,
+    student_id,
+    college_id,
+    test_type: str,
+    subject_focus: str | None,
+    weak_area_focus: bool,
+):
+    """Generate SSE events from the NEET-PG mock test stream."""
+    from app.engines.ai.agents.neet_pg_prep import stream_neetpg_mock_test
+
+    try:
+        async for event in stream_neetpg_mock_test(
+            db=db,
+            gateway=gateway,
+            prompt_registry=registry,
+            student_id=student_id,
+            college_id=college_id,
+            test_type=test_type,
+            subject_focus=subject_focus,
+            weak_area_focus=weak_area_focus,
+        ):
+            if event.event == "section":
+                data = event.model_dump_json(exclude={"mock_test"})
+                yield f"event: section\ndata: {data}\n\n"
+            elif event.mock_test is not None:
+                data = event.mock_test.model_dump_json()
+                yield f"event: complete\ndata: {data}\n\n"
+    except Exception as e:
+        logger.error("NEET-PG mock stream error: %s", e, exc_info=True)
+        error_data = json.dumps({"error": str(e)})
+        yield f"event: error\ndata: {error_data}\n\n"
+
+
 @router.post("/student/neetpg/submit-test")
 async def submit_neetpg_test(
     body: dict[str, Any],
@@ -1993,6 +2056,62 @@ async def review_flashcard_endpoint(
     return result.model_dump()
 
 
+@router.post("/student/flashcards/reviews/batch")
+async def review_flashcards_batch_endpoint(
+    body: dict[str, Any],
+    user: CurrentUser = Depends(require_student),
+    db: AsyncSession = Depends(get_tenant_db),
+):
+    """Process many flashcard reviews at once.
+
+    For reviews made offline in the mobile app and synced later, and for
+    importing review history. Reviews are applied in reviewed_at order;
+    reviews the server already has (a retried sync) are skipped.
+
+    Returns the SM-2 state after each applied review and the number of
+    applied and skipped reviews.
+    """
+    from uuid import UUID as _UUID
+
+    from app.engines.ai.agents.flashcard_generator import (
+        process_flashcard_review_batch,
+    )
+    from app.engines.ai.agents.flashcard_scheduler import ReviewInput
+    from app.engines.ai.agents.flashcard_schemas import (
+        ReviewBatchRequest,
+        ReviewBatchResponse,
+    )
+
+    parsed = ReviewBatchRequest(**body)
+    gateway = get_ai_gateway()
+    registry = get_prompt_registry()
+
+    student_id = _UUID(user.user_id) if user.user_id else user.college_id
+
+    result = await process_flashcard_review_batch(
+        db=db,
+        gateway=gateway,
+        prompt_registry=registry,
+        student_id=student_id,
+        college_id=user.college_id,
+        reviews=[
+            ReviewInput(
+                card_id=_UUID(item.card_id),
+                quality=item.response_quality,
+                response_time_ms=item.response_time_ms,
+                reviewed_at=item.reviewed_at,
+            )
+            for item in parsed.reviews
+        ],
+    )
+
+    return ReviewBatchResponse(
+        updates=result.updates,
+        applied=len(result.applied),
+        skipped=result.skipped,
+    ).model_dump()
+
+
 @router.get("/student/flashcards/stats")
 async def get_flashcard_stats_endpoint(
     user: CurrentUser = Depends(require_student),
@@ -6,6 +6,12 @@ Tasks:
 - ai.engagement_nudge: Nudge disengaged students (3+ days inactive).
 - ai.rollup_ai_costs: Hourly AI cost aggregation per college.
 - ai.batch_embed_documents: Batch document embedding generation.
+- ai.nightly_question_pool_fill: Top up every question pool bucket.
+- ai.refill_question_pool_bucket: Refill one low question pool bucket.
+- ai.backfill_dedup_index: Fingerprint existing questions / flashcards.
+- ai.apply_offline_classification: Apply Batch API chunk metadata.
+- ai.cluster_near_duplicate_chunks: Mark near-duplicate RAG chunks.
+- ai.fit_fsrs_weights: Fit per-student FSRS flashcard scheduling weights.
 
 Registered in celery_app.py via imports config.
 """
@@ -45,7 +51,7 @@ async def _run_student_recommendations(
     async with async_session_factory() as db:
         from sqlalchemy import text
         await db.execute(
-            text("SET app.current_college_id = :cid"),
+            text("SELECT set_config('app.current_college_id', :cid, false)"),
             {"cid": college_id_str},
         )
 
@@ -69,7 +75,7 @@ async def _run_student_recommendations(
             async with async_session_factory() as db:
                 from sqlalchemy import text
                 await db.execute(
-                    text("SET app.current_college_id = :cid"),
+                    text("SELECT set_config('app.current_college_id', :cid, false)"),
                     {"cid": college_id_str},
                 )
 
@@ -115,7 +121,7 @@ async def _run_engagement_nudge(college_id_str: str) -> dict:
     async with async_session_factory() as db:
         from sqlalchemy import text
         await db.execute(
-            text("SET app.current_college_id = :cid"),
+            text("SELECT set_config('app.current_college_id', :cid, false)"),
             {"cid": college_id_str},
         )
 
@@ -154,7 +160,7 @@ async def _run_engagement_nudge(college_id_str: str) -> dict:
             async with async_session_factory() as db:
                 from sqlalchemy import text
                 await db.execute(
-                    text("SET app.current_college_id = :cid"),
+                    text("SELECT set_config('app.current_college_id', :cid, false)"),
                     {"cid": college_id_str},
                 )
 
@@ -181,6 +187,179 @@ async def _run_engagement_nudge(college_id_str: str) -> dict:
     }
 
 
+async def _run_question_pool_refill(
+    college_id_str: str,
+    bucket_key: tuple[str, str, str, str],
+) -> int:
+    """Refill one question pool bucket through the S2 pipeline."""
+    from sqlalchemy import text
+
+    from app.core.database import async_session_factory
+    from app.engines.ai.gateway_deps import get_ai_gateway
+    from app.engines.ai.prompt_registry import get_prompt_registry
+    from app.engines.ai.question_pool import PoolBucket, refill_bucket
+
+    async with async_session_factory() as db:
+        await db.execute(
+            text("SELECT set_config('app.current_college_id', :cid, false)"),
+            {"cid": college_id_str},
+        )
+        added = await refill_bucket(
+            db, get_ai_gateway(), get_prompt_registry(),
+            college_id=UUID(college_id_str),
+            bucket=PoolBucket(*bucket_key),
+        )
+        await db.commit()
+
+    return added
+
+
+async def _run_question_pool_fill(college_id_str: str) -> dict:
+    """Enqueue a refill for every bucket of a college below target size."""
+    from sqlalchemy import text
+
+    from app.core.database import async_session_factory
+    from app.engines.ai.question_pool import (
+        POOL_TARGET_SIZE,
+        QuestionPool,
+        nightly_buckets,
+    )
+
+    college_id = UUID(college_id_str)
+
+    async with async_session_factory() as db:
+        await db.execute(
+            text("SELECT set_config('app.current_college_id', :cid, false)"),
+            {"cid": college_id_str},
+        )
+        buckets = await nightly_buckets(db, college_id)
+        sizes = await QuestionPool(db).bucket_sizes(college_id)
+
+    enqueued = 0
+    for bucket in buckets:
+        if sizes.get(bucket, 0) >= POOL_TARGET_SIZE:
+            continue
+        refill_question_pool_bucket.delay(
+            college_id_str,
+            bucket.subject,
+            bucket.topic,
+            bucket.difficulty_tier,
+            bucket.blooms_level,
+        )
+        enqueued += 1
+
+    return {
+        "college_id": college_id_str,
+        "buckets": len(buckets),
+        "enqueued": enqueued,
+    }
+
+
+async def _run_dedup_backfill(college_id_str: str, kind: str) -> dict:
+    """Index a college's existing content in the dedup index."""
+    from sqlalchemy import text
+
+    from app.core.database import async_session_factory
+    from app.engines.ai.dedup_index import DedupKind, backfill_dedup_index
+
+    async with async_session_factory() as db:
+        await db.execute(
+            text("SELECT set_config('app.current_college_id', :cid, false)"),
+            {"cid": college_id_str},
+        )
+        stats = await backfill_dedup_index(
+            db, UUID(college_id_str), DedupKind(kind),
+        )
+        await db.commit()
+
+    return {"college_id": college_id_str, "kind": kind, **stats}
+
+
+async def _run_apply_offline_classification(
+    batch_id: str,
+    document_id: str,
+    college_id_str: str | None,
+    give_up: bool = False,
+) -> int | None:
+    """Apply a finished classification batch; None while it is running.
+
+    With give_up, chunks of a batch still running are classified online.
+    """
+    from sqlalchemy import text
+
+    from app.config import get_settings
+    from app.core.database import async_session_factory
+    from app.engines.ai.gateway_deps import get_ai_gateway
+    from app.engines.ai.ingestion.pdf_processor import MedicalContentIngester
+
+    ingester = MedicalContentIngester(
+        openai_api_key=get_settings().OPENAI_API_KEY,
+        gateway=get_ai_gateway(),
+    )
+
+    async with async_session_factory() as db:
+        if college_id_str:
+            await db.execute(
+                text(
+                    "SELECT set_config('app.current_college_id', :cid, false)"
+                ),
+                {"cid": college_id_str},
+            )
+        updated = await ingester.apply_offline_classification(
+            db,
+            batch_id=batch_id,
+            document_id=UUID(document_id),
+            college_id=UUID(college_id_str) if college_id_str else None,
+            give_up=give_up,
+        )
+        await db.commit()
+
+    return updated
+
+
+async def _run_near_duplicate_clustering() -> dict:
+    """Fingerprint and cluster near-duplicate MedicalContent rows."""
+    from app.core.database import async_session_factory
+    from app.engines.ai.ingestion.near_duplicates import (
+        cluster_near_duplicates,
+    )
+
+    # medical_content is not tenant-scoped: one pass covers every college
+    # and the platform-wide corpus.
+    async with async_session_factory() as db:
+        stats = await cluster_near_duplicates(db)
+        await db.commit()
+
+    return stats
+
+
+async def _run_fsrs_fit(college_id_str: str) -> dict:
+    """Fit FSRS weights for a college's students with enough reviews.
+
+    fit_college_weights sets (and, after each commit, restores) the
+    tenant context itself.
+    """
+    from app.core.database import async_session_factory
+    from app.engines.ai.agents.flashcard_scheduler import fit_college_weights
+
+    async with async_session_factory() as db:
+        stats = await fit_college_weights(db, UUID(college_id_str))
+
+    return {"college_id": college_id_str, **stats}
+
+
+async def _all_college_ids() -> list[str]:
+    """All college ids (colleges is not tenant-scoped)."""
+    from sqlalchemy import select
+
+    from app.core.database import async_session_factory
+    from app.engines.admin.models import College
+
+    async with async_session_factory() as db:
+        result = await db.execute(select(College.id))
+        return [str(row[0]) for row in result.all()]
+
+
 # ---------------------------------------------------------------------------
 # Celery tasks
 # ---------------------------------------------------------------------------
@@ -307,3 +486,199 @@ def batch_embed_documents(college_id: str, document_ids: list[str]):
     )
     # TODO: Implement — fetch documents from R2, chunk with
     # medical-aware chunker, embed, upsert into document_embeddings
+
+
+@celery_app.task(name="ai.nightly_question_pool_fill")
+def nightly_question_pool_fill(college_id: str) -> dict:
+    """Night: top up every question pool bucket of a college.
+
+    When college_id="__all__", fans out one task per college. Each bucket
+    below POOL_TARGET_SIZE gets its own ai.refill_question_pool_bucket
+    task so a single slow bucket cannot hit the task time limit for the
+    rest.
+
+    Args:
+        college_id: UUID string of the college tenant, or "__all__".
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        if college_id == "__all__":
+            college_ids = loop.run_until_complete(_all_college_ids())
+            for cid in college_ids:
+                nightly_question_pool_fill.delay(cid)
+            return {"college_id": college_id, "colleges": len(college_ids)}
+
+        result = loop.run_until_complete(_run_question_pool_fill(college_id))
+    finally:
+        loop.close()
+
+    logger.info(
+        "Question pool fill: college=%s, buckets=%d, enqueued=%d",
+        college_id, result["buckets"], result["enqueued"],
+    )
+    return result
+
+
+@celery_app.task(name="ai.refill_question_pool_bucket")
+def refill_question_pool_bucket(
+    college_id: str,
+    subject: str,
+    topic: str,
+    difficulty_tier: str,
+    blooms_level: str = "apply",
+) -> dict:
+    """Generate and validate questions until a pool bucket is at target.
+
+    Enqueued by the nightly fill and, on demand, when a request finds a
+    bucket below POOL_LOW_WATERMARK.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        added = loop.run_until_complete(
+            _run_question_pool_refill(
+                college_id, (subject, topic, difficulty_tier, blooms_level),
+            ),
+        )
+    finally:
+        loop.close()
+
+    logger.info(
+        "Question pool refill: college=%s, bucket=%s/%s/%s/%s, added=%d",
+        college_id, subject, topic, difficulty_tier, blooms_level, added,
+    )
+    return {"college_id": college_id, "added": added}
+
+
+@celery_app.task(
+    name="ai.backfill_dedup_index",
+    soft_time_limit=3000,  # large colleges: many batches of embeddings
+    time_limit=3600,
+)
+def backfill_dedup_index(college_id: str, kind: str) -> dict:
+    """One-off: fingerprint a college's existing content for dedup.
+
+    Run once per kind ("mcq", "flashcard") after deploying the dedup
+    index; new content is indexed as it is generated. Near-duplicate
+    pool questions found on the way are retired.
+
+    Args:
+        college_id: UUID string of the college tenant, or "__all__".
+        kind: DedupKind value.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        if college_id == "__all__":
+            college_ids = loop.run_until_complete(_all_college_ids())
+            for cid in college_ids:
+                backfill_dedup_index.delay(cid, kind)
+            return {"college_id": college_id, "colleges": len(college_ids)}
+
+        result = loop.run_until_complete(_run_dedup_backfill(college_id, kind))
+    finally:
+        loop.close()
+
+    logger.info(
+        "Dedup backfill: college=%s, kind=%s, scanned=%d, duplicates=%d",
+        college_id, kind, result["scanned"], result["duplicates"],
+    )
+    return result
+
+
+@celery_app.task(
+    name="ai.apply_offline_classification",
+    bind=True,
+    default_retry_delay=600,  # poll every 10 minutes
+    max_retries=150,          # Batch API guarantees results within 24h
+)
+def apply_offline_classification(
+    self,
+    batch_id: str,
+    document_id: str,
+    college_id: str | None,
+) -> dict:
+    """Write Batch API chunk classifications back to MedicalContent.
+
+    Enqueued by content ingestion with offline_classification=True;
+    retries itself until the batch has ended. The last retry classifies
+    whatever is still pending online, so no chunk stays pending.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        updated = loop.run_until_complete(
+            _run_apply_offline_classification(
+                batch_id, document_id, college_id,
+                give_up=self.request.retries >= self.max_retries,
+            ),
+        )
+    finally:
+        loop.close()
+
+    if updated is None:
+        raise self.retry()
+
+    logger.info(
+        "Offline classification applied: batch=%s, document=%s, chunks=%d",
+        batch_id, document_id, updated,
+    )
+    return {"batch_id": batch_id, "document_id": document_id, "updated": updated}
+
+
+@celery_app.task(
+    name="ai.cluster_near_duplicate_chunks",
+    soft_time_limit=3000,  # first run fingerprints the whole corpus
+    time_limit=3600,
+)
+def cluster_near_duplicate_chunks() -> dict:
+    """Weekly: mark near-duplicate RAG chunks across the corpus.
+
+    Fingerprints rows stored before near-duplicate detection existed,
+    points each near-duplicate at its canonical chunk (retrieval skips
+    it) and releases duplicates whose canonical chunk was retired.
+    Ingestion already drops near-duplicates of stored chunks; this
+    catches older content and duplicates across concurrent uploads.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        result = loop.run_until_complete(_run_near_duplicate_clustering())
+    finally:
+        loop.close()
+
+    logger.info(
+        "Near-duplicate clustering: scanned=%d, duplicates=%d, released=%d",
+        result["scanned"], result["duplicates"], result["released"],
+    )
+    return result
+
+
+@celery_app.task(
+    name="ai.fit_fsrs_weights",
+    soft_time_limit=1500,
+    time_limit=1800,
+)
+def fit_fsrs_weights(college_id: str) -> dict:
+    """Weekly: fit FSRS scheduling weights to each student's reviews.
+
+    Only students with FSRS_MIN_REVIEWS reviews are fitted, and weights
+    are kept only if they predict the student's recall better than the
+    defaults. They take effect when FLASHCARD_SCHEDULER is "fsrs".
+
+    Args:
+        college_id: UUID string of the college tenant, or "__all__".
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        if college_id == "__all__":
+            college_ids = loop.run_until_complete(_all_college_ids())
+            for cid in college_ids:
+                fit_fsrs_weights.delay(cid)
+            return {"college_id": college_id, "colleges": len(college_ids)}
+
+        result = loop.run_until_complete(_run_fsrs_fit(college_id))
+    finally:
+        loop.close()
+
+    logger.info(
+        "FSRS fit: college=%s, candidates=%d, fitted=%d",
+        college_id, result["candidates"], result["fitted"],
+    )
+    return result
@@ -11,18 +11,29 @@ Usage in agent code:
     )
     # Pass tool_defs to Anthropic's tools parameter
     # Call executor(tool_name, tool_input) when Claude returns a tool_use block
+    # or executor.execute_many(calls) for several tool_use blocks at once,
+    # and serialize_tool_result(result) for the tool_result content
 """
 
+import asyncio
+import logging
 from typing import Any
 from uuid import UUID
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.engines.ai.tools.base import MCPToolServer
 from app.engines.ai.tools.compliance_data import ComplianceDataServer
 from app.engines.ai.tools.medical_knowledge import MedicalKnowledgeServer
+from app.engines.ai.tools.results import (
+    serialize_tool_result,
+    tool_result_cache,
+)
 from app.engines.ai.tools.student_analytics import StudentAnalyticsServer
 
+logger = logging.getLogger(__name__)
+
 # ---------------------------------------------------------------------------
 # Tool server registry — map name → class
 # ---------------------------------------------------------------------------
@@ -82,10 +93,80 @@ class ToolExecutor:
         self, tool_name: str, tool_input: dict[str, Any]
     ) -> dict[str, Any]:
         """Execute a tool call. Returns structured result dict."""
-        server = self._tool_to_server.get(tool_name)
-        if server is None:
-            return {"error": f"Unknown tool: {tool_name}"}
-        return await server.execute_tool(tool_name, tool_input)
+        return (await self.execute_many([(tool_name, tool_input)]))[0]
+
+    async def execute_many(
+        self, calls: list[tuple[str, dict[str, Any]]],
+    ) -> list[dict[str, Any]]:
+        """Execute independent tool calls concurrently.
+
+        Results are returned in call order. Cached results (per tenant,
+        per-tool TTL) are served without running the tool. Every
+        remaining call — even a lone one — gets its own short-lived
+        tenant session, since one AsyncSession cannot serve concurrent
+        queries and a timeout cancels the call mid-query, which would
+        leave the agent's session unusable. Every call is bounded by its
+        tool's timeout.
+        """
+        results: list[dict[str, Any] | None] = []
+        keys: list[tuple | None] = []
+        for name, tool_input in calls:
+            server = self._tool_to_server.get(name)
+            if server is None:
+                results.append({"error": f"Unknown tool: {name}"})
+                keys.append(None)
+                continue
+            key = tool_result_cache.key(server.college_id, name, tool_input)
+            results.append(tool_result_cache.get(key))
+            keys.append(key)
+
+        misses = [i for i, r in enumerate(results) if r is None]
+        fresh = await asyncio.gather(*(
+            self._call_isolated(*calls[i]) for i in misses
+        ))
+
+        for i, result in zip(misses, fresh):
+            name = calls[i][0]
+            tool_result_cache.set(
+                keys[i], result,
+                self._tool_to_server[name].cache_ttl_for(name),
+            )
+            results[i] = result
+        return results
+
+    async def _call_isolated(
+        self, tool_name: str, tool_input: dict[str, Any],
+    ) -> dict[str, Any]:
+        """Run one tool call on a fresh server bound to its own session."""
+        from app.core.database import async_session_factory
+
+        server = self._tool_to_server[tool_name]
+        async with async_session_factory() as session:
+            await session.execute(
+                text("SELECT set_config('app.current_college_id', :cid, false)"),
+                {"cid": str(server.college_id)},
+            )
+            isolated = type(server)(db=session, college_id=server.college_id)
+            return await self._run(isolated, tool_name, tool_input)
+
+    @staticmethod
+    async def _run(
+        server: MCPToolServer, tool_name: str, tool_input: dict[str, Any],
+    ) -> dict[str, Any]:
+        timeout = server.timeout_for(tool_name)
+        try:
+            return await asyncio.wait_for(
+                server.execute_tool(tool_name, tool_input), timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Tool %s.%s timed out after %.1fs",
+                server.server_name, tool_name, timeout,
+            )
+            return {
+                "error": f"Tool timed out: {tool_name}",
+                "server": server.server_name,
+            }
 
     @property
     def available_tools(self) -> list[str]:
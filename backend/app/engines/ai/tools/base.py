@@ -34,10 +34,28 @@ class MCPToolServer:
     # Subclasses must set this to their server name.
     server_name: str = "base"
 
+    # Per-call timeout (seconds); subclasses override slow tools in
+    # tool_timeouts. Enforced by ToolExecutor.
+    default_timeout_seconds: float = 15.0
+    tool_timeouts: dict[str, float] = {}
+
+    # Result cache TTL (seconds) per tool; 0 disables caching. Enforced
+    # by ToolExecutor through the per-tenant tool result cache.
+    default_cache_ttl_seconds: float = 0.0
+    cache_ttls: dict[str, float] = {}
+
     def __init__(self, db: AsyncSession, college_id: UUID) -> None:
         self.db = db
         self.college_id = college_id
 
+    def timeout_for(self, tool_name: str) -> float:
+        """Timeout in seconds for one call of tool_name."""
+        return self.tool_timeouts.get(tool_name, self.default_timeout_seconds)
+
+    def cache_ttl_for(self, tool_name: str) -> float:
+        """How long a result of tool_name may be served from cache."""
+        return self.cache_ttls.get(tool_name, self.default_cache_ttl_seconds)
+
     def get_tool_definitions(self) -> list[dict[str, Any]]:
         """Returns Anthropic-compatible tool definitions for this server.
 
@@ -20,6 +20,8 @@ class ComplianceDataServer(MCPToolServer):
     """Attendance data, faculty MSR status, compliance alerts."""
 
     server_name = "compliance_data"
+    # Attendance / MSR figures move slowly within a session
+    default_cache_ttl_seconds = 300.0
 
     def get_tool_definitions(self) -> list[dict[str, Any]]:
         return [
@@ -10,20 +10,28 @@ F1 (Exam Question Generator), all medical content generation agents.
 from typing import Any
 from uuid import UUID
 
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
-
-from app.engines.ai.models import (
-    MedicalEntity,
-    MedicalEntityRelationship,
+from app.engines.ai.entity_resolver import EntityCandidate, EntityResolver
+from app.engines.ai.knowledge_graph import (
+    KnowledgeGraphSnapshot,
+    get_knowledge_graph,
 )
 from app.engines.ai.tools.base import MCPToolServer
 
+# Entities considered per topic by get_misconceptions
+MISCONCEPTION_TOPICS = 5
+
+# (snapshot index, candidate) pairs per term, best first
+Resolved = dict[str, list[tuple[int, EntityCandidate]]]
+
 
 class MedicalKnowledgeServer(MCPToolServer):
     """RAG search, knowledge graph queries, medical reference data."""
 
     server_name = "medical_knowledge"
+    # Hybrid retrieval embeds the query and runs three searches
+    tool_timeouts = {"search_medical_content": 30.0}
+    # Reference content changes only on ingestion
+    default_cache_ttl_seconds = 3600.0
 
     def get_tool_definitions(self) -> list[dict[str, Any]]:
         return [
@@ -170,6 +178,55 @@ class MedicalKnowledgeServer(MCPToolServer):
             },
         ]
 
+    # ------------------------------------------------------------------
+    # Entity resolution
+    # ------------------------------------------------------------------
+
+    async def _resolve(
+        self,
+        terms: list[str],
+        entity_types: tuple[str, ...],
+        *,
+        limit: int = 1,
+    ) -> tuple[KnowledgeGraphSnapshot, Resolved]:
+        """The graph snapshot and each term's ranked entities in it.
+
+        All terms are resolved in one EntityResolver call (exact hits
+        from the snapshot, the rest in one trigram query). Each entity's
+        snapshot index comes with its candidate, so results can say how
+        the term was matched. Candidates missing from the snapshot (added
+        or retired since it was loaded) are dropped.
+        """
+        graph = await get_knowledge_graph(self.db)
+        resolver = EntityResolver(self.db, graph=graph)
+        found = await resolver.resolve_many(terms, entity_types, limit=limit)
+        resolved: Resolved = {}
+        for term, candidates in found.items():
+            resolved[term] = []
+            for candidate in candidates:
+                i = graph.index_of(candidate.entity_id)
+                if i is not None:
+                    resolved[term].append((i, candidate))
+        return graph, resolved
+
+    @staticmethod
+    def _resolution(
+        used: dict[str, list[EntityCandidate]],
+    ) -> dict[str, list[dict[str, Any]]]:
+        """The entities each term was answered with, and how they matched.
+
+        Part of every graph tool result, so a fuzzy match ("myocardial
+        infraction" → Myocardial Infarction, trigram) is visible to the
+        model instead of passing for the term itself.
+        """
+        return {
+            term: [
+                {"entity": c.name, "match": c.match, "score": round(c.score, 2)}
+                for c in candidates
+            ]
+            for term, candidates in used.items()
+        }
+
     # ------------------------------------------------------------------
     # Tool implementations
     # ------------------------------------------------------------------
@@ -239,120 +296,66 @@ class MedicalKnowledgeServer(MCPToolServer):
     ) -> dict[str, Any]:
         """Query the knowledge graph for differential diagnoses.
 
-        Uses recursive CTE for multi-hop relationship traversal:
-        symptom → HAS_SYMPTOM → disease → DIFFERENTIAL_OF → other diseases.
+        Traverses the in-process graph snapshot: diagnosis →
+        DIFFERENTIAL_OF → other diseases, or symptoms ← HAS_SYMPTOM ←
+        diseases, ranked by how many of the symptoms each disease shares.
         """
         symptoms = params.get("symptoms", [])
         primary_diagnosis = params.get("primary_diagnosis")
         max_results = params.get("max_results", 5)
 
         differentials: list[dict[str, Any]] = []
+        used: dict[str, list[EntityCandidate]] = {}
 
         if primary_diagnosis:
             # Find diseases that are differentials of the given diagnosis.
-            diagnosis_entity = await self.db.execute(
-                select(MedicalEntity).where(
-                    MedicalEntity.name.ilike(f"%{primary_diagnosis}%"),
-                    MedicalEntity.entity_type.in_(["disease", "condition"]),
-                    MedicalEntity.is_active.is_(True),
-                )
+            graph, found = await self._resolve(
+                [primary_diagnosis], ("disease", "condition"),
             )
-            entity = diagnosis_entity.scalar_one_or_none()
-
-            if entity:
-                # Direct DIFFERENTIAL_OF edges.
-                diff_result = await self.db.execute(
-                    select(
-                        MedicalEntity.name,
-                        MedicalEntity.entity_type,
-                        MedicalEntity.properties,
-                        MedicalEntityRelationship.confidence,
-                    )
-                    .join(
-                        MedicalEntityRelationship,
-                        MedicalEntityRelationship.target_entity_id
-                        == MedicalEntity.id,
-                    )
-                    .where(
-                        MedicalEntityRelationship.source_entity_id == entity.id,
-                        MedicalEntityRelationship.relationship_type
-                        == "differential_of",
-                        MedicalEntityRelationship.is_active.is_(True),
-                        MedicalEntity.is_active.is_(True),
-                    )
-                    .order_by(MedicalEntityRelationship.confidence.desc())
-                    .limit(max_results)
+            for entity, candidate in found[primary_diagnosis][:1]:
+                used[primary_diagnosis] = [candidate]
+                edges = sorted(
+                    graph.out_edges(entity, "differential_of"),
+                    key=lambda te: -te[1].confidence,
                 )
-
-                for row in diff_result.all():
+                for target, edge in edges[:max_results]:
+                    node = graph.entities[target]
                     differentials.append({
-                        "diagnosis": row.name,
-                        "entity_type": row.entity_type,
-                        "confidence": float(row.confidence),
-                        "properties": row.properties or {},
-                        "reasoning": f"Differential of {primary_diagnosis}",
+                        "diagnosis": node.name,
+                        "entity_type": node.entity_type,
+                        "confidence": edge.confidence,
+                        "properties": node.properties,
+                        "reasoning": f"Differential of {candidate.name}",
                     })
 
         elif symptoms:
-            # Find diseases linked to the given symptoms via HAS_SYMPTOM.
-            # Count shared symptoms to rank differentials.
+            # Diseases linked to the symptoms via HAS_SYMPTOM, ranked by
+            # the number of symptoms they share.
+            graph, found = await self._resolve(symptoms, ("symptom",))
+            matched: dict[int, str] = {}
             for symptom_name in symptoms:
-                symptom_result = await self.db.execute(
-                    select(MedicalEntity).where(
-                        MedicalEntity.name.ilike(f"%{symptom_name}%"),
-                        MedicalEntity.entity_type == "symptom",
-                        MedicalEntity.is_active.is_(True),
-                    )
-                )
-                symptom_entity = symptom_result.scalar_one_or_none()
-
-                if symptom_entity:
-                    # Find diseases with HAS_SYMPTOM pointing to this symptom.
-                    disease_result = await self.db.execute(
-                        select(
-                            MedicalEntity.name,
-                            MedicalEntity.entity_type,
-                            MedicalEntityRelationship.confidence,
-                        )
-                        .join(
-                            MedicalEntityRelationship,
-                            MedicalEntityRelationship.source_entity_id
-                            == MedicalEntity.id,
-                        )
-                        .where(
-                            MedicalEntityRelationship.target_entity_id
-                            == symptom_entity.id,
-                            MedicalEntityRelationship.relationship_type
-                            == "has_symptom",
-                            MedicalEntityRelationship.is_active.is_(True),
-                            MedicalEntity.is_active.is_(True),
-                        )
-                        .limit(max_results)
-                    )
-
-                    for row in disease_result.all():
-                        existing = next(
-                            (d for d in differentials
-                             if d["diagnosis"] == row.name),
-                            None,
-                        )
-                        if existing:
-                            existing["shared_symptom_count"] += 1
-                        else:
-                            differentials.append({
-                                "diagnosis": row.name,
-                                "entity_type": row.entity_type,
-                                "confidence": float(row.confidence),
-                                "shared_symptom_count": 1,
-                                "reasoning": (
-                                    f"Shares symptom: {symptom_name}"
-                                ),
-                            })
-
-            # Rank by shared symptom count.
-            differentials.sort(
-                key=lambda d: d.get("shared_symptom_count", 0), reverse=True
-            )
+                used[symptom_name] = []
+                for symptom, candidate in found[symptom_name][:1]:
+                    matched.setdefault(symptom, symptom_name)
+                    used[symptom_name] = [candidate]
+
+            shared = graph.shared_sources(list(matched), "has_symptom")
+            for disease, count, confidence in shared[:max_results]:
+                node = graph.entities[disease]
+                names = [
+                    name for symptom, name in matched.items()
+                    if graph.edges_between(disease, symptom, ("has_symptom",))
+                ]
+                differentials.append({
+                    "diagnosis": node.name,
+                    "entity_type": node.entity_type,
+                    "confidence": confidence,
+                    "shared_symptom_count": count,
+                    "reasoning": (
+                        f"Shares symptom{'s' if count > 1 else ''}: "
+                        + ", ".join(names)
+                    ),
+                })
 
         return {
             "differentials": differentials[:max_results],
@@ -360,85 +363,54 @@ class MedicalKnowledgeServer(MCPToolServer):
                 "symptoms": symptoms,
                 "primary_diagnosis": primary_diagnosis,
             },
+            "resolved": self._resolution(used),
         }
 
     async def _tool_get_drug_interactions(
         self, params: dict[str, Any]
     ) -> dict[str, Any]:
-        """Direct edge query on the knowledge graph for drug interactions."""
+        """Direct edge lookup on the knowledge graph for drug interactions."""
         drug_a_name = params["drug_a"]
         drug_b_name = params["drug_b"]
 
-        # Find both drug entities.
-        drug_a_result = await self.db.execute(
-            select(MedicalEntity).where(
-                MedicalEntity.name.ilike(f"%{drug_a_name}%"),
-                MedicalEntity.entity_type == "drug",
-                MedicalEntity.is_active.is_(True),
-            )
-        )
-        drug_a = drug_a_result.scalar_one_or_none()
-
-        drug_b_result = await self.db.execute(
-            select(MedicalEntity).where(
-                MedicalEntity.name.ilike(f"%{drug_b_name}%"),
-                MedicalEntity.entity_type == "drug",
-                MedicalEntity.is_active.is_(True),
-            )
-        )
-        drug_b = drug_b_result.scalar_one_or_none()
+        graph, found = await self._resolve([drug_a_name, drug_b_name], ("drug",))
+        resolved = self._resolution({
+            name: [c for _, c in found[name]] for name in found
+        })
 
-        if not drug_a or not drug_b:
+        if not found[drug_a_name] or not found[drug_b_name]:
             return {
                 "interactions": [],
                 "drug_a": drug_a_name,
                 "drug_b": drug_b_name,
+                "resolved": resolved,
                 "note": "One or both drugs not found in knowledge graph.",
             }
 
-        # Query edges in both directions (a→b and b→a).
-        interaction_result = await self.db.execute(
-            select(
-                MedicalEntityRelationship.relationship_type,
-                MedicalEntityRelationship.properties,
-                MedicalEntityRelationship.confidence,
-                MedicalEntityRelationship.source_reference,
-            ).where(
-                MedicalEntityRelationship.is_active.is_(True),
-                (
-                    (
-                        (MedicalEntityRelationship.source_entity_id == drug_a.id)
-                        & (MedicalEntityRelationship.target_entity_id == drug_b.id)
-                    )
-                    | (
-                        (MedicalEntityRelationship.source_entity_id == drug_b.id)
-                        & (MedicalEntityRelationship.target_entity_id == drug_a.id)
-                    )
-                ),
-                MedicalEntityRelationship.relationship_type.in_([
-                    "interacts_with", "contraindicated_in",
-                ]),
-            )
-        )
-
+        # Edges in both directions (a→b and b→a).
         interactions = []
-        for row in interaction_result.all():
-            props = row.properties or {}
+        for edge in graph.edges_between(
+            found[drug_a_name][0][0],
+            found[drug_b_name][0][0],
+            ("interacts_with", "contraindicated_in"),
+        ):
+            props = edge.properties
             interactions.append({
-                "type": row.relationship_type,
+                "type": edge.relationship_type,
                 "severity": props.get("severity", "unknown"),
                 "mechanism": props.get("mechanism", ""),
                 "clinical_significance": props.get(
                     "clinical_significance", ""
                 ),
-                "confidence": float(row.confidence),
-                "source": row.source_reference or "",
+                "confidence": edge.confidence,
+                "source": edge.source_reference or "",
             })
 
         return {
             "interactions": interactions,
             "drug_a": drug_a_name,
             "drug_b": drug_b_name,
+            "resolved": resolved,
         }
 
     async def _tool_get_competency_details(
@@ -447,26 +419,23 @@ class MedicalKnowledgeServer(MCPToolServer):
         """Look up NMC competency information from the knowledge graph."""
         code = params["competency_code"]
 
-        result = await self.db.execute(
-            select(MedicalEntity).where(
-                MedicalEntity.entity_type == "competency",
-                MedicalEntity.name.ilike(f"%{code}%"),
-                MedicalEntity.is_active.is_(True),
-            )
-        )
-        entity = result.scalar_one_or_none()
+        graph, found = await self._resolve([code], ("competency",))
+        resolved = self._resolution({code: [c for _, c in found[code]]})
 
-        if not entity:
+        if not found[code]:
             return {
                 "found": False,
                 "competency_code": code,
+                "resolved": resolved,
                 "note": "Competency not found in knowledge graph.",
             }
 
-        props = entity.properties or {}
+        entity = graph.entities[found[code][0][0]]
+        props = entity.properties
         return {
             "found": True,
             "competency_code": code,
+            "resolved": resolved,
             "name": entity.name,
             "description": props.get("description", ""),
             "level": props.get("level", ""),
@@ -491,26 +460,24 @@ class MedicalKnowledgeServer(MCPToolServer):
         topic_name = params["topic"]
         subject = params.get("subject")
 
-        query = select(MedicalEntity).where(
-            MedicalEntity.name.ilike(f"%{topic_name}%"),
-            MedicalEntity.entity_type.in_(["topic", "subject", "disease"]),
-            MedicalEntity.is_active.is_(True),
+        # Over-fetch so the subject filter still leaves enough topics
+        graph, found = await self._resolve(
+            [topic_name], ("topic", "subject", "disease"),
+            limit=MISCONCEPTION_TOPICS * (4 if subject else 1),
         )
-
+        matches = [(graph.entities[i], c) for i, c in found[topic_name]]
         if subject:
             # Filter by a related subject entity if provided — for now,
             # check the properties JSONB for a "subject" key.
-            query = query.where(
-                MedicalEntity.properties["subject"].astext == subject
-            )
-
-        result = await self.db.execute(query.limit(5))
-        entities = result.scalars().all()
+            matches = [
+                (e, c) for e, c in matches
+                if e.properties.get("subject") == subject
+            ]
+        matches = matches[:MISCONCEPTION_TOPICS]
 
         misconceptions = []
-        for entity in entities:
-            props = entity.properties or {}
-            entity_misconceptions = props.get("misconceptions", [])
+        for entity, _ in matches:
+            entity_misconceptions = entity.properties.get("misconceptions", [])
             for m in entity_misconceptions:
                 misconceptions.append({
                     "topic": entity.name,
@@ -526,6 +493,7 @@ class MedicalKnowledgeServer(MCPToolServer):
             "misconceptions": misconceptions,
             "topic": topic_name,
             "subject": subject,
+            "resolved": self._resolution({topic_name: [c for _, c in matches]}),
             "note": (
                 "Misconception data will be enriched over time from "
                 "student interaction patterns."
@@ -0,0 +1,180 @@
+"""Tool result caching and compact serialization — Section L7.
+
+Copilot tool loops resend every tool result on every iteration, and the
+same calls repeat across iterations and conversations (e.g.
+get_attendance_summary for one department). Two things keep that cheap:
+
+- ToolResultCache — per-tenant, in-process cache keyed by
+  (college_id, tool, normalized input). TTLs are set per tool on the
+  servers (MCPToolServer.cache_ttl_for); TTL 0 means "never cache".
+  Error results are never cached.
+- serialize_tool_result — orjson serialization of the tool_result
+  content. Results larger than TOOL_RESULT_MAX_CHARS are compacted: long
+  lists of rows keep their first COMPACT_TOP_ROWS rows plus a summary
+  (row count and min/max/mean of numeric columns).
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any
+from uuid import UUID
+
+import orjson
+
+TOOL_RESULT_MAX_CHARS = 8000
+COMPACT_TOP_ROWS = 10
+_CACHE_MAX_ENTRIES = 2048
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+class ToolResultCache:
+    """LRU cache of tool results with per-entry TTL."""
+
+    def __init__(self, max_entries: int = _CACHE_MAX_ENTRIES) -> None:
+        self._entries: OrderedDict[
+            tuple[UUID, str, bytes], tuple[dict[str, Any], float]
+        ] = OrderedDict()
+        self._max_entries = max_entries
+
+    @staticmethod
+    def key(
+        college_id: UUID, tool_name: str, tool_input: dict[str, Any],
+    ) -> tuple[UUID, str, bytes]:
+        return (college_id, tool_name, _normalized_input(tool_input))
+
+    def get(self, key: tuple[UUID, str, bytes]) -> dict[str, Any] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        result, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return result
+
+    def set(
+        self,
+        key: tuple[UUID, str, bytes],
+        result: dict[str, Any],
+        ttl_seconds: float,
+    ) -> None:
+        if ttl_seconds <= 0 or "error" in result:
+            return
+        self._entries[key] = (result, time.monotonic() + ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(
+        self,
+        college_id: UUID | None = None,
+        tool_name: str | None = None,
+    ) -> None:
+        """Drop entries of one college and/or tool (all when both None)."""
+        for key in list(self._entries):
+            if (college_id is None or key[0] == college_id) and (
+                tool_name is None or key[1] == tool_name
+            ):
+                del self._entries[key]
+
+
+tool_result_cache = ToolResultCache()
+
+
+def _normalized_input(tool_input: dict[str, Any]) -> bytes:
+    """Canonical tool input: sorted keys, no Nones, collapsed whitespace."""
+
+    def norm(value: Any) -> Any:
+        if isinstance(value, str):
+            return " ".join(value.split())
+        if isinstance(value, dict):
+            return {k: norm(v) for k, v in value.items() if v is not None}
+        if isinstance(value, list | tuple):
+            return [norm(v) for v in value]
+        return value
+
+    return orjson.dumps(
+        norm(tool_input),
+        default=str,
+        option=_ORJSON_OPTIONS | orjson.OPT_SORT_KEYS,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Serialization
+# ---------------------------------------------------------------------------
+
+def serialize_tool_result(
+    result: dict[str, Any],
+    max_chars: int = TOOL_RESULT_MAX_CHARS,
+) -> str:
+    """Serialize a tool result for a tool_result block, compacting if large."""
+    payload = _dumps(result)
+    if len(payload) <= max_chars:
+        return payload
+
+    payload = _dumps(compact_result(result))
+    if len(payload) <= max_chars:
+        return payload
+    return payload[:max_chars] + " ...[truncated]"
+
+
+def compact_result(value: Any, top_rows: int = COMPACT_TOP_ROWS) -> Any:
+    """Replace long lists of rows with their top rows plus a summary."""
+    if isinstance(value, dict):
+        compacted: dict[str, Any] = {}
+        for k, v in value.items():
+            if _is_long_row_list(v, top_rows):
+                compacted[k] = [compact_result(r, top_rows) for r in v[:top_rows]]
+                compacted[f"{k}_summary"] = _summarize_rows(v, top_rows)
+            else:
+                compacted[k] = compact_result(v, top_rows)
+        return compacted
+    if isinstance(value, list):
+        if _is_long_row_list(value, top_rows):
+            return {
+                "rows": [compact_result(r, top_rows) for r in value[:top_rows]],
+                "summary": _summarize_rows(value, top_rows),
+            }
+        return [compact_result(v, top_rows) for v in value]
+    return value
+
+
+def _dumps(value: Any) -> str:
+    return orjson.dumps(value, default=str, option=_ORJSON_OPTIONS).decode()
+
+
+def _is_long_row_list(value: Any, top_rows: int) -> bool:
+    return (
+        isinstance(value, list)
+        and len(value) > top_rows
+        and all(isinstance(r, dict) for r in value)
+    )
+
+
+def _summarize_rows(rows: list[dict[str, Any]], shown: int) -> dict[str, Any]:
+    """Row count plus min/max/mean of each numeric column."""
+    numeric: dict[str, list[float]] = {}
+    for row in rows:
+        for k, v in row.items():
+            if isinstance(v, int | float) and not isinstance(v, bool):
+                numeric.setdefault(k, []).append(v)
+
+    return {
+        "total_rows": len(rows),
+        "rows_shown": shown,
+        "numeric_columns": {
+            k: {
+                "min": min(vals),
+                "max": max(vals),
+                "mean": round(sum(vals) / len(vals), 4),
+            }
+            for k, vals in numeric.items()
+        },
+    }
@@ -22,6 +22,8 @@ class StudentAnalyticsServer(MCPToolServer):
     """Student performance data, study patterns, metacognitive profiles."""
 
     server_name = "student_analytics"
+    # Student state changes with every answer — keep it short
+    default_cache_ttl_seconds = 60.0
 
     def get_tool_definitions(self) -> list[dict[str, Any]]:
         return [
@@ -415,7 +415,7 @@ class SAFTemplate(Base):
             '"data_source": "...|null", "data_query_config": {...}, '
             '"is_required": true, "requires_narrative": false, '
             '"narrative_prompt": "...|null", "validation_rules": {...}, '
-            '"help_text": "..."}]}]'
+            '"help_text": "...", "depends_on": ["A1.1"]}]}]'
         ),
     )
 
@@ -38,7 +38,7 @@ async def _run_compliance_check(
     async with async_session_factory() as db:
         from sqlalchemy import text
         await db.execute(
-            text("SET app.current_college_id = :cid"),
+            text("SELECT set_config('app.current_college_id', :cid, false)"),
             {"cid": college_id_str},
         )
 
@@ -75,7 +75,7 @@ async def _run_targeted_evaluation(
     async with async_session_factory() as db:
         from sqlalchemy import text
         await db.execute(
-            text("SET app.current_college_id = :cid"),
+            text("SELECT set_config('app.current_college_id', :cid, false)"),
             {"cid": college_id_str},
         )
 
@@ -3,7 +3,7 @@
 All models inherit from TenantModel (college_id + RLS).
 """
 
-from sqlalchemy import Boolean, Column, Date, DateTime, Float, ForeignKey, Index, Integer, String, Text
+from sqlalchemy import Boolean, Column, Date, DateTime, Float, ForeignKey, Index, Integer, String, Text, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 
 from app.shared.models import Base, TenantModel
@@ -28,6 +28,13 @@ class Flashcard(TenantModel):
     __table_args__ = (
         Index("ix_flashcards_student_subject_topic", "college_id", "student_id", "subject", "topic"),
         Index("ix_flashcards_student_active", "college_id", "student_id", "is_active"),
+        # Due queue: a review session is a range scan of this index
+        Index(
+            "ix_flashcards_student_due",
+            "student_id",
+            "next_review_date",
+            postgresql_where=text("is_active"),
+        ),
     )
 
     student_id = Column(UUID(as_uuid=True), ForeignKey("students.id"), nullable=False)
@@ -47,6 +54,17 @@ class Flashcard(TenantModel):
     is_ai_generated = Column(Boolean, default=True)
     is_active = Column(Boolean, default=True)
 
+    # SM-2 state after the latest review (denormalized from FlashcardReview,
+    # written by process_review); next_review_date is NULL for new cards
+    ease_factor = Column(Float, nullable=False, default=2.5, server_default="2.5")
+    interval_days = Column(Float, nullable=False, default=0.0, server_default="0")
+    repetition_count = Column(Integer, nullable=False, default=0, server_default="0")
+    next_review_date = Column(Date)
+    last_reviewed_at = Column(DateTime(timezone=True))
+    # FSRS memory state, kept alongside SM-2; NULL until the first review
+    memory_stability = Column(Float)
+    memory_difficulty = Column(Float)
+
 
 class FlashcardReview(TenantModel):
     """Individual review events for spaced repetition scheduling."""
@@ -66,6 +84,31 @@ class FlashcardReview(TenantModel):
     reviewed_at = Column(DateTime(timezone=True))
 
 
+class FlashcardReviewStats(TenantModel):
+    """Rolling per-student flashcard review aggregates.
+
+    Updated with every review batch by FlashcardScheduler; reviewed_cards
+    etc. count cards by the SM-2 state of their latest review.
+    """
+    __tablename__ = "flashcard_review_stats"
+    __table_args__ = (
+        UniqueConstraint("college_id", "student_id", name="uq_flashcard_review_stats_student"),
+    )
+
+    student_id = Column(UUID(as_uuid=True), ForeignKey("students.id"), nullable=False)
+    total_reviews = Column(Integer, nullable=False, default=0, server_default="0")
+    reviewed_cards = Column(Integer, nullable=False, default=0, server_default="0")
+    mastered_cards = Column(Integer, nullable=False, default=0, server_default="0")
+    ease_factor_sum = Column(Float, nullable=False, default=0.0, server_default="0")
+    mastered_by_subject = Column(JSONB, nullable=False, default=dict, server_default="{}")
+    # Consecutive review days up to last_review_date
+    streak_days = Column(Integer, nullable=False, default=0, server_default="0")
+    last_review_date = Column(Date)
+    # FSRS weights fitted to the student's history (NULL = not fitted)
+    fsrs_weights = Column(JSONB)
+    fsrs_fitted_at = Column(DateTime(timezone=True))
+
+
 class PracticeTest(TenantModel):
     """AI-generated practice tests."""
     __tablename__ = "practice_tests"
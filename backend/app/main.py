@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
@@ -95,9 +96,21 @@ async def lifespan(app: FastAPI):
     register_faculty_qr_handlers(QRService)
     logger.info("QR action handlers registered (%d handlers)", len(QRService._action_handlers))
 
+    # --- Knowledge graph snapshot refresh on update events ---
+    from app.engines.ai.knowledge_graph import listen_for_updates
+
+    kg_listener = asyncio.create_task(listen_for_updates()) if redis_ok else None
+
     yield
 
     # Shutdown
+    if kg_listener is not None:
+        kg_listener.cancel()
+    from app.engines.ai.ingestion.pdf_extraction import (
+        shutdown_pdf_extraction_service,
+    )
+
+    shutdown_pdf_extraction_service()
     await clerk.close()
     await permify.close()
     logger.info("Shutting down Acolyte API")
@@ -0,0 +1,140 @@
+"""Benchmark MedicalTextChunker: word-count estimate vs cl100k_base BPE.
+
+Chunks the same corpus with each token counter and measures every chunk
+with the real tokenizer, reporting how far chunk sizes drift from the
+target (mean, stdev, coefficient of variation, share over max_tokens /
+under min_tokens) and chunking throughput.
+
+The default corpus is synthetic and deliberately mixes the text that
+breaks word-count estimates: prose, drug-dosage tables, lab-value lists
+and Latin anatomy terms. Pass --pdf or --text to use a real document.
+
+Requires the bundled vocabulary (python -m scripts.fetch_bpe_vocab).
+
+Usage:
+    cd backend
+    python -m scripts.benchmark_chunker
+    python -m scripts.benchmark_chunker --pdf textbook.pdf --repeat 3
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from app.engines.ai.ingestion.chunker import MedicalTextChunker
+from app.engines.ai.ingestion.pdf_extraction import (
+    count_pdf_pages,
+    extract_page_range,
+)
+from app.engines.ai.ingestion.tokens import (
+    EstimatedTokenCounter,
+    load_bpe_counter,
+)
+
+_PROSE = (
+    "Heart failure is a clinical syndrome in which the heart cannot pump "
+    "enough blood to meet the metabolic needs of the body. Patients "
+    "present with dyspnoea, orthopnoea and peripheral oedema. "
+    "Management combines diuretics with ACE inhibitors or ARNIs, "
+    "beta-blockers and mineralocorticoid receptor antagonists."
+)
+_DRUGS = [
+    "Furosemide", "Enalapril", "Metoprolol succinate", "Spironolactone",
+    "Amoxicillin-clavulanate", "Ceftriaxone", "Vancomycin", "Heparin",
+]
+_LATIN = [
+    "musculus sternocleidomastoideus", "arteria carotis communis",
+    "nervus vagus", "vena jugularis interna", "ligamentum arteriosum",
+    "processus mastoideus", "foramen ovale", "fossa pterygopalatina",
+]
+
+
+def synthetic_corpus(pages: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    parts: list[str] = []
+    for page in range(pages):
+        parts.append(f"CHAPTER {page // 20 + 1}" if page % 20 == 0 else "")
+        parts.append(" ".join([_PROSE] * rng.randint(1, 3)))
+        parts.append("\n".join(
+            f"{rng.choice(_DRUGS)} | {rng.choice([20, 40, 80, 250, 500])} mg "
+            f"| {rng.choice(['PO', 'IV', 'IM'])} | q{rng.choice([6, 8, 12, 24])}h "
+            f"| CrCl<{rng.choice([30, 50])}: {rng.choice(['50%', 'avoid'])}"
+            for _ in range(rng.randint(8, 20))
+        ))
+        parts.append("\n".join(
+            f"Na+ {rng.randint(125, 150)} mmol/L; K+ {rng.uniform(2.8, 6.2):.1f} "
+            f"mmol/L; Cr {rng.uniform(0.5, 4.0):.2f} mg/dL; "
+            f"eGFR {rng.randint(15, 120)} mL/min/1.73m2"
+            for _ in range(rng.randint(3, 8))
+        ))
+        parts.append(", ".join(rng.sample(_LATIN, 5)) + ".")
+    return "\n\n".join(p for p in parts if p)
+
+
+def load_corpus(args: argparse.Namespace) -> str:
+    if args.pdf:
+        path = str(args.pdf)
+        return "\n\n".join(
+            p for p in extract_page_range(path, 0, count_pdf_pages(path)) if p
+        )
+    if args.text:
+        return args.text.read_text()
+    return synthetic_corpus(args.pages)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pdf", type=Path)
+    parser.add_argument("--text", type=Path)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    try:
+        bpe = load_bpe_counter()
+    except (ImportError, OSError, ValueError) as exc:
+        print(f"BPE vocabulary unavailable: {exc}", file=sys.stderr)
+        print("Run: python -m scripts.fetch_bpe_vocab", file=sys.stderr)
+        return 1
+
+    corpus = load_corpus(args)
+    print(f"Corpus: {len(corpus):,} chars, {bpe.count(corpus):,} cl100k tokens\n")
+
+    header = (
+        f"{'counter':<10} {'chunks':>7} {'mean':>7} {'stdev':>7} {'cv':>6} "
+        f"{'min':>5} {'max':>5} {'>max%':>6} {'<min%':>6} {'MB/s':>7}"
+    )
+    print(header)
+    print("-" * len(header))
+    for counter in (EstimatedTokenCounter(), bpe):
+        chunker = MedicalTextChunker(token_counter=counter)
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            chunks = chunker.chunk_text(corpus, document_title="benchmark")
+        elapsed = (time.perf_counter() - started) / args.repeat
+
+        # Measure every chunk with the real tokenizer
+        sizes = [bpe.count(c.content) for c in chunks]
+        mean = statistics.fmean(sizes)
+        stdev = statistics.pstdev(sizes)
+        over = sum(s > chunker.max_tokens for s in sizes) / len(sizes)
+        under = sum(s < chunker.min_tokens for s in sizes) / len(sizes)
+        print(
+            f"{counter.name:<10} {len(sizes):>7} {mean:>7.0f} {stdev:>7.0f} "
+            f"{stdev / mean:>6.2f} {min(sizes):>5} {max(sizes):>5} "
+            f"{over:>6.1%} {under:>6.1%} {len(corpus) / elapsed / 1e6:>7.2f}"
+        )
+
+    info = bpe.cache_info()
+    print(
+        f"\nBPE line cache: {info.hits:,} hits / {info.misses:,} misses "
+        f"({info.hits / max(info.hits + info.misses, 1):.0%} hit rate)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
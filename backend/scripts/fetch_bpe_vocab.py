@@ -0,0 +1,56 @@
+"""Fetch the cl100k_base BPE vocabulary bundled with the chunker.
+
+MedicalTextChunker sizes chunks in cl100k_base tokens and loads the
+vocabulary from app/engines/ai/ingestion/data/ — it never downloads it
+at runtime. The Docker build runs this script; run it once locally to
+get real token counts in development (otherwise the chunker falls back
+to the word-count estimate).
+
+Deliberately imports nothing from app/ so it runs before the app is
+configured.
+
+Usage:
+    cd backend
+    python -m scripts.fetch_bpe_vocab
+"""
+
+import hashlib
+import sys
+import urllib.request
+from pathlib import Path
+
+# Keep in sync with app/engines/ai/ingestion/tokens.py
+BPE_VOCAB_URL = (
+    "https://openaipublic.blob.core.windows.net/encodings/cl100k_base.tiktoken"
+)
+BPE_VOCAB_SHA256 = (
+    "223921b76ee99bde995b7ff738513eef100fb51d18c93597a113bcffe865b2a7"
+)
+BPE_VOCAB_PATH = (
+    Path(__file__).resolve().parent.parent
+    / "app" / "engines" / "ai" / "ingestion" / "data" / "cl100k_base.tiktoken"
+)
+
+
+def main() -> int:
+    if BPE_VOCAB_PATH.exists():
+        data = BPE_VOCAB_PATH.read_bytes()
+        if hashlib.sha256(data).hexdigest() == BPE_VOCAB_SHA256:
+            print(f"BPE vocabulary already present at {BPE_VOCAB_PATH}")
+            return 0
+
+    with urllib.request.urlopen(BPE_VOCAB_URL, timeout=60) as response:
+        data = response.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if digest != BPE_VOCAB_SHA256:
+        print(f"Hash mismatch for {BPE_VOCAB_URL}: {digest}", file=sys.stderr)
+        return 1
+
+    BPE_VOCAB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    BPE_VOCAB_PATH.write_bytes(data)
+    print(f"Wrote {len(data)} bytes to {BPE_VOCAB_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1239,6 +1239,11 @@ async def main(skip_embeddings: bool = False, dry_run: bool = False) -> None:
                 entity_result["created"], entity_result["skipped"],
             )
 
+            from app.engines.ai.entity_resolver import sync_entity_aliases
+
+            aliases = await sync_entity_aliases(db)
+            logger.info("Entity aliases: created=%d", aliases)
+
             logger.info("=== Step 3: Seeding Entity Relationships ===")
             rel_result = await seed_entity_relationships(db)
             logger.info(
@@ -1249,6 +1254,12 @@ async def main(skip_embeddings: bool = False, dry_run: bool = False) -> None:
             await db.commit()
             logger.info("=== Seed complete! ===")
 
+            from app.engines.ai.knowledge_graph import (
+                notify_knowledge_graph_updated,
+            )
+
+            await notify_knowledge_graph_updated()
+
         except Exception:
             await db.rollback()
             logger.error("Seed failed — rolled back", exc_info=True)
@@ -0,0 +1,97 @@
+"""Tests for token-sized, adaptively concurrent chunk embedding."""
+
+import asyncio
+from types import SimpleNamespace
+
+from app.engines.ai.ingestion.embedder import (
+    AdaptiveLimiter,
+    ChunkEmbedder,
+    token_batches,
+)
+
+
+class TestTokenBatches:
+    def test_batches_respect_token_budget(self):
+        assert token_batches([400, 400, 400, 400], max_tokens=1000) == [
+            (0, 2), (2, 4),
+        ]
+
+    def test_oversized_input_gets_its_own_batch(self):
+        assert token_batches([10, 5000, 10], max_tokens=1000) == [
+            (0, 1), (1, 2), (2, 3),
+        ]
+
+    def test_input_count_is_capped(self):
+        assert token_batches([1] * 5, max_tokens=1000, max_inputs=2) == [
+            (0, 2), (2, 4), (4, 5),
+        ]
+
+    def test_empty(self):
+        assert token_batches([]) == []
+
+
+class TestAdaptiveLimiter:
+    def test_throttle_halves_limit(self):
+        limiter = AdaptiveLimiter(initial=8)
+        limiter.on_throttle()
+        assert limiter.limit == 4
+
+    def test_limit_never_drops_below_minimum(self):
+        limiter = AdaptiveLimiter(initial=2, minimum=1)
+        for _ in range(5):
+            limiter.on_throttle()
+        assert limiter.limit == 1
+
+    def test_fast_responses_grow_limit_up_to_maximum(self):
+        limiter = AdaptiveLimiter(initial=2, maximum=4)
+        for _ in range(50):
+            limiter.on_success(0.1)
+        assert limiter.limit == 4
+
+    def test_slow_responses_shrink_limit(self):
+        limiter = AdaptiveLimiter(initial=10, latency_target_seconds=1.0)
+        limiter.on_success(5.0)
+        assert limiter.limit == 8
+
+    async def test_in_flight_is_bounded_by_limit(self):
+        limiter = AdaptiveLimiter(initial=2, maximum=2)
+        peak = current = 0
+
+        async def work():
+            nonlocal peak, current
+            async with limiter:
+                current += 1
+                peak = max(peak, current)
+                await asyncio.sleep(0.01)
+                current -= 1
+
+        await asyncio.gather(*(work() for _ in range(6)))
+        assert peak == 2
+
+
+class _FakeEmbeddings:
+    def __init__(self):
+        self.batch_sizes: list[int] = []
+
+    async def create(self, model, input, dimensions):
+        self.batch_sizes.append(len(input))
+        data = [
+            SimpleNamespace(index=i, embedding=[float(len(text))])
+            for i, text in enumerate(input)
+        ]
+        # The API does not promise response order
+        return SimpleNamespace(data=data[::-1])
+
+
+class TestChunkEmbedder:
+    async def test_embeddings_come_back_in_input_order(self):
+        embeddings = _FakeEmbeddings()
+        embedder = ChunkEmbedder(
+            SimpleNamespace(embeddings=embeddings), batch_tokens=1000,
+        )
+        texts = ["a" * n for n in range(1, 8)]
+
+        result = await embedder.embed(texts, [400] * len(texts))
+
+        assert result == [[float(n)] for n in range(1, 8)]
+        assert embeddings.batch_sizes == [2, 2, 2, 1]
@@ -0,0 +1,202 @@
+"""Tests for MinHash / LSH fingerprinting in the dedup index."""
+
+from types import SimpleNamespace
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.engines.ai import question_pool
+from app.engines.ai.agents import (
+    exam_question_generator,
+    practice_question_generator,
+)
+from app.engines.ai.dedup_index import (
+    JACCARD_THRESHOLD,
+    LSH_BANDS,
+    NUM_PERM,
+    cosine_similarity,
+    estimate_jaccard,
+    find_batch_duplicates,
+    fingerprint,
+    normalize_text,
+    question_dedup_text,
+)
+
+STEM = (
+    "A 45-year-old man presents to the emergency department with crushing "
+    "retrosternal chest pain radiating to the left arm for two hours. ECG "
+    "shows ST elevation in leads II, III and aVF. Which coronary artery is "
+    "most likely occluded?"
+)
+EDITED = STEM.replace("45-year-old", "52-year-old").replace("two", "three")
+UNRELATED = (
+    "A 6-year-old girl presents with periorbital edema, frothy urine and "
+    "serum albumin of 1.8 g/dL after an upper respiratory infection. What "
+    "is the most likely finding on electron microscopy?"
+)
+
+
+class TestNormalization:
+    def test_case_punctuation_and_whitespace_are_ignored(self):
+        assert normalize_text("Which  ARTERY, is   occluded?") == (
+            "which artery is occluded"
+        )
+
+    def test_identical_after_normalization_share_hash(self):
+        a = fingerprint("Which artery is occluded?")
+        b = fingerprint("which   artery is OCCLUDED")
+        assert a.content_hash == b.content_hash
+        assert a.minhash == b.minhash
+
+    def test_question_text_joins_stem_and_lead_in(self):
+        q = {"stem": "Vignette.", "lead_in": "Next step?"}
+        assert question_dedup_text(q) == "Vignette. Next step?"
+
+
+class TestFingerprint:
+    def test_signature_and_band_sizes(self):
+        fp = fingerprint(STEM)
+        assert len(fp.minhash) == NUM_PERM
+        assert len(fp.bands) == LSH_BANDS
+        assert all(-(2**63) <= b < 2**63 for b in fp.bands)
+
+    def test_fingerprint_is_deterministic(self):
+        assert fingerprint(STEM) == fingerprint(STEM)
+
+    def test_small_edit_stays_above_threshold(self):
+        sim = estimate_jaccard(fingerprint(STEM).minhash, fingerprint(EDITED).minhash)
+        assert sim >= JACCARD_THRESHOLD
+
+    def test_unrelated_stem_is_far_below_threshold(self):
+        sim = estimate_jaccard(
+            fingerprint(STEM).minhash, fingerprint(UNRELATED).minhash,
+        )
+        assert sim < 0.2
+
+    def test_short_text_is_a_single_shingle(self):
+        assert fingerprint("ST elevation").minhash != fingerprint("ST").minhash
+
+
+class TestBatchDuplicates:
+    def test_later_near_copy_is_the_duplicate(self):
+        matches = find_batch_duplicates(
+            [fingerprint(STEM), fingerprint(UNRELATED), fingerprint(EDITED)],
+        )
+        assert matches[0] is None
+        assert matches[1] is None
+        assert matches[2] is not None
+        assert matches[2].batch_index == 0
+        assert matches[2].method == "minhash"
+
+    def test_distinct_items_all_kept(self):
+        assert find_batch_duplicates(
+            [fingerprint(STEM), fingerprint(UNRELATED)],
+        ) == [None, None]
+
+
+class TestCosine:
+    def test_cosine_similarity(self):
+        assert cosine_similarity([1.0, 0.0], [1.0, 0.0]) == 1.0
+        assert cosine_similarity([1.0, 0.0], [0.0, 1.0]) == 0.0
+        assert cosine_similarity([0.0, 0.0], [1.0, 0.0]) == 0.0
+
+
+class FakeIndex:
+    """Nothing is a duplicate; records registered (text, item_id) pairs."""
+
+    added: list[tuple[str, UUID]] = []
+
+    def __init__(self, db, *, college_id, kind):
+        pass
+
+    async def check(self, texts):
+        return [None] * len(texts)
+
+    async def add(self, entries):
+        FakeIndex.added.extend(entries)
+        return len(entries)
+
+
+class FakePipeline:
+    """Passes every item except those mentioning "REJECT"."""
+
+    def __init__(self, gateway):
+        pass
+
+    async def validate_batch(self, db, *, items, college_id):
+        return [
+            SimpleNamespace(
+                passed="REJECT" not in item.content, overall_confidence=0.9,
+                rejection_reasons=["flawed"],
+            )
+            for item in items
+        ]
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    FakeIndex.added = []
+    for module in (practice_question_generator, exam_question_generator):
+        monkeypatch.setattr(module, "DedupIndex", FakeIndex)
+        monkeypatch.setattr(module, "MedicalSafetyPipeline", FakePipeline)
+    monkeypatch.setattr(question_pool, "DedupIndex", FakeIndex)
+    return FakeIndex.added
+
+
+def _state(*stems):
+    return {
+        "college_id": str(uuid4()),
+        "retrieved_content": [],
+        "validated_questions": [],
+        "generated_questions": [
+            {"stem": stem, "lead_in": "Which artery?", "options": []}
+            for stem in stems
+        ],
+    }
+
+
+class TestRegistration:
+    @pytest.mark.parametrize(
+        "module", [practice_question_generator, exam_question_generator],
+    )
+    async def test_accepted_questions_are_indexed_with_their_ids(
+        self, registry, module,
+    ):
+        result = await module.validate_questions(
+            _state(STEM, "REJECT " + UNRELATED), db=None, gateway=None,
+        )
+
+        (accepted,) = result["validated_questions"]
+        assert registry == [
+            (question_dedup_text(accepted), UUID(accepted["id"])),
+        ]
+        assert "id" not in result["rejected_questions"][0]
+
+    async def test_pooled_rows_keep_the_indexed_id(self, registry):
+        class FakeSession:
+            async def execute(self, statement, params=None):
+                rows = [
+                    {col.key: value for col, value in row.items()}
+                    for row in statement._multi_values[0]
+                ]
+                self.rows = rows
+                return SimpleNamespace(all=lambda: [
+                    (row["id"], row["content_hash"]) for row in rows
+                ])
+
+        result = await practice_question_generator.validate_questions(
+            _state(STEM), db=None, gateway=None,
+        )
+        (accepted,) = result["validated_questions"]
+        db = FakeSession()
+        pool = question_pool.QuestionPool(db)
+        await pool.add_questions(
+            uuid4(), question_pool.PoolBucket("Medicine", "MI", "medium"),
+            [accepted],
+        )
+
+        (row,) = db.rows
+        assert row["id"] == UUID(accepted["id"])
+        assert row["question_data"]["id"] == accepted["id"]
+        # Validation and pooling index it under the same id
+        assert {item_id for _, item_id in registry} == {row["id"]}
@@ -0,0 +1,135 @@
+"""Tests for the Bridge Layer local direct-answer pre-screen."""
+
+from app.engines.ai.pipelines.direct_answer_rules import (
+    LocalVerdict,
+    RollingDirectAnswerGate,
+    detect_direct_answer_locally,
+)
+
+ANSWER_KEY = [
+    "Inferior wall myocardial infarction is most commonly caused by "
+    "occlusion of the right coronary artery. ST elevation appears in "
+    "leads II, III and aVF.",
+]
+
+
+class TestGiveawayPhrases:
+    def test_answer_is(self):
+        result = detect_direct_answer_locally(
+            "Good effort. The answer is the right coronary artery.",
+        )
+        assert result.verdict is LocalVerdict.DIRECT
+        assert result.evidence == "The answer is the right coronary artery."
+        assert result.engagement_score == 0.0
+
+    def test_option_is_correct(self):
+        result = detect_direct_answer_locally("Option B is correct here.")
+        assert result.verdict is LocalVerdict.DIRECT
+
+    def test_giveaway_phrases_inside_questions_are_not_direct(self):
+        for question in (
+            "What do you think the most likely diagnosis is, given the ST "
+            "elevation?",
+            "Good. So what do you think the answer is?",
+            "Can you work out what this is due to?",
+            "Why do you think the answer is not aortic dissection",
+        ):
+            result = detect_direct_answer_locally(question)
+            assert result.verdict is not LocalVerdict.DIRECT, question
+
+    def test_giveaway_after_a_question_is_direct(self):
+        result = detect_direct_answer_locally(
+            "Which vessel is it? The answer is the right coronary artery.",
+        )
+        assert result.verdict is LocalVerdict.DIRECT
+
+
+class TestAnswerKeyOverlap:
+    def test_restating_answer_key_is_direct(self):
+        result = detect_direct_answer_locally(
+            "Inferior myocardial infarction is caused by occlusion of the "
+            "right coronary artery. Does that make sense?",
+            ANSWER_KEY,
+        )
+        assert result.verdict is LocalVerdict.DIRECT
+        assert result.max_overlap >= 0.7
+
+    def test_socratic_reply_passes_locally(self):
+        result = detect_direct_answer_locally(
+            "Look at which leads show the changes on this ECG. Which part "
+            "of the heart do those leads face, and which vessel supplies "
+            "it? Check the coronary anatomy diagram in your Anatomy text.",
+            ANSWER_KEY,
+        )
+        assert result.verdict is LocalVerdict.SOCRATIC
+        assert result.engagement_score > 0.7
+
+    def test_short_declaratives_are_not_a_socratic_pass(self):
+        for reply in (
+            "It's an MI. Does that make sense?",
+            "It is inferior wall MI from RCA occlusion. Make sense?",
+        ):
+            result = detect_direct_answer_locally(reply, ANSWER_KEY)
+            assert result.verdict is LocalVerdict.UNCERTAIN, reply
+
+    def test_no_answer_key_is_uncertain(self):
+        result = detect_direct_answer_locally(
+            "Which vessel supplies the inferior wall of the heart?",
+        )
+        assert result.verdict is LocalVerdict.UNCERTAIN
+        assert not result.decided
+
+    def test_no_question_is_uncertain(self):
+        result = detect_direct_answer_locally(
+            "Think about the leads involved and review the chapter on "
+            "coronary circulation.",
+            ANSWER_KEY,
+        )
+        assert result.verdict is LocalVerdict.UNCERTAIN
+
+
+def _stream(gate: RollingDirectAnswerGate, text: str, step: int = 7) -> list[str]:
+    """Feed text in small deltas; return what the gate released per delta."""
+    return [gate.feed(text[i:i + step]) for i in range(0, len(text), step)]
+
+
+class TestRollingGate:
+    def test_releases_one_sentence_behind_and_loses_nothing(self):
+        head = "Good thinking so far. Which leads show the ST changes?\n"
+        tail = "Which vessel supplies that wall? Check your Anatomy text."
+        reply = head + tail
+        gate = RollingDirectAnswerGate(ANSWER_KEY)
+        released = _stream(gate, reply)
+
+        assert "".join(released) == head
+        assert gate.finish() == tail
+        assert gate.released == reply
+        assert gate.violation is None
+
+    def test_giveaway_is_caught_before_release(self):
+        gate = RollingDirectAnswerGate()
+        released = _stream(
+            gate, "Let's look at the ECG. The answer is the right coronary "
+            "artery. Does that help?",
+        )
+        assert gate.violation is not None
+        assert "The answer is" in gate.violation.evidence
+        assert "answer is" not in "".join(released)
+        assert gate.feed("More text. ") == ""
+        assert gate.finish() == ""
+
+    def test_giveaway_split_by_an_abbreviation(self):
+        gate = RollingDirectAnswerGate()
+        _stream(gate, "Recall what the ECG showed, i.e. this is caused by a K+ shift. ")
+        assert gate.violation is not None
+
+    def test_answer_key_restatement_in_the_last_sentence(self):
+        gate = RollingDirectAnswerGate(ANSWER_KEY)
+        _stream(
+            gate, "Nice work. Inferior myocardial infarction is caused by "
+            "occlusion of the right coronary artery",
+        )
+        assert gate.violation is None
+        assert gate.finish() == ""
+        assert gate.violation.verdict is LocalVerdict.DIRECT
+        assert gate.released == ""
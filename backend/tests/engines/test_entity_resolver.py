@@ -0,0 +1,101 @@
+"""Tests for batched, ranked entity resolution."""
+
+from types import SimpleNamespace
+from uuid import uuid4
+
+from app.engines.ai import knowledge_graph
+from app.engines.ai.entity_resolver import NORMALIZE_SQL, EntityResolver
+from app.engines.ai.knowledge_graph import KnowledgeGraphSnapshot
+
+
+def _entity(entity_type, name, aliases=()):
+    return SimpleNamespace(
+        id=uuid4(), entity_type=entity_type, name=name, aliases=list(aliases),
+        properties=None,
+    )
+
+
+MI = _entity("disease", "Myocardial Infarction", ["MI", "Heart Attack"])
+MITRAL = _entity("disease", "Mitral Stenosis")
+CHEST_PAIN = _entity("symptom", "Chest Pain")
+HYDRALAZINE = _entity("drug", "Hydralazine")
+CLOZAPINE = _entity("drug", "Clozapine")
+PENICILLAMINE = _entity("drug", "Penicillamine")
+
+
+class FakeSession:
+    """Records lookups; answers with scripted (ord, entity, rank) rows."""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.lookups: list[dict] = []
+
+    async def execute(self, query, params):
+        self.lookups.append(params)
+        return SimpleNamespace(all=lambda: [
+            SimpleNamespace(
+                ord=ord_, entity_id=e.id, name=e.name,
+                entity_type=e.entity_type, alias=alias, rank=rank, score=score,
+            )
+            for ord_, e, alias, rank, score in self.rows
+        ])
+
+
+class TestResolveMany:
+    async def test_exact_hits_skip_the_query(self):
+        graph = KnowledgeGraphSnapshot.from_rows([MI, MITRAL, CHEST_PAIN], [])
+        db = FakeSession(rows=[
+            (1, MITRAL, "Mitral Stenosis", 1, 0.35),
+            (2, MI, "Myocardial Infarction", 3, 0.61),
+        ])
+        found = await EntityResolver(db, graph=graph).resolve_many(
+            ["Heart attack", "myocardial infraction", "mit", "MIT ", "?!", "MI"],
+            ("disease",),
+        )
+
+        # One query for the misses, normalized and deduplicated
+        assert db.lookups == [{
+            "terms": ["mit", "myocardial infraction"],
+            "entity_types": ["disease"],
+            "limit": 3,
+        }]
+        assert [(c.name, c.match) for c in found["Heart attack"]] == [
+            ("Myocardial Infarction", "exact"),
+        ]
+        assert found["MI"][0].score == 1.0
+        assert [(c.name, c.match) for c in found["mit"]] == [
+            ("Mitral Stenosis", "prefix"),
+        ]
+        assert [(c.name, c.match) for c in found["myocardial infraction"]] == [
+            ("Myocardial Infarction", "trigram"),
+        ]
+        assert found["MIT "] == found["mit"]
+        assert found["?!"] == []
+
+    async def test_without_a_snapshot_everything_is_queried(self):
+        db = FakeSession(rows=[(1, CHEST_PAIN, "Chest Pain", 0, 1.0)])
+        candidate = await EntityResolver(db).resolve("chest pain")
+        assert candidate.name == "Chest Pain"
+        assert db.lookups[0]["terms"] == ["chest pain"]
+        assert db.lookups[0]["entity_types"] is None
+
+    async def test_drugs_resolve_exactly_or_not_at_all(self):
+        # Look-alike drugs pass pg_trgm's 0.3 threshold
+        db = FakeSession(rows=[
+            (1, CLOZAPINE, "Clozapine", 3, 0.33),
+            (2, HYDRALAZINE, "Hydralazine", 0, 1.0),
+            (3, HYDRALAZINE, "Hydralazine", 3, 0.41),
+            (4, PENICILLAMINE, "Penicillamine", 2, 0.47),
+        ])
+        found = await EntityResolver(db).resolve_many(
+            ["clonidine", "hydralazine", "hydroxyzine", "penicillin"],
+            ("drug",),
+        )
+        assert found["clonidine"] == found["hydroxyzine"] == []
+        assert found["penicillin"] == []
+        assert [(c.name, c.match) for c in found["hydralazine"]] == [
+            ("Hydralazine", "exact"),
+        ]
+
+    def test_sql_normalization_matches_python(self):
+        assert knowledge_graph._NON_WORD_RE.pattern in NORMALIZE_SQL
@@ -0,0 +1,175 @@
+"""Tests for the indexed flashcard due queue (review sessions)."""
+
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.engines.ai.agents.flashcard_generator import FlashcardGenerator
+
+TODAY = date.today()
+
+
+class FakeResult:
+    def __init__(self, rows=(), scalar=None):
+        self._rows = list(rows)
+        self._scalar = scalar
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+    def one(self):
+        return self._rows[0]
+
+    def scalar_one(self):
+        return self._scalar
+
+
+class FakeSession:
+    """Answers the due / new / count queries from in-memory cards.
+
+    Applies bulk card updates, so a session after a review sees the new
+    schedule.
+    """
+
+    def __init__(self, cards):
+        self.cards = cards
+        self.stats = SimpleNamespace(
+            total_reviews=0, reviewed_cards=0, mastered_cards=0,
+            ease_factor_sum=0.0, mastered_by_subject={}, streak_days=0,
+            last_review_date=None, fsrs_weights=None,
+        )
+
+    async def execute(self, statement, params=None):
+        if params is not None:
+            if statement.table.name == "flashcards":
+                by_id = {card.id: card for card in self.cards}
+                for row in params:
+                    vars(by_id[row["id"]]).update(row)
+            return FakeResult()
+        if not statement.is_select:
+            return FakeResult()  # stats row insert
+
+        if str(statement).startswith("SELECT count("):
+            return FakeResult([self._counts()])
+        entity = statement.column_descriptions[0]["entity"]
+        if entity.__tablename__ != "flashcards":
+            return FakeResult(scalar=self.stats)
+        if statement._for_update_arg is not None:
+            return FakeResult(self.cards)  # the scheduler's card lock
+
+        if "IS NULL" in str(statement.whereclause):
+            rows = sorted(
+                (c for c in self.cards if c.next_review_date is None),
+                key=lambda c: c.created_at,
+            )
+        else:
+            rows = sorted(
+                (
+                    c for c in self.cards
+                    if c.next_review_date is not None
+                    and c.next_review_date <= TODAY
+                ),
+                key=lambda c: c.next_review_date,
+            )
+        return FakeResult(rows[:statement._limit])
+
+    def _counts(self):
+        dates = [c.next_review_date for c in self.cards]
+        return (
+            sum(1 for d in dates if d is not None and d <= TODAY),
+            sum(1 for d in dates if d is not None and d < TODAY),
+            sum(1 for d in dates if d is None),
+        )
+
+    async def flush(self):
+        pass
+
+
+def _card(front, due_in_days=None, created_days_ago=30):
+    reviewed = due_in_days is not None
+    return SimpleNamespace(
+        id=uuid4(), front=front, back="...", card_type="basic",
+        subject="Anatomy", topic="", difficulty=3, clinical_pearl=None,
+        ease_factor=2.5, interval_days=6.0 if reviewed else 0.0,
+        repetition_count=2 if reviewed else 0,
+        next_review_date=(
+            TODAY + timedelta(days=due_in_days) if reviewed else None
+        ),
+        last_reviewed_at=(
+            datetime.now(timezone.utc) - timedelta(days=6) if reviewed else None
+        ),
+        memory_stability=None, memory_difficulty=None,
+        created_at=datetime.now(timezone.utc) - timedelta(days=created_days_ago),
+    )
+
+
+@pytest.fixture
+def deck():
+    return [
+        _card("new, older", created_days_ago=20),
+        _card("due today", due_in_days=0),
+        _card("not due", due_in_days=3),
+        _card("overdue 5 days", due_in_days=-5),
+        _card("new, newer", created_days_ago=2),
+        _card("overdue 1 day", due_in_days=-1),
+    ]
+
+
+@pytest.fixture
+def generator(deck, monkeypatch):
+    generator = FlashcardGenerator(
+        db=FakeSession(deck), gateway=None, prompt_registry=None,
+    )
+
+    async def no_event(*args):
+        pass
+
+    monkeypatch.setattr(generator, "_fire_metacognitive_event", no_event)
+    return generator
+
+
+async def _session(generator, max_cards=20):
+    return await generator.get_review_session(
+        student_id=uuid4(), college_id=uuid4(), max_cards=max_cards,
+    )
+
+
+class TestReviewSession:
+    async def test_due_cards_come_before_new_cards(self, generator):
+        session = await _session(generator)
+        assert [c.front for c in session.cards] == [
+            "overdue 5 days", "overdue 1 day", "due today",
+            "new, older", "new, newer",
+        ]
+        assert [c.days_overdue for c in session.cards] == [5, 1, 0, -1, -1]
+
+    async def test_new_cards_only_fill_remaining_slots(self, generator):
+        session = await _session(generator, max_cards=4)
+        assert [c.front for c in session.cards] == [
+            "overdue 5 days", "overdue 1 day", "due today", "new, older",
+        ]
+
+    async def test_counts_cover_the_whole_queue(self, generator):
+        session = await _session(generator, max_cards=2)
+        assert len(session.cards) == 2
+        assert (session.total_due, session.overdue_cards, session.new_cards) == (
+            5, 2, 2,
+        )
+
+    async def test_review_reschedules_the_card(self, generator, deck):
+        card = deck[3]  # overdue 5 days
+        update = await generator.process_review(
+            student_id=uuid4(), college_id=uuid4(), card_id=card.id,
+            quality=5, response_time_ms=800,
+        )
+
+        assert card.next_review_date == update.next_review_date > TODAY
+        assert card.repetition_count == 3
+        session = await _session(generator)
+        assert "overdue 5 days" not in [c.front for c in session.cards]
+        assert (session.total_due, session.overdue_cards) == (4, 1)
@@ -0,0 +1,331 @@
+"""Tests for vectorized SM-2 / FSRS flashcard scheduling."""
+
+import random
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.engines.ai.agents import flashcard_scheduler
+from app.engines.ai.agents.flashcard_scheduler import (
+    FSRS_DEFAULT_WEIGHTS,
+    MIN_EASE_FACTOR,
+    FlashcardScheduler,
+    ReviewInput,
+    _advance_streak,
+    current_streak,
+    fit_college_weights,
+    fit_fsrs_weights,
+    fsrs_interval,
+    fsrs_retrievability,
+    fsrs_step,
+    quality_to_rating,
+    review_rounds,
+    sm2_step,
+)
+from app.shared.exceptions import NotFoundException
+
+
+def _sm2_reference(quality, ease, interval, reps):
+    """The scalar SM-2 the scheduler replaced."""
+    ease = max(ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02), 1.3)
+    if quality < 3:
+        return ease, 1.0, 0
+    reps += 1
+    return ease, {1: 1.0, 2: 6.0}.get(reps, interval * ease), reps
+
+
+class TestSM2:
+    def test_matches_scalar_sm2(self):
+        cases = [
+            (q, ease, interval, reps)
+            for q in range(6)
+            for ease, interval, reps in [
+                (2.5, 0.0, 0), (2.5, 1.0, 1), (2.36, 6.0, 2), (1.3, 15.0, 3),
+            ]
+        ]
+        ease, interval, reps = sm2_step(*(np.array(c) for c in zip(*cases)))
+        for i, case in enumerate(cases):
+            exp_ease, exp_interval, exp_reps = _sm2_reference(*case)
+            assert abs(ease[i] - exp_ease) < 1e-9
+            assert abs(interval[i] - exp_interval) < 1e-9
+            assert reps[i] == exp_reps
+
+    def test_ease_floor(self):
+        ease, _, _ = sm2_step(
+            np.array([0]), np.array([1.35]), np.array([3.0]), np.array([2]),
+        )
+        assert ease[0] == MIN_EASE_FACTOR
+
+
+class TestReviewRounds:
+    def test_each_round_has_one_review_per_card(self):
+        rounds = review_rounds(["a", "b", "a", "c", "a", "b"])
+        assert rounds == [[0, 1, 3], [2, 5], [4]]
+
+    def test_empty(self):
+        assert review_rounds([]) == []
+
+
+class TestFSRS:
+    def test_quality_to_rating(self):
+        assert quality_to_rating(np.arange(6)).tolist() == [1, 1, 1, 2, 3, 4]
+
+    def test_interval_equals_stability_at_default_retention(self):
+        assert fsrs_interval(np.array([10.0, 0.2]))[0] == 10
+        assert fsrs_interval(np.array([10.0, 0.2]))[1] == 1
+        assert abs(
+            fsrs_retrievability(np.array([10.0]), np.array([10.0]))[0] - 0.9,
+        ) < 1e-9
+
+    def test_new_cards_get_initial_state(self):
+        stability, difficulty = fsrs_step(
+            FSRS_DEFAULT_WEIGHTS,
+            np.array([1, 3, 4]),
+            np.full(3, np.nan),
+            np.full(3, np.nan),
+            np.zeros(3),
+        )
+        w = FSRS_DEFAULT_WEIGHTS
+        assert stability.tolist() == [w[0], w[2], w[3]]
+        assert difficulty[0] > difficulty[1] > difficulty[2]
+
+    def test_recall_grows_and_lapse_shrinks_stability(self):
+        stability, _ = fsrs_step(
+            FSRS_DEFAULT_WEIGHTS,
+            np.array([1, 2, 3, 4]),
+            np.full(4, 10.0),
+            np.full(4, 5.0),
+            np.full(4, 10.0),
+        )
+        again, hard, good, easy = stability
+        assert again < 10.0 < hard < good < easy
+
+
+def _simulate(weights, cards: int, reviews: int, seed: int = 3):
+    """Chronological history of cards reviewed at their FSRS interval,
+    recalled with the probability weights predict."""
+    rng = random.Random(seed)
+    w = np.asarray(weights)
+    history = []
+    for card in range(cards):
+        day = rng.randrange(30)
+        stability = difficulty = np.array([np.nan])
+        last = day
+        for _ in range(reviews):
+            if np.isnan(stability[0]):
+                rating = rng.choice([1, 3, 3, 3, 4])
+            else:
+                p = fsrs_retrievability(np.array([day - last]), stability)[0]
+                rating = 3 if rng.random() < p else 1
+            stability, difficulty = fsrs_step(
+                w, np.array([rating]), stability, difficulty,
+                np.array([day - last]),
+            )
+            history.append((day, card, rating))
+            last = day
+            day += int(fsrs_interval(stability)[0]) + rng.randrange(-1, 3)
+    history.sort()
+    return [h[1] for h in history], [h[2] for h in history], [h[0] for h in history]
+
+
+class TestFitFSRS:
+    def test_too_little_history(self):
+        cards, ratings, days = _simulate(FSRS_DEFAULT_WEIGHTS, 10, 5)
+        assert fit_fsrs_weights(cards, ratings, days) is None
+
+    def test_fit_beats_defaults_on_a_different_learner(self):
+        # A student who forgets faster than the default model expects
+        learner = list(FSRS_DEFAULT_WEIGHTS)
+        learner[8] -= 0.6
+        learner[2] = 1.2
+        fit = fit_fsrs_weights(*_simulate(learner, 150, 6))
+
+        assert fit is not None
+        assert fit.log_loss < fit.default_log_loss
+        assert fit.weights[2] < FSRS_DEFAULT_WEIGHTS[2]
+        assert list(fit.weights[:4]) == sorted(fit.weights[:4])
+
+
+class TestStreak:
+    def _stats(self, streak=0, last=None):
+        return SimpleNamespace(streak_days=streak, last_review_date=last)
+
+    def test_consecutive_days_extend_the_streak(self):
+        stats = self._stats(3, date(2026, 3, 10))
+        _advance_streak(stats, {date(2026, 3, 11), date(2026, 3, 12)})
+        assert (stats.streak_days, stats.last_review_date) == (5, date(2026, 3, 12))
+
+    def test_gap_restarts_and_old_days_are_ignored(self):
+        stats = self._stats(3, date(2026, 3, 10))
+        _advance_streak(stats, {date(2026, 3, 9), date(2026, 3, 10)})
+        assert stats.streak_days == 3
+        _advance_streak(stats, {date(2026, 3, 13)})
+        assert stats.streak_days == 1
+
+    def test_current_streak_breaks_after_a_missed_day(self):
+        stats = self._stats(4, date(2026, 3, 10))
+        assert current_streak(stats, date(2026, 3, 11)) == 4
+        assert current_streak(stats, date(2026, 3, 12)) == 0
+        assert current_streak(None, date(2026, 3, 12)) == 0
+
+
+class FakeResult:
+    def __init__(self, rows=(), scalar=None):
+        self._rows = list(rows)
+        self._scalar = scalar
+
+    def all(self):
+        return self._rows
+
+    def scalar_one(self):
+        return self._scalar
+
+
+class FakeSession:
+    """Serves the card rows and stats row; records bulk writes."""
+
+    def __init__(self, cards, stats):
+        self.cards = cards
+        self.stats = stats
+        self.writes: dict[str, list[dict]] = {}
+
+    async def execute(self, statement, params=None):
+        if params is not None:
+            self.writes[statement.table.name] = params
+            return FakeResult()
+        if statement.is_select:
+            entity = statement.column_descriptions[0]["entity"]
+            if entity.__tablename__ == "flashcards":
+                return FakeResult(self.cards)
+            return FakeResult(scalar=self.stats)
+        return FakeResult()  # stats row insert
+
+    async def flush(self):
+        pass
+
+
+def _card(subject="Anatomy", **state):
+    values = dict(
+        id=uuid4(), subject=subject, ease_factor=2.5, interval_days=0.0,
+        repetition_count=0, last_reviewed_at=None, memory_stability=None,
+        memory_difficulty=None,
+    )
+    values.update(state)
+    return SimpleNamespace(**values)
+
+
+def _new_stats():
+    return SimpleNamespace(
+        total_reviews=0, reviewed_cards=0, mastered_cards=0,
+        ease_factor_sum=0.0, mastered_by_subject={}, streak_days=0,
+        last_review_date=None, fsrs_weights=None,
+    )
+
+
+DAY = datetime(2026, 3, 10, 9, tzinfo=timezone.utc)
+
+
+class TestApplyReviews:
+    async def test_offline_reviews_replay_in_order(self):
+        a, b = _card(), _card("Physiology")
+        db = FakeSession(sorted([a, b], key=lambda c: c.id), _new_stats())
+        reviews = [
+            ReviewInput(a.id, 5, 900, DAY + timedelta(days=1)),
+            ReviewInput(b.id, 1, 1500, DAY),
+            ReviewInput(a.id, 4, 1200, DAY),
+            ReviewInput(a.id, 5, 800, DAY + timedelta(days=7)),
+        ]
+        result = await FlashcardScheduler(db).apply_reviews(
+            student_id=uuid4(), college_id=uuid4(), reviews=reviews,
+        )
+
+        assert result.skipped == 0
+        assert [r.response_time_ms for r in result.applied] == [1500, 1200, 900, 800]
+        a_updates = [u for u in result.updates if u.card_id == str(a.id)]
+        assert [u.interval_days for u in a_updates] == [1.0, 6.0, 16.2]
+        assert a_updates[-1].next_review_date == date(2026, 3, 17) + timedelta(days=17)
+
+        assert len(db.writes["flashcard_reviews"]) == 4
+        card_rows = {row["id"]: row for row in db.writes["flashcards"]}
+        assert card_rows[a.id]["repetition_count"] == 3
+        assert card_rows[a.id]["last_reviewed_at"] == DAY + timedelta(days=7)
+        assert card_rows[b.id]["memory_stability"] == FSRS_DEFAULT_WEIGHTS[0]
+
+        stats = db.stats
+        assert (stats.total_reviews, stats.reviewed_cards) == (4, 2)
+        assert stats.mastered_cards == 0
+        assert abs(
+            stats.ease_factor_sum - (a_updates[-1].ease_factor + 1.96)
+        ) < 0.01
+        assert (stats.streak_days, stats.last_review_date) == (1, date(2026, 3, 17))
+
+    async def test_already_synced_reviews_are_skipped(self):
+        card = _card(
+            ease_factor=2.6, interval_days=16.0, repetition_count=3,
+            last_reviewed_at=DAY,
+        )
+        stats = _new_stats()
+        stats.reviewed_cards, stats.ease_factor_sum = 1, 2.6
+        db = FakeSession([card], stats)
+        result = await FlashcardScheduler(db).apply_reviews(
+            student_id=uuid4(),
+            college_id=uuid4(),
+            reviews=[
+                ReviewInput(card.id, 5, 700, DAY),
+                ReviewInput(card.id, 5, 700, DAY + timedelta(days=16)),
+            ],
+        )
+
+        assert result.skipped == 1
+        assert result.updates[0].interval_days == round(16.0 * 2.7, 1)
+        assert (stats.reviewed_cards, stats.mastered_cards) == (1, 1)
+        assert stats.mastered_by_subject == {"Anatomy": 1}
+        assert abs(stats.ease_factor_sum - 2.7) < 1e-9
+
+    async def test_unknown_card(self):
+        db = FakeSession([], _new_stats())
+        with pytest.raises(NotFoundException):
+            await FlashcardScheduler(db).apply_reviews(
+                student_id=uuid4(),
+                college_id=uuid4(),
+                reviews=[ReviewInput(uuid4(), 3, 1000, DAY)],
+            )
+
+
+class TenantSession:
+    """Drops the RLS setting on commit, like a NullPool connection."""
+
+    def __init__(self, student_ids):
+        self.student_ids = student_ids
+        self.tenant = ""
+
+    async def execute(self, statement, params=None):
+        if "set_config" in str(statement):
+            self.tenant = params["cid"]
+            return FakeResult()
+        return FakeResult([(s,) for s in self.student_ids])
+
+    async def commit(self):
+        self.tenant = ""
+
+
+class TestFitCollegeWeights:
+    async def test_every_student_is_fitted_under_the_tenant(self, monkeypatch):
+        college_id = uuid4()
+        db = TenantSession([uuid4(), uuid4(), uuid4()])
+        seen: list[tuple] = []
+
+        async def fit_student(db, *, student_id, college_id):
+            seen.append((student_id, db.tenant))
+            return None
+
+        monkeypatch.setattr(
+            flashcard_scheduler, "fit_student_weights", fit_student,
+        )
+        stats = await fit_college_weights(db, college_id)
+
+        assert stats == {"candidates": 3, "fitted": 0}
+        assert seen == [(s, str(college_id)) for s in db.student_ids]
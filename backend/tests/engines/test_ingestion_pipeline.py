@@ -0,0 +1,270 @@
+"""Tests for the streaming page-range plumbing of MedicalContentIngester."""
+
+import asyncio
+from types import SimpleNamespace
+from uuid import uuid4
+
+from app.engines.ai.ingestion.chunker import TextChunk
+from app.engines.ai.ingestion.metadata_extractor import ChunkMetadata
+from app.engines.ai.ingestion.pdf_processor import (
+    MAX_CARRY_CHARS,
+    MedicalContentIngester,
+    _partition_chunks,
+    _pipe,
+    _pipe_grouped,
+    _split_carry,
+    _StoredChunk,
+)
+
+
+class TestSplitCarry:
+    def test_trailing_paragraph_is_carried(self):
+        head, carry = _split_carry("first para\n\nsecond para", final=False)
+        assert head == "first para"
+        assert carry == "second para"
+
+    def test_final_range_keeps_everything(self):
+        text = "first para\n\nsecond para"
+        assert _split_carry(text, final=True) == (text, "")
+
+    def test_text_without_paragraph_break_is_not_carried(self):
+        assert _split_carry("one long paragraph", final=False) == (
+            "one long paragraph", "",
+        )
+
+    def test_oversized_tail_is_not_carried(self):
+        text = "intro\n\n" + "x" * (MAX_CARRY_CHARS + 1)
+        assert _split_carry(text, final=False) == (text, "")
+
+
+class TestPipe:
+    async def test_items_flow_in_order_and_sentinel_is_forwarded(self):
+        inbox: asyncio.Queue = asyncio.Queue()
+        outbox: asyncio.Queue = asyncio.Queue()
+        for item in (1, 2, 3, None):
+            inbox.put_nowait(item)
+
+        async def double(x: int) -> int:
+            return x * 2
+
+        await _pipe(inbox, outbox, double)
+        assert [outbox.get_nowait() for _ in range(4)] == [2, 4, 6, None]
+
+    async def test_full_outbox_applies_backpressure(self):
+        inbox: asyncio.Queue = asyncio.Queue()
+        outbox: asyncio.Queue = asyncio.Queue(maxsize=1)
+        processed: list[int] = []
+        for item in (1, 2, 3, None):
+            inbox.put_nowait(item)
+
+        async def record(x: int) -> int:
+            processed.append(x)
+            return x
+
+        task = asyncio.create_task(_pipe(inbox, outbox, record))
+        await asyncio.sleep(0.01)
+        # One item buffered, one blocked on put — the third is not read.
+        assert processed == [1, 2]
+
+        drained = []
+        while (item := await outbox.get()) is not None:
+            drained.append(item)
+        await task
+        assert drained == [1, 2, 3]
+
+    async def test_concurrent_work_keeps_input_order(self):
+        inbox: asyncio.Queue = asyncio.Queue()
+        outbox: asyncio.Queue = asyncio.Queue()
+        for item in (3, 1, 2, None):
+            inbox.put_nowait(item)
+        running = peak = 0
+
+        async def slow(x: int) -> int:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(x / 100)
+            running -= 1
+            return x
+
+        await _pipe(inbox, outbox, slow, concurrency=3)
+        assert [outbox.get_nowait() for _ in range(4)] == [3, 1, 2, None]
+        assert peak == 3
+
+
+class TestPipeGrouped:
+    async def test_items_are_grouped_up_to_the_limit(self):
+        inbox: asyncio.Queue = asyncio.Queue()
+        outbox: asyncio.Queue = asyncio.Queue()
+        for item in (3, 0, 1, 2, 5, 1, None):
+            inbox.put_nowait(item)
+        groups: list[list[int]] = []
+
+        async def record(group: list[int]) -> None:
+            groups.append(list(group))
+
+        await _pipe_grouped(inbox, outbox, record, size=lambda x: x, limit=4)
+        # The last group is flushed by the sentinel, below the limit.
+        assert groups == [[3, 0, 1], [2, 5], [1]]
+        assert [outbox.get_nowait() for _ in range(7)] == [
+            3, 0, 1, 2, 5, 1, None,
+        ]
+
+    async def test_group_is_forwarded_after_its_work(self):
+        inbox: asyncio.Queue = asyncio.Queue()
+        outbox: asyncio.Queue = asyncio.Queue()
+        for item in ([1], [2], None):
+            inbox.put_nowait(item)
+
+        async def tag(group: list[list[int]]) -> None:
+            for item in group:
+                item.append(len(group))
+
+        await _pipe_grouped(inbox, outbox, tag, size=len, limit=10)
+        assert [outbox.get_nowait() for _ in range(3)] == [[1, 2], [2, 2], None]
+
+
+def _chunk(content: str) -> TextChunk:
+    return TextChunk(
+        content=content, chunk_index=0, estimated_tokens=1,
+        start_char=0, end_char=len(content),
+    )
+
+
+def _stored(parent, college=None, *, active=True, **metadata) -> _StoredChunk:
+    return _StoredChunk(
+        id=uuid4(), parent_document_id=parent, college_id=college,
+        is_active=active, metadata=metadata,
+    )
+
+
+class TestPartitionChunks:
+    def test_previous_version_chunks_are_reused(self):
+        previous = uuid4()
+        kept, edited = _chunk("kept"), _chunk("edited")
+        stored = {kept.content_hash: _stored(previous)}
+
+        fresh, reused = _partition_chunks(
+            [kept, edited], stored, set(),
+            college_id=None, previous_document_id=previous,
+        )
+        assert fresh == [edited]
+        assert [c for c, _ in reused] == [kept]
+
+    def test_other_documents_chunks_are_duplicates(self):
+        dup = _chunk("dup")
+        stored = {dup.content_hash: _stored(uuid4())}
+
+        fresh, reused = _partition_chunks(
+            [dup], stored, set(), college_id=None, previous_document_id=uuid4(),
+        )
+        assert fresh == [] and reused == []
+
+    def test_retired_chunks_are_revived_within_scope(self):
+        college = uuid4()
+        restored = _chunk("restored")
+        stored = {
+            restored.content_hash: _stored(
+                uuid4(), college, active=False,
+                retired_by_document_id=str(uuid4()),
+            ),
+        }
+
+        _, reused = _partition_chunks(
+            [restored], stored, set(),
+            college_id=college, previous_document_id=None,
+        )
+        assert len(reused) == 1
+        _, reused = _partition_chunks(
+            [restored], stored, set(),
+            college_id=uuid4(), previous_document_id=None,
+        )
+        assert reused == []
+
+    def test_deactivated_chunks_are_not_revived(self):
+        previous = uuid4()
+        hidden = _chunk("hidden")
+        stored = {hidden.content_hash: _stored(previous, active=False)}
+
+        fresh, reused = _partition_chunks(
+            [hidden], stored, set(),
+            college_id=None, previous_document_id=previous,
+        )
+        assert fresh == [] and reused == []
+
+    def test_in_flight_hashes_are_skipped_and_accepted_ones_added(self):
+        previous = uuid4()
+        a, b, c = _chunk("a"), _chunk("b"), _chunk("c")
+        stored = {b.content_hash: _stored(previous)}
+        in_flight = {c.content_hash}
+
+        fresh, reused = _partition_chunks(
+            [a, b, c, a], stored, in_flight,
+            college_id=None, previous_document_id=previous,
+        )
+        assert fresh == [a]
+        assert [x for x, _ in reused] == [b]
+        assert in_flight == {a.content_hash, b.content_hash, c.content_hash}
+
+
+class FakeExtractor:
+    """Batch still running; online classification labels by content."""
+
+    def __init__(self):
+        self.online: list[str] = []
+
+    async def fetch_offline(self, db, batch_id, college_id, pack_sizes):
+        return None
+
+    async def classify_chunks_batch(self, db, chunks, college_id):
+        self.online.extend(content for content, _ in chunks)
+        return [ChunkMetadata(subject="Anatomy", topic=c) for c, _ in chunks]
+
+
+class TestApplyOfflineClassification:
+    def _setup(self):
+        rows = [
+            SimpleNamespace(
+                content=f"chunk {i}", source_reference="p.1",
+                medical_entity_type=None,
+                metadata_={"classification": {
+                    "status": "pending", "batch_id": "batch-1",
+                    "custom_id": "pack-0", "position": i,
+                }},
+            )
+            for i in range(2)
+        ]
+        db = SimpleNamespace(
+            execute=_returning(SimpleNamespace(scalars=lambda: rows)),
+            flush=_returning(None),
+        )
+        ingester = MedicalContentIngester.__new__(MedicalContentIngester)
+        ingester._extractor = FakeExtractor()
+        return ingester, db, rows
+
+    async def _apply(self, ingester, db, **kwargs):
+        return await ingester.apply_offline_classification(
+            db, batch_id="batch-1", document_id=uuid4(), college_id=uuid4(),
+            **kwargs,
+        )
+
+    async def test_running_batch_is_polled_again(self):
+        ingester, db, rows = self._setup()
+        assert await self._apply(ingester, db) is None
+        assert ingester._extractor.online == []
+        assert rows[0].metadata_["classification"]["status"] == "pending"
+
+    async def test_last_attempt_classifies_pending_chunks_online(self):
+        ingester, db, rows = self._setup()
+        assert await self._apply(ingester, db, give_up=True) == 2
+        assert ingester._extractor.online == ["chunk 0", "chunk 1"]
+        assert [r.metadata_["classification"]["status"] for r in rows] == [
+            "done", "done",
+        ]
+        assert rows[1].metadata_["topic"] == "chunk 1"
+
+
+def _returning(value):
+    async def call(*args, **kwargs):
+        return value
+    return call
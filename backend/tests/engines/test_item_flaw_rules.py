@@ -0,0 +1,205 @@
+"""Tests for the deterministic NBME item-writing flaw pre-screen."""
+
+from app.engines.ai.pipelines.item_flaw_rules import (
+    parse_mcq,
+    prescreen_item_flaws,
+)
+from app.engines.ai.pipelines.nbme_standards import ItemWritingFlaw
+
+
+def _mcq(stem: str, lead_in: str, options: list[str], correct: str) -> str:
+    option_text = "\n".join(
+        f"  {'ABCDE'[i]}. {o}" for i, o in enumerate(options)
+    )
+    return (
+        f"Stem: {stem}\n"
+        f"Lead-in: {lead_in}\n"
+        f"Options:\n{option_text}\n"
+        f"Correct answer: {correct}\n"
+        f"Bloom's level: apply"
+    )
+
+
+def _codes(content: str) -> set[ItemWritingFlaw]:
+    result = prescreen_item_flaws(content)
+    assert result is not None
+    return {f.code for f in result.flaws}
+
+
+CLEAN = _mcq(
+    "A 58-year-old man has crushing chest pain for 40 minutes. ECG shows "
+    "ST elevation in leads II, III and aVF.",
+    "Which coronary artery is most likely occluded?",
+    [
+        "Left anterior descending artery",
+        "Right coronary artery",
+        "Left circumflex artery",
+        "Left main coronary artery",
+    ],
+    "B",
+)
+
+
+class TestParsing:
+    def test_parses_formatted_mcq(self):
+        parsed = parse_mcq(CLEAN)
+        assert parsed is not None
+        assert len(parsed.options) == 4
+        assert parsed.correct_index == 1
+        assert parsed.lead_in.startswith("Which coronary artery")
+
+    def test_non_mcq_returns_none(self):
+        assert parse_mcq("Question (SAQ): Describe the Krebs cycle.") is None
+        assert prescreen_item_flaws("Model answer: ...") is None
+
+
+class TestRules:
+    def test_clean_item(self):
+        result = prescreen_item_flaws(CLEAN)
+        assert result is not None
+        assert result.clean
+
+    def test_all_of_the_above(self):
+        content = _mcq(
+            "Features of nephrotic syndrome.", "Which is a feature?",
+            ["Proteinuria", "Hypoalbuminemia", "Edema", "All of the above"],
+            "D",
+        )
+        assert ItemWritingFlaw.ALL_NONE_OF_ABOVE in _codes(content)
+
+    def test_absolute_terms(self):
+        content = _mcq(
+            "Regarding metformin.", "Which statement is most accurate?",
+            [
+                "It always causes lactic acidosis",
+                "It reduces hepatic gluconeogenesis",
+                "It never causes diarrhoea",
+                "It is an insulin secretagogue",
+            ],
+            "B",
+        )
+        assert ItemWritingFlaw.ABSOLUTE_TERMS in _codes(content)
+
+    def test_ordinary_all_and_none_are_not_flagged(self):
+        content = _mcq(
+            "Regarding rheumatic fever.", "Which statement is most accurate?",
+            [
+                "All patients need penicillin prophylaxis",
+                "None of the major criteria involve the skin",
+                "Every case follows a streptococcal infection",
+                "Chorea is a minor criterion",
+            ],
+            "A",
+        )
+        codes = _codes(content)
+        assert ItemWritingFlaw.ABSOLUTE_TERMS not in codes
+        assert ItemWritingFlaw.ALL_NONE_OF_ABOVE not in codes
+
+    def test_negative_stem_without_emphasis(self):
+        content = _mcq(
+            "Nephrotic syndrome.",
+            "Which of the following is not a feature?",
+            ["Proteinuria", "Hematuria", "Edema", "Hyperlipidemia"],
+            "B",
+        )
+        assert ItemWritingFlaw.NEGATIVE_STEM_NO_EMPHASIS in _codes(content)
+
+    def test_capitalized_negation_is_fine(self):
+        content = _mcq(
+            "Nephrotic syndrome.",
+            "Which of the following is NOT a feature?",
+            ["Proteinuria", "Hematuria", "Edema", "Hyperlipidemia"],
+            "B",
+        )
+        assert ItemWritingFlaw.NEGATIVE_STEM_NO_EMPHASIS not in _codes(content)
+
+    def test_least_likely_without_emphasis(self):
+        content = _mcq(
+            "A 30-year-old woman with fever.",
+            "Which is the least likely diagnosis?",
+            ["Malaria", "Dengue", "Typhoid", "Gout"],
+            "D",
+        )
+        assert ItemWritingFlaw.NEGATIVE_STEM_NO_EMPHASIS in _codes(content)
+
+    def test_at_least_is_not_a_negation(self):
+        content = _mcq(
+            "Fever for at least 2 weeks with splenomegaly.",
+            "Treatment should continue for at least how many days?",
+            ["7", "14", "21", "28"],
+            "B",
+        )
+        assert ItemWritingFlaw.NEGATIVE_STEM_NO_EMPHASIS not in _codes(content)
+
+    def test_length_skew_is_left_to_the_llm(self):
+        content = _mcq(
+            "A child with a barking cough.", "What is the diagnosis?",
+            [
+                "Croup",
+                "Epiglottitis",
+                "Bacterial tracheitis following a viral upper respiratory "
+                "tract infection in winter",
+                "Asthma",
+            ],
+            "A",
+        )
+        assert ItemWritingFlaw.TESTWISE_CUES not in _codes(content)
+
+    def test_longest_answer_bias(self):
+        content = _mcq(
+            "A child in septic shock.", "What is the next best step?",
+            [
+                "Observe",
+                "Give IV fluids at 20 mL/kg, reassess after each bolus and "
+                "start vasopressors if unresponsive",
+                "Oral antibiotics",
+                "Discharge",
+            ],
+            "B",
+        )
+        assert ItemWritingFlaw.LONGEST_ANSWER_BIAS in _codes(content)
+
+    def test_grammatical_article_cue(self):
+        content = _mcq(
+            "A patient with a painless testicular mass.",
+            "The most likely tumour is an",
+            ["Seminoma", "Embryonal carcinoma", "Leydig cell tumour", "Yolk sac tumour"],
+            "B",
+        )
+        assert ItemWritingFlaw.GRAMMATICAL_CUES in _codes(content)
+
+    def test_k_type_items(self):
+        content = _mcq(
+            "Consider statements 1-4.", "Which are correct?",
+            ["1 and 3", "2 and 4", "1, 2 and 3 only", "4 only"],
+            "A",
+        )
+        assert ItemWritingFlaw.K_TYPE_ITEMS in _codes(content)
+
+    def test_logical_subset_cue(self):
+        content = _mcq(
+            "A hypoxic patient.", "What is the best initial step?",
+            [
+                "Administer oxygen",
+                "Administer oxygen and start IV fluids",
+                "Order a chest X-ray",
+                "Start antibiotics",
+            ],
+            "B",
+        )
+        assert ItemWritingFlaw.LOGICAL_CUES in _codes(content)
+
+    def test_word_repeat_cue(self):
+        content = _mcq(
+            "A patient has a normal anion gap metabolic acidosis with "
+            "alkaline urine, suggesting renal tubular disease.",
+            "What is the most likely cause?",
+            [
+                "Distal renal tubular acidosis",
+                "Diabetic ketoacidosis",
+                "Lactic acidosis",
+                "Salicylate poisoning",
+            ],
+            "A",
+        )
+        assert ItemWritingFlaw.WORD_REPEATS in _codes(content)
@@ -0,0 +1,330 @@
+"""Tests for the in-process knowledge graph snapshot and the graph tools."""
+
+import time
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.engines.ai import knowledge_graph
+from app.engines.ai.knowledge_graph import (
+    KnowledgeGraphSnapshot,
+    get_knowledge_graph,
+    invalidate_knowledge_graph,
+    normalize_name,
+)
+from app.engines.ai.tools.medical_knowledge import MedicalKnowledgeServer
+
+ENTITIES = [
+    ("disease", "Myocardial Infarction", ["MI", "Heart Attack"], {}),
+    ("disease", "Pulmonary Embolism", ["PE"], {}),
+    ("disease", "Heart Failure", ["CHF"], {"subject": "Medicine"}),
+    ("disease", "Aortic Dissection", [], {}),
+    ("symptom", "Chest Pain", [], {}),
+    ("symptom", "Dyspnea", ["Breathlessness"], {}),
+    ("drug", "Warfarin", [], {}),
+    ("drug", "Aspirin", ["ASA"], {}),
+    ("drug", "Aspirin-Dipyridamole", [], {}),
+    ("competency", "PH 1.5 Pharmacokinetics", [], {"level": "KH"}),
+    ("pathway", "Na+/K+-ATPase Inhibition", [], {}),
+]
+
+EDGES = [
+    ("Myocardial Infarction", "Aortic Dissection", "differential_of", 0.7),
+    ("Myocardial Infarction", "Pulmonary Embolism", "differential_of", 0.9),
+    ("Myocardial Infarction", "Chest Pain", "has_symptom", 1.0),
+    ("Myocardial Infarction", "Dyspnea", "has_symptom", 0.6),
+    ("Pulmonary Embolism", "Chest Pain", "has_symptom", 0.8),
+    ("Pulmonary Embolism", "Dyspnea", "has_symptom", 1.0),
+    ("Heart Failure", "Dyspnea", "has_symptom", 1.0),
+    ("Aortic Dissection", "Chest Pain", "has_symptom", 1.0),
+    ("Aspirin", "Warfarin", "interacts_with", 1.0),
+]
+
+
+def _rows():
+    entities = [
+        SimpleNamespace(
+            id=uuid4(), entity_type=t, name=n, aliases=a, properties=p,
+        )
+        for t, n, a, p in ENTITIES
+    ]
+    ids = {e.name: e.id for e in entities}
+    edges = [
+        SimpleNamespace(
+            source_entity_id=ids[s], target_entity_id=ids[t],
+            relationship_type=r, confidence=c, source_reference="Seed",
+            properties={"severity": "major"} if r == "interacts_with" else None,
+        )
+        for s, t, r, c in EDGES
+    ]
+    # An edge to an inactive (unloaded) entity is dropped
+    edges.append(SimpleNamespace(
+        source_entity_id=ids["Warfarin"], target_entity_id=uuid4(),
+        relationship_type="interacts_with", confidence=1.0,
+        source_reference=None, properties=None,
+    ))
+    return entities, edges
+
+
+@pytest.fixture
+def graph():
+    return KnowledgeGraphSnapshot.from_rows(*_rows())
+
+
+def _names(graph, indices):
+    return [graph.entities[i].name for i in indices]
+
+
+class TestResolution:
+    def test_normalize(self):
+        assert normalize_name("  Na+/K+-ATPase   Inhibition ") == (
+            "na+ k+ atpase inhibition"
+        )
+
+    def test_exact_alias_prefix_and_substring(self, graph):
+        def resolve(term, types=None):
+            i = graph.resolve(term, types)
+            return None if i is None else graph.entities[i].name
+
+        assert resolve("heart attack") == "Myocardial Infarction"
+        assert resolve("mi", ("disease",)) == "Myocardial Infarction"
+        assert resolve("aspirin", ("drug",)) == "Aspirin"
+        assert resolve("breathless") == "Dyspnea"
+        assert resolve("PH 1.5", ("competency",)) == "PH 1.5 Pharmacokinetics"
+        assert resolve("embolism") == "Pulmonary Embolism"
+        assert resolve("warfarin", ("disease",)) is None
+        assert resolve("   ") is None
+
+    def test_search_ranks_exact_then_shortest_completion(self, graph):
+        # "heart attack" (an alias) is a shorter completion than "heart failure"
+        assert _names(graph, graph.search("heart", ("disease",))) == [
+            "Myocardial Infarction", "Heart Failure",
+        ]
+        assert _names(graph, graph.search("aspirin")) == [
+            "Aspirin", "Aspirin-Dipyridamole",
+        ]
+
+
+class TestTraversal:
+    def test_csr_neighbours(self, graph):
+        mi = graph.resolve("MI")
+        assert sorted(
+            (graph.entities[t].name, e.confidence)
+            for t, e in graph.out_edges(mi, "differential_of")
+        ) == [("Aortic Dissection", 0.7), ("Pulmonary Embolism", 0.9)]
+        dyspnea = graph.resolve("dyspnea")
+        assert sorted(
+            graph.entities[s].name for s, _ in graph.in_edges(dyspnea, "has_symptom")
+        ) == ["Heart Failure", "Myocardial Infarction", "Pulmonary Embolism"]
+        assert list(graph.out_edges(mi, "no_such_type")) == []
+        assert len(graph.edges) == len(EDGES)
+
+    def test_edges_between_either_direction(self, graph):
+        aspirin, warfarin = graph.resolve("aspirin"), graph.resolve("warfarin")
+        for a, b in ((aspirin, warfarin), (warfarin, aspirin)):
+            edges = graph.edges_between(a, b, ("interacts_with",))
+            assert [e.properties["severity"] for e in edges] == ["major"]
+        assert graph.edges_between(aspirin, warfarin, ("contraindicated_in",)) == []
+
+    def test_shared_sources_counts_the_intersection(self, graph):
+        symptoms = [graph.resolve("chest pain"), graph.resolve("dyspnea")]
+        shared = [
+            (graph.entities[i].name, count, confidence)
+            for i, count, confidence in graph.shared_sources(
+                symptoms, "has_symptom",
+            )
+        ]
+        assert shared == [
+            ("Myocardial Infarction", 2, 1.0),
+            ("Pulmonary Embolism", 2, 1.0),
+            ("Aortic Dissection", 1, 1.0),
+            ("Heart Failure", 1, 1.0),
+        ]
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class FakeSession:
+    """Serves the graph rows; answers resolver lookups by substring."""
+
+    def __init__(self):
+        self.entities, self.edges = _rows()
+        self.synonyms = [SimpleNamespace(
+            entity_id=self.entities[5].id, alias="Dyspnoea",
+        )]
+        self.loads = 0
+        self.lookups: list[list[str]] = []
+
+    async def execute(self, query, params=None):
+        if params is not None:
+            return self._lookup(params)
+        table = query.column_descriptions[0]["entity"].__tablename__
+        if table == "medical_entities":
+            self.loads += 1
+            return FakeResult(self.entities)
+        if table == "medical_entity_aliases":
+            return FakeResult(self.synonyms)
+        return FakeResult(self.edges)
+
+    def _lookup(self, params):
+        self.lookups.append(params["terms"])
+        types = params["entity_types"]
+        rows = []
+        for ord_, term in enumerate(params["terms"], 1):
+            matches = [
+                e for e in self.entities
+                if term in normalize_name(e.name)
+                and (types is None or e.entity_type in types)
+            ]
+            matches.sort(key=lambda e: (len(e.name), e.name))
+            rows.extend(
+                SimpleNamespace(
+                    ord=ord_, entity_id=e.id, name=e.name,
+                    entity_type=e.entity_type, alias=e.name, rank=2, score=0.4,
+                )
+                for e in matches[:params["limit"]]
+            )
+        return FakeResult(rows)
+
+
+@pytest.fixture
+def fresh_snapshot(monkeypatch):
+    monkeypatch.setattr(knowledge_graph, "_snapshot", None)
+    monkeypatch.setattr(knowledge_graph, "_stale", False)
+    monkeypatch.setattr(knowledge_graph, "_loading", False)
+
+
+class TestRefresh:
+    async def test_reused_until_invalidated_or_expired(
+        self, fresh_snapshot, monkeypatch,
+    ):
+        db = FakeSession()
+        first = await get_knowledge_graph(db)
+        assert await get_knowledge_graph(db) is first
+
+        invalidate_knowledge_graph()
+        second = await get_knowledge_graph(db)
+        assert second.version > first.version
+
+        monkeypatch.setattr(
+            knowledge_graph, "SNAPSHOT_MAX_AGE_SECONDS", time.monotonic()
+            - second.loaded_at,
+        )
+        assert await get_knowledge_graph(db) is not second
+        assert db.loads == 3
+
+    async def test_failed_reload_keeps_serving(self, fresh_snapshot):
+        db = FakeSession()
+        first = await get_knowledge_graph(db)
+
+        async def broken(query, params=None):
+            raise ConnectionError("db down")
+
+        db.execute = broken
+        invalidate_knowledge_graph()
+        assert await get_knowledge_graph(db) is first
+
+
+class TestTools:
+    @pytest.fixture
+    def server(self, fresh_snapshot):
+        return MedicalKnowledgeServer(db=FakeSession(), college_id=uuid4())
+
+    async def test_differentials_of_a_diagnosis(self, server):
+        result = await server._tool_get_differential_diagnoses(
+            {"primary_diagnosis": "heart attack"},
+        )
+        assert [d["diagnosis"] for d in result["differentials"]] == [
+            "Pulmonary Embolism", "Aortic Dissection",
+        ]
+
+    async def test_differentials_from_symptoms(self, server):
+        result = await server._tool_get_differential_diagnoses(
+            {"symptoms": ["chest pain", "breathlessness", "fever"],
+             "max_results": 3},
+        )
+        top = result["differentials"]
+        assert [(d["diagnosis"], d["shared_symptom_count"]) for d in top] == [
+            ("Myocardial Infarction", 2),
+            ("Pulmonary Embolism", 2),
+            ("Aortic Dissection", 1),
+        ]
+        assert top[0]["reasoning"] == "Shares symptoms: chest pain, breathlessness"
+        assert top[2]["reasoning"] == "Shares symptom: chest pain"
+        assert result["resolved"]["breathlessness"] == [
+            {"entity": "Dyspnea", "match": "exact", "score": 1.0},
+        ]
+        assert result["resolved"]["fever"] == []
+        assert server.db.loads == 1
+        # Exact names and aliases never reach the database
+        assert server.db.lookups == [["fever"]]
+
+    async def test_drug_interactions(self, server):
+        result = await server._tool_get_drug_interactions(
+            {"drug_a": "warfarin", "drug_b": "ASA"},
+        )
+        assert [(i["type"], i["severity"]) for i in result["interactions"]] == [
+            ("interacts_with", "major"),
+        ]
+        assert result["resolved"]["ASA"] == [
+            {"entity": "Aspirin", "match": "exact", "score": 1.0},
+        ]
+        missing = await server._tool_get_drug_interactions(
+            {"drug_a": "warfarin", "drug_b": "heparin"},
+        )
+        assert missing["interactions"] == [] and "note" in missing
+        assert server.db.lookups == [["heparin"]]
+
+    async def test_drugs_are_never_fuzzy_matched(self, server):
+        # "dipyridamole" is a substring of Aspirin-Dipyridamole only
+        result = await server._tool_get_drug_interactions(
+            {"drug_a": "warfarin", "drug_b": "dipyridamole"},
+        )
+        assert result["interactions"] == [] and "note" in result
+        assert result["resolved"]["dipyridamole"] == []
+
+    async def test_fuzzy_matches_are_reported(self, server):
+        result = await server._tool_get_differential_diagnoses(
+            {"symptoms": ["pain"]},
+        )
+        assert result["resolved"] == {"pain": [
+            {"entity": "Chest Pain", "match": "substring", "score": 0.4},
+        ]}
+        assert len(result["differentials"]) == 3
+
+    async def test_synonym_rows_resolve_exactly(self, server):
+        result = await server._tool_get_differential_diagnoses(
+            {"symptoms": ["dyspnoea"]},
+        )
+        assert len(result["differentials"]) == 3
+        assert server.db.lookups == []
+
+    async def test_competency_and_misconceptions(self, server):
+        competency = await server._tool_get_competency_details(
+            {"competency_code": "PH 1.5"},
+        )
+        assert (competency["found"], competency["level"]) == (True, "KH")
+        assert [m["entity"] for m in competency["resolved"]["PH 1.5"]] == [
+            "PH 1.5 Pharmacokinetics",
+        ]
+        assert (await server._tool_get_competency_details(
+            {"competency_code": "AN 9.9"},
+        ))["found"] is False
+
+        server.db.entities[2].properties["misconceptions"] = [
+            {"misconception": "CHF is a heart attack"},
+        ]
+        result = await server._tool_get_misconceptions(
+            {"topic": "heart", "subject": "Medicine"},
+        )
+        assert [m["topic"] for m in result["misconceptions"]] == ["Heart Failure"]
+        assert [m["entity"] for m in result["resolved"]["heart"]] == [
+            "Heart Failure",
+        ]
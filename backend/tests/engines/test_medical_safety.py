@@ -0,0 +1,323 @@
+"""Tests for the Medical Safety Pipeline's execution modes."""
+
+import asyncio
+import re
+from typing import get_args
+from uuid import uuid4
+
+import pytest
+
+from app.engines.ai.pipelines.medical_safety import (
+    BATCH_MAX_ITEMS,
+    BiasDetectionBatch,
+    BiasDetectionCheck,
+    BloomsVerificationCheck,
+    ClinicalAccuracyBatch,
+    ClinicalAccuracyCheck,
+    CombinedSafetyCheck,
+    ItemWritingFlawCheck,
+    MedicalSafetyPipeline,
+    SafetyItem,
+    SourceGroundingBatch,
+    SourceGroundingCheck,
+)
+from app.engines.ai.pipelines.nbme_standards import ItemWritingFlaw
+
+MCQ = (
+    "Stem: A 58-year-old man has crushing chest pain for 40 minutes. ECG "
+    "shows ST elevation in leads II, III and aVF.\n"
+    "Lead-in: Which coronary artery is most likely occluded?\n"
+    "Options:\n"
+    "  A. Left anterior descending artery\n"
+    "  B. Right coronary artery\n"
+    "  C. Left circumflex artery\n"
+    "  D. All of the above\n"
+    "Correct answer: B\n"
+    "Bloom's level: apply"
+)
+
+
+def _verdicts(confidence=1.0):
+    ok = confidence >= 0.7
+    return {
+        SourceGroundingCheck: SourceGroundingCheck(
+            all_claims_grounded=ok, grounded_claim_count=1,
+            total_claim_count=1, ungrounded_claims=[], confidence=confidence,
+        ),
+        ClinicalAccuracyCheck: ClinicalAccuracyCheck(
+            clinically_accurate=ok, inaccuracies=[], outdated_information=[],
+            confidence=confidence,
+        ),
+        BiasDetectionCheck: BiasDetectionCheck(
+            bias_free=ok, biases_found=[], confidence=confidence,
+        ),
+        ItemWritingFlawCheck: ItemWritingFlawCheck(
+            meets_standards=ok, flaws_detected=[], total_flaw_count=0,
+            confidence=confidence,
+        ),
+        BloomsVerificationCheck: BloomsVerificationCheck(
+            blooms_aligned=ok, declared_level="apply", actual_level="apply",
+            reasoning="", confidence=confidence,
+        ),
+    }
+
+
+class FakeGateway:
+    """Answers each check by output schema; optional per-schema delays."""
+
+    def __init__(self, verdicts=None, delays=None, combined=None):
+        self.verdicts = verdicts or _verdicts()
+        self.delays = delays or {}
+        self.combined = combined
+        self.calls: list[type] = []
+        self.cancelled: list[type] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.drained = 0
+        self.lock = asyncio.Lock()
+
+    def session_lock(self, db):
+        return self.lock
+
+    async def complete_structured(self, db, *, output_schema, **kwargs):
+        self.calls.append(output_schema)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays.get(output_schema, 0.01))
+        except asyncio.CancelledError:
+            self.cancelled.append(output_schema)
+            raise
+        finally:
+            self.in_flight -= 1
+        if output_schema is CombinedSafetyCheck:
+            return self.combined
+        return self.verdicts[output_schema]
+
+    async def drain(self, db):
+        self.drained += 1
+
+
+async def _validate(gateway, content="Explanation of STEMI.", **kwargs):
+    kwargs.setdefault("content_type", "explanation")
+    return await MedicalSafetyPipeline(gateway).validate(
+        None, content=content, college_id=uuid4(), **kwargs,
+    )
+
+
+class TestConcurrentChecks:
+    @pytest.mark.parametrize("mode, expected", [
+        ("concurrent", 3), ("sequential", 1),
+    ])
+    async def test_checks_run_in_parallel_under_the_bound(self, mode, expected):
+        gateway = FakeGateway()
+        result = await _validate(gateway, mode=mode)
+
+        assert gateway.max_in_flight == expected
+        assert [c.check_name for c in result.checks] == [
+            "source_grounding", "clinical_accuracy", "bias_detection",
+        ]
+        assert result.recommendation == "auto_approve"
+
+    async def test_hard_reject_cancels_outstanding_checks(self):
+        verdicts = _verdicts()
+        verdicts.update({
+            schema: verdict for schema, verdict in _verdicts(0.0).items()
+            if schema in (SourceGroundingCheck, ClinicalAccuracyCheck)
+        })
+        gateway = FakeGateway(verdicts, delays={BiasDetectionCheck: 10})
+        result = await asyncio.wait_for(_validate(gateway), timeout=5)
+
+        assert result.recommendation == "reject"
+        assert result.skipped_checks == ["bias_detection"]
+        assert gateway.cancelled == [BiasDetectionCheck]
+        assert gateway.drained == 1
+
+    async def test_summative_content_is_never_short_circuited(self):
+        verdicts = {**_verdicts(), **{
+            schema: verdict for schema, verdict in _verdicts(0.0).items()
+            if schema in (SourceGroundingCheck, ClinicalAccuracyCheck)
+        }}
+        gateway = FakeGateway(verdicts, delays={BiasDetectionCheck: 0.05})
+        result = await _validate(gateway, is_summative=True)
+
+        assert result.skipped_checks == []
+        assert gateway.cancelled == []
+        assert len(result.checks) == 3
+
+
+class TestCombinedMode:
+    def _combined(self, **fields):
+        verdicts = _verdicts()
+        return CombinedSafetyCheck(
+            source_grounding=verdicts[SourceGroundingCheck],
+            clinical_accuracy=verdicts[ClinicalAccuracyCheck],
+            bias_detection=verdicts[BiasDetectionCheck],
+            **fields,
+        )
+
+    async def test_missing_question_verdicts_are_rerun(self):
+        gateway = FakeGateway(combined=self._combined())
+        result = await _validate(
+            gateway, content=MCQ, content_type="mcq",
+            declared_blooms_level="apply", mode="combined",
+        )
+
+        assert gateway.calls[0] is CombinedSafetyCheck
+        assert set(gateway.calls[1:]) == {
+            ItemWritingFlawCheck, BloomsVerificationCheck,
+        }
+        assert [c.check_name for c in result.checks] == [
+            "source_grounding", "clinical_accuracy", "bias_detection",
+            "item_writing_flaws", "blooms_verification",
+        ]
+
+    async def test_prescreen_applies_to_the_combined_verdict(self):
+        verdicts = _verdicts()
+        gateway = FakeGateway(combined=self._combined(
+            item_writing_flaws=verdicts[ItemWritingFlawCheck],
+            blooms_verification=verdicts[BloomsVerificationCheck],
+        ))
+        result = await _validate(
+            gateway, content=MCQ, content_type="mcq",
+            declared_blooms_level="apply", mode="combined",
+        )
+
+        assert gateway.calls == [CombinedSafetyCheck]
+        flaws = {c.check_name: c for c in result.checks}["item_writing_flaws"]
+        assert not flaws.passed
+        assert ItemWritingFlaw.ALL_NONE_OF_ABOVE.value in [
+            f["code"] for f in flaws.details["flaws"]
+        ]
+
+
+BATCH_CHECKS = {
+    SourceGroundingBatch: SourceGroundingCheck,
+    ClinicalAccuracyBatch: ClinicalAccuracyCheck,
+    BiasDetectionBatch: BiasDetectionCheck,
+}
+ITEM = re.compile(r'<item index="(\d+)">(.*?)</item>', re.DOTALL)
+
+
+class BatchGateway(FakeGateway):
+    """Answers packed calls in reverse item order.
+
+    Items containing "BIASED" get a failing bias verdict; items containing
+    "DROP" are left out of every packed response.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.packed: dict[type, list[int]] = {}
+
+    async def complete_structured(
+        self, db, *, output_schema, user_message="", **kwargs,
+    ):
+        single = BATCH_CHECKS.get(output_schema)
+        if single is None:
+            return await super().complete_structured(
+                db, output_schema=output_schema, **kwargs,
+            )
+        self.calls.append(output_schema)
+        items = ITEM.findall(user_message)
+        self.packed.setdefault(single, []).append(len(items))
+        batched = get_args(output_schema.model_fields["verdicts"].annotation)[0]
+        verdicts = []
+        for index, body in reversed(items):
+            if "DROP" in body:
+                continue
+            verdict = self.verdicts[single]
+            if single is BiasDetectionCheck and "BIASED" in body:
+                verdict = _verdicts(0.0)[BiasDetectionCheck]
+            verdicts.append(
+                batched(item_index=int(index), **verdict.model_dump()),
+            )
+        return output_schema(verdicts=verdicts)
+
+
+def _items(*contents):
+    return [SafetyItem(content=c, content_type="explanation") for c in contents]
+
+
+async def _validate_batch(gateway, items):
+    return await MedicalSafetyPipeline(gateway).validate_batch(
+        None, items=items, college_id=uuid4(),
+    )
+
+
+class TestValidateBatch:
+    async def test_items_are_packed_by_count(self):
+        gateway = BatchGateway()
+        count = 2 * BATCH_MAX_ITEMS + 3
+        results = await _validate_batch(
+            gateway, _items(*(f"Explanation {i}." for i in range(count))),
+        )
+
+        assert len(results) == count
+        for sizes in gateway.packed.values():
+            assert sorted(sizes) == [3, BATCH_MAX_ITEMS, BATCH_MAX_ITEMS]
+
+    async def test_items_are_packed_by_token_budget(self):
+        gateway = BatchGateway()
+        # ~5,000 estimated tokens each: two fit in the 12,000 token budget.
+        await _validate_batch(gateway, _items(*("x" * 20_000,) * 5))
+
+        for sizes in gateway.packed.values():
+            assert sorted(sizes) == [1, 2, 2]
+
+    async def test_verdicts_map_back_to_their_items(self):
+        gateway = BatchGateway()
+        results = await _validate_batch(
+            gateway, _items("Fair.", "BIASED.", "Also fair."),
+        )
+
+        bias = [
+            {c.check_name: c for c in result.checks}["bias_detection"]
+            for result in results
+        ]
+        assert [check.passed for check in bias] == [True, False, True]
+        assert results[0].recommendation == "auto_approve"
+        assert results[1].recommendation != "auto_approve"
+
+    async def test_missing_verdicts_fall_back_to_single_item_calls(self):
+        gateway = BatchGateway()
+        results = await _validate_batch(
+            gateway, _items("Fair.", "DROP me.", "Also fair."),
+        )
+
+        assert sorted(
+            schema.__name__ for schema in gateway.calls
+            if schema not in BATCH_CHECKS
+        ) == [
+            "BiasDetectionCheck", "ClinicalAccuracyCheck",
+            "SourceGroundingCheck",
+        ]
+        assert all(len(result.checks) == 3 for result in results)
+        assert results[1].recommendation == "auto_approve"
+
+
+class RecordingSession:
+    def __init__(self, lock):
+        self.lock = lock
+        self.executed: list[tuple[object, bool]] = []
+
+    async def execute(self, statement, rows=None):
+        self.executed.append((rows, self.lock.locked()))
+
+
+class TestLogChecksBatch:
+    async def test_bulk_insert_holds_the_session_lock(self):
+        gateway = BatchGateway()
+        pipeline = MedicalSafetyPipeline(gateway)
+        items = _items("Fair.", "Also fair.")
+        results = await _validate_batch(gateway, items)
+        db = RecordingSession(gateway.lock)
+
+        await pipeline.log_checks_batch(
+            db, uuid4(), uuid4(),
+            [(result, item.content) for result, item in zip(results, items)],
+        )
+
+        [(rows, locked)] = db.executed
+        assert locked
+        assert len(rows) == 6
@@ -0,0 +1,54 @@
+"""Tests for packed chunk classification in the ingestion MetadataExtractor."""
+
+from app.engines.ai.ingestion.metadata_extractor import (
+    MetadataExtractor,
+    _build_packed_message,
+    _PackedClassification,
+    _PackedClassificationBatch,
+)
+
+
+def _classification(index: int, topic: str) -> _PackedClassification:
+    return _PackedClassification(
+        index=index, subject="Pharmacology", topic=topic,
+    )
+
+
+class TestPackedMessage:
+    def test_chunks_are_numbered_in_order(self):
+        message = _build_packed_message([("alpha", "Book"), ("beta", "Book")])
+        assert message.index("[Chunk 0]") < message.index("alpha")
+        assert message.index("[Chunk 1]") < message.index("beta")
+
+    def test_long_chunks_are_truncated(self):
+        message = _build_packed_message([("x" * 10_000, "Book")])
+        assert len(message) < 2100
+
+
+class TestFromPacked:
+    def test_answers_are_mapped_by_index(self):
+        batch = _PackedClassificationBatch(classifications=[
+            _classification(1, "Beta blockers"),
+            _classification(0, "ACE inhibitors"),
+        ])
+        result = MetadataExtractor._from_packed(batch, 2)
+        assert [m.topic for m in result] == ["ACE inhibitors", "Beta blockers"]
+
+    def test_missing_and_out_of_range_indices(self):
+        batch = _PackedClassificationBatch(classifications=[
+            _classification(0, "ACE inhibitors"),
+            _classification(7, "Stray"),
+        ])
+        result = MetadataExtractor._from_packed(batch, 2)
+        assert result[0].topic == "ACE inhibitors"
+        assert result[1] is None
+
+    def test_defaults_fill_empty_fields(self):
+        batch = _PackedClassificationBatch(classifications=[
+            _PackedClassification(index=0, subject="", topic=""),
+        ])
+        metadata = MetadataExtractor._from_packed(batch, 1)[0]
+        assert metadata.subject == "Other"
+        assert metadata.topic == "Unclassified"
+        assert metadata.content_type == "theory"
+        assert metadata.key_terms is None
@@ -0,0 +1,147 @@
+"""Tests for the AI Gateway model routing policy — tiers, SLOs, failover."""
+
+from decimal import Decimal
+
+from app.engines.ai.model_routing import (
+    MODEL_TIERS,
+    CapabilityTier,
+    ModelHealthTracker,
+    ModelRoutingPolicy,
+    get_slo,
+)
+
+HAIKU = "claude-haiku-4-5-20251001"
+SONNET = "claude-sonnet-4-5-20250929"
+
+
+def _feed(tracker: ModelHealthTracker, model: str, n: int, **kwargs) -> None:
+    for _ in range(n):
+        tracker.record(model, **kwargs)
+
+
+class TestTierSelection:
+    def test_primary_model_without_history(self):
+        policy = ModelRoutingPolicy()
+        for tier, models in MODEL_TIERS.items():
+            selected = policy.select(
+                tier=tier, agent_id="test", task_type="general",
+            )
+            assert selected == models[0]
+
+    def test_accepts_tier_string(self):
+        policy = ModelRoutingPolicy()
+        assert policy.select(
+            tier="fast", agent_id="test", task_type="general",
+        ) == HAIKU
+
+    def test_latency_slo_breach_moves_to_sibling(self):
+        policy = ModelRoutingPolicy()
+        _feed(policy.tracker, HAIKU, 20, latency_ms=9000, ok=True)
+        _feed(policy.tracker, SONNET, 20, latency_ms=800, ok=True)
+        selected = policy.select(
+            tier=CapabilityTier.FAST,
+            agent_id="retrieval_router",
+            task_type="retrieval_routing",
+        )
+        assert selected == SONNET
+
+    def test_cost_slo_breach_moves_to_sibling(self):
+        policy = ModelRoutingPolicy()
+        _feed(
+            policy.tracker, SONNET, 20,
+            latency_ms=500, ok=True, cost_usd=Decimal("0.05"),
+        )
+        selected = policy.select(
+            tier=CapabilityTier.BALANCED,
+            agent_id="classifier",
+            task_type="classification",
+        )
+        assert selected == HAIKU
+
+
+class TestFailover:
+    def test_sustained_errors_fail_over(self):
+        policy = ModelRoutingPolicy()
+        _feed(policy.tracker, SONNET, 20, latency_ms=100, ok=False)
+        selected = policy.select(
+            tier=CapabilityTier.BALANCED, agent_id="test", task_type="general",
+        )
+        assert selected == HAIKU
+
+    def test_pinned_model_fails_over(self):
+        policy = ModelRoutingPolicy()
+        _feed(policy.tracker, SONNET, 20, latency_ms=100, ok=False)
+        assert policy.failover(
+            SONNET, agent_id="test", task_type="general",
+        ) == HAIKU
+
+    def test_few_errors_do_not_fail_over(self):
+        policy = ModelRoutingPolicy()
+        _feed(policy.tracker, SONNET, 3, latency_ms=100, ok=False)
+        assert policy.failover(
+            SONNET, agent_id="test", task_type="general",
+        ) == SONNET
+
+    def test_health_check_has_no_side_effects(self):
+        tracker = ModelHealthTracker()
+        # 4 errors in 20 calls: under the default threshold, over safety's
+        _feed(tracker, SONNET, 16, latency_ms=100, ok=True)
+        _feed(tracker, SONNET, 4, latency_ms=100, ok=False)
+
+        assert tracker.is_healthy(SONNET, 0.10) is False
+        assert tracker.is_healthy(SONNET, 0.25) is True
+        assert tracker.sample_count(SONNET) == 20
+
+    def test_errors_start_the_cooldown_when_recorded(self):
+        tracker = ModelHealthTracker()
+        _feed(tracker, SONNET, 10, latency_ms=100, ok=False)
+        # Window cleared, model still out for every threshold
+        assert tracker.sample_count(SONNET) == 0
+        assert tracker.is_healthy(SONNET, 1.0) is False
+
+
+class TestBudgetDowngrade:
+    def _gateway(self, policy):
+        from app.engines.ai.gateway import AIGateway
+
+        return AIGateway(api_key="test", routing_policy=policy)
+
+    def test_downgrades_to_a_healthy_sibling(self):
+        gateway = self._gateway(ModelRoutingPolicy())
+        assert gateway._downgrade_model(
+            SONNET, agent_id="test", task_type="general",
+        ) == HAIKU
+
+    def test_does_not_undo_a_failover(self):
+        policy = ModelRoutingPolicy()
+        _feed(policy.tracker, HAIKU, 20, latency_ms=100, ok=False)
+        # Pinned haiku fails over to sonnet; the warning downgrade keeps it
+        model = policy.failover(HAIKU, agent_id="test", task_type="general")
+        assert model == SONNET
+        assert self._gateway(policy)._downgrade_model(
+            model, agent_id="test", task_type="general",
+        ) == SONNET
+
+
+class TestHealthTracker:
+    def test_p95_requires_min_samples(self):
+        tracker = ModelHealthTracker()
+        _feed(tracker, HAIKU, 5, latency_ms=100, ok=True)
+        assert tracker.p95_latency_ms(HAIKU) is None
+
+    def test_p95_value(self):
+        tracker = ModelHealthTracker()
+        for latency in range(1, 101):
+            tracker.record(HAIKU, latency_ms=latency, ok=True)
+        assert tracker.p95_latency_ms(HAIKU) == 95
+
+    def test_window_is_bounded(self):
+        tracker = ModelHealthTracker(window_size=10)
+        _feed(tracker, HAIKU, 50, latency_ms=100, ok=True)
+        assert tracker.sample_count(HAIKU) == 10
+
+
+def test_slo_lookup_falls_back_to_wildcard_then_default():
+    assert get_slo("retrieval_router", "retrieval_routing").p95_latency_ms == 1500
+    assert get_slo("any_agent", "safety_check").max_error_rate == 0.10
+    assert get_slo("any_agent", "unknown_task").p95_latency_ms is None
@@ -0,0 +1,119 @@
+"""Tests for near-duplicate detection of ingested RAG chunks."""
+
+from uuid import uuid4
+
+from app.engines.ai.dedup_index import estimate_jaccard, fingerprint
+from app.engines.ai.ingestion.near_duplicates import (
+    CHUNK_JACCARD_THRESHOLD,
+    find_near_duplicates,
+    fingerprint_chunks,
+    same_numbers,
+    visible_to,
+)
+
+PASSAGE = (
+    "Furosemide is a loop diuretic that inhibits the Na-K-2Cl cotransporter "
+    "in the thick ascending limb of the loop of Henle. In acute pulmonary "
+    "oedema the usual adult dose is 40 mg intravenously, given slowly, "
+    "repeated after 20 minutes if the response is inadequate. Monitor "
+    "serum potassium, as hypokalaemia below 3.5 mmol/L predisposes to "
+    "digoxin toxicity and arrhythmias. Ototoxicity occurs with rapid "
+    "infusion of high doses, particularly in renal impairment."
+)
+# Same passage as OCR'd from another printing: reflowed lines, a broken
+# hyphenation and a missing comma.
+OCR_COPY = (
+    PASSAGE.replace("diuretic that", "diuretic\nthat")
+    .replace("cotransporter", "co-\ntransporter")
+    .replace("slowly,", "slowly")
+)
+DOSE_CHANGED = PASSAGE.replace("40 mg", "80 mg")
+UNRELATED = (
+    "The brachial plexus is formed by the ventral rami of C5 to T1. Its "
+    "roots give off the dorsal scapular and long thoracic nerves before "
+    "joining into upper, middle and lower trunks in the posterior "
+    "triangle of the neck."
+)
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class FakeSession:
+    """Returns the given stored (minhash, lsh_bands, content) rows."""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+
+    async def execute(self, query):
+        return FakeResult(self.rows)
+
+
+def _stored(text: str):
+    fp = fingerprint(text)
+    return list(fp.minhash), list(fp.bands), text
+
+
+class TestSignals:
+    def test_ocr_copy_is_above_threshold(self):
+        a, b = fingerprint_chunks([PASSAGE, OCR_COPY])
+        assert estimate_jaccard(a.minhash, b.minhash) >= CHUNK_JACCARD_THRESHOLD
+
+    def test_numbers_must_match(self):
+        assert same_numbers(PASSAGE, OCR_COPY)
+        assert not same_numbers(PASSAGE, DOSE_CHANGED)
+        assert same_numbers("0.5 mg then 2 mg", "2 mg then 0.5 mg")
+
+    def test_visibility(self):
+        college = uuid4()
+        assert visible_to(None, college)
+        assert visible_to(None, None)
+        assert visible_to(college, college)
+        assert not visible_to(college, uuid4())
+        assert not visible_to(college, None)
+
+
+class TestFindNearDuplicates:
+    async def test_stored_near_copy_is_a_duplicate(self):
+        db = FakeSession([_stored(PASSAGE)])
+        texts = [OCR_COPY, UNRELATED]
+        result = await find_near_duplicates(
+            db, texts, fingerprint_chunks(texts), college_id=None,
+        )
+        assert result == [True, False]
+
+    async def test_changed_dose_is_kept(self):
+        db = FakeSession([_stored(PASSAGE)])
+        texts = [DOSE_CHANGED]
+        result = await find_near_duplicates(
+            db, texts, fingerprint_chunks(texts), college_id=None,
+        )
+        assert result == [False]
+
+    async def test_earlier_text_in_batch_wins(self):
+        texts = [PASSAGE, UNRELATED, OCR_COPY]
+        result = await find_near_duplicates(
+            FakeSession(), texts, fingerprint_chunks(texts), college_id=None,
+        )
+        assert result == [False, False, True]
+
+    async def test_pending_texts_count_as_earlier(self):
+        texts = [OCR_COPY]
+        result = await find_near_duplicates(
+            FakeSession(),
+            texts,
+            fingerprint_chunks(texts),
+            college_id=None,
+            pending=[(fingerprint(PASSAGE), PASSAGE)],
+        )
+        assert result == [True]
+
+    async def test_empty_batch(self):
+        assert await find_near_duplicates(
+            FakeSession(), [], [], college_id=None,
+        ) == []
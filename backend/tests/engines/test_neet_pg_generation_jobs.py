@@ -0,0 +1,243 @@
+"""Tests for NEET-PG mock test batch planning and streamed generation."""
+
+import asyncio
+import dataclasses
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.core import database
+from app.engines.ai import routes
+from app.engines.ai.agents import neet_pg_prep, practice_question_generator
+from app.engines.ai.agents.neet_pg_prep import (
+    GENERATION_MAX_CONCURRENCY,
+    GENERATION_MAX_RETRIES,
+    S2_MAX_BATCH_SIZE,
+    NEETPGPrepAgent,
+)
+from app.engines.ai.agents.neet_pg_schemas import MockTestStreamEvent
+from app.shared.exceptions import AcolyteException
+
+
+def _agent(db=None) -> NEETPGPrepAgent:
+    return NEETPGPrepAgent(db=db, gateway=None, prompt_registry=None)
+
+
+class TestPlanGenerationJobs:
+    def test_splits_subjects_into_s2_batches(self):
+        agent = _agent()
+        blueprint = {"Medicine": 25, "Anatomy": 10, "Forensic Medicine": 0}
+        queue = agent._build_difficulty_queue(
+            agent._get_difficulty_allocation(35),
+        )
+        jobs, _ = agent._plan_generation_jobs(blueprint, queue)
+
+        assert [(j.subject, j.batch_index, j.count) for j in jobs] == [
+            ("Medicine", 0, 10),
+            ("Medicine", 1, 10),
+            ("Medicine", 2, 5),
+            ("Anatomy", 0, 10),
+        ]
+        assert all(j.count <= S2_MAX_BATCH_SIZE for j in jobs)
+
+    def test_difficulty_counts_cover_every_question(self):
+        agent = _agent()
+        allocation = agent._get_difficulty_allocation(50)
+        queue = agent._build_difficulty_queue(allocation)
+        jobs, counts = agent._plan_generation_jobs({"Surgery": 50}, queue)
+
+        assert counts == allocation
+        assert sum(j.count for j in jobs) == 50
+        assert all(1 <= r <= 5 for j in jobs for r in j.difficulty_ratings)
+
+
+# ---------------------------------------------------------------------------
+# Live generation
+# ---------------------------------------------------------------------------
+
+class FakeSession:
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        # Postgres (asyncpg) rejects bind parameters in SET
+        assert not (params and sql.lstrip().upper().startswith("SET ")), sql
+
+    async def commit(self):
+        pass
+
+    def add(self, obj):
+        pass
+
+    async def flush(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def _question(topic):
+    return SimpleNamespace(model_dump=lambda: {
+        "stem": "A 40-year-old man...",
+        "lead_in": "What is the diagnosis?",
+        "options": [{"text": t} for t in "ABCD"],
+        "correct_answer_index": 0,
+        "topic": topic,
+    })
+
+
+class FakeGenerator:
+    """Stands in for S2; ``failures`` maps topic → attempts that raise."""
+
+    def __init__(self, failures=None):
+        self.failures = dict(failures or {})
+        self.calls: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, *, topic, count, **kwargs):
+        self.calls.append(topic)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if self.failures.get(topic, 0) > 0:
+                self.failures[topic] -= 1
+                raise RuntimeError(f"S2 failed for {topic}")
+            return SimpleNamespace(questions=[_question(topic)] * count)
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def generator(monkeypatch):
+    fake = FakeGenerator()
+    monkeypatch.setattr(database, "async_session_factory", FakeSession)
+    monkeypatch.setattr(
+        practice_question_generator, "generate_practice_questions", fake,
+    )
+    monkeypatch.setattr(neet_pg_prep, "_GENERATION_RETRY_BACKOFF_SECONDS", 0)
+    return fake
+
+
+def _jobs(agent, subjects, per_subject=10):
+    queue = agent._build_difficulty_queue(
+        agent._get_difficulty_allocation(per_subject * len(subjects)),
+    )
+    jobs, _ = agent._plan_generation_jobs(
+        {s: per_subject for s in subjects}, queue,
+    )
+    return [dataclasses.replace(job, topic=job.subject) for job in jobs]
+
+
+async def _run(agent, jobs):
+    return [
+        result async for result in agent._run_generation_jobs(
+            jobs, student_id=uuid4(), college_id=uuid4(),
+        )
+    ]
+
+
+class TestRunGenerationJobs:
+    async def test_batches_run_concurrently_within_the_bound(self, generator):
+        agent = _agent()
+        subjects = [f"Subject {i}" for i in range(GENERATION_MAX_CONCURRENCY + 2)]
+        results = await _run(agent, _jobs(agent, subjects))
+
+        assert len(results) == len(subjects)
+        assert all(error is None and len(qs) == 10 for _, qs, error in results)
+        assert generator.max_in_flight == GENERATION_MAX_CONCURRENCY
+
+    async def test_failed_batch_is_retried_alone(self, generator):
+        generator.failures = {"Medicine": 1, "Surgery": GENERATION_MAX_RETRIES + 1}
+        agent = _agent()
+        results = {
+            job.subject: (len(questions), error)
+            for job, questions, error in await _run(
+                agent, _jobs(agent, ["Medicine", "Surgery", "Anatomy"]),
+            )
+        }
+
+        assert results["Medicine"] == (10, None)
+        assert results["Anatomy"] == (10, None)
+        assert results["Surgery"][0] == 0
+        assert isinstance(results["Surgery"][1], RuntimeError)
+        assert generator.calls.count("Anatomy") == 1
+        assert generator.calls.count("Medicine") == 2
+        assert generator.calls.count("Surgery") == GENERATION_MAX_RETRIES + 1
+
+
+class TestStreamMockTest:
+    @pytest.fixture
+    def agent(self, generator, monkeypatch):
+        agent = _agent(db=FakeSession())
+        monkeypatch.setattr(neet_pg_prep, "AgentExecution", SimpleNamespace)
+
+        async def serve_from_pool(jobs, *, student_id, college_id):
+            # The first batch comes from the pool, the rest are generated
+            pooled = [
+                q for _, q, _ in await _run(agent, jobs[:1])
+            ]
+            return {jobs[0].subject: pooled[0]}, jobs[1:]
+
+        monkeypatch.setattr(agent, "_serve_from_pool", serve_from_pool)
+        return agent
+
+    async def test_event_sequence(self, agent):
+        events = [
+            event async for event in agent.stream_mock_test(
+                student_id=uuid4(), college_id=uuid4(),
+                test_type="subject", subject_focus="Medicine",
+            )
+        ]
+
+        assert [(e.event, e.source) for e in events] == [
+            ("section", "question_pool"),
+            ("section", "live"),
+            ("section", "live"),
+            ("complete", "live"),
+        ]
+        assert [e.completed_batches for e in events] == [1, 2, 3, 3]
+        assert all(e.total_batches == 3 for e in events)
+        mock_test = events[-1].mock_test
+        assert mock_test.question_count == 30
+        assert sorted(q.question_index for q in mock_test.questions) == list(
+            range(30),
+        )
+
+    async def test_generate_requires_a_complete_event(self, monkeypatch):
+        agent = _agent()
+
+        async def no_complete(**kwargs):
+            yield MockTestStreamEvent(
+                event="section", completed_batches=1, total_batches=1,
+            )
+
+        monkeypatch.setattr(agent, "stream_mock_test", no_complete)
+        with pytest.raises(AcolyteException):
+            await agent.generate_mock_test(
+                student_id=uuid4(), college_id=uuid4(),
+            )
+
+    async def test_sse_ends_with_the_documented_complete_event(
+        self, agent, monkeypatch,
+    ):
+        async def stream(*, db, gateway, prompt_registry, **kwargs):
+            async for event in agent.stream_mock_test(**kwargs):
+                yield event
+
+        monkeypatch.setattr(neet_pg_prep, "stream_neetpg_mock_test", stream)
+        frames = [
+            frame async for frame in routes._neetpg_mock_sse_generator(
+                db=None, gateway=None, registry=None,
+                student_id=uuid4(), college_id=uuid4(),
+                test_type="subject", subject_focus="Medicine",
+                weak_area_focus=False,
+            )
+        ]
+        assert [f.split("\n", 1)[0] for f in frames] == [
+            "event: section", "event: section", "event: section",
+            "event: complete",
+        ]
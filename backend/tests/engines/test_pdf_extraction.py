@@ -0,0 +1,32 @@
+"""Tests for the process-pool PDF extraction helpers."""
+
+from app.engines.ai.ingestion.pdf_extraction import (
+    clean_pdf_text,
+    split_page_range,
+)
+
+
+class TestSplitPageRange:
+    def test_range_is_split_evenly_across_workers(self):
+        assert split_page_range(0, 16, 4) == [(0, 4), (4, 8), (8, 12), (12, 16)]
+
+    def test_sub_ranges_cover_range_contiguously(self):
+        parts = split_page_range(10, 403, 4)
+        assert parts[0][0] == 10
+        assert parts[-1][1] == 403
+        assert all(a[1] == b[0] for a, b in zip(parts, parts[1:]))
+        assert len(parts) <= 4
+
+    def test_small_ranges_are_not_over_split(self):
+        assert split_page_range(0, 5, 4) == [(0, 4), (4, 5)]
+
+    def test_empty_range(self):
+        assert split_page_range(7, 7, 4) == []
+
+
+class TestCleanPdfText:
+    def test_collapses_spaces_and_blank_lines(self):
+        assert clean_pdf_text("a  \t b\n\n\n\nc") == "a b\n\nc"
+
+    def test_strips_page_number_lines(self):
+        assert clean_pdf_text("Page 12\nCardiac output") == "Cardiac output"
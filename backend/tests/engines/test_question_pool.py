@@ -0,0 +1,150 @@
+"""Tests for question pool bucket helpers and refill gating."""
+
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.engines.ai import question_pool, tasks
+from app.engines.ai.question_pool import (
+    POOL_IDLE_DAYS,
+    REFILL_DEMAND_THRESHOLD,
+    PoolBucket,
+    QuestionPool,
+    content_hash,
+    nightly_buckets,
+    rating_to_tier,
+    request_refill,
+)
+
+
+class TestRatingToTier:
+    def test_ratings_map_to_tiers(self):
+        assert rating_to_tier(1) == "easy"
+        assert rating_to_tier(3) == "moderate"
+        assert rating_to_tier(5) == "difficult"
+
+    def test_out_of_range_rating_falls_back_to_difficult(self):
+        assert rating_to_tier(9) == "difficult"
+
+
+class TestContentHash:
+    def test_whitespace_and_case_are_normalized(self):
+        a = {"stem": "A 45-year-old man  presents", "lead_in": "Next step?"}
+        b = {"stem": "a 45-year-old man presents", "lead_in": "next   step?"}
+        assert content_hash(a) == content_hash(b)
+
+    def test_lead_in_is_part_of_the_hash(self):
+        a = {"stem": "Same vignette", "lead_in": "Diagnosis?"}
+        b = {"stem": "Same vignette", "lead_in": "Next step?"}
+        assert content_hash(a) != content_hash(b)
+
+    def test_options_do_not_affect_the_hash(self):
+        a = {"stem": "S", "lead_in": "L", "options": [{"text": "x"}]}
+        b = {"stem": "S", "lead_in": "L", "options": [{"text": "y"}]}
+        assert content_hash(a) == content_hash(b)
+
+
+class TestPoolBucket:
+    def test_bucket_is_hashable_with_default_blooms(self):
+        bucket = PoolBucket("Pharmacology", "Autonomic", "moderate")
+        same = PoolBucket("Pharmacology", "Autonomic", "moderate")
+        assert {bucket: 1}[same] == 1
+        assert bucket.blooms_level == "apply"
+
+
+@pytest.fixture
+def enqueued(monkeypatch):
+    calls: list[tuple] = []
+    monkeypatch.setattr(
+        tasks, "refill_question_pool_bucket",
+        SimpleNamespace(delay=lambda *args: calls.append(args)),
+    )
+    monkeypatch.setattr(question_pool, "_recent_refills", OrderedDict())
+    monkeypatch.setattr(question_pool, "_bucket_demand", OrderedDict())
+    return calls
+
+
+class TestRequestRefill:
+    def test_syllabus_bucket_refills_on_first_miss_then_debounces(
+        self, enqueued,
+    ):
+        college_id = uuid4()
+        bucket = PoolBucket("Medicine", "Cardiology", "moderate")
+        assert request_refill(college_id, bucket, on_syllabus=True)
+        assert not request_refill(college_id, bucket, on_syllabus=True)
+        assert len(enqueued) == 1
+
+    def test_free_text_bucket_waits_for_demand(self, enqueued):
+        college_id = uuid4()
+        bucket = PoolBucket("Pharmacology", "my exam tomorrow", "easy")
+        results = [
+            request_refill(college_id, bucket, on_syllabus=False)
+            for _ in range(REFILL_DEMAND_THRESHOLD)
+        ]
+        assert results == [False] * (REFILL_DEMAND_THRESHOLD - 1) + [True]
+        assert len(enqueued) == 1
+
+    def test_tracking_is_bounded(self, enqueued, monkeypatch):
+        monkeypatch.setattr(question_pool, "_REFILL_TRACKING_MAX_KEYS", 5)
+        college_id = uuid4()
+        for i in range(20):
+            bucket = PoolBucket("Medicine", f"topic {i}", "easy")
+            request_refill(college_id, bucket, on_syllabus=True)
+            request_refill(college_id, bucket, on_syllabus=False)
+        assert len(question_pool._recent_refills) == 5
+        assert len(enqueued) == 20
+
+    def test_debounce_entries_expire(self, enqueued, monkeypatch):
+        college_id = uuid4()
+        bucket = PoolBucket("Medicine", "Cardiology", "easy")
+        request_refill(college_id, bucket, on_syllabus=True)
+        monkeypatch.setattr(question_pool, "_REFILL_DEBOUNCE_SECONDS", 0)
+        assert request_refill(college_id, bucket, on_syllabus=True)
+        assert len(question_pool._recent_refills) == 1
+
+
+class TestNightlyBuckets:
+    async def test_idle_off_syllabus_buckets_expire(self, monkeypatch):
+        now = datetime.now(timezone.utc)
+        active = PoolBucket("Pharmacology", "beta blockers", "easy")
+        idle = PoolBucket("Pharmacology", "my notes p.4", "easy")
+        idle_syllabus = PoolBucket("Anatomy", "Brachial plexus", "easy")
+
+        async def last_active(self, college_id):
+            old = now - timedelta(days=POOL_IDLE_DAYS + 1)
+            return {active: now, idle: old, idle_syllabus: old}
+
+        async def on_syllabus(self, buckets):
+            return {b for b in buckets if b is idle_syllabus}
+
+        monkeypatch.setattr(QuestionPool, "bucket_last_active", last_active)
+        monkeypatch.setattr(QuestionPool, "on_syllabus", on_syllabus)
+        buckets = await nightly_buckets(db=None, college_id=uuid4())
+
+        assert active in buckets
+        assert idle_syllabus in buckets
+        assert idle not in buckets
+        assert PoolBucket("Medicine", "Cardiology", "difficult") in buckets
+
+
+class TestOnSyllabus:
+    async def test_high_yield_topics_skip_the_competency_query(self):
+        queries = []
+
+        class FakeSession:
+            async def execute(self, query):
+                queries.append(query)
+                return SimpleNamespace(all=lambda: [("anatomy", "brachial plexus")])
+
+        pool = QuestionPool(FakeSession())
+        cardiology = PoolBucket("Medicine", "cardiology", "easy")
+        plexus = PoolBucket("Anatomy", "Brachial Plexus", "easy")
+        free_text = PoolBucket("Anatomy", "arm stuff", "easy")
+
+        assert await pool.on_syllabus([cardiology]) == {cardiology}
+        assert queries == []
+        assert await pool.on_syllabus([plexus, free_text]) == {plexus}
+        assert len(queries) == 1
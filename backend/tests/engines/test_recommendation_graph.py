@@ -0,0 +1,173 @@
+"""Tests for the fan-out / fan-in recommendation LangGraph."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+from app.core import database
+from app.engines.ai.agents import recommendation_engine
+from app.engines.ai.agents.recommendation_engine import (
+    build_recommendation_graph,
+    gather_student_data,
+)
+from app.engines.ai.analytics import metacognitive
+
+
+def _state(trigger="manual"):
+    return {
+        "student_id": str(uuid4()),
+        "college_id": str(uuid4()),
+        "trigger": trigger,
+        "student_context": {},
+        "recent_events": [],
+        "archetype": None,
+        "knowledge_gaps": [],
+        "improvement_trends": [],
+        "workload_assessment": {},
+        "recommendations": [],
+        "study_plan": None,
+        "execution_id": None,
+    }
+
+
+class TestGraph:
+    async def test_gap_analysis_runs_alongside_data_gathering(self, monkeypatch):
+        gathering, analyzing = asyncio.Event(), asyncio.Event()
+        seen = {}
+
+        async def gather(state):
+            gathering.set()
+            # Deadlocks (and times out) unless both branches run at once
+            await analyzing.wait()
+            return {
+                "student_context": {"recent_activity": {}},
+                "recent_events": [],
+                "archetype": "Deep Diver",
+            }
+
+        async def analyze(state):
+            analyzing.set()
+            await gathering.wait()
+            return {"knowledge_gaps": [{"topic": "Shock"}], "improvement_trends": []}
+
+        async def generate(state):
+            seen.update(state)
+            return {"recommendations": [], "execution_id": None}
+
+        monkeypatch.setattr(recommendation_engine, "gather_student_data", gather)
+        monkeypatch.setattr(recommendation_engine, "analyze_knowledge_gaps", analyze)
+        monkeypatch.setattr(
+            recommendation_engine, "generate_recommendations", generate,
+        )
+
+        compiled = build_recommendation_graph().compile()
+        await asyncio.wait_for(compiled.ainvoke(_state()), timeout=5)
+
+        # generate_recommendations saw both branches' output
+        assert seen["knowledge_gaps"] == [{"topic": "Shock"}]
+        assert seen["workload_assessment"]["disengagement_risk"] is True
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+
+class FakeSession:
+    def __init__(self, rows, tracker):
+        self.rows = rows
+        self.tracker = tracker
+
+    async def execute(self, query):
+        self.tracker["open"] += 1
+        self.tracker["peak"] = max(self.tracker["peak"], self.tracker["open"])
+        await asyncio.sleep(0.01)
+        self.tracker["open"] -= 1
+        entity = query.column_descriptions[0]["entity"]
+        return FakeResult(self.rows.get(entity.__tablename__, []))
+
+
+class TestGatherStudentData:
+    async def test_reads_run_concurrently_on_separate_sessions(
+        self, monkeypatch,
+    ):
+        tracker = {"open": 0, "peak": 0, "sessions": 0}
+        event = SimpleNamespace(
+            event_type="study_session_started",
+            subject="Pathology",
+            topic="Neoplasia",
+            occurred_at=datetime(2026, 3, 10, tzinfo=timezone.utc),
+        )
+        archetype = SimpleNamespace(
+            behavioral_archetype=None, self_reported_archetype="Deep Diver",
+        )
+        rows = {
+            "metacognitive_events": [event],
+            "student_archetype_profiles": [archetype],
+        }
+
+        @asynccontextmanager
+        async def college_session(college_id):
+            tracker["sessions"] += 1
+            yield FakeSession(rows, tracker)
+
+        class FakeEngine:
+            async def get_student_context_for_ai(self, db, student_id, college_id):
+                await db.execute(recommendation_engine.select(
+                    recommendation_engine.StudentMetacognitiveProfile,
+                ))
+                return SimpleNamespace(model_dump=lambda: {"overall_mastery": 0.5})
+
+        monkeypatch.setattr(recommendation_engine, "_college_session", college_session)
+        monkeypatch.setattr(metacognitive, "get_analytics_engine", FakeEngine)
+
+        result = await gather_student_data(_state())
+
+        assert tracker["sessions"] == 3
+        assert tracker["peak"] == 3
+        assert result["student_context"] == {"overall_mastery": 0.5}
+        assert result["archetype"] == "Deep Diver"
+        assert result["recent_events"][0]["topic"] == "Neoplasia"
+
+
+class TenantSession:
+    def __init__(self):
+        self.queries: list[tuple[str, dict | None]] = []
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        # Postgres (asyncpg) rejects bind parameters in SET
+        assert not (params and sql.lstrip().upper().startswith("SET ")), sql
+        self.queries.append((sql, params))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class TestCollegeSession:
+    async def test_tenant_is_set_with_set_config(self, monkeypatch):
+        session = TenantSession()
+        monkeypatch.setattr(database, "async_session_factory", lambda: session)
+        college_id = str(uuid4())
+
+        async with recommendation_engine._college_session(college_id) as db:
+            assert db is session
+
+        assert session.queries == [(
+            "SELECT set_config('app.current_college_id', :cid, false)",
+            {"cid": college_id},
+        )]
@@ -0,0 +1,208 @@
+"""Tests for dependency-ordered, packed SAF field filling."""
+
+import asyncio
+import re
+from types import SimpleNamespace
+from uuid import uuid4
+
+from app.engines.ai.agents.compliance_schemas import DataFetchResult
+from app.engines.ai.agents.saf_generator import (
+    SAFGenerator,
+    _PackedNarrative,
+    _PackedNarrativeBatch,
+    field_waves,
+)
+
+
+class FakeResult:
+    def __init__(self, row):
+        self._row = row
+
+    def scalars(self):
+        return self
+
+    def first(self):
+        return self._row
+
+
+class FakeSession:
+    """Serves the template; accepts the draft."""
+
+    def __init__(self, template):
+        self.template = template
+        self.added = []
+
+    async def execute(self, query):
+        return FakeResult(self.template)
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def flush(self):
+        pass
+
+
+class FakeGateway:
+    """Answers packed calls with "text <n>" per request, minus ``drop``."""
+
+    def __init__(self, drop=(), fail_packs=False):
+        self.drop = set(drop)
+        self.fail_packs = fail_packs
+        self.packed_messages: list[str] = []
+        self.single_messages: list[str] = []
+        self._lock = asyncio.Lock()
+
+    def session_lock(self, db):
+        return self._lock
+
+    async def complete_structured(self, db, *, user_message, **kwargs):
+        self.packed_messages.append(user_message)
+        if self.fail_packs:
+            raise RuntimeError("overloaded")
+        count = len(re.findall(r"^\[Request \d+\]$", user_message, re.M))
+        return _PackedNarrativeBatch(narratives=[
+            _PackedNarrative(index=i, text=f"text {i}")
+            for i in range(count) if i not in self.drop
+        ])
+
+    async def complete(self, db, *, user_message, **kwargs):
+        self.single_messages.append(user_message)
+        return SimpleNamespace(content="single")
+
+
+class FakeFetcher:
+    def __init__(self, values):
+        self.values = values
+        self.calls: list[str] = []
+
+    async def fetch(self, db, source_type, query_config, college_id):
+        self.calls.append(source_type)
+        if source_type not in self.values:
+            return DataFetchResult(status="no_data", message="empty")
+        return DataFetchResult(value=self.values[source_type], status="ok")
+
+
+def _field(code, **extra):
+    return {"field_code": code, "label": f"Label {code}", **extra}
+
+
+def _narrative(code, **extra):
+    return _field(
+        code, requires_narrative=True, narrative_prompt=f"Describe {code}",
+        **extra,
+    )
+
+
+async def _generate(sections, gateway, fetcher):
+    template = SimpleNamespace(
+        id=uuid4(), template_code="NMC_SAF_AI", title="SAF", is_active=True,
+        sections=sections,
+    )
+    return await SAFGenerator(gateway, fetcher).generate_document(
+        FakeSession(template),
+        college_id=uuid4(),
+        template_id=template.id,
+        parameters={"academic_year": "2025-26"},
+        requested_by=uuid4(),
+    )
+
+
+class TestFieldWaves:
+    def test_dependencies_come_first(self):
+        fields = [
+            _field("A", depends_on=["B"]),
+            _field("B"),
+            _field("C", depends_on=["A", "B", "missing"]),
+            _field("D"),
+        ]
+        waves, cyclic = field_waves(fields)
+        assert waves == [[1, 3], [0], [2]]
+        assert cyclic == []
+
+    def test_cycles_are_reported(self):
+        fields = [
+            _field("A", depends_on=["B"]),
+            _field("B", depends_on=["A"]),
+            _field("C", depends_on=["A"]),
+            _field("D"),
+        ]
+        assert field_waves(fields) == ([[3]], [0, 1, 2])
+
+
+class TestGenerateDocument:
+    async def test_one_fetch_per_source_and_config(self):
+        fetcher = FakeFetcher({"college_profile": "Govt Medical College"})
+        sections = [
+            {"section_code": "S1", "order": 1, "fields": [
+                _field("A", data_source="college_profile.name"),
+                _field("B", data_source="college_profile.address"),
+            ]},
+            {"section_code": "S2", "order": 2, "fields": [
+                _field("C", data_source="college_profile.name"),
+                _field("D", data_source="college_profile.name",
+                       data_query_config={"scope": "ug"}),
+                _field("E"),
+            ]},
+        ]
+        result = await _generate(sections, FakeGateway(), fetcher)
+
+        assert sorted(fetcher.calls) == ["college_profile", "college_profile"]
+        assert [f.source for s in result.sections for f in s.fields] == [
+            "auto_filled", "auto_filled", "auto_filled", "auto_filled",
+            "manual_entry_required",
+        ]
+        assert result.auto_filled_fields == 4
+        assert [gap["field_code"] for gap in result.data_gaps] == ["E"]
+
+    async def test_narratives_are_packed_and_see_dependencies(self):
+        gateway = FakeGateway()
+        fetcher = FakeFetcher({"faculty_roster": 142})
+        sections = [
+            {"section_code": "S2", "order": 2, "fields": [
+                _narrative("SUMMARY", depends_on=["FAC"]),
+            ]},
+            {"section_code": "S1", "order": 1, "fields": [
+                _narrative("FAC", data_source="faculty_roster"),
+                _narrative("VISION"),
+                _narrative("MISSION"),
+            ]},
+        ]
+        result = await _generate(sections, gateway, fetcher)
+
+        # FAC, VISION and MISSION share one call; SUMMARY waits for FAC
+        assert len(gateway.packed_messages) == 1
+        assert len(gateway.single_messages) == 1
+        assert "- Label FAC: text 0" in gateway.single_messages[0]
+        assert [s.section_code for s in result.sections] == ["S1", "S2"]
+        fac, vision, mission = result.sections[0].fields
+        assert (fac.value, fac.data_source_used) == ("text 0", "faculty_roster")
+        assert (vision.value, mission.value) == ("text 1", "text 2")
+        assert result.sections[1].fields[0].value == "single"
+        assert result.narrative_fields == 4
+
+    async def test_missing_answers_are_retried_alone(self):
+        gateway = FakeGateway(drop={1})
+        sections = [{"section_code": "S1", "order": 1, "fields": [
+            _narrative("A"), _narrative("B"),
+        ]}]
+        result = await _generate(sections, gateway, FakeFetcher({}))
+
+        assert [f.value for f in result.sections[0].fields] == ["text 0", "single"]
+        assert "Describe B" in gateway.single_messages[0]
+
+    async def test_failed_pack_keeps_fallbacks(self):
+        gateway = FakeGateway(fail_packs=True)
+        sections = [{"section_code": "S1", "order": 1, "fields": [
+            _narrative("A", data_source="hostel_capacity"),
+            _narrative("B"),
+            _narrative("C", depends_on=["C"]),
+        ]}]
+        result = await _generate(
+            sections, gateway, FakeFetcher({"hostel_capacity": 600}),
+        )
+
+        a, b, c = result.sections[0].fields
+        assert (a.value, a.source) == (600, "auto_filled")
+        assert b.source == "manual_entry_required"
+        assert c.source == "manual_entry_required"
+        assert "cycle" in c.error_message
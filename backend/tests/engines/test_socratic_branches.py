@@ -0,0 +1,199 @@
+"""Tests for the concurrent pre-processing branches of the Study Buddy."""
+
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from app.core import database
+from app.engines.ai.agents import socratic_study_buddy as buddy
+
+
+class FakeSession:
+    def __init__(self, log, fail=False):
+        self.log = log
+        self.fail = fail
+        self.committed = False
+        self.queries: list[tuple[str, dict | None]] = []
+
+    async def execute(self, statement, params=None):
+        if self.fail:
+            raise ConnectionError("database unavailable")
+        sql = str(statement)
+        # Postgres (asyncpg) rejects bind parameters in SET
+        assert not (params and sql.lstrip().upper().startswith("SET ")), sql
+        self.queries.append((sql, params))
+
+    async def commit(self):
+        self.committed = True
+
+    async def __aenter__(self):
+        self.log.append(self)
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeGateway:
+    def __init__(self):
+        self.drained = []
+
+    async def drain(self, db):
+        self.drained.append(db)
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    log: list[FakeSession] = []
+    monkeypatch.setattr(
+        database, "async_session_factory", lambda: FakeSession(log),
+    )
+    return log
+
+
+def _state():
+    return {
+        "student_id": str(uuid4()),
+        "college_id": str(uuid4()),
+        "question": "Why does hypokalaemia cause arrhythmias?",
+        "active_pdf": "",
+        "active_chapter": "",
+        "active_page": 0,
+        "messages": [],
+        "turn_count": 0,
+        "student_knowledge_level": "intermediate",
+        "known_concepts": [],
+        "identified_misconceptions": [],
+        "zone_of_proximal_development": "guided_question",
+        "retrieved_passages": [],
+        "source_citations": [],
+        "current_scaffolding_level": "hint",
+        "scaffolding_attempts": 0,
+        "response": "",
+        "preservation_passed": False,
+        "regeneration_count": 0,
+        "regeneration_instructions": "",
+    }
+
+
+class TestRunBranch:
+    async def test_result_on_its_own_session(self, sessions):
+        gateway = FakeGateway()
+
+        async def node(state, *, db):
+            return {"identified_misconceptions": ["K+ raises excitability"]}
+
+        state = _state()
+        result = await buddy._run_branch(
+            node, state, gateway=gateway, timeout=1.0, fallback={},
+        )
+        assert result == {"identified_misconceptions": ["K+ raises excitability"]}
+        assert gateway.drained == sessions
+        assert sessions[0].committed
+        assert sessions[0].queries == [(
+            "SELECT set_config('app.current_college_id', :cid, false)",
+            {"cid": state["college_id"]},
+        )]
+
+    async def test_overrun_and_failure_fall_back(self, sessions):
+        gateway = FakeGateway()
+
+        async def slow(state, *, db):
+            await asyncio.sleep(10)
+
+        async def broken(state, *, db):
+            raise RuntimeError("tool server down")
+
+        fallback = {"identified_misconceptions": []}
+        for node in (slow, broken):
+            result = await buddy._run_branch(
+                node, _state(), gateway=gateway, timeout=0.01,
+                fallback=fallback,
+            )
+            assert result is fallback
+        # Usage from the abandoned calls is still drained and kept
+        assert gateway.drained == sessions
+        assert all(s.committed for s in sessions)
+
+
+    async def test_tenant_setup_failure_falls_back(self, monkeypatch):
+        log: list[FakeSession] = []
+        monkeypatch.setattr(
+            database, "async_session_factory",
+            lambda: FakeSession(log, fail=True),
+        )
+
+        ran: list[bool] = []
+
+        async def node(state, *, db):
+            ran.append(True)
+            return {}
+
+        fallback = {"retrieved_passages": []}
+        result = await buddy._run_branch(
+            node, _state(), gateway=FakeGateway(), timeout=1.0,
+            fallback=fallback,
+        )
+        assert result is fallback
+        assert ran == []
+
+
+class TestGraph:
+    async def test_branches_run_concurrently_and_join(
+        self, sessions, monkeypatch,
+    ):
+        started = {"retrieve": asyncio.Event(), "assess": asyncio.Event()}
+        scaffolds: list[dict] = []
+
+        async def retrieve(state, *, db):
+            started["retrieve"].set()
+            await started["assess"].wait()
+            return {"retrieved_passages": [{"content": "K+ and the RMP"}]}
+
+        async def assess(state, *, db):
+            started["assess"].set()
+            await started["retrieve"].wait()
+            return {"student_knowledge_level": "novice"}
+
+        async def detect(state, *, db):
+            await asyncio.sleep(10)  # overruns its budget
+
+        async def build(state, **deps):
+            scaffolds.append(dict(state))
+            return {"response": "What sets the resting membrane potential?"}
+
+        async def gate(state, **deps):
+            # Fail once to exercise the regeneration loop
+            passed = len(scaffolds) > 1
+            return {
+                "preservation_passed": passed,
+                "regeneration_count": state["regeneration_count"] + (not passed),
+            }
+
+        async def deliver(state, *, db):
+            return {"response": state["response"]}
+
+        monkeypatch.setattr(buddy, "retrieve_context", retrieve)
+        monkeypatch.setattr(buddy, "assess_knowledge", assess)
+        monkeypatch.setattr(buddy, "detect_misconceptions", detect)
+        monkeypatch.setattr(buddy, "build_scaffold", build)
+        monkeypatch.setattr(buddy, "preservation_gate", gate)
+        monkeypatch.setattr(buddy, "deliver_response", deliver)
+        monkeypatch.setattr(buddy, "MISCONCEPTION_TIMEOUT_SECONDS", 0.05)
+
+        graph = buddy.build_socratic_graph(
+            db=None, gateway=FakeGateway(), prompt_registry=None,
+        )
+        final = await asyncio.wait_for(
+            graph.ainvoke(_state(), {"configurable": {"thread_id": "t"}}),
+            timeout=5,
+        )
+
+        assert len(sessions) == 3
+        assert len(scaffolds) == 2
+        first = scaffolds[0]
+        assert first["retrieved_passages"] == [{"content": "K+ and the RMP"}]
+        assert first["student_knowledge_level"] == "novice"
+        assert first["identified_misconceptions"] == []
+        assert final["preservation_passed"] is True
@@ -0,0 +1,199 @@
+"""Tests for incremental Study Buddy streaming through the rolling gate."""
+
+import asyncio
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.engines.ai.agents import socratic_study_buddy as buddy
+from app.engines.ai.gateway import AIGateway, StreamChunk
+
+GIVEAWAY = (
+    "Good question. Think about the membrane. "
+    "The answer is hypokalaemia. Does that make sense?"
+)
+GUIDING = (
+    "Good question. Which ion sets the resting membrane potential? "
+    "What happens to it when serum potassium falls?"
+)
+
+
+class FakeGateway:
+    """Streams one scripted reply per attempt, a few characters at a time."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.requests: list[dict] = []
+        self.closed = 0
+        self.generation_done = asyncio.Event()
+
+    def stream(self, db, **request):
+        self.requests.append(request)
+        return self._tokens(self.replies.pop(0))
+
+    async def _tokens(self, reply):
+        try:
+            for i in range(0, len(reply), 5):
+                yield StreamChunk(type="text", text=reply[i:i + 5])
+                await asyncio.sleep(0)
+            self.generation_done.set()
+            yield StreamChunk(type="end")
+        finally:
+            self.closed += 1
+
+
+class FakeSession:
+    """Stands in for the AsyncSession the gateway locks and logs on."""
+
+
+class FakeMessageStream:
+    """An Anthropic message stream: 120 input tokens, 40 output tokens."""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.current_message_snapshot = SimpleNamespace(
+            usage=SimpleNamespace(input_tokens=120, output_tokens=1),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    @property
+    async def text_stream(self):
+        for i in range(0, len(self.reply), 5):
+            yield self.reply[i:i + 5]
+
+    async def get_final_message(self):
+        return SimpleNamespace(
+            usage=SimpleNamespace(input_tokens=120, output_tokens=40),
+        )
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """Stub the non-streaming steps; record preservation-gate calls."""
+    gated: list[str] = []
+
+    async def preprocess(state, *, gateway):
+        return {"retrieved_passages": [{"content": "K+ and the RMP"}]}
+
+    async def scaffold_request(state, *, db, prompt_registry):
+        return {"level": state["current_scaffolding_level"]}
+
+    async def gate(state, **deps):
+        gated.append(state["response"])
+        return {"preservation_passed": True}
+
+    async def deliver(state, *, db):
+        return {"response": "fallback" if not state["preservation_passed"]
+                else state["response"]}
+
+    monkeypatch.setattr(buddy, "_preprocess", preprocess)
+    monkeypatch.setattr(buddy, "_scaffold_request", scaffold_request)
+    monkeypatch.setattr(buddy, "preservation_gate", gate)
+    monkeypatch.setattr(buddy, "deliver_response", deliver)
+    return gated
+
+
+async def _request(state, *, db, prompt_registry):
+    return {
+        "system_prompt": "Be Socratic.",
+        "user_message": state["question"],
+        "college_id": state["college_id"],
+    }
+
+
+async def _collect(gateway):
+    chunks = []
+    async for chunk in buddy.stream_socratic_study_buddy(
+        db=None,
+        gateway=gateway,
+        prompt_registry=None,
+        question="Why does hypokalaemia cause arrhythmias?",
+        student_id=uuid4(),
+        college_id=uuid4(),
+    ):
+        chunks.append((chunk, gateway.generation_done.is_set()))
+    return chunks
+
+
+class TestStreaming:
+    async def test_text_arrives_before_generation_ends(self, pipeline):
+        gateway = FakeGateway([GUIDING])
+        chunks = await _collect(gateway)
+
+        texts = [(c.text, done) for c, done in chunks if c.type == "text"]
+        assert texts[0] == ("Good question. ", False)
+        assert "".join(t for t, _ in texts) == GUIDING
+        assert chunks[-1][0].type == "end"
+        assert pipeline == [GUIDING]
+        assert gateway.closed == 1
+
+    async def test_giveaway_is_retracted_and_regenerated(self, pipeline):
+        gateway = FakeGateway([GIVEAWAY, GUIDING])
+        chunks = await _collect(gateway)
+
+        types = [c.type for c, _ in chunks]
+        retract = types.index("retract")
+        before = "".join(c.text for c, _ in chunks[:retract] if c.type == "text")
+        after = "".join(c.text for c, _ in chunks[retract:] if c.type == "text")
+        assert before == "Good question. "
+        assert after == GUIDING
+        # The first attempt was cut off, never screened by the full gate
+        assert pipeline == [GUIDING]
+        assert [r["level"] for r in gateway.requests] == [
+            "hint", buddy.SCAFFOLDING_LEVELS[1],
+        ]
+        assert gateway.closed == 2
+
+    async def test_usage_is_logged_when_the_gate_cuts_a_stream(
+        self, pipeline, monkeypatch,
+    ):
+        replies = [GIVEAWAY, GUIDING]
+        gateway = AIGateway(api_key="test")
+        gateway.client = SimpleNamespace(messages=SimpleNamespace(
+            stream=lambda **params: FakeMessageStream(replies.pop(0)),
+        ))
+        logged: list[dict] = []
+
+        async def check_budget(db, college_id, model, task_type, **kwargs):
+            return model
+
+        async def log_execution(db, **kwargs):
+            logged.append(kwargs)
+
+        monkeypatch.setattr(gateway, "_check_budget", check_budget)
+        monkeypatch.setattr(gateway, "_log_execution", log_execution)
+        monkeypatch.setattr(buddy, "_scaffold_request", _request)
+
+        chunks = [
+            chunk async for chunk in buddy.stream_socratic_study_buddy(
+                db=FakeSession(), gateway=gateway, prompt_registry=None,
+                question="Why does hypokalaemia cause arrhythmias?",
+                student_id=uuid4(), college_id=uuid4(),
+            )
+        ]
+
+        assert [c.type for c in chunks].count("retract") == 1
+        cut, completed = (entry["usage"] for entry in logged)
+        # The cut-off attempt: snapshot input tokens, streamed output estimate
+        assert cut["input_tokens"] == 120
+        assert 1 < cut["output_tokens"] < len(GIVEAWAY) // 4
+        assert completed["output_tokens"] == 40
+        assert all(entry["cost"] > 0 for entry in logged)
+
+    async def test_fallback_after_max_attempts(self, pipeline):
+        attempts = buddy.MAX_REGENERATION_ATTEMPTS
+        gateway = FakeGateway([GIVEAWAY] * attempts)
+        chunks = await _collect(gateway)
+
+        types = [c.type for c, _ in chunks]
+        assert types.count("retract") == attempts
+        assert len(gateway.requests) == attempts
+        assert chunks[-2][0].text == "fallback"
+        assert types[-1] == "end"
+        assert pipeline == []
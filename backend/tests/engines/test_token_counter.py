@@ -0,0 +1,130 @@
+"""Tests for token-budget chunk packing in MedicalTextChunker."""
+
+import re
+
+from app.engines.ai.ingestion.chunker import (
+    _PARAGRAPH_BREAK,
+    MedicalTextChunker,
+    _split_spans,
+)
+from app.engines.ai.ingestion.tokens import EstimatedTokenCounter
+
+
+class WordCounter:
+    """One token per whitespace-separated word — exact and predictable."""
+
+    name = "words"
+
+    def count(self, text: str) -> int:
+        return len(text.split())
+
+    def tail(self, text: str, max_tokens: int) -> str:
+        return " ".join(text.split()[-max_tokens:])
+
+
+def _chunker(**kwargs) -> MedicalTextChunker:
+    params = dict(
+        target_tokens=50, min_tokens=10, max_tokens=60, overlap_tokens=5,
+        token_counter=WordCounter(),
+    )
+    params.update(kwargs)
+    return MedicalTextChunker(**params)
+
+
+def _sentences(n: int, words: int = 9, tag: str = "s") -> str:
+    return " ".join(
+        " ".join(f"{tag}{i}w{j}" for j in range(words)) + "." for i in range(n)
+    )
+
+
+class TestSplitSpans:
+    def test_spans_are_stripped_and_skip_blank_segments(self):
+        text = "  alpha  \n\n\n\n beta\n\n   \n\ngamma "
+        spans = _split_spans(text, 0, len(text), _PARAGRAPH_BREAK)
+        assert [text[s:e] for s, e in spans] == ["alpha", "beta", "gamma"]
+
+    def test_respects_bounds(self):
+        text = "a b c d e"
+        spans = _split_spans(text, 2, 7, re.compile(r"\s+"))
+        assert [text[s:e] for s, e in spans] == ["b", "c", "d"]
+
+
+class TestTokenBudgetPacking:
+    def test_chunks_stay_within_target_plus_overlap(self):
+        chunker = _chunker()
+        text = "\n\n".join(_sentences(4, tag=f"p{k}") for k in range(12))
+        chunks = chunker.chunk_text(text)
+
+        assert len(chunks) > 1
+        for chunk in chunks:
+            assert chunk.estimated_tokens <= 50 + 5
+            assert chunk.estimated_tokens == len(chunk.content.split())
+
+    def test_overlap_is_tail_of_previous_chunk(self):
+        chunker = _chunker()
+        text = _sentences(30)
+        first, second = chunker.chunk_text(text)[:2]
+
+        overlap = second.content.split("\n\n")[0]
+        assert len(overlap.split()) == 5
+        assert first.content.endswith(overlap)
+
+    def test_chunks_end_at_paragraph_boundary(self):
+        # Paragraphs of 30 tokens: two do not fit in 50, so each chunk
+        # holds one paragraph rather than a paragraph and a half.
+        chunker = _chunker(overlap_tokens=0)
+        text = "\n\n".join(_sentences(3, words=10, tag=f"p{k}s") for k in range(4))
+        chunks = chunker.chunk_text(text)
+
+        assert [c.content.split()[0] for c in chunks] == [
+            "p0s0w0", "p1s0w0", "p2s0w0", "p3s0w0",
+        ]
+
+    def test_short_paragraph_is_packed_with_next(self):
+        # Cutting before the second paragraph would leave a 4-token chunk
+        # (under min_tokens), so sentences are packed across it instead.
+        chunker = _chunker(overlap_tokens=0)
+        text = _sentences(1, words=4, tag="a") + "\n\n" + _sentences(10, tag="b")
+        first = chunker.chunk_text(text)[0]
+
+        assert first.content.startswith("a0w0")
+        assert first.estimated_tokens == 4 + 5 * 9
+
+    def test_oversized_table_lines_are_split(self):
+        # A dosage table with no sentence punctuation is split at lines.
+        chunker = _chunker(overlap_tokens=0)
+        table = "\n".join(
+            f"Drug{i} | {i * 10} mg | PO | q8h | renal adjust" for i in range(40)
+        )
+        chunks = chunker.chunk_text(table)
+
+        assert len(chunks) > 1
+        for chunk in chunks:
+            assert chunk.estimated_tokens <= 50
+            assert chunk.content.startswith("Drug")
+            assert chunk.content.endswith("renal adjust")
+
+    def test_oversized_sentence_falls_back_to_words(self):
+        chunker = _chunker(overlap_tokens=0)
+        text = " ".join(f"w{i}" for i in range(120))
+        chunks = chunker.chunk_text(text)
+
+        assert [c.estimated_tokens for c in chunks] == [50, 50, 20]
+
+    def test_offsets_slice_the_source_text(self):
+        chunker = _chunker(overlap_tokens=0)
+        text = "CHAPTER 1 Cardiology\n" + "\n\n".join(
+            _sentences(3, tag=f"p{k}") for k in range(8)
+        )
+        for chunk in chunker.chunk_text(text):
+            assert text[chunk.start_char:chunk.end_char] == chunk.content
+            assert chunk.heading == "CHAPTER 1 Cardiology"
+
+
+class TestEstimatedTokenCounter:
+    def test_count_and_tail(self):
+        counter = EstimatedTokenCounter()
+        text = " ".join(f"w{i}" for i in range(100))
+        assert counter.count(text) == 135
+        assert counter.tail(text, 27).split() == [f"w{i}" for i in range(80, 100)]
+        assert counter.tail("short text", 27) == "short text"
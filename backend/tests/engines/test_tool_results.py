@@ -0,0 +1,173 @@
+"""Tests for tool result caching, compact serialization and the executor."""
+
+import asyncio
+import json
+import time
+from datetime import date
+from uuid import uuid4
+
+import pytest
+
+from app.core import database
+from app.engines.ai.tools import ToolExecutor
+from app.engines.ai.tools.base import MCPToolServer
+from app.engines.ai.tools.results import (
+    ToolResultCache,
+    compact_result,
+    serialize_tool_result,
+)
+
+
+class TestToolResultCache:
+    def test_equivalent_inputs_share_a_key(self):
+        cid = uuid4()
+        a = ToolResultCache.key(
+            cid, "get_attendance_summary",
+            {"department_id": "d1", "period": "current_month", "x": None},
+        )
+        b = ToolResultCache.key(
+            cid, "get_attendance_summary",
+            {"period": " current_month ", "department_id": "d1"},
+        )
+        assert a == b
+
+    def test_keys_are_per_tenant(self):
+        tool_input = {"department_id": "d1"}
+        assert ToolResultCache.key(uuid4(), "t", tool_input) != (
+            ToolResultCache.key(uuid4(), "t", tool_input)
+        )
+
+    def test_hit_then_expiry(self):
+        cache = ToolResultCache()
+        key = ToolResultCache.key(uuid4(), "t", {})
+        cache.set(key, {"rows": []}, ttl_seconds=0.05)
+        assert cache.get(key) == {"rows": []}
+        time.sleep(0.06)
+        assert cache.get(key) is None
+
+    def test_errors_and_zero_ttl_are_not_cached(self):
+        cache = ToolResultCache()
+        key = ToolResultCache.key(uuid4(), "t", {})
+        cache.set(key, {"error": "Tool execution failed: t"}, ttl_seconds=60)
+        assert cache.get(key) is None
+        cache.set(key, {"rows": []}, ttl_seconds=0)
+        assert cache.get(key) is None
+
+    def test_lru_eviction(self):
+        cache = ToolResultCache(max_entries=2)
+        cid = uuid4()
+        keys = [ToolResultCache.key(cid, "t", {"i": i}) for i in range(3)]
+        for key in keys:
+            cache.set(key, {"ok": True}, ttl_seconds=60)
+        assert cache.get(keys[0]) is None
+        assert cache.get(keys[2]) == {"ok": True}
+
+    def test_invalidate_one_college(self):
+        cache = ToolResultCache()
+        a, b = uuid4(), uuid4()
+        cache.set(ToolResultCache.key(a, "t", {}), {"v": 1}, 60)
+        cache.set(ToolResultCache.key(b, "t", {}), {"v": 2}, 60)
+        cache.invalidate(college_id=a)
+        assert cache.get(ToolResultCache.key(a, "t", {})) is None
+        assert cache.get(ToolResultCache.key(b, "t", {})) == {"v": 2}
+
+
+class TestSerializeToolResult:
+    def test_small_result_is_plain_json(self):
+        result = {"date": date(2026, 3, 1), "rate": 0.8}
+        assert json.loads(serialize_tool_result(result)) == {
+            "date": "2026-03-01", "rate": 0.8,
+        }
+
+    def test_large_row_list_is_compacted(self):
+        rows = [{"name": f"student-{i}" * 5, "attendance": i} for i in range(500)]
+        payload = serialize_tool_result({"below_threshold": rows})
+        data = json.loads(payload)
+        assert len(data["below_threshold"]) == 10
+        summary = data["below_threshold_summary"]
+        assert summary["total_rows"] == 500
+        assert summary["numeric_columns"]["attendance"] == {
+            "min": 0, "max": 499, "mean": 249.5,
+        }
+
+    def test_output_is_size_capped(self):
+        payload = serialize_tool_result({"text": "x" * 50_000}, max_chars=1000)
+        assert len(payload) <= 1000 + len(" ...[truncated]")
+
+    def test_short_lists_are_untouched(self):
+        value = {"rows": [{"a": 1}, {"a": 2}]}
+        assert compact_result(value) == value
+
+
+class FakeSession:
+    def __init__(self, log=None):
+        self.queries: list[str] = []
+        self.params: list[dict | None] = []
+        if log is not None:
+            log.append(self)
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        # Postgres (asyncpg) rejects bind parameters in SET
+        assert not (params and sql.lstrip().upper().startswith("SET ")), sql
+        self.queries.append(sql)
+        self.params.append(params)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class SlowServer(MCPToolServer):
+    server_name = "slow"
+    tool_timeouts = {"hang": 0.01}
+
+    def get_tool_definitions(self):
+        return [{"name": "hang"}, {"name": "lookup"}]
+
+    async def _tool_hang(self, tool_input):
+        await self.db.execute("SELECT pg_sleep(60)")
+        await asyncio.sleep(60)
+
+    async def _tool_lookup(self, tool_input):
+        await self.db.execute("SELECT 1")
+        return {"value": tool_input["q"]}
+
+
+class TestToolExecutor:
+    @pytest.fixture
+    def sessions(self, monkeypatch):
+        log: list[FakeSession] = []
+        monkeypatch.setattr(
+            database, "async_session_factory", lambda: FakeSession(log),
+        )
+        return log
+
+    async def test_single_call_runs_on_an_isolated_session(self, sessions):
+        shared = FakeSession()
+        college_id = uuid4()
+        executor = ToolExecutor([SlowServer(db=shared, college_id=college_id)])
+
+        result = await executor("hang", {})
+
+        assert result["error"] == "Tool timed out: hang"
+        assert shared.queries == []
+        assert len(sessions) == 1
+        assert sessions[0].queries == [
+            "SELECT set_config('app.current_college_id', :cid, false)",
+            "SELECT pg_sleep(60)",
+        ]
+        assert sessions[0].params[0] == {"cid": str(college_id)}
+
+    async def test_concurrent_calls_each_get_a_session(self, sessions):
+        shared = FakeSession()
+        executor = ToolExecutor([SlowServer(db=shared, college_id=uuid4())])
+
+        results = await executor.execute_many(
+            [("lookup", {"q": "a"}), ("lookup", {"q": "b"})],
+        )
+
+        assert results == [{"value": "a"}, {"value": "b"}]
+        assert len(sessions) == 2 and shared.queries == []